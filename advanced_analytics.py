@@ -1,23 +1,423 @@
 """
 Advanced performance analytics and risk metrics
+
+Trade and equity history live in fixed-capacity NumPy ring buffers, and the
+statistics behind the metrics are updated incrementally as points arrive, so
+get_comprehensive_metrics() reads them instead of rescanning the history.
+
+Features:
+- Structured-array ring buffers (no per-point dicts), O(1) append
+- Running trade statistics over the buffered window: sums for Sortino,
+  information ratio, profit factor, win/loss averages and the P&L distribution
+  are added on append and subtracted on eviction
+- Sliding-window drawdown statistics for Calmar, recovery factor and Ulcer
+  index (max drawdown, sum of squared drawdowns) over the buffered equity
+  window: amortized O(1) per appended or evicted point, O(1) to read
+- Append-only binary state files: save_state() only appends the records added
+  since the last save, and compacts a file once it holds twice the capacity
 """
+import math
+import os
+import threading
+from collections import deque
 import numpy as np
-import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from logger import Logger
-import joblib
-import os
+
+TRADE_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('symbol', '<U32'),
+    ('side', '<U8'),
+    ('entry_price', '<f8'),
+    ('exit_price', '<f8'),
+    ('pnl', '<f8'),
+    ('pnl_pct', '<f8'),
+    ('duration', '<f8'),
+    ('leverage', '<f8'),
+])
+
+EQUITY_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('balance', '<f8'),
+])
+
+LEGACY_STATE_PATH = 'models/analytics_state.pkl'
+
+# Trade distribution buckets on pnl_pct * 100: (name, lower, upper, lower inclusive, upper inclusive)
+_DISTRIBUTION_BUCKETS = (
+    ('huge_wins', 5, math.inf, False, False),
+    ('big_wins', 2, 5, False, True),
+    ('small_wins', 0, 2, False, True),
+    ('small_losses', -2, 0, True, False),
+    ('big_losses', -5, -2, True, False),
+    ('huge_losses', -math.inf, -5, False, False),
+)
+
+
+def _bucket(pnl_pct: float) -> Optional[str]:
+    p = pnl_pct * 100
+    for name, low, high, low_inclusive, high_inclusive in _DISTRIBUTION_BUCKETS:
+        above = p >= low if low_inclusive else p > low
+        below = p <= high if high_inclusive else p < high
+        if above and below:
+            return name
+    return None
+
+
+def _std(n: int, total: float, total_sq: float) -> float:
+    """Population std from running sums (0 when the spread is rounding noise)"""
+    if n == 0:
+        return 0.0
+    mean_sq = total_sq / n
+    variance = mean_sq - (total / n) ** 2
+    if variance <= 1e-12 * mean_sq:
+        return 0.0
+    return math.sqrt(variance)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class HistoryRingBuffer:
+    """
+    Fixed-capacity ring buffer of structured records.
+
+    Same mirrored layout as CandleRingBuffer: every record is written at i and
+    i + capacity, so the buffered records are always one contiguous slice.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._head = -1  # Index (0..capacity-1) of the newest record
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, record: tuple) -> Optional[np.void]:
+        """Append a record; returns a copy of the record it evicted, if any"""
+        head = (self._head + 1) % self.capacity
+        evicted = self._data[head].copy() if self._count == self.capacity else None
+        self._data[head] = record
+        self._data[head + self.capacity] = record
+        self._head = head
+        self._count = min(self._count + 1, self.capacity)
+        return evicted
+
+    def view(self) -> np.ndarray:
+        """Buffered records, oldest first (a view: copy it to keep it)"""
+        end = self._head + 1 + self.capacity
+        return self._data[end - self._count:end]
+
+    def replace(self, records: np.ndarray):
+        """Reset the buffer to the newest `capacity` of the given records"""
+        records = records[-self.capacity:]
+        n = len(records)
+        self._data[:n] = records
+        self._data[self.capacity:self.capacity + n] = records
+        self._head = n - 1 if n else -1
+        self._count = n
+
+
+class _TradeStats:
+    """Running sums over the buffered trades (add on append, remove on eviction)"""
+
+    def __init__(self):
+        self.n = 0
+        self.ret_sum = 0.0
+        self.ret_sq = 0.0
+        self.down_n = 0
+        self.down_sum = 0.0
+        self.down_sq = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.win_pct_sum = 0.0
+        self.loss_pct_sum = 0.0
+        self.duration_sum = 0.0
+        self.distribution = {name: 0 for name, *_ in _DISTRIBUTION_BUCKETS}
+
+    def update(self, trade, sign: int = 1):
+        pnl = float(trade['pnl'])
+        pnl_pct = float(trade['pnl_pct'])
+        self.n += sign
+        self.ret_sum += sign * pnl_pct
+        self.ret_sq += sign * pnl_pct * pnl_pct
+        self.duration_sum += sign * float(trade['duration'])
+        if pnl_pct < 0:
+            self.down_n += sign
+            self.down_sum += sign * pnl_pct
+            self.down_sq += sign * pnl_pct * pnl_pct
+        if pnl > 0:
+            self.gross_profit += sign * pnl
+            self.wins += sign
+            self.win_pct_sum += sign * pnl_pct
+        elif pnl < 0:
+            self.gross_loss -= sign * pnl
+            self.losses += sign
+            self.loss_pct_sum += sign * pnl_pct
+        bucket = _bucket(pnl_pct)
+        if bucket:
+            self.distribution[bucket] += sign
+
+
+class _EquityStats:
+    """Drawdown statistics of a fixed equity series (Calmar's sub-period), in one vectorized pass"""
+
+    def __init__(self):
+        self.n = 0
+        self.first_ts = self.last_ts = 0.0
+        self.first_balance = self.last_balance = 0.0
+        self.max_dd_pct = 0.0
+        self.max_dd_dollars = 0.0
+        self.ulcer_sq_sum = 0.0
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> '_EquityStats':
+        stats = cls()
+        stats.n = len(records)
+        if stats.n == 0:
+            return stats
+        timestamps, balances = records['timestamp'], records['balance'].astype(np.float64)
+        peaks = np.maximum.accumulate(balances)
+        gaps = peaks - balances
+        safe_peaks = np.where(peaks == 0, 1.0, peaks)
+        drawdowns = np.where(peaks == 0, (balances > 0).astype(np.float64), gaps / safe_peaks)
+
+        stats.first_ts, stats.last_ts = float(timestamps[0]), float(timestamps[-1])
+        stats.first_balance, stats.last_balance = float(balances[0]), float(balances[-1])
+        stats.max_dd_pct = max(0.0, float(drawdowns.max()))
+        stats.max_dd_dollars = max(0.0, float(gaps.max()))
+        stats.ulcer_sq_sum = float(np.square(gaps / safe_peaks * 100)[peaks > 0].sum())
+        return stats
+
+
+def _shift(agg: tuple, delta: float) -> tuple:
+    """Re-center (count, sum d, sum d^2, min balance) moments, d = balance - center, by delta"""
+    n, m1, m2, low = agg
+    return n, m1 + n * delta, m2 + 2 * delta * m1 + n * delta * delta, low
+
+
+def _merge(a: tuple, b: tuple) -> tuple:
+    return a[0] + b[0], a[1] + b[1], a[2] + b[2], min(a[3], b[3])
+
+
+def _segment_drawdown(peak: float, agg: tuple) -> tuple:
+    """(ulcer squared sum, max drawdown pct, max drawdown dollars) of points sharing one running peak"""
+    if peak <= 0:
+        return 0.0, 0.0, max(0.0, peak - agg[3])
+    return agg[2] / (peak * peak) * 1e4, (peak - agg[3]) / peak, peak - agg[3]
+
+
+class _EquityWindowStats:
+    """
+    Drawdown statistics of a sliding equity window, O(1) to read and amortized O(1) to update
+
+    The running peak from the window's first point splits the window into
+    segments, each headed by a new high. A segment only needs the peak, the
+    point count, the first two moments of (balance - peak) and the lowest
+    balance. That is enough for its Ulcer sum and its largest drawdown.
+
+    - Appends: a monotonic stack of points without a higher successor yet
+      gives every point its next higher point. Each point's segment
+      aggregate is finalized when that successor arrives.
+    - Evictions: removing the oldest point splits its segment into the
+      finalized segments of the points after it. Every point becomes a segment
+      head at most once.
+    - Closed segments are kept in a two-stack queue with running maxima. The
+      open last segment is tracked separately, with a monotonic deque for its
+      minimum.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._balance = [0.0] * capacity
+        self._timestamp = [0.0] * capacity
+        self._next_higher = [-1] * capacity
+        # Per point, centered on its balance: its stack gap while stacked, then its segment
+        self._agg: List[Optional[tuple]] = [None] * capacity
+        self.clear()
+
+    def clear(self):
+        self._start = 0  # Absolute index of the oldest point
+        self._end = -1  # Absolute index of the newest point
+        self._stack = deque()  # Points without a higher successor yet (balances non-increasing)
+        # Closed segments: (ulcer, dd pct, dd dollars, max dd pct, max dd dollars), the maxima
+        # running over the entries below on the same stack; the front stack's top is the oldest
+        self._front, self._back = [], []
+        self._closed_ulcer = 0.0
+        self._tail = -1  # Head (the window's highest point) of the open last segment
+        self._tail_agg = None  # (count, sum d, sum d^2) of the open segment, d = balance - its peak
+        self._tail_min = deque()  # Points of the open segment with increasing balances
+
+    def _bal(self, index: int) -> float:
+        return self._balance[index % self.capacity]
+
+    @property
+    def n(self) -> int:
+        return self._end - self._start + 1
+
+    @property
+    def first_ts(self) -> float:
+        return self._timestamp[self._start % self.capacity]
+
+    @property
+    def last_ts(self) -> float:
+        return self._timestamp[self._end % self.capacity]
+
+    @property
+    def first_balance(self) -> float:
+        return self._bal(self._start)
+
+    @property
+    def last_balance(self) -> float:
+        return self._bal(self._end)
+
+    def _tail_drawdown(self) -> tuple:
+        return _segment_drawdown(self._bal(self._tail), self._tail_agg + (self._bal(self._tail_min[0]),))
+
+    @property
+    def ulcer_sq_sum(self) -> float:
+        return 0.0 if self.n == 0 else max(0.0, self._closed_ulcer + self._tail_drawdown()[0])
+
+    def _max_drawdown(self, field: int) -> float:
+        if self.n == 0:
+            return 0.0
+        best = max(0.0, self._tail_drawdown()[field])
+        for side in (self._front, self._back):
+            if side:
+                best = max(best, side[-1][field + 2])
+        return best
+
+    @property
+    def max_dd_pct(self) -> float:
+        return self._max_drawdown(1)
+
+    @property
+    def max_dd_dollars(self) -> float:
+        return self._max_drawdown(2)
+
+    @staticmethod
+    def _push(side: list, ulcer: float, dd_pct: float, dd_dollars: float):
+        below_pct, below_dollars = (side[-1][3], side[-1][4]) if side else (0.0, 0.0)
+        side.append((ulcer, dd_pct, dd_dollars, max(dd_pct, below_pct), max(dd_dollars, below_dollars)))
+
+    def _close(self, head: int, agg: tuple, front: bool):
+        """Add a closed segment at the front or back of the queue"""
+        ulcer, dd_pct, dd_dollars = _segment_drawdown(self._bal(head), agg)
+        self._closed_ulcer += ulcer
+        self._push(self._front if front else self._back, ulcer, dd_pct, dd_dollars)
+
+    def _pop_front(self):
+        if not self._front:
+            # Move the back stack over (reversed), recomputing the running maxima
+            back, self._back = self._back, []
+            for ulcer, dd_pct, dd_dollars, _, _ in reversed(back):
+                self._push(self._front, ulcer, dd_pct, dd_dollars)
+        ulcer = self._front.pop()[0]
+        # Exactly zero again whenever no closed segment is left, so rounding does not accumulate
+        self._closed_ulcer = self._closed_ulcer - ulcer if self._front or self._back else 0.0
+
+    def _chain(self, first: int, stop: int) -> List[int]:
+        """Segment heads from first up to (excluding) stop, following next-higher links"""
+        heads = []
+        while first != stop:
+            heads.append(first)
+            first = self._next_higher[first % self.capacity]
+        return heads
+
+    def append(self, timestamp: float, balance: float):
+        """Add the newest point, evicting the oldest once the window holds capacity points"""
+        if self.n == self.capacity:
+            self._evict()
+        k = self._end + 1
+        slot = k % self.capacity
+        self._balance[slot], self._timestamp[slot], self._next_higher[slot] = balance, timestamp, -1
+        self._end = k
+
+        # Stacked points lower than the new one get it as next higher point: their segments are final
+        done = None
+        while self._stack and self._bal(self._stack[-1]) < balance:
+            j = self._stack.pop()
+            if done is not None:
+                self._agg[j % self.capacity] = _merge(
+                    self._agg[j % self.capacity], _shift(self._agg[done % self.capacity], self._bal(done) - self._bal(j)))
+            self._next_higher[j % self.capacity] = k
+            done = j
+        if done is not None and self._stack:
+            u = self._stack[-1]
+            self._agg[u % self.capacity] = _merge(
+                self._agg[u % self.capacity], _shift(self._agg[done % self.capacity], self._bal(done) - self._bal(u)))
+        self._stack.append(k)
+        self._agg[slot] = (1, 0.0, 0.0, balance)
+
+        if k == self._start or balance > self._bal(self._tail):
+            if k != self._start:
+                self._close(self._tail, self._tail_agg + (self._bal(self._tail_min[0]),), front=False)
+            self._tail, self._tail_agg, self._tail_min = k, (1, 0.0, 0.0), deque([k])
+        else:
+            d = balance - self._bal(self._tail)
+            n, m1, m2 = self._tail_agg
+            self._tail_agg = (n + 1, m1 + d, m2 + d * d)
+            while self._tail_min and self._bal(self._tail_min[-1]) >= balance:
+                self._tail_min.pop()
+            self._tail_min.append(k)
+
+    def _evict(self):
+        s = self._start
+        self._start = s + 1
+        if self._start > self._end:  # Capacity 1
+            self.clear()
+            self._start, self._end = s + 1, s
+            return
+        if s == self._tail:
+            # The window's highest point leaves: the points before the next highest form closed segments
+            self._stack.popleft()
+            new_tail = self._stack[0]
+            heads = self._chain(s + 1, new_tail)
+            removed = (1, 0.0, 0.0, self._bal(s))
+            for j in heads:
+                removed = _merge(removed, _shift(self._agg[j % self.capacity], self._bal(j) - self._bal(s)))
+            n, m1, m2 = self._tail_agg
+            remaining = (n - removed[0], m1 - removed[1], m2 - removed[2], 0.0)
+            self._tail_agg = _shift(remaining, self._bal(s) - self._bal(new_tail))[:3]
+            self._tail = new_tail
+            while self._tail_min[0] < new_tail:
+                self._tail_min.popleft()
+        else:
+            self._pop_front()
+            heads = self._chain(s + 1, self._next_higher[s % self.capacity])
+        for j in reversed(heads):
+            self._close(j, self._agg[j % self.capacity], front=True)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, capacity: int) -> '_EquityWindowStats':
+        stats = cls(capacity)
+        for timestamp, balance in zip(records['timestamp'].tolist(), records['balance'].tolist()):
+            stats.append(timestamp, balance)
+        return stats
+
 
 class AdvancedAnalytics:
     """Calculate advanced risk and performance metrics"""
 
     def __init__(self, max_history_size: int = 10000):
         self.logger = Logger.get_logger()
-        self.trade_history = []
-        self.equity_curve = []
         self.max_history_size = max_history_size
-        self.state_path = 'models/analytics_state.pkl'
+        self.state_path = 'models/analytics_state'
+        self._lock = threading.RLock()
+
+        self._trades = HistoryRingBuffer(TRADE_DTYPE, max_history_size)
+        self._equity = HistoryRingBuffer(EQUITY_DTYPE, max_history_size)
+        self._trade_stats = _TradeStats()
+        self._equity_stats = _EquityWindowStats(max_history_size)
+        # Records added since the last save_state(); rewrite = file must be compacted/replaced
+        self._unsaved = {'trades': 0, 'equity': 0}
+        self._rewrite = {'trades': False, 'equity': False}
 
         # Load existing state if available
         self.load_state()
@@ -29,32 +429,94 @@ class AdvancedAnalytics:
         Args:
             trade_data: Dict with trade info (entry, exit, pnl, duration, etc.)
         """
-        self.trade_history.append({
-            'timestamp': datetime.now(),
-            'symbol': trade_data.get('symbol'),
-            'side': trade_data.get('side'),
-            'entry_price': trade_data.get('entry_price'),
-            'exit_price': trade_data.get('exit_price'),
-            'pnl': trade_data.get('pnl', 0),
-            'pnl_pct': trade_data.get('pnl_pct', 0),
-            'duration': trade_data.get('duration', 0),
-            'leverage': trade_data.get('leverage', 1)
-        })
-
-        # MEMORY: Limit history size to prevent unbounded growth
-        if len(self.trade_history) > self.max_history_size:
-            self.trade_history = self.trade_history[-self.max_history_size:]
+        def number(key, default=math.nan):
+            value = trade_data.get(key, default)
+            return default if value is None else float(value)
+
+        record = (
+            datetime.now().timestamp(),
+            str(trade_data.get('symbol') or ''),
+            str(trade_data.get('side') or ''),
+            number('entry_price'),
+            number('exit_price'),
+            number('pnl', 0.0),
+            number('pnl_pct', 0.0),
+            number('duration', 0.0),
+            number('leverage', 1.0),
+        )
+        with self._lock:
+            # MEMORY: Fixed-capacity buffer, the oldest trade leaves the window
+            evicted = self._trades.append(record)
+            if evicted is not None:
+                self._trade_stats.update(evicted, -1)
+            self._trade_stats.update(self._trades.view()[-1])
+            self._unsaved['trades'] += 1
 
     def record_equity(self, balance: float):
         """Record current equity for curve tracking"""
-        self.equity_curve.append({
-            'timestamp': datetime.now(),
-            'balance': balance
-        })
+        timestamp = datetime.now().timestamp()
+        with self._lock:
+            # MEMORY: Fixed-capacity buffer; the drawdown stats slide with it (same capacity)
+            self._equity.append((timestamp, balance))
+            self._equity_stats.append(timestamp, float(balance))
+            self._unsaved['equity'] += 1
+
+    @property
+    def trade_history(self) -> List[Dict]:
+        """Buffered trades as dicts, oldest first (a copy; built on each access)"""
+        with self._lock:
+            records = self._trades.view().copy()
+        return [{
+            'timestamp': datetime.fromtimestamp(r['timestamp']),
+            'symbol': str(r['symbol']),
+            'side': str(r['side']),
+            'entry_price': _optional(float(r['entry_price'])),
+            'exit_price': _optional(float(r['exit_price'])),
+            'pnl': float(r['pnl']),
+            'pnl_pct': float(r['pnl_pct']),
+            'duration': float(r['duration']),
+            'leverage': float(r['leverage']),
+        } for r in records]
+
+    @property
+    def equity_curve(self) -> List[Dict]:
+        """Buffered equity points as dicts, oldest first (a copy; built on each access)"""
+        with self._lock:
+            records = self._equity.view().copy()
+        return [{'timestamp': datetime.fromtimestamp(ts), 'balance': balance}
+                for ts, balance in zip(records['timestamp'].tolist(), records['balance'].tolist())]
+
+    @equity_curve.setter
+    def equity_curve(self, points: List[Dict]):
+        records = np.array([(p['timestamp'].timestamp(), p['balance']) for p in points], dtype=EQUITY_DTYPE)
+        with self._lock:
+            self._equity.replace(records)
+            self._equity_stats = _EquityWindowStats.from_records(self._equity.view(), self.max_history_size)
+            self._rewrite['equity'] = True
+
+    @property
+    def initial_balance(self) -> Optional[float]:
+        """First balance of the tracked equity curve, or None if nothing is recorded"""
+        with self._lock:
+            stats = self._equity_stats
+            return stats.first_balance if stats.n else None
+
+    def prune_equity_before(self, cutoff: datetime) -> int:
+        """
+        Drop equity points older than cutoff and restart drawdown stats from the rest
 
-        # MEMORY: Limit equity curve size to prevent unbounded growth
-        if len(self.equity_curve) >= self.max_history_size:
-            self.equity_curve = self.equity_curve[-self.max_history_size:]
+        Returns:
+            Number of points removed
+        """
+        with self._lock:
+            records = self._equity.view()
+            keep = records[records['timestamp'] > cutoff.timestamp()].copy()
+            removed = len(records) - len(keep)
+            if removed:
+                self._equity.replace(keep)
+                self._equity_stats = _EquityWindowStats.from_records(keep, self.max_history_size)
+                self._rewrite['equity'] = True
+            return removed
 
     def calculate_sortino_ratio(self, risk_free_rate: float = 0.0) -> float:
         """
@@ -66,30 +528,28 @@ class AdvancedAnalytics:
         Returns:
             Sortino ratio (higher is better)
         """
-        if len(self.trade_history) < 10:
-            return 0.0
-
-        returns = [t['pnl_pct'] for t in self.trade_history]
-
-        if not returns:
-            return 0.0
+        with self._lock:
+            stats = self._trade_stats
+            if stats.n < 10:
+                return 0.0
 
-        # Calculate average return
-        avg_return = np.mean(returns)
+            # Calculate average return
+            avg_return = stats.ret_sum / stats.n
 
-        # Calculate downside deviation (only negative returns)
-        downside_returns = [r for r in returns if r < 0]
-        if not downside_returns:
-            return float('inf')  # No losses
+            # Calculate downside deviation (only negative returns)
+            if stats.down_n == 0:
+                return float('inf')  # No losses
 
-        downside_std = np.std(downside_returns)
+            downside_std = _std(stats.down_n, stats.down_sum, stats.down_sq)
+            first_trade = datetime.fromtimestamp(self._trades.view()[0]['timestamp'])
+            n = stats.n
 
         if downside_std == 0:
             return float('inf')
 
         # Annualize assuming 365 trading days
         trading_days_per_year = 365
-        avg_trades_per_day = len(self.trade_history) / max(1, (datetime.now() - self.trade_history[0]['timestamp']).days)
+        avg_trades_per_day = n / max(1, (datetime.now() - first_trade).days)
 
         annualized_return = avg_return * avg_trades_per_day * trading_days_per_year
         annualized_downside_std = downside_std * np.sqrt(avg_trades_per_day * trading_days_per_year)
@@ -108,54 +568,34 @@ class AdvancedAnalytics:
         Returns:
             Calmar ratio (higher is better)
         """
-        if len(self.equity_curve) < 2:
-            return 0.0
-
-        # Filter recent data
-        cutoff_date = datetime.now() - timedelta(days=period_days)
-        recent_equity = [e for e in self.equity_curve if e['timestamp'] >= cutoff_date]
-
-        if len(recent_equity) < 2:
-            recent_equity = self.equity_curve
-
-        balances = [e['balance'] for e in recent_equity]
-
-        # Calculate return
-        initial_balance = balances[0]
-        final_balance = balances[-1]
+        with self._lock:
+            stats = self._equity_stats
+            if stats.n < 2:
+                return 0.0
+
+            # Filter recent data (only needs a pass when tracking started before the cutoff)
+            cutoff = (datetime.now() - timedelta(days=period_days)).timestamp()
+            if stats.first_ts < cutoff:
+                records = self._equity.view()
+                recent = records[records['timestamp'] >= cutoff]
+                if len(recent) >= 2:
+                    stats = _EquityStats.from_records(recent)
 
         # Defensive: Handle zero initial balance
-        if initial_balance == 0:
+        if stats.first_balance == 0:
             return 0.0
 
-        total_return = (final_balance - initial_balance) / initial_balance
+        total_return = (stats.last_balance - stats.first_balance) / stats.first_balance
 
-        # Calculate max drawdown
-        peak = balances[0]
-        max_dd = 0.0
-
-        for balance in balances:
-            if balance > peak:
-                peak = balance
-            # Handle zero peak: if peak is zero and balance > 0, treat drawdown as 100%
-            if peak == 0:
-                dd = 1.0 if balance > 0 else 0.0
-            else:
-                dd = (peak - balance) / peak
-            if dd > max_dd:
-                max_dd = dd
-
-        if max_dd == 0:
+        if stats.max_dd_pct == 0:
             return float('inf')
 
         # Annualize return
-        days_elapsed = max(1, (recent_equity[-1]['timestamp'] - recent_equity[0]['timestamp']).days)
-        # SAFETY: Prevent division by zero in edge cases
-        if days_elapsed <= 0:
-            days_elapsed = 1
+        elapsed = datetime.fromtimestamp(stats.last_ts) - datetime.fromtimestamp(stats.first_ts)
+        days_elapsed = max(1, elapsed.days)
         annualized_return = total_return * (365 / days_elapsed)
 
-        calmar_ratio = annualized_return / max_dd
+        calmar_ratio = annualized_return / stats.max_dd_pct
 
         return calmar_ratio
 
@@ -169,23 +609,21 @@ class AdvancedAnalytics:
         Returns:
             Information ratio (higher is better)
         """
-        if len(self.trade_history) < 10:
-            return 0.0
-
-        returns = [t['pnl_pct'] for t in self.trade_history]
-
-        if not returns:
-            return 0.0
-
-        # If no benchmark, use risk-free rate (0%)
-        if benchmark_returns is None:
-            benchmark_returns = [0.0] * len(returns)
-
-        # Calculate excess returns
-        excess_returns = [r - b for r, b in zip(returns, benchmark_returns[:len(returns)])]
-
-        avg_excess_return = np.mean(excess_returns)
-        tracking_error = np.std(excess_returns)
+        with self._lock:
+            stats = self._trade_stats
+            if stats.n < 10:
+                return 0.0
+
+            if benchmark_returns is None:
+                # Benchmark is the risk-free rate (0%): excess returns are the returns
+                avg_excess_return = stats.ret_sum / stats.n
+                tracking_error = _std(stats.n, stats.ret_sum, stats.ret_sq)
+            else:
+                returns = self._trades.view()['pnl_pct']
+                n = min(len(returns), len(benchmark_returns))
+                excess_returns = returns[:n] - np.asarray(benchmark_returns[:n], dtype=float)
+                avg_excess_return = np.mean(excess_returns)
+                tracking_error = np.std(excess_returns)
 
         # SAFETY: Guard against division by zero
         if tracking_error == 0 or np.isnan(tracking_error):
@@ -202,14 +640,14 @@ class AdvancedAnalytics:
         Returns:
             Profit factor (>1 is profitable)
         """
-        if not self.trade_history:
-            return 0.0
+        with self._lock:
+            stats = self._trade_stats
+            if not stats.n:
+                return 0.0
+            gross_profit, gross_loss = stats.gross_profit, stats.gross_loss
 
-        gross_profit = sum(t['pnl'] for t in self.trade_history if t['pnl'] > 0)
-        gross_loss = abs(sum(t['pnl'] for t in self.trade_history if t['pnl'] < 0))
-
-        if gross_loss == 0:
-            return float('inf') if gross_profit > 0 else 0.0
+        if stats.losses == 0:
+            return float('inf') if stats.wins > 0 else 0.0
 
         return gross_profit / gross_loss
 
@@ -220,30 +658,27 @@ class AdvancedAnalytics:
         Returns:
             Dict with max consecutive wins and losses
         """
-        if not self.trade_history:
+        with self._lock:
+            pnl = self._trades.view()['pnl'].copy()
+
+        if not len(pnl):
             return {'max_wins': 0, 'max_losses': 0, 'current_streak': 0}
 
-        max_wins = 0
-        max_losses = 0
-        current_wins = 0
-        current_losses = 0
-
-        for trade in self.trade_history:
-            if trade['pnl'] > 0:
-                current_wins += 1
-                current_losses = 0
-                max_wins = max(max_wins, current_wins)
-            elif trade['pnl'] < 0:
-                current_losses += 1
-                current_wins = 0
-                max_losses = max(max_losses, current_losses)
+        # Run lengths of wins (+1) and losses (-1); break-even trades don't end a streak
+        signs = np.sign(pnl)
+        signs = signs[signs != 0]
+        if not len(signs):
+            return {'max_wins': 0, 'max_losses': 0, 'current_streak': 0}
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(signs)) + 1))
+        lengths = np.diff(np.append(starts, len(signs)))
+        values = signs[starts]
+        max_wins = int(lengths[values > 0].max()) if (values > 0).any() else 0
+        max_losses = int(lengths[values < 0].max()) if (values < 0).any() else 0
 
         # Determine current streak
-        if self.trade_history:
-            last_trade = self.trade_history[-1]
-            current_streak = current_wins if last_trade['pnl'] > 0 else -current_losses
-        else:
-            current_streak = 0
+        current_losses = int(lengths[-1]) if values[-1] < 0 else 0
+        current_streak = int(lengths[-1]) if pnl[-1] > 0 else -current_losses
 
         return {
             'max_wins': max_wins,
@@ -258,25 +693,12 @@ class AdvancedAnalytics:
         Returns:
             Recovery factor (higher is better)
         """
-        if not self.equity_curve or len(self.equity_curve) < 2:
-            return 0.0
-
-        balances = [e['balance'] for e in self.equity_curve]
-
-        initial_balance = balances[0]
-        final_balance = balances[-1]
-        net_profit = final_balance - initial_balance
-
-        # Calculate max drawdown in dollar terms
-        peak = balances[0]
-        max_dd_dollars = 0.0
-
-        for balance in balances:
-            if balance > peak:
-                peak = balance
-            dd = peak - balance
-            if dd > max_dd_dollars:
-                max_dd_dollars = dd
+        with self._lock:
+            stats = self._equity_stats
+            if stats.n < 2:
+                return 0.0
+            net_profit = stats.last_balance - stats.first_balance
+            max_dd_dollars = stats.max_dd_dollars
 
         if max_dd_dollars == 0:
             return float('inf') if net_profit > 0 else 0.0
@@ -290,29 +712,13 @@ class AdvancedAnalytics:
         Returns:
             Ulcer Index (lower is better)
         """
-        if not self.equity_curve or len(self.equity_curve) < 2:
-            return 0.0
-
-        balances = [e['balance'] for e in self.equity_curve]
-
-        # Calculate percentage drawdown from peak for each point
-        drawdowns = []
-        peak = balances[0]
+        with self._lock:
+            stats = self._equity_stats
+            if stats.n < 2:
+                return 0.0
 
-        for balance in balances:
-            if balance > peak:
-                peak = balance
-            # Defensive: Handle zero peak to avoid division by zero
-            if peak > 0:
-                dd_pct = ((peak - balance) / peak) * 100
-            else:
-                dd_pct = 0.0
-            drawdowns.append(dd_pct)
-
-        # Ulcer Index is RMS of drawdowns
-        ulcer_index = np.sqrt(np.mean([dd ** 2 for dd in drawdowns]))
-
-        return ulcer_index
+            # Ulcer Index is RMS of percentage drawdowns from peak
+            return math.sqrt(stats.ulcer_sq_sum / stats.n)
 
     def get_trade_distribution(self) -> Dict:
         """
@@ -321,21 +727,10 @@ class AdvancedAnalytics:
         Returns:
             Dict with trade distribution stats
         """
-        if not self.trade_history:
-            return {}
-
-        pnls = [t['pnl_pct'] * 100 for t in self.trade_history]  # Convert to percentage
-
-        distribution = {
-            'huge_wins': len([p for p in pnls if p > 5]),  # >5%
-            'big_wins': len([p for p in pnls if 2 < p <= 5]),  # 2-5%
-            'small_wins': len([p for p in pnls if 0 < p <= 2]),  # 0-2%
-            'small_losses': len([p for p in pnls if -2 <= p < 0]),  # 0 to -2%
-            'big_losses': len([p for p in pnls if -5 <= p < -2]),  # -2 to -5%
-            'huge_losses': len([p for p in pnls if p < -5])  # <-5%
-        }
-
-        return distribution
+        with self._lock:
+            if not self._trade_stats.n:
+                return {}
+            return dict(self._trade_stats.distribution)
 
     def get_comprehensive_metrics(self) -> Dict:
         """
@@ -344,32 +739,31 @@ class AdvancedAnalytics:
         Returns:
             Dict with all calculated metrics
         """
-        metrics = {
-            'sortino_ratio': self.calculate_sortino_ratio(),
-            'calmar_ratio': self.calculate_calmar_ratio(),
-            'information_ratio': self.calculate_information_ratio(),
-            'profit_factor': self.calculate_profit_factor(),
-            'recovery_factor': self.calculate_recovery_factor(),
-            'ulcer_index': self.calculate_ulcer_index(),
-            'consecutive_stats': self.calculate_consecutive_wins_losses(),
-            'trade_distribution': self.get_trade_distribution(),
-            'total_trades': len(self.trade_history)
-        }
-
-        # Calculate additional basic metrics
-        if self.trade_history:
-            wins = [t for t in self.trade_history if t['pnl'] > 0]
-            losses = [t for t in self.trade_history if t['pnl'] < 0]
-
-            metrics['win_rate'] = len(wins) / len(self.trade_history) if self.trade_history else 0
-            metrics['avg_win'] = np.mean([t['pnl_pct'] for t in wins]) if wins else 0
-            metrics['avg_loss'] = np.mean([t['pnl_pct'] for t in losses]) if losses else 0
-            metrics['avg_duration_minutes'] = np.mean([t['duration'] for t in self.trade_history])
-
-            if metrics['avg_loss'] != 0:
-                metrics['risk_reward_ratio'] = abs(metrics['avg_win'] / metrics['avg_loss'])
-            else:
-                metrics['risk_reward_ratio'] = float('inf') if metrics['avg_win'] > 0 else 0
+        with self._lock:
+            metrics = {
+                'sortino_ratio': self.calculate_sortino_ratio(),
+                'calmar_ratio': self.calculate_calmar_ratio(),
+                'information_ratio': self.calculate_information_ratio(),
+                'profit_factor': self.calculate_profit_factor(),
+                'recovery_factor': self.calculate_recovery_factor(),
+                'ulcer_index': self.calculate_ulcer_index(),
+                'consecutive_stats': self.calculate_consecutive_wins_losses(),
+                'trade_distribution': self.get_trade_distribution(),
+                'total_trades': self._trade_stats.n
+            }
+
+            # Calculate additional basic metrics
+            stats = self._trade_stats
+            if stats.n:
+                metrics['win_rate'] = stats.wins / stats.n
+                metrics['avg_win'] = stats.win_pct_sum / stats.wins if stats.wins else 0
+                metrics['avg_loss'] = stats.loss_pct_sum / stats.losses if stats.losses else 0
+                metrics['avg_duration_minutes'] = stats.duration_sum / stats.n
+
+                if metrics['avg_loss'] != 0:
+                    metrics['risk_reward_ratio'] = abs(metrics['avg_win'] / metrics['avg_loss'])
+                else:
+                    metrics['risk_reward_ratio'] = float('inf') if metrics['avg_win'] > 0 else 0
 
         return metrics
 
@@ -426,27 +820,95 @@ class AdvancedAnalytics:
 
         return summary
 
+    def _state_file(self, name: str) -> str:
+        return os.path.join(self.state_path, f'{name}.bin')
+
     def save_state(self):
-        """Save analytics state to disk"""
+        """
+        Save analytics state to disk
+
+        Appends the records added since the last save to
+        <state_path>/trades.bin and equity.bin (fixed-size little-endian
+        records). A file is rewritten from the buffer only after a prune or
+        once it holds twice the buffer capacity.
+        """
         try:
-            os.makedirs('models', exist_ok=True)
-            joblib.dump({
-                'trade_history': self.trade_history,
-                'equity_curve': self.equity_curve,
-                'max_history_size': self.max_history_size
-            }, self.state_path)
-            self.logger.info(f"💾 Analytics state saved ({len(self.trade_history)} trades, {len(self.equity_curve)} equity points)")
+            os.makedirs(self.state_path, exist_ok=True)
+
+            with self._lock:
+                for name, buffer in (('trades', self._trades), ('equity', self._equity)):
+                    path = self._state_file(name)
+                    records = buffer.view()
+                    stored = os.path.getsize(path) // records.dtype.itemsize if os.path.exists(path) else 0
+                    pending = min(self._unsaved[name], len(records))
+
+                    if self._rewrite[name] or stored + pending > 2 * self.max_history_size:
+                        tmp_path = path + '.tmp'
+                        with open(tmp_path, 'wb') as f:
+                            f.write(records.tobytes())
+                        os.replace(tmp_path, path)
+                    elif pending:
+                        with open(path, 'ab') as f:
+                            f.write(records[len(records) - pending:].tobytes())
+
+                    self._unsaved[name] = 0
+                    self._rewrite[name] = False
+                trades, points = len(self._trades), len(self._equity)
+
+            self.logger.info(f"💾 Analytics state saved ({trades} trades, {points} equity points)")
         except Exception as e:
             self.logger.error(f"Error saving analytics state: {e}")
 
+    def _read_records(self, name: str, dtype: np.dtype) -> np.ndarray:
+        """Newest max_history_size complete records of a state file"""
+        path = self._state_file(name)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=dtype)
+        stored = os.path.getsize(path) // dtype.itemsize  # A torn last append is ignored
+        count = min(stored, self.max_history_size)
+        return np.fromfile(path, dtype=dtype, count=count, offset=(stored - count) * dtype.itemsize)
+
     def load_state(self):
         """Load analytics state from disk"""
         try:
-            if os.path.exists(self.state_path):
-                data = joblib.load(self.state_path)
-                self.trade_history = data.get('trade_history', [])
-                self.equity_curve = data.get('equity_curve', [])
-                self.max_history_size = data.get('max_history_size', 10000)
-                self.logger.info(f"📂 Analytics state loaded ({len(self.trade_history)} trades, {len(self.equity_curve)} equity points)")
+            if os.path.isdir(self.state_path):
+                trades = self._read_records('trades', TRADE_DTYPE)
+                equity = self._read_records('equity', EQUITY_DTYPE)
+                migrated = False
+            elif os.path.exists(LEGACY_STATE_PATH):
+                trades, equity = self._read_legacy_state()
+                migrated = True
+            else:
+                return
+
+            with self._lock:
+                self._trades.replace(trades)
+                self._trade_stats = _TradeStats()
+                for trade in self._trades.view():
+                    self._trade_stats.update(trade)
+                self._equity.replace(equity)
+                self._equity_stats = _EquityWindowStats.from_records(self._equity.view(), self.max_history_size)
+                self._rewrite = {'trades': migrated, 'equity': migrated}
+
+            self.logger.info(f"📂 Analytics state loaded ({len(self._trades)} trades, {len(self._equity)} equity points)")
         except Exception as e:
             self.logger.error(f"Error loading analytics state: {e}")
+
+    def _read_legacy_state(self):
+        """Convert a joblib-pickled state from before the binary format (rewritten on next save)"""
+        import joblib
+
+        data = joblib.load(LEGACY_STATE_PATH)
+
+        def number(value, default=math.nan):
+            return default if value is None else float(value)
+
+        trades = np.array([(
+            t['timestamp'].timestamp(), str(t.get('symbol') or ''), str(t.get('side') or ''),
+            number(t.get('entry_price')), number(t.get('exit_price')), number(t.get('pnl'), 0.0),
+            number(t.get('pnl_pct'), 0.0), number(t.get('duration'), 0.0), number(t.get('leverage'), 1.0)
+        ) for t in data.get('trade_history', [])], dtype=TRADE_DTYPE)
+        equity = np.array([
+            (e['timestamp'].timestamp(), float(e['balance'])) for e in data.get('equity_curve', [])
+        ], dtype=EQUITY_DTYPE)
+        return trades, equity
@@ -0,0 +1,1088 @@
+"""
+Native asyncio KuCoin Futures API client
+
+Same surface as KuCoinClient, built on ccxt's async exchange instead of
+pushing blocking calls into thread pools. All requests share one aiohttp
+session with connection pooling, so a full-market scan runs as a few hundred
+coroutines on one event loop instead of dozens of OS threads.
+
+Features:
+- One shared aiohttp session (keep-alive, DNS cache, bounded connection pool)
+- APICallPriority semantics kept: CRITICAL calls run immediately, everything
+  else goes through an asyncio priority queue and yields to pending CRITICAL calls
+- Same retry/backoff classification as KuCoinClient._handle_api_error
+- Local candle store delta fetching for OHLCV (shared with KuCoinClient)
+- run()/shutdown() bridge for synchronous callers (own event loop thread)
+"""
+
+import asyncio
+import contextvars
+import itertools
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from candle_store import CandleStore
+from config import Config
+from kucoin_client import APICallPriority, KuCoinClient
+from logger import Logger
+from rate_limiter import WeightedRateLimiter, get_rate_limiter
+
+# Set while a CRITICAL call runs, so the calls it makes itself (balance, ticker)
+# execute inline instead of queueing behind the critical call they belong to
+_inside_critical_call = contextvars.ContextVar('inside_critical_call', default=False)
+# Priority of the call being executed, used to pick the rate limiter lane
+_current_priority = contextvars.ContextVar('current_priority', default=APICallPriority.NORMAL)
+# Rate limiter pool of the last request sent by this task; a 429 penalizes only that pool
+_last_pool = contextvars.ContextVar('last_pool', default=None)
+
+
+class AsyncKuCoinClient:
+    """Asyncio wrapper for KuCoin Futures API using ccxt.async_support with API call prioritization"""
+
+    # Pure helpers shared with the synchronous client
+    _predict_slippage = KuCoinClient._predict_slippage
+    _calculate_spread = KuCoinClient._calculate_spread
+    validate_and_cap_amount = KuCoinClient.validate_and_cap_amount
+
+    def __init__(self, api_key: str, api_secret: str, api_passphrase: str,
+                 max_concurrency: int = None, max_connections: int = None):
+        """
+        Initialize async KuCoin client.
+
+        Nothing touches the network until start() (or the first API call).
+
+        Args:
+            api_key: KuCoin API key
+            api_secret: KuCoin API secret
+            api_passphrase: KuCoin API passphrase
+            max_concurrency: Non-critical calls in flight at once (default Config.ASYNC_CLIENT_MAX_CONCURRENCY)
+            max_connections: Pooled HTTP connections (default Config.ASYNC_CLIENT_MAX_CONNECTIONS)
+        """
+        self.logger = Logger.get_logger()
+        self.orders_logger = Logger.get_orders_logger()
+        self._credentials = (api_key, api_secret, api_passphrase)
+        self.max_concurrency = max_concurrency or Config.ASYNC_CLIENT_MAX_CONCURRENCY
+        self.max_connections = max_connections or Config.ASYNC_CLIENT_MAX_CONNECTIONS
+
+        self.exchange = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._closing = False
+        self._started = False
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        # Priority dispatch: CRITICAL calls bypass the queue, the rest are served lowest priority value first
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._pending_critical_calls = 0
+        self._critical_idle: Optional[asyncio.Event] = None
+
+        # Shared weighted rate limiter (same buckets as the synchronous client)
+        self.rate_limiter = get_rate_limiter() if Config.ENABLE_RATE_LIMITER else None
+
+        # Local candle store (opened on first OHLCV fetch)
+        self._candle_store = None
+        self._candle_store_failed = False
+
+        # Event loop thread for synchronous callers (see run())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_client(cls, client: KuCoinClient, **kwargs) -> 'AsyncKuCoinClient':
+        """Create an async client with the same credentials as a synchronous KuCoinClient"""
+        exchange = client.exchange
+        return cls(exchange.apiKey, exchange.secret, exchange.password, **kwargs)
+
+    async def start(self):
+        """Open the shared HTTP session, load markets and start the priority dispatchers"""
+        if self._started:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._started:
+                return
+
+            api_key, api_secret, api_passphrase = self._credentials
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            )
+            self.exchange = ccxt_async.kucoinfutures({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'password': api_passphrase,
+                'enableRateLimit': self.rate_limiter is None,
+                'timeout': 30000,  # 30 second timeout
+                'session': self.session,
+                'options': {
+                    'defaultType': 'future',
+                    'adjustForTimeDifference': True,
+                },
+            })
+
+            if self.rate_limiter is not None:
+                self._install_rate_limiter()
+
+            self._queue = asyncio.PriorityQueue()
+            self._critical_idle = asyncio.Event()
+            self._critical_idle.set()
+            self._workers = [asyncio.create_task(self._priority_worker()) for _ in range(self.max_concurrency)]
+            self._started = True
+
+            try:
+                await self.exchange.load_markets()
+            except Exception as e:
+                self.logger.warning(f"Could not load markets for async client: {e}")
+
+            self.logger.info(
+                f"⚡ Async KuCoin client started ({self.max_concurrency} concurrent calls, "
+                f"{self.max_connections} pooled connections)"
+            )
+
+    def _install_rate_limiter(self):
+        """Reserve each request's weight in the shared limiter before ccxt sends it"""
+        exchange = self.exchange
+        send = exchange.fetch2
+
+        async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            cost = exchange.calculate_rate_limiter_cost(api, method, path, params, config)
+            pool = WeightedRateLimiter.pool_for(api)
+            await self.rate_limiter.acquire_async(pool, WeightedRateLimiter.weight_for(cost), _current_priority.get())
+            _last_pool.set(pool)
+            return await send(path, api, method, params, headers, body, config)
+
+        exchange.fetch2 = fetch2
+
+    async def close(self):
+        """Stop the dispatchers and close the exchange and HTTP session"""
+        self._closing = True
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                *_, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+
+        if self.exchange is not None:
+            try:
+                await self.exchange.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing async exchange: {e}")
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self._candle_store is not None:
+            self._candle_store.close()
+            self._candle_store = None
+        self._started = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def run(self, coro: Awaitable, timeout: float = None) -> Any:
+        """
+        Run a coroutine on the client's own event loop thread from synchronous code
+
+        Args:
+            coro: Coroutine using this client
+            timeout: Seconds to wait for the result
+
+        Returns:
+            The coroutine's result
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name='AsyncKuCoinClient', daemon=True
+            )
+            self._loop_thread.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self):
+        """Close the client and stop the event loop thread started by run()"""
+        if self._loop is None:
+            return
+        try:
+            self.run(self.close(), timeout=10)
+        except Exception as e:
+            self.logger.warning(f"Error closing async client: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+
+    async def _wait_for_critical_calls(self, priority: APICallPriority):
+        """Let pending CRITICAL calls finish before a non-critical call starts (max 5 seconds)"""
+        if priority > APICallPriority.CRITICAL and not self._critical_idle.is_set():
+            try:
+                await asyncio.wait_for(self._critical_idle.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def _track_critical_call(self, priority: APICallPriority, increment: bool):
+        """Track critical API calls in progress"""
+        if priority == APICallPriority.CRITICAL:
+            if increment:
+                self._pending_critical_calls += 1
+                self._critical_idle.clear()
+            else:
+                self._pending_critical_calls = max(0, self._pending_critical_calls - 1)
+                if self._pending_critical_calls == 0:
+                    self._critical_idle.set()
+
+    async def _priority_worker(self):
+        """Serve queued calls in priority order"""
+        while True:
+            priority, _, call_name, factory, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                await self._wait_for_critical_calls(priority)
+                _current_priority.set(priority)
+                try:
+                    result = await factory()
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def _execute_with_priority(self, factory: Callable[[], Awaitable], priority: APICallPriority,
+                                     call_name: str) -> Any:
+        """
+        Execute an API call with priority handling.
+        Critical calls (orders, position closing) execute immediately.
+        Non-critical calls are queued by priority and wait for critical calls to complete.
+        """
+        await self.start()
+
+        if _inside_critical_call.get():
+            return await factory()
+
+        if priority == APICallPriority.CRITICAL:
+            self._track_critical_call(priority, increment=True)
+            token = _inside_critical_call.set(True)
+            priority_token = _current_priority.set(priority)
+            try:
+                self.logger.debug(f"🔴 CRITICAL API call: {call_name}")
+                return await factory()
+            finally:
+                _current_priority.reset(priority_token)
+                _inside_critical_call.reset(token)
+                self._track_critical_call(priority, increment=False)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((int(priority), next(self._sequence), call_name, factory, future))
+        return await future
+
+    @staticmethod
+    def _retry_delay(attempt: int, exponential_backoff: bool, base_delay: float = 2) -> float:
+        """Backoff delay for a retry attempt, capped at 30 seconds"""
+        return min((2 ** attempt) if exponential_backoff else base_delay, 30)
+
+    def _rate_limit_delay(self, attempt: int, exponential_backoff: bool, base_delay: float = 2) -> float:
+        """Delay after a rate limit error (0 when the shared limiter paces the retry)"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.penalize(_last_pool.get())
+            return 0
+        return self._retry_delay(attempt, exponential_backoff, base_delay)
+
+    async def _handle_api_error(self, factory: Callable[[], Awaitable], max_retries: int = 3,
+                                exponential_backoff: bool = True,
+                                operation_name: str = "API call",
+                                is_critical: bool = False) -> Any:
+        """
+        Handle API errors with retry logic and exponential backoff.
+
+        Same classification as KuCoinClient._handle_api_error, but waits with
+        asyncio.sleep so other coroutines keep running during backoff.
+
+        Args:
+            factory: Callable returning the awaitable to execute
+            max_retries: Maximum number of retry attempts
+            exponential_backoff: If True, use exponential backoff (1s, 2s, 4s, etc.)
+            operation_name: Name of the operation for logging
+            is_critical: If True, uses more aggressive retry for critical operations
+
+        Returns:
+            Result if successful, None if all retries failed
+        """
+        last_exception = None
+        effective_retries = max_retries * 3 if is_critical else max_retries
+
+        for attempt in range(effective_retries):
+            retry_kind = None
+            try:
+                result = await factory()
+                if attempt > 0:
+                    self.logger.info(f"{operation_name} succeeded after {attempt} retry attempt(s)")
+                return result
+
+            except ccxt.RateLimitExceeded as e:
+                last_exception = e
+                retry_kind = "Rate limit exceeded"
+                delay = self._rate_limit_delay(attempt, exponential_backoff, base_delay=1)
+
+            except ccxt.InsufficientFunds as e:
+                self.logger.error(f"Insufficient funds for {operation_name}: {str(e)}")
+                return None
+
+            except ccxt.InvalidOrder as e:
+                error_str = str(e)
+                if '300009' in error_str or 'No open positions to close' in error_str:
+                    self.logger.debug(f"Position already closed for {operation_name}: {error_str}")
+                else:
+                    self.logger.error(f"Invalid order parameters for {operation_name}: {error_str}")
+                return None
+
+            except ccxt.AuthenticationError as e:
+                self.logger.error(f"Authentication failed for {operation_name}: {str(e)}")
+                raise
+
+            except ccxt.NetworkError as e:
+                last_exception = e
+                retry_kind = "Network error"
+                delay = self._retry_delay(attempt, exponential_backoff)
+
+            except ccxt.ExchangeError as e:
+                last_exception = e
+                error_str = str(e).lower()
+                if '400' in error_str or 'invalid' in error_str:
+                    self.logger.error(f"Invalid request for {operation_name}: {str(e)}")
+                    return None
+                elif '403' in error_str or 'permission' in error_str or 'forbidden' in error_str:
+                    self.logger.error(f"Permission denied for {operation_name}: {str(e)}")
+                    return None
+                elif '429' in error_str or 'too many' in error_str:
+                    retry_kind = "Rate limit error"
+                    delay = self._rate_limit_delay(attempt, exponential_backoff)
+                elif any(code in error_str for code in ('500', '502', '503', '504')):
+                    retry_kind = "Server error"
+                    delay = self._retry_delay(attempt, exponential_backoff)
+                else:
+                    self.logger.error(f"Exchange error for {operation_name}: {str(e)}")
+                    return None
+
+            except Exception as e:
+                self.logger.error(f"Unexpected error for {operation_name}: {type(e).__name__}: {str(e)}")
+                return None
+
+            if attempt < effective_retries - 1:
+                self.logger.warning(
+                    f"{retry_kind} for {operation_name} "
+                    f"(attempt {attempt + 1}/{effective_retries}). "
+                    f"Waiting {delay}s before retry... Error: {str(last_exception)}"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.logger.error(
+                    f"{retry_kind} for {operation_name} after {effective_retries} attempts. "
+                    f"Error: {str(last_exception)}"
+                )
+
+        if last_exception:
+            self.logger.error(
+                f"Failed {operation_name} after {effective_retries} attempts. "
+                f"Last error: {type(last_exception).__name__}: {str(last_exception)}"
+            )
+        return None
+
+    async def get_active_futures(self, include_volume: bool = True) -> List[Dict]:
+        """Get all active USDT futures trading pairs - NORMAL priority
+
+        Args:
+            include_volume: If True, fetch ticker data to include 24h volume
+
+        Returns:
+            List of futures with symbol, info, swap, future, and optionally quoteVolume
+        """
+        async def _fetch():
+            try:
+                markets = await self.exchange.load_markets()
+                futures = [
+                    {
+                        'symbol': symbol,
+                        'info': market,
+                        'swap': market.get('swap', False),
+                        'future': market.get('future', False)
+                    }
+                    for symbol, market in markets.items()
+                    if (market.get('swap') or market.get('future')) and market.get('active') and ':USDT' in symbol
+                ]
+                self.logger.info(f"Found {len(futures)} active USDT futures pairs")
+
+                if include_volume:
+                    try:
+                        tickers = await self.exchange.fetch_tickers()
+                        for future in futures:
+                            if future['symbol'] in tickers:
+                                future['quoteVolume'] = tickers[future['symbol']].get('quoteVolume', 0)
+                    except Exception as e:
+                        self.logger.warning(f"Could not fetch volume data: {e}")
+
+                return futures
+            except Exception as e:
+                self.logger.error(f"Error fetching active futures: {e}")
+                return []
+
+        return await self._execute_with_priority(_fetch, APICallPriority.NORMAL, 'get_active_futures')
+
+    async def get_ticker(self, symbol: str, priority: APICallPriority = APICallPriority.HIGH) -> Optional[Dict]:
+        """Get ticker information for a symbol
+
+        Args:
+            symbol: Trading pair symbol
+            priority: Priority level (HIGH for position monitoring, NORMAL for scanning)
+
+        Returns:
+            Ticker dict or None
+        """
+        if self._closing:
+            self.logger.debug(f"Skipping get_ticker({symbol}) - client is closing")
+            return None
+
+        async def _fetch():
+            return await self._handle_api_error(
+                lambda: self.exchange.fetch_ticker(symbol),
+                max_retries=3,
+                exponential_backoff=True,
+                operation_name=f"get_ticker({symbol})",
+                is_critical=priority <= APICallPriority.HIGH
+            )
+
+        return await self._execute_with_priority(_fetch, priority, f'get_ticker({symbol})')
+
+    def _get_candle_store(self) -> Optional[CandleStore]:
+        """Open the local candle store on first use (None if disabled or unavailable)"""
+        if not Config.ENABLE_CANDLE_STORE or self._candle_store_failed:
+            return None
+        if self._candle_store is None:
+            try:
+                self._candle_store = CandleStore(Config.CANDLE_STORE_PATH, Config.CANDLE_STORE_MAX_CANDLES)
+            except Exception as e:
+                self.logger.warning(f"Could not open candle store, using full REST fetches: {e}")
+                self._candle_store_failed = True
+        return self._candle_store
+
+    async def _fetch_ohlcv_delta(self, store: CandleStore, symbol: str, timeframe: str, limit: int) -> List:
+        """Fetch only candles newer than the last stored one (see CandleStore.delta_since)"""
+        delta = await asyncio.to_thread(store.delta_since, symbol, timeframe, limit)
+        if delta is not None:
+            since, fetch_limit = delta
+            fresh = await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=fetch_limit)
+            merged = await asyncio.to_thread(store.merge_delta, symbol, timeframe, since, fresh, limit)
+            if merged is not None:
+                return merged
+
+        ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        if ohlcv:
+            await asyncio.to_thread(store.upsert, symbol, timeframe, ohlcv)
+        return ohlcv
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100,
+                        priority: APICallPriority = APICallPriority.NORMAL) -> List:
+        """Get OHLCV data for a symbol with retry logic - NORMAL priority (scanning)
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            limit: Number of candles to retrieve
+            priority: Priority level
+
+        Returns:
+            List of OHLCV candles
+        """
+        if self._closing:
+            self.logger.debug(f"Skipping get_ohlcv({symbol}) - client is closing")
+            return []
+
+        async def _fetch_ohlcv():
+            store = self._get_candle_store()
+            if store is not None:
+                try:
+                    return await self._fetch_ohlcv_delta(store, symbol, timeframe, limit)
+                except (sqlite3.Error, ValueError) as e:
+                    self.logger.warning(f"Candle store unavailable for {symbol} {timeframe}: {e}")
+            return await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+        async def _fetch():
+            result = await self._handle_api_error(
+                _fetch_ohlcv,
+                max_retries=3,
+                exponential_backoff=True,
+                operation_name=f"get_ohlcv({symbol})"
+            )
+            if not result:
+                self.logger.warning(f"Empty OHLCV data returned for {symbol}")
+                return []
+            return result
+
+        return await self._execute_with_priority(_fetch, priority, f'get_ohlcv({symbol})')
+
+    async def fetch_ohlcv_many(self, symbols: Sequence[str], timeframes: Dict[str, int],
+                               timeout: float = 10) -> Dict[str, Any]:
+        """
+        Fetch several timeframes for many symbols concurrently (one coroutine per request)
+
+        Args:
+            symbols: Trading pair symbols
+            timeframes: timeframe -> candle limit, e.g. {'1h': 100, '4h': 50}
+            timeout: Seconds allowed per symbol
+
+        Returns:
+            symbol -> {timeframe: candles}, or the Exception raised for that symbol
+        """
+        async def _fetch_symbol(symbol: str) -> Dict[str, List]:
+            candles = await asyncio.gather(*(
+                self.get_ohlcv(symbol, timeframe, limit) for timeframe, limit in timeframes.items()
+            ))
+            return dict(zip(timeframes, candles))
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(_fetch_symbol(symbol), timeout) for symbol in symbols),
+            return_exceptions=True
+        )
+        return dict(zip(symbols, results))
+
+    async def get_order_book(self, symbol: str, limit: int = 20,
+                             priority: APICallPriority = APICallPriority.HIGH) -> Optional[Dict]:
+        """Get order book depth for a symbol
+
+        Args:
+            symbol: Trading pair symbol
+            limit: Number of bid/ask levels to fetch
+            priority: Priority level
+
+        Returns:
+            Dict with 'bids' and 'asks' lists, or None if error
+        """
+        async def _fetch():
+            try:
+                order_book = await self.exchange.fetch_order_book(symbol, limit=limit)
+                return {
+                    'bids': order_book.get('bids', []),
+                    'asks': order_book.get('asks', []),
+                    'timestamp': order_book.get('timestamp')
+                }
+            except Exception as e:
+                self.logger.error(f"Error fetching order book for {symbol}: {e}")
+                return None
+
+        return await self._execute_with_priority(_fetch, priority, f'get_order_book({symbol})')
+
+    async def get_balance(self) -> Dict:
+        """Get account balance - HIGH priority for position monitoring"""
+        async def _fetch():
+            result = await self._handle_api_error(
+                lambda: self.exchange.fetch_balance(),
+                max_retries=3,
+                exponential_backoff=True,
+                operation_name="get_balance",
+                is_critical=True
+            )
+            return result if result is not None else {}
+
+        return await self._execute_with_priority(_fetch, APICallPriority.HIGH, 'get_balance')
+
+    async def get_open_positions(self) -> List[Dict]:
+        """Get all open positions - HIGH priority for position monitoring"""
+        async def _fetch():
+            try:
+                positions = await self.exchange.fetch_positions()
+                return [pos for pos in positions if float(pos.get('contracts', 0)) > 0]
+            except Exception as e:
+                self.logger.error(f"Error fetching positions: {e}")
+                return []
+
+        return await self._execute_with_priority(_fetch, APICallPriority.HIGH, 'get_open_positions')
+
+    def _market(self, symbol: str) -> Dict:
+        """Market metadata from the markets loaded at start()"""
+        markets = getattr(self.exchange, 'markets', None) or {}
+        return markets.get(symbol) or {}
+
+    def _contract_size(self, symbol: str) -> float:
+        return self._market(symbol).get('contractSize', 1) or 1
+
+    def get_market_limits(self, symbol: str) -> Optional[Dict]:
+        """Get market limits for a symbol (min/max order size) from loaded markets"""
+        market = self._market(symbol)
+        if not market:
+            return None
+        limits = market.get('limits', {})
+        return {
+            'amount': {'min': limits.get('amount', {}).get('min'), 'max': limits.get('amount', {}).get('max')},
+            'cost': {'min': limits.get('cost', {}).get('min'), 'max': limits.get('cost', {}).get('max')}
+        }
+
+    def validate_order_locally(self, symbol: str, amount: float, price: float) -> Tuple[bool, str]:
+        """Validate order against loaded exchange invariants BEFORE submitting to API
+
+        Returns:
+            Tuple of (is_valid, rejection_reason)
+        """
+        market = self._market(symbol)
+        if not market:
+            self.logger.warning(f"No metadata available for {symbol}, allowing order")
+            return True, "metadata_unavailable"
+        if not market.get('active', False):
+            return False, f"Market {symbol} is not active"
+
+        limits = self.get_market_limits(symbol)
+        min_amount, max_amount = limits['amount']['min'], limits['amount']['max']
+        if min_amount and amount < min_amount:
+            return False, f"Amount {amount:.4f} below minimum {min_amount}"
+        if max_amount and amount > max_amount:
+            return False, f"Amount {amount:.4f} exceeds maximum {max_amount}"
+        if price > 0:
+            cost = amount * price
+            min_cost, max_cost = limits['cost']['min'], limits['cost']['max']
+            if min_cost and cost < min_cost:
+                return False, f"Order cost ${cost:.2f} below minimum ${min_cost:.2f}"
+            if max_cost and cost > max_cost:
+                return False, f"Order cost ${cost:.2f} exceeds maximum ${max_cost:.2f}"
+        return True, "valid"
+
+    def calculate_required_margin(self, symbol: str, amount: float, price: float, leverage: int) -> float:
+        """Calculate margin required to open a position (USDT)"""
+        if leverage <= 0:
+            self.logger.error(f"Invalid leverage: {leverage}, using 1x")
+            leverage = 1
+        if amount <= 0 or price <= 0:
+            self.logger.error(f"Invalid amount ({amount}) or price ({price})")
+            return 0
+        return amount * price * self._contract_size(symbol) / leverage
+
+    async def check_available_margin(self, symbol: str, amount: float,
+                                     price: float, leverage: int) -> Tuple[bool, float, str]:
+        """Check if there's enough margin available to open a position
+
+        Returns:
+            Tuple of (is_sufficient, available_margin, reason)
+        """
+        try:
+            balance = await self.get_balance()
+            if not balance or 'free' not in balance or 'USDT' not in balance.get('free', {}):
+                self.logger.debug("Could not determine available margin, proceeding with order")
+                return True, 0, "Unable to verify margin, proceeding"
+
+            available_margin = float(balance['free']['USDT'])
+            required_with_buffer = self.calculate_required_margin(symbol, amount, price, leverage) * 1.05
+            if available_margin < required_with_buffer:
+                position_value = amount * price * self._contract_size(symbol)
+                return False, available_margin, (
+                    f"Insufficient margin: available=${available_margin:.2f}, "
+                    f"required=${required_with_buffer:.2f} (position value=${position_value:.2f}, "
+                    f"leverage={leverage}x)"
+                )
+            return True, available_margin, "Sufficient margin available"
+        except Exception as e:
+            self.logger.error(f"Error checking available margin: {e}")
+            return True, 0, f"Error checking margin: {e}"
+
+    def is_position_viable(self, symbol: str, amount: float, price: float, leverage: int) -> Tuple[bool, str]:
+        """Check if a position size is viable for trading
+
+        Returns:
+            Tuple of (is_viable, reason)
+        """
+        limits = self.get_market_limits(symbol)
+        if limits and limits['amount']['min'] and amount < limits['amount']['min']:
+            return False, f"Position size {amount:.4f} below exchange minimum {limits['amount']['min']}"
+
+        position_value = amount * price * self._contract_size(symbol)
+        if limits and limits['cost']['min'] and position_value < limits['cost']['min']:
+            return False, f"Position value ${position_value:.2f} below exchange minimum ${limits['cost']['min']}"
+        if position_value < 1.0:
+            return False, f"Position value ${position_value:.2f} too small to be meaningful"
+
+        required_margin = self.calculate_required_margin(symbol, amount, price, leverage)
+        if required_margin < 0.10:
+            return False, f"Required margin ${required_margin:.4f} too small to be meaningful"
+        return True, "Position is viable"
+
+    def adjust_position_for_margin(self, symbol: str, amount: float, price: float,
+                                   leverage: int, available_margin: float) -> Tuple[float, int]:
+        """Adjust position size and/or leverage to fit available margin
+
+        Returns:
+            Tuple of (adjusted_amount, adjusted_leverage)
+        """
+        if available_margin <= 0.01 or price <= 0:
+            self.logger.error(f"Cannot adjust position: margin ${available_margin:.4f}, price {price}")
+            return 0.0, 1
+
+        contract_size = self._contract_size(symbol)
+        usable_margin = available_margin * 0.90
+        adjusted_amount = min(amount, usable_margin * leverage / (price * contract_size))
+        adjusted_amount = self.validate_and_cap_amount(symbol, adjusted_amount)
+
+        if self.calculate_required_margin(symbol, adjusted_amount, price, leverage) > usable_margin:
+            position_value = adjusted_amount * price * contract_size
+            adjusted_leverage = max(1, min(int(position_value / usable_margin), leverage))
+            self.logger.warning(f"Reducing leverage from {leverage}x to {adjusted_leverage}x to fit available margin")
+            return adjusted_amount, adjusted_leverage
+
+        self.logger.warning(
+            f"Reducing position size from {amount:.4f} to {adjusted_amount:.4f} contracts "
+            f"to fit available margin (${usable_margin:.2f})"
+        )
+        return adjusted_amount, leverage
+
+    def _log_order(self, title: str, order: Dict, fields: List[Tuple[str, Any]]):
+        """Write an order block to the orders logger"""
+        self.orders_logger.info("=" * 80)
+        self.orders_logger.info(title)
+        self.orders_logger.info("-" * 80)
+        self.orders_logger.info(f"  Order ID: {order.get('id', 'N/A')}")
+        for name, value in fields:
+            self.orders_logger.info(f"  {name}: {value}")
+        self.orders_logger.info(f"  Status: {order.get('status', 'N/A')}")
+        self.orders_logger.info(f"  Timestamp: {order.get('timestamp', 'N/A')}")
+        self.orders_logger.info("=" * 80)
+        self.orders_logger.info("")
+
+    async def _fit_to_margin(self, symbol: str, amount: float, price: float,
+                             leverage: int) -> Optional[Tuple[float, int]]:
+        """Shrink amount/leverage to the available margin (None if the result is not viable)"""
+        has_margin, available_margin, margin_reason = await self.check_available_margin(
+            symbol, amount, price, leverage
+        )
+        if has_margin:
+            return amount, leverage
+
+        self.logger.warning(f"Margin check failed: {margin_reason}")
+        adjusted_amount, adjusted_leverage = self.adjust_position_for_margin(
+            symbol, amount, price, leverage, available_margin
+        )
+        is_viable, viability_reason = self.is_position_viable(symbol, adjusted_amount, price, adjusted_leverage)
+        if not is_viable:
+            self.logger.error(
+                f"Cannot open position: adjusted position not viable - {viability_reason} "
+                f"(adjusted: {adjusted_amount:.4f}, desired: {amount:.4f})"
+            )
+            return None
+        return adjusted_amount, adjusted_leverage
+
+    async def _submit_order(self, symbol: str, side: str, order_type: str, amount: float,
+                            leverage: int, price: float = None, reduce_only: bool = False,
+                            post_only: bool = False, is_critical: bool = False) -> Optional[Dict]:
+        """Set cross margin/leverage (unless reduce-only) and place the order with retries"""
+        async def _place_order():
+            if not reduce_only:
+                await self.exchange.set_margin_mode('cross', symbol)
+                await self.exchange.set_leverage(leverage, symbol, params={"marginMode": "cross"})
+            params = {"marginMode": "cross"}
+            if post_only:
+                params["postOnly"] = True
+            if reduce_only:
+                params["reduceOnly"] = True
+            return await self.exchange.create_order(
+                symbol=symbol, type=order_type, side=side, amount=amount, price=price, params=params
+            )
+
+        return await self._handle_api_error(
+            _place_order,
+            max_retries=3,
+            exponential_backoff=True,
+            operation_name=f"create_{order_type}_order({symbol}, {side})",
+            is_critical=is_critical or reduce_only
+        )
+
+    async def create_market_order(self, symbol: str, side: str, amount: float,
+                                  leverage: int = 10, max_slippage: float = 0.01,
+                                  validate_depth: bool = True, reduce_only: bool = False,
+                                  is_critical: bool = False) -> Optional[Dict]:
+        """Create a market order with leverage and slippage protection
+
+        🔴 CRITICAL PRIORITY: runs immediately; queued scanning calls wait for it.
+
+        Args:
+            symbol: Trading pair symbol
+            side: 'buy' or 'sell'
+            amount: Order amount in contracts
+            leverage: Leverage to use
+            max_slippage: Maximum acceptable slippage (default 1%)
+            validate_depth: Check order book depth before large orders
+            reduce_only: If True, order only reduces position (for closing positions)
+            is_critical: If True, uses more aggressive retry for critical operations
+
+        Returns:
+            Order dict if successful, None otherwise
+        """
+        async def _create_order():
+            is_valid, rejection_reason = self.validate_order_locally(symbol, amount, 0)
+            if not is_valid:
+                self.logger.error(f"🛑 Order validation failed: {rejection_reason}")
+                self.orders_logger.error(
+                    f"Order rejected locally | Symbol: {symbol} | Side: {side} | "
+                    f"Amount: {amount:.4f} | Reason: {rejection_reason}"
+                )
+                return None
+
+            ticker = await self._handle_api_error(
+                lambda: self.exchange.fetch_ticker(symbol),
+                operation_name=f"get_ticker({symbol})", is_critical=True
+            )
+            if not ticker:
+                self.logger.error(f"Could not get ticker for {symbol}")
+                return None
+            reference_price = ticker['last']
+
+            validated_amount = self.validate_and_cap_amount(symbol, amount)
+            order_leverage = leverage
+            if not reduce_only:
+                fitted = await self._fit_to_margin(symbol, validated_amount, reference_price, leverage)
+                if fitted is None:
+                    return None
+                validated_amount, order_leverage = fitted
+
+            if validate_depth and validated_amount > 100:
+                order_book = await self.exchange.fetch_order_book(symbol, limit=20)
+                if order_book:
+                    levels = order_book['bids'] if side == 'sell' else order_book['asks']
+                    total_liquidity = sum(level[1] for level in levels)
+                    predicted_slippage = self._predict_slippage(validated_amount, levels, reference_price)
+                    if predicted_slippage > max_slippage:
+                        self.logger.warning(
+                            f"High predicted slippage for {symbol}: {predicted_slippage:.2%} "
+                            f"(max: {max_slippage:.2%}). Consider reducing size or using limit order."
+                        )
+                        safe_amount = min(validated_amount, total_liquidity * 0.5)
+                        if safe_amount < validated_amount * 0.7:
+                            self.logger.warning(
+                                f"Reducing order size from {validated_amount:.4f} to {safe_amount:.4f} "
+                                f"to limit slippage"
+                            )
+                            validated_amount = safe_amount
+
+            order = await self._submit_order(
+                symbol, side, 'market', validated_amount, order_leverage,
+                reduce_only=reduce_only, is_critical=is_critical
+            )
+            if not order:
+                return None
+
+            # Market orders fill immediately; fetch the status for fill details
+            await asyncio.sleep(0.5)
+            if order.get('id'):
+                try:
+                    filled_order = await self.exchange.fetch_order(order['id'], symbol)
+                    if filled_order:
+                        for key in ('status', 'average', 'filled', 'cost', 'timestamp'):
+                            order[key] = filled_order.get(key, order.get(key))
+                except Exception as e:
+                    self.logger.debug(f"Could not fetch order status immediately (order may be too new): {e}")
+
+            avg_price = order.get('average') or order.get('price') or reference_price
+            self.logger.info(
+                f"Created {side} market order for {validated_amount} {symbol} "
+                f"at {order_leverage}x leverage (avg fill: {avg_price})"
+            )
+            self._log_order(f"{side.upper()} ORDER EXECUTED: {symbol}", order, [
+                ('Type', 'MARKET'), ('Side', side.upper()), ('Symbol', symbol),
+                ('Amount', f"{validated_amount} contracts"), ('Leverage', f"{order_leverage}x"),
+                ('Reference Price', reference_price), ('Average Fill Price', avg_price),
+            ])
+            if order.get('average'):
+                actual_slippage = abs(order['average'] - reference_price) / reference_price
+                if actual_slippage > max_slippage:
+                    self.logger.warning(
+                        f"High slippage detected: {actual_slippage:.2%} "
+                        f"(reference: {reference_price}, filled: {order['average']})"
+                    )
+            return order
+
+        return await self._execute_with_priority(
+            _create_order, APICallPriority.CRITICAL, f'create_market_order({symbol}, {side})'
+        )
+
+    async def create_limit_order(self, symbol: str, side: str, amount: float,
+                                 price: float, leverage: int = 10, post_only: bool = False,
+                                 reduce_only: bool = False, is_critical: bool = False) -> Optional[Dict]:
+        """Create a limit order with leverage - 🔴 CRITICAL PRIORITY
+
+        Args:
+            symbol: Trading pair symbol
+            side: 'buy' or 'sell'
+            amount: Order amount in contracts
+            price: Limit price
+            leverage: Leverage to use
+            post_only: If True, ensures order is a maker order (reduces fees)
+            reduce_only: If True, order only reduces position (safer exits)
+            is_critical: If True, uses more aggressive retry for critical operations
+        """
+        async def _create_order():
+            validated_amount = self.validate_and_cap_amount(symbol, amount)
+            order_leverage = leverage
+            if not reduce_only:
+                fitted = await self._fit_to_margin(symbol, validated_amount, price, leverage)
+                if fitted is None:
+                    return None
+                validated_amount, order_leverage = fitted
+
+            order = await self._submit_order(
+                symbol, side, 'limit', validated_amount, order_leverage, price=price,
+                reduce_only=reduce_only, post_only=post_only, is_critical=is_critical
+            )
+            if not order:
+                return None
+
+            self.logger.info(
+                f"Created {side} limit order for {validated_amount} {symbol} at {price} "
+                f"(leverage={order_leverage}x, post_only={post_only}, reduce_only={reduce_only})"
+            )
+            self._log_order(f"{side.upper()} ORDER CREATED: {symbol}", order, [
+                ('Type', 'LIMIT'), ('Side', side.upper()), ('Symbol', symbol),
+                ('Amount', f"{validated_amount} contracts"), ('Limit Price', price),
+                ('Leverage', f"{order_leverage}x"), ('Post Only', post_only), ('Reduce Only', reduce_only),
+            ])
+            return order
+
+        return await self._execute_with_priority(
+            _create_order, APICallPriority.CRITICAL, f'create_limit_order({symbol}, {side})'
+        )
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        """Cancel an order - CRITICAL priority for risk management"""
+        async def _cancel():
+            async def _do_cancel():
+                await self.exchange.cancel_order(order_id, symbol)
+                return True
+
+            result = await self._handle_api_error(
+                _do_cancel,
+                max_retries=3,
+                exponential_backoff=True,
+                operation_name=f"cancel_order({order_id}, {symbol})"
+            )
+            if result:
+                self.logger.info(f"Cancelled order {order_id} for {symbol}")
+                return True
+            return False
+
+        return await self._execute_with_priority(_cancel, APICallPriority.CRITICAL, f'cancel_order({order_id})')
+
+    async def get_order_status(self, order_id: str, symbol: str) -> Optional[Dict]:
+        """Get the status of an order
+
+        Returns:
+            Order status dict with fields like 'status', 'filled', 'remaining', etc.
+        """
+        async def _fetch():
+            try:
+                order = await self.exchange.fetch_order(order_id, symbol)
+                return {
+                    'id': order['id'],
+                    'status': order['status'],
+                    'filled': order.get('filled', 0),
+                    'remaining': order.get('remaining', 0),
+                    'amount': order.get('amount', 0),
+                    'price': order.get('price'),
+                    'average': order.get('average'),
+                    'cost': order.get('cost', 0),
+                    'timestamp': order.get('timestamp')
+                }
+            except Exception as e:
+                self.logger.error(f"Error fetching order status for {order_id}: {e}")
+                return None
+
+        return await self._execute_with_priority(_fetch, APICallPriority.HIGH, f'get_order_status({order_id})')
+
+    async def close_position(self, symbol: str, use_limit: bool = False,
+                             slippage_tolerance: float = 0.002, max_close_retries: int = 5) -> bool:
+        """Close a position with optional limit order, retrying the whole operation
+
+        Args:
+            symbol: Trading pair symbol
+            use_limit: If True, uses limit order instead of market order
+            slippage_tolerance: Maximum acceptable slippage (default 0.2%)
+            max_close_retries: Maximum number of retries for the entire close operation
+
+        Returns:
+            True if position closed successfully, False otherwise
+        """
+        for close_attempt in range(max_close_retries):
+            try:
+                positions = await self.get_open_positions()
+                position = next((pos for pos in positions if pos['symbol'] == symbol), None)
+                if position is None:
+                    self.logger.info(f"Position {symbol} not found (may already be closed)")
+                    return True
+
+                contracts = abs(float(position['contracts']))
+                side = 'sell' if position['side'] == 'long' else 'buy'
+                leverage = position.get('leverage') or position.get('info', {}).get('realLeverage')
+                try:
+                    leverage = int(leverage)
+                except (ValueError, TypeError):
+                    self.logger.warning(f"Leverage not found for {symbol} when closing, defaulting to 10x")
+                    leverage = 10
+
+                ticker = await self.get_ticker(symbol) if use_limit else None
+                if ticker:
+                    current_price = ticker['last']
+                    if side == 'sell':
+                        limit_price = current_price * (1 - slippage_tolerance)
+                    else:
+                        limit_price = current_price * (1 + slippage_tolerance)
+                    order = await self.create_limit_order(
+                        symbol, side, contracts, limit_price, leverage, reduce_only=True, is_critical=True
+                    )
+                else:
+                    if use_limit:
+                        self.logger.error(f"Could not get ticker for {symbol}, falling back to market order")
+                    order = await self.create_market_order(
+                        symbol, side, contracts, leverage, reduce_only=True, is_critical=True
+                    )
+
+                if order:
+                    self.logger.info(f"Closed position for {symbol} with {leverage}x leverage")
+                    return True
+                self.logger.error(
+                    f"Failed to create close order for {symbol} "
+                    f"(attempt {close_attempt + 1}/{max_close_retries})"
+                )
+            except Exception as e:
+                self.logger.error(
+                    f"Error closing position {symbol} "
+                    f"(attempt {close_attempt + 1}/{max_close_retries}): {e}"
+                )
+
+            if close_attempt < max_close_retries - 1:
+                retry_delay = min(2 ** close_attempt, 10)
+                self.logger.warning(f"Retrying close_position for {symbol} in {retry_delay}s...")
+                await asyncio.sleep(retry_delay)
+
+        self.logger.error(
+            f"Failed to close position {symbol} after {max_close_retries} attempts. "
+            f"Position may still be open!"
+        )
+        return False
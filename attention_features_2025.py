@@ -6,7 +6,6 @@ import numpy as np
 import os
 from typing import Dict, List, Tuple
 from logger import Logger
-from sklearn.preprocessing import StandardScaler
 
 
 class AttentionFeatureSelector:
@@ -109,6 +108,25 @@ class AttentionFeatureSelector:
         """
         return self.calculate_attention_scores(features)
 
+    def apply_attention_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Apply attention weighting to every row of a feature matrix
+
+        Row-wise equivalent of apply_attention() in one vectorized pass.
+
+        Args:
+            features: Feature matrix (shape: n_samples x n_features)
+
+        Returns:
+            Attention-weighted feature matrix
+        """
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        normalized = np.divide(features, norms, out=features.astype(float), where=norms > 0)
+        raw_scores = normalized * self.attention_weights
+        exp_scores = np.exp(raw_scores - raw_scores.max(axis=1, keepdims=True))
+        attention_scores = exp_scores / exp_scores.sum(axis=1, keepdims=True)
+        return features * attention_scores * self.n_features
+
     def apply_attention(self, features: np.ndarray) -> np.ndarray:
         """
         Apply attention weighting to features
@@ -4,25 +4,16 @@ Uses Optuna to automatically find the best model parameters
 """
 import numpy as np
 from typing import Dict, Any, Optional
+from lazy_components import module_available
 from logger import Logger
 
-try:
-    import optuna
-    from optuna.samplers import TPESampler
-    OPTUNA_AVAILABLE = True
-except ImportError:
-    OPTUNA_AVAILABLE = False
+# Checked without importing: optuna and the boosting libraries are imported by
+# the optimize_* methods, so importing this module stays cheap
+OPTUNA_AVAILABLE = module_available('optuna')
+if not OPTUNA_AVAILABLE:
     Logger.get_logger().warning("Optuna not available. AutoML features disabled.")
 
-try:
-    from xgboost import XGBClassifier
-    from lightgbm import LGBMClassifier
-    from catboost import CatBoostClassifier
-    from sklearn.model_selection import cross_val_score
-    from sklearn.preprocessing import StandardScaler
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+ML_AVAILABLE = all(module_available(name) for name in ('xgboost', 'lightgbm', 'sklearn'))
 
 class AutoML:
     """Automatic hyperparameter optimization for trading models"""
@@ -50,6 +41,11 @@ class AutoML:
             self.logger.warning("AutoML not available")
             return {}
 
+        import optuna
+        from optuna.samplers import TPESampler
+        from sklearn.model_selection import cross_val_score
+        from xgboost import XGBClassifier
+
         def objective(trial):
             params = {
                 'n_estimators': trial.suggest_int('n_estimators', 50, 200),
@@ -119,6 +115,11 @@ class AutoML:
             self.logger.warning("AutoML not available")
             return {}
 
+        import optuna
+        from optuna.samplers import TPESampler
+        from lightgbm import LGBMClassifier
+        from sklearn.model_selection import cross_val_score
+
         def objective(trial):
             params = {
                 'n_estimators': trial.suggest_int('n_estimators', 50, 200),
@@ -1,12 +1,173 @@
 """
 Enhanced Backtesting Engine with Walk-Forward Optimization
+
+Two execution modes share the same fee, funding and slippage accounting:
+- run_backtest: bar-by-bar loop calling a strategy function per row
+- run_backtest_vectorized: NumPy core for precomputed signal columns with a
+  struct-of-arrays position book, vectorized stop-loss/take-profit detection
+  and a preallocated equity array (exit scan compiled with Numba if installed)
+
+Walk-forward windows are sized from the data's bar interval and run on a
+process pool that reads the data from one shared memory block.
 """
+import heapq
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional, Union
 from datetime import datetime, timedelta
 from logger import Logger
 
+# Optional JIT compilation for the exit scan
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
+# Exit reason codes used by the vectorized core
+_EXIT_NONE, _EXIT_STOP_LOSS, _EXIT_TAKE_PROFIT = 0, 1, 2
+_EXIT_REASONS = {_EXIT_STOP_LOSS: 'stop_loss', _EXIT_TAKE_PROFIT: 'take_profit'}
+
+
+def _scan_exit_numpy(close: np.ndarray, start: int, is_long: bool,
+                     stop_loss: float, take_profit: float) -> Tuple[int, int]:
+    """
+    First bar at or after start whose close hits the stop loss or take profit
+
+    Scans in growing chunks so short-lived positions only touch a few bars.
+
+    Returns:
+        (bar index, exit reason code), or (-1, _EXIT_NONE) if never hit
+    """
+    n = len(close)
+    chunk = 64
+    while start < n:
+        end = min(n, start + chunk)
+        window = close[start:end]
+        if is_long:
+            sl_hit = window <= stop_loss
+            tp_hit = window >= take_profit
+        else:
+            sl_hit = window >= stop_loss
+            tp_hit = window <= take_profit
+        hit = sl_hit | tp_hit
+        if hit.any():
+            offset = int(np.argmax(hit))
+            # Stop loss is checked first, as in check_exits()
+            return start + offset, _EXIT_STOP_LOSS if sl_hit[offset] else _EXIT_TAKE_PROFIT
+        start = end
+        chunk *= 4
+    return -1, _EXIT_NONE
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _scan_exit_compiled(close, start, is_long, stop_loss, take_profit):
+        for i in range(start, len(close)):
+            price = close[i]
+            if is_long:
+                if price <= stop_loss:
+                    return i, 1
+                if price >= take_profit:
+                    return i, 2
+            else:
+                if price >= stop_loss:
+                    return i, 1
+                if price <= take_profit:
+                    return i, 2
+        return -1, 0
+
+    _scan_exit = _scan_exit_compiled
+else:
+    _scan_exit = _scan_exit_numpy
+
+
+def infer_bars_per_day(index: pd.Index) -> Optional[float]:
+    """
+    Number of bars per day from the median spacing of a time index
+
+    Args:
+        index: DatetimeIndex, or numeric epoch timestamps in seconds or milliseconds
+
+    Returns:
+        Bars per day, or None if the index is not a time axis
+    """
+    if len(index) < 2:
+        return None
+    if isinstance(index, pd.DatetimeIndex):
+        seconds = ((index - index[0]) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+    elif pd.api.types.is_numeric_dtype(index):
+        values = index.to_numpy(dtype=np.float64)
+        median = np.median(np.abs(values))
+        if median < 1e9:
+            return None  # Row numbers, not epoch timestamps
+        seconds = values / 1000.0 if median > 1e11 else values
+    else:
+        return None
+    steps = np.diff(seconds)
+    steps = steps[steps > 0]
+    if not len(steps):
+        return None
+    return 86400.0 / float(np.median(steps))
+
+
+def _walk_forward_windows(n: int, train_bars: int, test_bars: int,
+                          min_train_samples: int) -> List[Tuple[int, int, int]]:
+    """(train_start, train_end, test_end) row bounds, advancing by one train period"""
+    windows = []
+    start_idx = 0
+    while start_idx + train_bars + test_bars <= n:
+        train_end_idx = min(start_idx + train_bars, n)
+        test_end_idx = min(train_end_idx + test_bars, n)
+
+        if train_end_idx >= n:
+            break
+        if train_end_idx - start_idx < min_train_samples or test_end_idx - train_end_idx < 10:
+            break
+
+        windows.append((start_idx, train_end_idx, test_end_idx))
+        start_idx = train_end_idx
+    return windows
+
+
+def _rebuild_index(values: np.ndarray, index_spec: Tuple[str, Optional[str]]) -> pd.Index:
+    kind, tz = index_spec
+    if kind == 'datetime':
+        index = pd.DatetimeIndex(values.view('M8[ns]'))
+        return index.tz_localize('UTC').tz_convert(tz) if tz else index
+    return pd.Index(values)
+
+
+def _run_walk_forward_window(shm_name: str, n_rows: int, columns: List[str],
+                             index_spec: Tuple[str, Optional[str]], window: Tuple[int, int, int],
+                             strategy_func, engine_params: Dict) -> Dict:
+    """
+    Backtest one walk-forward test window in a worker process
+
+    The full dataset lives in shared memory as an int64 index column followed
+    by a float64 (rows, columns) block; only the test slice is copied out.
+    """
+    _, train_end_idx, test_end_idx = window
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        index_values = np.ndarray((n_rows,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((n_rows, len(columns)), dtype=np.float64, buffer=shm.buf, offset=n_rows * 8)
+        test_data = pd.DataFrame(
+            values[train_end_idx:test_end_idx].copy(), columns=columns,
+            index=_rebuild_index(index_values[train_end_idx:test_end_idx].copy(), index_spec)
+        )
+        del index_values, values
+    finally:
+        shm.close()
+
+    return BacktestEngine(**engine_params).run_backtest(test_data, strategy_func)
+
+
 class BacktestEngine:
     """Advanced backtesting engine for strategy validation"""
 
@@ -150,19 +311,231 @@ class BacktestEngine:
             self.logger.error(traceback.format_exc())
             return {}
 
+    def run_backtest_vectorized(self, data: pd.DataFrame,
+                                signals: Union[pd.DataFrame, Dict[str, np.ndarray]],
+                                initial_balance: float = None,
+                                use_next_bar_execution: bool = True,
+                                max_open_positions: Optional[int] = None) -> Dict:
+        """
+        Run backtest on NumPy columns with precomputed signals
+
+        Same execution model and accounting as run_backtest, but the per-bar work
+        is array based: open positions live in a struct-of-arrays book, each
+        position's stop-loss/take-profit bar is found with a vectorized scan over
+        closes, and equity is written into a preallocated array. Python code only
+        runs per signal and per trade, not per bar.
+
+        Args:
+            data: DataFrame with at least 'close' (and 'open' for next-bar execution);
+                  'volume' and 'timestamp' are used when present
+            signals: Columns aligned with data rows:
+                     'side': 'long'/'short' or 1/-1, empty/None/0 for no signal
+                     'amount', 'leverage', 'stop_loss', 'take_profit': optional,
+                     NaN falls back to the run_backtest defaults
+            initial_balance: Starting balance (overrides init value if provided)
+            use_next_bar_execution: If True, execute signals at next bar's open (realistic)
+            max_open_positions: Ignore signals while this many positions are open
+                                (1 reproduces strategies that only enter when flat)
+
+        Returns:
+            Backtest results dictionary (equity_curve is a DataFrame with
+            timestamp, balance and equity columns)
+        """
+        if initial_balance:
+            self.initial_balance = initial_balance
+
+        self.reset()
+
+        try:
+            n = len(data)
+            self.logger.info(f"Starting vectorized backtest with {n} candles "
+                             f"(numba: {NUMBA_AVAILABLE})")
+            if n == 0:
+                return self.calculate_results()
+
+            close = data['close'].to_numpy(dtype=float)
+            exec_prices = data['open'].to_numpy(dtype=float) if use_next_bar_execution else close
+            volume = data['volume'].to_numpy(dtype=float) if 'volume' in data else None
+            timestamps = data['timestamp'].to_numpy() if 'timestamp' in data else data.index.to_numpy()
+
+            side, amount, leverage, stop_loss, take_profit = self._signal_columns(signals, n)
+            signal_bars = np.flatnonzero(side != 0)
+
+            # Struct-of-arrays position book (one slot per signal at most)
+            m = len(signal_bars)
+            pos_side = np.zeros(m, dtype=np.int8)
+            pos_entry = np.zeros(m)
+            pos_amount = np.zeros(m)
+            pos_leverage = np.zeros(m)
+            pos_stop_loss = np.zeros(m)
+            pos_take_profit = np.zeros(m)
+            pos_entry_bar = np.zeros(m, dtype=np.int64)
+            pos_exit_bar = np.zeros(m, dtype=np.int64)
+            pos_exit_reason = np.zeros(m, dtype=np.int8)
+            opened = 0
+
+            # Open positions ordered like check_exits + backtest_end closing:
+            # (exit bar, closed at end, insertion order)
+            open_heap: List[Tuple[int, int, int]] = []
+            # Balance after each entry/exit, for the equity array
+            event_bars: List[int] = []
+            event_balances: List[float] = []
+
+            def settle_until(bar: int):
+                while open_heap and open_heap[0][0] <= bar:
+                    exit_bar, _, k = heapq.heappop(open_heap)
+                    reason = _EXIT_REASONS.get(int(pos_exit_reason[k]), 'backtest_end')
+                    self._settle_position({
+                        'side': 'long' if pos_side[k] > 0 else 'short',
+                        'entry_price': pos_entry[k],
+                        'amount': pos_amount[k],
+                        'leverage': pos_leverage[k],
+                        'entry_time': timestamps[pos_entry_bar[k]],
+                        'stop_loss': pos_stop_loss[k],
+                        'take_profit': pos_take_profit[k]
+                    }, close[exit_bar], reason)
+                    event_bars.append(exit_bar)
+                    event_balances.append(self.balance)
+
+            for t in signal_bars:
+                # Exits up to and including the signal bar happen before the strategy runs
+                settle_until(t)
+                if max_open_positions is not None and len(open_heap) >= max_open_positions:
+                    continue
+
+                bar = t + 1 if use_next_bar_execution else t
+                if bar >= n:
+                    continue  # Signal on the last bar is never executed
+
+                side_str = 'long' if side[t] > 0 else 'short'
+                position = self._open_position(
+                    side=side_str,
+                    amount=amount[t],
+                    leverage=leverage[t],
+                    entry_price=exec_prices[bar],
+                    volume=volume[bar] if volume is not None else None,
+                    stop_loss=None if np.isnan(stop_loss[t]) else stop_loss[t],
+                    take_profit=None if np.isnan(take_profit[t]) else take_profit[t],
+                    entry_time=timestamps[bar]
+                )
+                if position is None:
+                    continue
+                event_bars.append(bar)
+                event_balances.append(self.balance)
+
+                # Next-bar entries fill at the open, so the same bar's close can exit them
+                start = bar if use_next_bar_execution else bar + 1
+                exit_bar, reason = _scan_exit(close, start, side[t] > 0,
+                                              float(position['stop_loss']), float(position['take_profit']))
+                at_end = exit_bar < 0
+                exit_bar = n - 1 if at_end else int(exit_bar)
+
+                k = opened
+                opened += 1
+                pos_side[k] = side[t]
+                pos_entry[k] = position['entry_price']
+                pos_amount[k] = position['amount']
+                pos_leverage[k] = position['leverage']
+                pos_stop_loss[k] = position['stop_loss']
+                pos_take_profit[k] = position['take_profit']
+                pos_entry_bar[k] = bar
+                pos_exit_bar[k] = exit_bar
+                pos_exit_reason[k] = int(reason)
+                heapq.heappush(open_heap, (exit_bar, int(at_end), k))
+
+            settle_until(n - 1)
+
+            # Equity at each bar is recorded before that bar's entries and exits
+            balance = np.full(n, float(self.initial_balance))
+            if event_bars:
+                ev_bars = np.asarray(event_bars, dtype=np.int64)
+                ev_balances = np.asarray(event_balances, dtype=float)
+                last_event = np.searchsorted(ev_bars, np.arange(n), side='left') - 1
+                has_event = last_event >= 0
+                balance[has_event] = ev_balances[last_event[has_event]]
+
+            # Unrealized P&L = close * sum(dir * lev * amount) - sum(dir * lev * amount * entry)
+            # over positions open at the start of the bar; both sums are step functions
+            equity = balance.copy()
+            if opened:
+                weight = pos_side[:opened] * pos_leverage[:opened] * pos_amount[:opened]
+                first = pos_entry_bar[:opened] + 1
+                last = pos_exit_bar[:opened] + 1
+                live = first < last
+                exposure = np.zeros(n + 1)
+                cost = np.zeros(n + 1)
+                np.add.at(exposure, first[live], weight[live])
+                np.add.at(exposure, last[live], -weight[live])
+                np.add.at(cost, first[live], (weight * pos_entry[:opened])[live])
+                np.add.at(cost, last[live], -(weight * pos_entry[:opened])[live])
+                equity += close * np.cumsum(exposure)[:n] - np.cumsum(cost)[:n]
+
+            self.equity_curve = pd.DataFrame({
+                'timestamp': timestamps,
+                'balance': balance,
+                'equity': equity
+            })
+
+            results = self.calculate_results()
+            if results.get('total_trades'):
+                self.logger.info(
+                    f"Backtest complete: Net P&L: ${results['total_pnl']:.2f} "
+                    f"({results['total_pnl_pct']:.2%}), Win Rate: {results['win_rate']:.2%}, "
+                    f"Sharpe: {results['sharpe_ratio']:.2f}"
+                )
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error in vectorized backtest: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return {}
+
+    @staticmethod
+    def _signal_columns(signals: Union[pd.DataFrame, Dict[str, np.ndarray]], n: int) -> Tuple[np.ndarray, ...]:
+        """
+        Normalize signal columns to float arrays with run_backtest defaults
+
+        Returns:
+            (side as +1/-1/0, amount, leverage, stop_loss, take_profit)
+        """
+        def column(name, default):
+            if name not in signals:
+                return np.full(n, default, dtype=float)
+            values = np.asarray(pd.to_numeric(pd.Series(np.asarray(signals[name])), errors='coerce'), dtype=float)
+            if len(values) != n:
+                raise ValueError(f"Signal column '{name}' has {len(values)} rows, expected {n}")
+            return np.where(np.isnan(values), default, values)
+
+        raw_side = pd.Series(np.asarray(signals['side'], dtype=object))
+        if len(raw_side) != n:
+            raise ValueError(f"Signal column 'side' has {len(raw_side)} rows, expected {n}")
+        side = raw_side.map({'long': 1, 'short': -1})
+        numeric = pd.to_numeric(raw_side.where(side.isna()), errors='coerce')
+        side = np.sign(side.fillna(numeric).fillna(0).to_numpy(dtype=float)).astype(np.int8)
+
+        return (side, column('amount', 100), column('leverage', 10),
+                column('stop_loss', np.nan), column('take_profit', np.nan))
+
     def walk_forward_optimization(self, data: pd.DataFrame, strategy_func,
                                  train_period_days: int = 30,
                                  test_period_days: int = 7,
-                                 min_train_samples: int = 100) -> Dict:
+                                 min_train_samples: int = 100,
+                                 max_workers: int = 0) -> Dict:
         """
         Perform walk-forward optimization
 
+        Windows are sized from the data's bar interval. Test windows run on a
+        process pool when the strategy function can be pickled (a module-level
+        function) and the data is numeric; otherwise they run in this process.
+
         Args:
             data: Full dataset
             strategy_func: Strategy function to test
             train_period_days: Days to use for training
             test_period_days: Days to use for testing
             min_train_samples: Minimum samples needed for training
+            max_workers: Worker processes (0 = one per CPU, 1 = run in this process)
 
         Returns:
             Aggregated results from all test periods
@@ -179,37 +552,26 @@ class BacktestEngine:
             if 'timestamp' in data.columns:
                 data = data.set_index('timestamp')
 
-            # Calculate window sizes
-            total_period = train_period_days + test_period_days
-
-            start_idx = 0
-            while start_idx + train_period_days * 24 + test_period_days * 24 <= len(data):
-                # Define train and test windows
-                train_end_idx = min(start_idx + train_period_days * 24, len(data))  # Assuming hourly data
-                test_end_idx = min(train_end_idx + test_period_days * 24, len(data))
+            # Calculate window sizes from the bar interval
+            bars_per_day = infer_bars_per_day(data.index)
+            if bars_per_day is None:
+                self.logger.warning("Could not infer bar interval from data, assuming hourly bars")
+                bars_per_day = 24
+            train_bars = max(1, int(round(train_period_days * bars_per_day)))
+            test_bars = max(1, int(round(test_period_days * bars_per_day)))
 
-                if train_end_idx >= len(data):
-                    break
-
-                train_data = data.iloc[start_idx:train_end_idx]
-                test_data = data.iloc[train_end_idx:test_end_idx]
-
-                if len(train_data) < min_train_samples or len(test_data) < 10:
-                    break
-
-                # Run backtest on test period
-                test_results = self.run_backtest(test_data, strategy_func)
+            windows = _walk_forward_windows(len(data), train_bars, test_bars, min_train_samples)
 
+            results_iter = self._iter_walk_forward_results(data, windows, strategy_func, max_workers)
+            for i, test_results in enumerate(results_iter):
+                start_idx, train_end_idx, test_end_idx = windows[i]
                 if test_results:
-                    test_results['train_start'] = train_data.index[0]
-                    test_results['train_end'] = train_data.index[-1]
-                    test_results['test_start'] = test_data.index[0]
-                    test_results['test_end'] = test_data.index[-1]
+                    test_results['train_start'] = data.index[start_idx]
+                    test_results['train_end'] = data.index[train_end_idx - 1]
+                    test_results['test_start'] = data.index[train_end_idx]
+                    test_results['test_end'] = data.index[test_end_idx - 1]
                     all_results.append(test_results)
 
-                # Move window forward
-                start_idx = train_end_idx
-
             # Aggregate results
             if all_results:
                 aggregated = self.aggregate_walk_forward_results(all_results)
@@ -230,6 +592,90 @@ class BacktestEngine:
             self.logger.error(f"Error in walk-forward optimization: {e}")
             return {}
 
+    def _iter_walk_forward_results(self, data: pd.DataFrame, windows: List[Tuple[int, int, int]],
+                                   strategy_func, max_workers: int) -> Iterator[Dict]:
+        """
+        Backtest each test window, yielding results in window order
+
+        Returns:
+            Iterator of run_backtest results, one per window
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(windows))
+        shareable = self._shareable_frame(data)
+        if workers > 1 and shareable is not None:
+            try:
+                pickle.dumps(strategy_func)
+            except Exception:
+                self.logger.info("Strategy function cannot be pickled, running walk-forward windows in process")
+            else:
+                yield from self._iter_walk_forward_parallel(shareable, windows, strategy_func, workers)
+                return
+
+        for _, train_end_idx, test_end_idx in windows:
+            yield self.run_backtest(data.iloc[train_end_idx:test_end_idx], strategy_func)
+
+    @staticmethod
+    def _shareable_frame(data: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray, List[str], Tuple]]:
+        """
+        Split data into an int64 index and a float64 value block for shared memory
+
+        Returns:
+            (index values, values, columns, index spec), or None if a column or
+            the index cannot be represented
+        """
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+            return None
+        index = data.index
+        if isinstance(index, pd.DatetimeIndex):
+            naive = index.tz_convert(None) if index.tz is not None else index
+            index_values = np.asarray(naive, dtype='datetime64[ns]').view(np.int64)
+            index_spec = ('datetime', str(index.tz) if index.tz is not None else None)
+        elif pd.api.types.is_integer_dtype(index):
+            index_values = index.to_numpy(dtype=np.int64)
+            index_spec = ('int', None)
+        else:
+            return None
+        values = data.to_numpy(dtype=np.float64)
+        return index_values, values, list(data.columns), index_spec
+
+    def _iter_walk_forward_parallel(self, shareable: Tuple, windows: List[Tuple[int, int, int]],
+                                    strategy_func, workers: int) -> Iterator[Dict]:
+        """Dispatch windows to a process pool over one shared memory copy of the data"""
+        index_values, values, columns, index_spec = shareable
+        n_rows = len(index_values)
+        engine_params = {
+            'initial_balance': self.initial_balance,
+            'trading_fee_rate': self.trading_fee_rate,
+            'funding_rate': self.funding_rate,
+            'latency_ms': self.latency_ms,
+            'slippage_bps': self.slippage_bps
+        }
+
+        shm = shared_memory.SharedMemory(create=True, size=max(n_rows * 8 * (1 + len(columns)), 1))
+        try:
+            np.ndarray((n_rows,), dtype=np.int64, buffer=shm.buf)[:] = index_values
+            block = np.ndarray((n_rows, len(columns)), dtype=np.float64, buffer=shm.buf, offset=n_rows * 8)
+            block[:] = values
+            del block
+
+            self.logger.info(f"Running {len(windows)} walk-forward windows on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_run_walk_forward_window, shm.name, n_rows, columns, index_spec,
+                                    window, strategy_func, engine_params)
+                    for window in windows
+                ]
+                # Results stream back in window order while later windows are still running
+                for window, future in zip(windows, futures):
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        self.logger.error(f"Walk-forward window {window} failed: {e}")
+                        yield {}
+        finally:
+            shm.close()
+            shm.unlink()
+
     def aggregate_walk_forward_results(self, results: List[Dict]) -> Dict:
         """Aggregate results from multiple walk-forward periods"""
         try:
@@ -305,51 +751,69 @@ class BacktestEngine:
         AUDIT FIX: Add latency simulation and slippage
         """
         try:
-            side = signal.get('side', 'long')
-            amount = signal.get('amount', 100)
-            entry_price = row['close']
-            leverage = signal.get('leverage', 10)
-
-            # AUDIT FIX: Apply slippage based on order size and liquidity
-            volume = row.get('volume', None)
-            slippage_price = self.calculate_slippage(entry_price, amount, side, volume)
-
-            # Calculate slippage cost
-            slippage_cost = abs(slippage_price - entry_price) * amount
-            self.total_slippage_cost += slippage_cost
-
-            # Use slippage-adjusted price for execution
-            execution_price = slippage_price
-
-            # Calculate position size
-            position_value = amount * execution_price
-            required_margin = position_value / leverage
-
-            if required_margin > self.balance * 0.95:
-                return  # Not enough balance
-
-            # PRIORITY 1: Calculate and deduct trading fee
-            trading_fee = position_value * self.trading_fee_rate
-            self.total_trading_fees += trading_fee
-            self.balance -= trading_fee
-
-            # Create position
-            position = {
-                'side': side,
-                'entry_price': execution_price,  # Use slippage-adjusted price
-                'amount': amount,
-                'leverage': leverage,
-                'entry_time': row.get('timestamp', None),
-                'stop_loss': signal.get('stop_loss', execution_price * 0.95 if side == 'long' else execution_price * 1.05),
-                'take_profit': signal.get('take_profit', execution_price * 1.05 if side == 'long' else execution_price * 0.95)
-            }
-
-            self.positions.append(position)
-            self.balance -= required_margin
+            position = self._open_position(
+                side=signal.get('side', 'long'),
+                amount=signal.get('amount', 100),
+                leverage=signal.get('leverage', 10),
+                entry_price=row['close'],
+                volume=row.get('volume', None),
+                stop_loss=signal.get('stop_loss'),
+                take_profit=signal.get('take_profit'),
+                entry_time=row.get('timestamp', None)
+            )
+            if position is not None:
+                self.positions.append(position)
 
         except Exception as e:
             self.logger.error(f"Error executing signal: {e}")
 
+    def _open_position(self, side: str, amount: float, leverage: float, entry_price: float,
+                       volume: Optional[float], stop_loss: Optional[float] = None,
+                       take_profit: Optional[float] = None, entry_time=None) -> Optional[Dict]:
+        """
+        Apply slippage, margin check and entry fee for a new position
+
+        Shared by both engine modes so their accounting is identical.
+
+        Returns:
+            Position dict (not yet added to self.positions), or None if margin is insufficient
+        """
+        # AUDIT FIX: Apply slippage based on order size and liquidity
+        slippage_price = self.calculate_slippage(entry_price, amount, side, volume)
+
+        # Calculate slippage cost
+        slippage_cost = abs(slippage_price - entry_price) * amount
+        self.total_slippage_cost += slippage_cost
+
+        # Use slippage-adjusted price for execution
+        execution_price = slippage_price
+
+        # Calculate position size
+        position_value = amount * execution_price
+        required_margin = position_value / leverage
+
+        if required_margin > self.balance * 0.95:
+            return None  # Not enough balance
+
+        # PRIORITY 1: Calculate and deduct trading fee
+        trading_fee = position_value * self.trading_fee_rate
+        self.total_trading_fees += trading_fee
+        self.balance -= trading_fee
+
+        # Create position
+        position = {
+            'side': side,
+            'entry_price': execution_price,  # Use slippage-adjusted price
+            'amount': amount,
+            'leverage': leverage,
+            'entry_time': entry_time,
+            'stop_loss': stop_loss if stop_loss is not None else (execution_price * 0.95 if side == 'long' else execution_price * 1.05),
+            'take_profit': take_profit if take_profit is not None else (execution_price * 1.05 if side == 'long' else execution_price * 0.95)
+        }
+
+        self.balance -= required_margin
+        return position
+
     def check_exits(self, row: pd.Series):
         """Check if any positions should be closed"""
         current_price = row['close']
@@ -384,65 +848,73 @@ class BacktestEngine:
         PRIORITY 1: Include trading fees and funding in PnL calculation
         """
         try:
-            # Calculate P&L
-            if position['side'] == 'long':
-                price_change = (exit_price - position['entry_price']) / position['entry_price']
-            else:  # short
-                price_change = (position['entry_price'] - exit_price) / position['entry_price']
-
-            position_value = position['amount'] * position['entry_price']
-            gross_pnl = price_change * position_value * position['leverage']
-
-            # PRIORITY 1: Calculate trading fees (entry + exit)
-            entry_fee = position_value * self.trading_fee_rate
-            exit_value = position['amount'] * exit_price
-            exit_fee = exit_value * self.trading_fee_rate
-            trading_fees = entry_fee + exit_fee
-
-            # PRIORITY 1: Calculate funding fees
-            # Estimate funding based on position hold time (if available)
-            funding_fees = 0.0
-            if 'entry_time' in position and 'exit_time' in position:
-                # Calculate number of 8-hour funding periods
-                hold_hours = (position['exit_time'] - position['entry_time']).total_seconds() / 3600
-                funding_periods = hold_hours / 8  # Funding every 8 hours
-                funding_fees = position_value * self.funding_rate * funding_periods
-            else:
-                # Fallback: assume 1 funding period per position
-                funding_fees = position_value * self.funding_rate
-
-            # Net PnL after fees
-            net_pnl = gross_pnl - trading_fees - funding_fees
-
-            # Track fees
-            self.total_trading_fees += trading_fees
-            self.total_funding_fees += funding_fees
-
-            # Return margin and add net P&L
-            required_margin = position_value / position['leverage']
-            self.balance += required_margin + net_pnl
-
-            # Record trade with fee details
-            trade = {
-                'side': position['side'],
-                'entry_price': position['entry_price'],
-                'exit_price': exit_price,
-                'amount': position['amount'],
-                'leverage': position['leverage'],
-                'gross_pnl': gross_pnl,
-                'trading_fees': trading_fees,
-                'funding_fees': funding_fees,
-                'net_pnl': net_pnl,
-                'pnl_pct': (net_pnl / required_margin) if required_margin > 0 else 0,
-                'exit_reason': exit_reason
-            }
-
-            self.closed_trades.append(trade)
+            self._settle_position(position, exit_price, exit_reason)
             self.positions.remove(position)
 
         except Exception as e:
             self.logger.error(f"Error closing position: {e}")
 
+    def _settle_position(self, position: Dict, exit_price: float, exit_reason: str):
+        """
+        Book fees, funding and P&L for a closed position and record the trade
+
+        Shared by both engine modes so their accounting is identical.
+        """
+        # Calculate P&L
+        if position['side'] == 'long':
+            price_change = (exit_price - position['entry_price']) / position['entry_price']
+        else:  # short
+            price_change = (position['entry_price'] - exit_price) / position['entry_price']
+
+        position_value = position['amount'] * position['entry_price']
+        gross_pnl = price_change * position_value * position['leverage']
+
+        # PRIORITY 1: Calculate trading fees (entry + exit)
+        entry_fee = position_value * self.trading_fee_rate
+        exit_value = position['amount'] * exit_price
+        exit_fee = exit_value * self.trading_fee_rate
+        trading_fees = entry_fee + exit_fee
+
+        # PRIORITY 1: Calculate funding fees
+        # Estimate funding based on position hold time (if available)
+        funding_fees = 0.0
+        if 'entry_time' in position and 'exit_time' in position:
+            # Calculate number of 8-hour funding periods
+            hold_hours = (position['exit_time'] - position['entry_time']).total_seconds() / 3600
+            funding_periods = hold_hours / 8  # Funding every 8 hours
+            funding_fees = position_value * self.funding_rate * funding_periods
+        else:
+            # Fallback: assume 1 funding period per position
+            funding_fees = position_value * self.funding_rate
+
+        # Net PnL after fees
+        net_pnl = gross_pnl - trading_fees - funding_fees
+
+        # Track fees
+        self.total_trading_fees += trading_fees
+        self.total_funding_fees += funding_fees
+
+        # Return margin and add net P&L
+        required_margin = position_value / position['leverage']
+        self.balance += required_margin + net_pnl
+
+        # Record trade with fee details
+        trade = {
+            'side': position['side'],
+            'entry_price': position['entry_price'],
+            'exit_price': exit_price,
+            'amount': position['amount'],
+            'leverage': position['leverage'],
+            'gross_pnl': gross_pnl,
+            'trading_fees': trading_fees,
+            'funding_fees': funding_fees,
+            'net_pnl': net_pnl,
+            'pnl_pct': (net_pnl / required_margin) if required_margin > 0 else 0,
+            'exit_reason': exit_reason
+        }
+
+        self.closed_trades.append(trade)
+
     def calculate_equity(self, current_price: float) -> float:
         """Calculate current equity including unrealized P&L"""
         equity = self.balance
@@ -459,6 +931,12 @@ class BacktestEngine:
 
         return equity
 
+    def _equity_values(self) -> np.ndarray:
+        """Equity column of the equity curve (list of dicts or DataFrame)"""
+        if isinstance(self.equity_curve, pd.DataFrame):
+            return self.equity_curve['equity'].to_numpy(dtype=float)
+        return np.array([e['equity'] for e in self.equity_curve], dtype=float)
+
     def calculate_results(self) -> Dict:
         """
         Calculate backtest performance metrics
@@ -505,15 +983,10 @@ class BacktestEngine:
 
             # Calculate max drawdown
             max_drawdown = 0
-            if self.equity_curve:
-                equity_values = [e['equity'] for e in self.equity_curve]
-                peak = equity_values[0]
-                for equity in equity_values:
-                    if equity > peak:
-                        peak = equity
-                    drawdown = (peak - equity) / peak
-                    if drawdown > max_drawdown:
-                        max_drawdown = drawdown
+            equity_values = self._equity_values()
+            if len(equity_values):
+                peak = np.maximum.accumulate(equity_values)
+                max_drawdown = max(max_drawdown, float(np.max((peak - equity_values) / peak)))
 
             return {
                 'total_trades': total_trades,
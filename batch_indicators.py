@@ -0,0 +1,214 @@
+"""
+Batched multi-symbol indicator computation
+
+Stacks aligned OHLCV for many symbols into one (symbols x candles x fields)
+NumPy tensor and computes every Indicators.calculate_all column for all
+symbols in a single vectorized pass. Per-symbol results are exposed as
+DataFrames that wrap views of the output tensor, so nothing is copied
+when SignalGenerator reads them.
+
+Features:
+- One pass per timeframe instead of one pandas pipeline per symbol
+- Symbols are bucketed by candle count so results match calculate_all exactly
+- Recursive indicators (EMA, ATR) loop over candles, vectorized across symbols
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import Indicators, OUTPUT_COLUMNS, MIN_CANDLES
+
+# Field order of the input tensor
+_TS, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(6)
+_OUT = {name: i for i, name in enumerate(OUTPUT_COLUMNS)}
+
+
+def _rolling(x: np.ndarray, window: int, func) -> np.ndarray:
+    """Apply a window reduction along the candle axis (NaN until the window is full)"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = func(sliding_window_view(x, window, axis=1), axis=-1)
+    return out
+
+
+def _rolling_sum_partial(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sum that uses whatever is available at the start (min_periods=1)"""
+    padded = np.concatenate([np.zeros((x.shape[0], window - 1)), x], axis=1)
+    return sliding_window_view(padded, window, axis=1).sum(axis=-1)
+
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    """pandas ewm(span, adjust=False).mean() for every row at once"""
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(x)
+    out[:, 0] = x[:, 0]
+    for t in range(1, x.shape[1]):
+        out[:, t] = ((1.0 - alpha) * out[:, t - 1] + alpha * x[:, t]) / ((1.0 - alpha) + alpha)
+    return out
+
+
+class BatchIndicators:
+    """Calculate technical indicators for many symbols at once"""
+
+    @staticmethod
+    def stack_ohlcv(ohlcv_by_symbol: Dict[str, List]) -> Tuple[List[str], np.ndarray]:
+        """
+        Stack equally long OHLCV histories into one tensor
+
+        Args:
+            ohlcv_by_symbol: symbol -> list of [timestamp, open, high, low, close, volume]
+
+        Returns:
+            Tuple of (symbols, tensor of shape (symbols, candles, 6))
+        """
+        symbols = list(ohlcv_by_symbol)
+        if not symbols:
+            return symbols, np.empty((0, 0, 6))
+        tensor = np.array([ohlcv_by_symbol[s] for s in symbols], dtype=np.float64)
+        if tensor.ndim != 3 or tensor.shape[2] < 6:
+            raise ValueError(f"OHLCV histories must be equally long lists of 6 fields, got shape {tensor.shape}")
+        return symbols, tensor[:, :, :6]
+
+    @staticmethod
+    def calculate_all(ohlcv: np.ndarray) -> np.ndarray:
+        """
+        Calculate all indicators for a stacked OHLCV tensor
+
+        Args:
+            ohlcv: Array of shape (symbols, candles, 6)
+
+        Returns:
+            Array of shape (symbols, candles, len(OUTPUT_COLUMNS)) in OUTPUT_COLUMNS order
+        """
+        n_symbols, n_candles, _ = ohlcv.shape
+        out = np.empty((n_symbols, n_candles, len(OUTPUT_COLUMNS)))
+        out[:, :, :6] = ohlcv[:, :, :6]
+        if n_symbols == 0 or n_candles < MIN_CANDLES:
+            out[:, :, 6:] = np.nan
+            return out
+
+        close = np.ascontiguousarray(ohlcv[:, :, _CLOSE])
+        high = np.ascontiguousarray(ohlcv[:, :, _HIGH])
+        low = np.ascontiguousarray(ohlcv[:, :, _LOW])
+        volume = np.ascontiguousarray(ohlcv[:, :, _VOLUME])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Moving averages and MACD
+            sma_20 = _rolling(close, 20, np.mean)
+            out[:, :, _OUT['sma_20']] = sma_20
+            out[:, :, _OUT['sma_50']] = _rolling(close, 50, np.mean)
+            ema_12 = _ewm(close, 12)
+            ema_26 = _ewm(close, 26)
+            macd = ema_12 - ema_26
+            macd_signal = _ewm(macd, 9)
+            out[:, :, _OUT['ema_12']] = ema_12
+            out[:, :, _OUT['ema_26']] = ema_26
+            out[:, :, _OUT['macd']] = macd
+            out[:, :, _OUT['macd_signal']] = macd_signal
+            out[:, :, _OUT['macd_diff']] = macd - macd_signal
+
+            # RSI
+            delta = np.zeros_like(close)
+            delta[:, 1:] = np.diff(close, axis=1)
+            gain = _rolling(np.where(delta > 0, delta, 0.0), 14, np.mean)
+            loss = _rolling(np.where(delta < 0, -delta, 0.0), 14, np.mean)
+            rsi = 100 - (100 / (1 + gain / np.where(loss == 0, np.nan, loss)))
+            out[:, :, _OUT['rsi']] = np.where(np.isnan(rsi), 50.0, rsi)
+
+            # Stochastic oscillator (14, 3)
+            lowest = _rolling(low, 14, np.min)
+            highest = _rolling(high, 14, np.max)
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+            stoch_d = _rolling(stoch_k, 3, np.mean)
+            out[:, :, _OUT['stoch_k']] = np.where(np.isnan(stoch_k), 50.0, stoch_k)
+            out[:, :, _OUT['stoch_d']] = np.where(np.isnan(stoch_d), 50.0, stoch_d)
+
+            # Bollinger Bands
+            bb_std = _rolling(close, 20, lambda w, axis: np.std(w, axis=axis, ddof=1))
+            bb_high = sma_20 + bb_std * 2
+            bb_low = sma_20 - bb_std * 2
+            bb_width = (bb_high - bb_low) / np.where(sma_20 == 0, np.nan, sma_20)
+            out[:, :, _OUT['bb_high']] = bb_high
+            out[:, :, _OUT['bb_mid']] = sma_20
+            out[:, :, _OUT['bb_low']] = bb_low
+            out[:, :, _OUT['bb_width']] = np.where(np.isfinite(bb_width), bb_width, 0.03)
+
+            # ATR (Wilder smoothing, zeros during warm-up like ta's AverageTrueRange)
+            true_range = high - low
+            prev_close = close[:, :-1]
+            true_range[:, 1:] = np.maximum.reduce([
+                true_range[:, 1:], np.abs(high[:, 1:] - prev_close), np.abs(low[:, 1:] - prev_close)
+            ])
+            atr = np.zeros_like(close)
+            atr[:, 13] = true_range[:, :14].mean(axis=1)
+            for t in range(14, n_candles):
+                atr[:, t] = (atr[:, t - 1] * 13 + true_range[:, t]) / 14.0
+            out[:, :, _OUT['atr']] = atr
+
+            # Volume
+            counts = np.minimum(np.arange(1, n_candles + 1), 20)
+            volume_sma = _rolling_sum_partial(volume, 20) / counts
+            volume_ratio = volume / np.where(volume_sma == 0, np.nan, volume_sma)
+            out[:, :, _OUT['volume_sma']] = volume_sma
+            out[:, :, _OUT['volume_ratio']] = np.where(np.isnan(volume_ratio), 1.0, volume_ratio)
+
+            # Momentum
+            momentum = np.full_like(close, np.nan)
+            momentum[:, 10:] = close[:, 10:] / close[:, :-10] - 1
+            out[:, :, _OUT['momentum']] = momentum
+            out[:, :, _OUT['roc']] = momentum * 100
+
+            # VWAP (rolling 50)
+            typical_price = (high + low + close) / 3
+            out[:, :, _OUT['vwap']] = (_rolling_sum_partial(typical_price * volume, 50)
+                                       / _rolling_sum_partial(volume, 50))
+
+        return out
+
+    @staticmethod
+    def frame(indicators: np.ndarray, index: int) -> pd.DataFrame:
+        """
+        Wrap one symbol of a calculate_all output tensor as a DataFrame
+
+        The numeric columns are a view of the tensor (no copy); only the
+        timestamp column is materialized as datetimes.
+        """
+        values = indicators[index]
+        df = pd.DataFrame(values[:, 1:], columns=OUTPUT_COLUMNS[1:], copy=False)
+        df.insert(0, 'timestamp', pd.to_datetime(values[:, 0].astype('int64'), unit='ms'))
+        return df
+
+    @classmethod
+    def calculate_many(cls, ohlcv_by_symbol: Dict[str, List]) -> Dict[str, pd.DataFrame]:
+        """
+        Calculate indicators for many symbols, one tensor per distinct history length
+
+        Args:
+            ohlcv_by_symbol: symbol -> list of [timestamp, open, high, low, close, volume]
+
+        Returns:
+            symbol -> DataFrame equivalent to Indicators.calculate_all (empty if < 50 candles)
+        """
+        buckets: Dict[int, Dict[str, List]] = {}
+        frames: Dict[str, pd.DataFrame] = {}
+        for symbol, ohlcv in ohlcv_by_symbol.items():
+            if ohlcv is None or len(ohlcv) < MIN_CANDLES:
+                frames[symbol] = pd.DataFrame()
+            else:
+                buckets.setdefault(len(ohlcv), {})[symbol] = ohlcv
+
+        for bucket in buckets.values():
+            try:
+                symbols, tensor = cls.stack_ohlcv(bucket)
+            except (ValueError, TypeError):
+                # Ragged or malformed rows: fall back to the per-symbol path for this bucket
+                for symbol, ohlcv in bucket.items():
+                    frames[symbol] = Indicators.calculate_all(ohlcv)
+                continue
+            indicators = cls.calculate_all(tensor)
+            for i, symbol in enumerate(symbols):
+                frames[symbol] = cls.frame(indicators, i)
+        return frames
@@ -1,6 +1,7 @@
 """
 Main trading bot orchestrator
 """
+import os
 import time
 import signal
 import sys
@@ -35,22 +36,92 @@ from smart_trading_enhancements import (
     SmartTradeFilter, SmartPositionSizer, SmartExitOptimizer,
     MarketContextAnalyzer, VolatilityAdaptiveParameters
 )
-# Enhanced ML Intelligence (2025+ Advanced AI)
-from enhanced_ml_intelligence import (
-    DeepLearningSignalPredictor, MultiTimeframeSignalFusion,
-    AdaptiveExitStrategy, ReinforcementLearningStrategy
-)
+# Optional engines built on first use (Enhanced ML Intelligence, dashboard)
+from lazy_components import LazyComponentRegistry
 # DCA and Hedging Strategies
 from dca_strategy import DCAStrategy
 from hedging_strategy import HedgingStrategy
-# Dashboard
-from dashboard import TradingDashboard, FLASK_AVAILABLE
+
+_IMPORT_TIME = time.time()
+
+
+def _process_start_time() -> float:
+    """Wall-clock time this process started (falls back to when bot was imported)"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _IMPORT_TIME
+
+
+def _build_deep_learning_predictor():
+    from enhanced_ml_intelligence import DeepLearningSignalPredictor
+    return DeepLearningSignalPredictor(n_features=31)
+
+
+def _build_multi_tf_fusion():
+    from enhanced_ml_intelligence import MultiTimeframeSignalFusion
+    return MultiTimeframeSignalFusion()
+
+
+def _build_adaptive_exit():
+    from enhanced_ml_intelligence import AdaptiveExitStrategy
+    return AdaptiveExitStrategy()
+
+
+def _build_rl_strategy():
+    from enhanced_ml_intelligence import ReinforcementLearningStrategy
+    rl_strategy = ReinforcementLearningStrategy()
+    # Load saved Q-table if available
+    rl_strategy.load_q_table()
+    return rl_strategy
+
 
 class TradingBot:
     """Main trading bot that orchestrates all components"""
 
-    def __init__(self):
-        """Initialize the trading bot"""
+    @property
+    def deep_learning_predictor(self):
+        """DeepLearningSignalPredictor, or None when ENABLE_DEEP_LEARNING is off"""
+        return self.components.get('deep_learning_predictor')
+
+    @property
+    def multi_tf_fusion(self):
+        return self.components.get('multi_tf_fusion')
+
+    @property
+    def adaptive_exit(self):
+        return self.components.get('adaptive_exit')
+
+    @property
+    def rl_strategy(self):
+        return self.components.get('rl_strategy')
+
+    def __init__(self, client: KuCoinClient = None, fast_startup: bool = False):
+        """Initialize the trading bot
+
+        Args:
+            client: Exchange client to trade through (default: a live KuCoinClient
+                built from Config; replay.ReplayRunner passes a replay client)
+            fast_startup: Staged startup - restore saved state, sync positions over
+                REST and start the position monitor first, then connect the
+                WebSocket and build the scanner, ML, analytics and dashboard on a
+                background thread (run() waits for it before scanning; a failed
+                build is retried while the restored positions stay monitored)
+        """
+        # Startup timing and staged-initialization state
+        self.startup_metrics = {'process_start': _process_start_time()}
+        self._components_ready = threading.Event()
+        self._startup_thread = None
+        self._startup_error = None  # Last background initialization failure (None once it succeeds)
+        self._startup_stop = threading.Event()
+        self._pending_closed_positions = []
+        self._pending_closed_lock = threading.Lock()
+        self._first_position_check_done = False
+
         # Validate configuration
         Config.validate()
 
@@ -90,12 +161,14 @@ class TradingBot:
         self.logger.info("   All logs consolidated for better visibility")
 
         # Initialize components
-        self.client = KuCoinClient(
+        self.client = client if client is not None else KuCoinClient(
             Config.API_KEY,
             Config.API_SECRET,
             Config.API_PASSPHRASE,
-            enable_websocket=Config.ENABLE_WEBSOCKET
+            # Staged startup connects the WebSocket in the background instead
+            enable_websocket=Config.ENABLE_WEBSOCKET and not fast_startup
         )
+        self._deferred_websocket = client is None and fast_startup and Config.ENABLE_WEBSOCKET
 
         # Get balance and auto-configure trading parameters if not set in .env
         balance = self.client.get_balance()
@@ -118,8 +191,6 @@ class TradingBot:
                 # Include trading fee buffer: 0.12% fees + 0.5% profit = 0.62%
                 Config.MIN_PROFIT_THRESHOLD = 0.0062
 
-        self.scanner = MarketScanner(self.client)
-
         self.position_manager = PositionManager(
             self.client,
             Config.TRAILING_STOP_PERCENTAGE
@@ -131,7 +202,62 @@ class TradingBot:
             Config.MAX_OPEN_POSITIONS
         )
 
-        self.ml_model = MLModel(Config.ML_MODEL_PATH)
+        # Restore stops and trailing state of positions tracked last session
+        # (applied when the positions are synced from the exchange)
+        self.position_manager.load_state()
+
+        # State
+        self.running = False
+        self.last_scan_time = None
+        self.last_retrain_time = datetime.now()
+        self.last_analytics_report = datetime.now()
+        self.last_performance_report = datetime.now()  # Track performance reporting
+
+        # Background scanning state
+        self._scan_thread = None
+        self._scan_thread_running = False
+        self._scan_lock = threading.Lock()
+        self._latest_opportunities = []
+        self._last_opportunity_update = datetime.now()
+
+        # Position monitoring state - separate from scanning
+        self._position_monitor_thread = None
+        self._position_monitor_running = False
+        self._position_monitor_lock = threading.Lock()  # Lock for position monitor timing
+        self._last_position_check = datetime.min  # First check runs as soon as the monitor starts
+
+        # Dashboard state
+        self.dashboard = None
+        self._dashboard_thread = None
+        self._dashboard_update_thread = None
+        self._dashboard_running = False
+        self._last_dashboard_update = datetime.now()
+
+        # Setup signal handlers for graceful shutdown
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+
+        if fast_startup:
+            # Open positions are protected before anything heavy is built
+            self.logger.info("⚡ Fast startup: monitoring existing positions before initializing other components")
+            self._restore_positions()
+            self._start_position_monitor()
+            self._startup_thread = threading.Thread(
+                target=self._init_components_background, daemon=True, name="StartupInit"
+            )
+            self._startup_thread.start()
+        else:
+            self._init_components()
+            self._mark_components_ready()
+            self._restore_positions()
+
+    def _init_components(self):
+        """Build the scanner, ML models, analytics engines, strategies and dashboard"""
+        self.scanner = MarketScanner(self.client)
+
+        # Built eagerly but cheap: a current compiled model serves predictions and the
+        # pickled boosting ensemble is only loaded when retraining needs it
+        self.ml_model = MLModel(Config.ML_MODEL_PATH, use_compiled=Config.ENABLE_COMPILED_MODEL)
 
         # Advanced analytics module
         self.analytics = AdvancedAnalytics()
@@ -165,6 +291,9 @@ class TradingBot:
         # Connect attention selector to ML model for feature weighting
         self.ml_model.attention_selector = self.attention_features_2025
 
+        # Let the scanner score each scan's opportunities with one batched model call
+        self.scanner.ml_model = self.ml_model
+
         # Smart Trading Enhancements
         self.smart_trade_filter = SmartTradeFilter()
         self.smart_position_sizer = SmartPositionSizer()
@@ -172,13 +301,14 @@ class TradingBot:
         self.market_context_analyzer = MarketContextAnalyzer()
         self.volatility_adaptive_params = VolatilityAdaptiveParameters()
 
-        # Enhanced ML Intelligence (Advanced AI)
-        self.deep_learning_predictor = DeepLearningSignalPredictor(n_features=31)
-        self.multi_tf_fusion = MultiTimeframeSignalFusion()
-        self.adaptive_exit = AdaptiveExitStrategy()
-        self.rl_strategy = ReinforcementLearningStrategy()
-        # Load saved Q-table if available
-        self.rl_strategy.load_q_table()
+        # Enhanced ML Intelligence (Advanced AI) - imported and built by the background
+        # preload run() starts (or on first use), so TensorFlow never slows startup
+        self.components = LazyComponentRegistry()
+        self.components.register('deep_learning_predictor', _build_deep_learning_predictor,
+                                 enabled=Config.ENABLE_DEEP_LEARNING)
+        self.components.register('multi_tf_fusion', _build_multi_tf_fusion)
+        self.components.register('adaptive_exit', _build_adaptive_exit)
+        self.components.register('rl_strategy', _build_rl_strategy)
 
         # DCA and Hedging Strategies
         self.dca_strategy = DCAStrategy()
@@ -207,8 +337,11 @@ class TradingBot:
         self.logger.info("   ✅ Market Context Analyzer (Sentiment analysis)")
         self.logger.info("   ✅ Volatility-Adaptive Parameters")
 
-        self.logger.info("🚀 ENHANCED ML INTELLIGENCE Activated:")
-        self.logger.info("   ✅ Deep Learning Signal Predictor (LSTM + Dense)")
+        self.logger.info("🚀 ENHANCED ML INTELLIGENCE Activated (loaded on first use):")
+        if Config.ENABLE_DEEP_LEARNING:
+            self.logger.info("   ✅ Deep Learning Signal Predictor (LSTM + Dense)")
+        else:
+            self.logger.info("   ⏸️  Deep Learning Signal Predictor: DISABLED (ENABLE_DEEP_LEARNING=false)")
         self.logger.info("   ✅ Multi-Timeframe Signal Fusion (Weighted voting)")
         self.logger.info("   ✅ Adaptive Exit Strategy (Dynamic targets)")
         self.logger.info("   ✅ Reinforcement Learning Strategy Selector (Q-learning)")
@@ -217,35 +350,9 @@ class TradingBot:
         self.logger.info("   ✅ DCA Strategy (Entry, Accumulation, Range)")
         self.logger.info("   ✅ Hedging Strategy (Portfolio protection)")
 
-        # State
-        self.running = False
-        self.last_scan_time = None
-        self.last_retrain_time = datetime.now()
-        self.last_analytics_report = datetime.now()
-        self.last_performance_report = datetime.now()  # Track performance reporting
-
-        # Background scanning state
-        self._scan_thread = None
-        self._scan_thread_running = False
-        self._scan_lock = threading.Lock()
-        self._latest_opportunities = []
-        self._last_opportunity_update = datetime.now()
-
-        # Position monitoring state - separate from scanning
-        self._position_monitor_thread = None
-        self._position_monitor_running = False
-        self._position_monitor_lock = threading.Lock()  # Lock for position monitor timing
-        self._last_position_check = datetime.now()
-
-        # Dashboard state
-        self.dashboard = None
-        self._dashboard_thread = None
-        self._dashboard_update_thread = None
-        self._dashboard_running = False
-        self._last_dashboard_update = datetime.now()
-
         # Initialize dashboard if enabled
         if Config.ENABLE_DASHBOARD:
+            from dashboard import TradingDashboard, FLASK_AVAILABLE
             if FLASK_AVAILABLE:
                 try:
                     self.dashboard = TradingDashboard(port=Config.DASHBOARD_PORT)
@@ -264,14 +371,55 @@ class TradingBot:
         else:
             self.logger.info("📊 Dashboard: DISABLED (set ENABLE_DASHBOARD=true in .env to enable)")
 
-        # Setup signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self.signal_handler)
-        signal.signal(signal.SIGTERM, self.signal_handler)
+    def _init_components_background(self):
+        """
+        Staged startup: build the remaining components while positions are already monitored
 
-        # Sync existing positions from exchange
+        If the build fails the bot stays in degraded mode - the position monitor
+        keeps managing the restored positions, no new trades are opened and
+        closes are recorded later - and the build is retried every
+        Config.STARTUP_RETRY_INTERVAL seconds until it succeeds or the bot stops.
+        """
+        attempt = 0
+        while not self._startup_stop.is_set():
+            attempt += 1
+            try:
+                if self._deferred_websocket:
+                    self.client.connect_websocket()
+                    self._deferred_websocket = False
+                self._init_components()
+            except Exception as e:
+                self._startup_error = e
+                self.logger.critical(
+                    f"🚨 Background initialization failed (attempt {attempt}): {e} - DEGRADED MODE: "
+                    f"monitoring {self.position_manager.get_open_positions_count()} open position(s), "
+                    f"no new trades; retrying in {Config.STARTUP_RETRY_INTERVAL:.0f}s", exc_info=True)
+                self._startup_stop.wait(Config.STARTUP_RETRY_INTERVAL)
+                continue
+            self._startup_error = None
+            self._mark_components_ready()
+            return
+
+    def _mark_components_ready(self):
+        """Flag initialization complete and record trades closed while it ran"""
+        with self._pending_closed_lock:
+            self._components_ready.set()
+            pending, self._pending_closed_positions = self._pending_closed_positions, []
+
+        elapsed = time.time() - self.startup_metrics['process_start']
+        self.startup_metrics['components_ready'] = elapsed
+        self.logger.info(f"⏱️  All components ready {elapsed:.2f}s after process start")
+
+        for symbol, pnl, position in pending:
+            self._record_closed_position(symbol, pnl, position)
+
+    def _restore_positions(self) -> int:
+        """Sync open positions from the exchange, re-applying last session's stops"""
         synced_positions = self.position_manager.sync_existing_positions()
         if synced_positions > 0:
             self.logger.info(f"📊 Managing {synced_positions} existing position(s) from exchange")
+        self.startup_metrics['positions_restored'] = time.time() - self.startup_metrics['process_start']
+        return synced_positions
 
     def signal_handler(self, sig, frame):
         """Handle shutdown signals gracefully"""
@@ -292,6 +440,7 @@ class TradingBot:
         self._scan_thread_running = False
         self._position_monitor_running = False
         self._dashboard_running = False
+        self._startup_stop.set()
 
     def execute_trade(self, opportunity: dict) -> bool:
         """
@@ -579,14 +728,13 @@ class TradingBot:
             # Get signals from different timeframes
             signal_1h = (signal, confidence)
 
-            # Get 4h indicators and signal
+            # Get 4h and 1d indicators and score both in one model call
             indicators_4h = Indicators.get_latest_indicators(df_4h) if df_4h is not None else indicators
-            ml_signal_4h, ml_conf_4h = self.ml_model.predict(indicators_4h)
-            signal_4h = (ml_signal_4h if ml_conf_4h > 0.5 else 'HOLD', ml_conf_4h)
-
-            # Get 1d indicators and signal
             indicators_1d = Indicators.get_latest_indicators(df_1d) if df_1d is not None else indicators
-            ml_signal_1d, ml_conf_1d = self.ml_model.predict(indicators_1d)
+            (ml_signal_4h, ml_conf_4h), (ml_signal_1d, ml_conf_1d) = self.ml_model.predict_batch(
+                [indicators_4h, indicators_1d]
+            )
+            signal_4h = (ml_signal_4h if ml_conf_4h > 0.5 else 'HOLD', ml_conf_4h)
             signal_1d = (ml_signal_1d if ml_conf_1d > 0.5 else 'HOLD', ml_conf_1d)
 
             # Fuse signals using sophisticated voting
@@ -617,6 +765,8 @@ class TradingBot:
 
         # ENHANCED ML: Deep Learning Signal Prediction
         try:
+            if self.deep_learning_predictor is None:
+                raise RuntimeError("deep learning predictor disabled")
             features = self.ml_model.prepare_features(indicators).flatten()
             dl_signal, dl_confidence = self.deep_learning_predictor.predict(features)
 
@@ -1014,127 +1164,139 @@ class TradingBot:
         # the entire update_open_positions() call fails and NO positions get updated
         try:
             for symbol, pnl, position in self.position_manager.update_positions():
-                try:
-                    profit_icon = "📈" if pnl > 0 else "📉"
-                    self.logger.info(f"{profit_icon} Position closed: {symbol}, P/L: {pnl:.2%}")
+                # Staged startup: analytics and models may still be loading; the
+                # close is recorded as soon as they are ready
+                with self._pending_closed_lock:
+                    if not self._components_ready.is_set():
+                        self._pending_closed_positions.append((symbol, pnl, position))
+                        self.logger.info(f"Position closed during startup: {symbol}, P/L: {pnl:.2%} (recording deferred)")
+                        continue
+                self._record_closed_position(symbol, pnl, position)
+        except Exception as e:
+            # Generator-level exception (e.g., API error fetching positions)
+            # Log and continue - position monitor will retry on next cycle
+            self.logger.error(f"Error during position update iteration: {e}", exc_info=True)
 
-                    # Record trade for analytics
-                    trade_duration = (datetime.now() - position.entry_time).total_seconds() / 60
+    def _record_closed_position(self, symbol: str, pnl: float, position):
+        """Record a closed position in analytics, risk tracking and the learning models"""
+        try:
+            profit_icon = "📈" if pnl > 0 else "📉"
+            self.logger.info(f"{profit_icon} Position closed: {symbol}, P/L: {pnl:.2%}")
+
+            # Record trade for analytics
+            trade_duration = (datetime.now() - position.entry_time).total_seconds() / 60
+
+            # DEFENSIVE: Ensure leverage is not zero (should never happen, but be safe)
+            leverage = position.leverage if position.leverage > 0 else 1
+
+            self.analytics.record_trade({
+                'symbol': symbol,
+                'side': position.side,
+                'entry_price': position.entry_price,
+                'exit_price': position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage),
+                'pnl': pnl,
+                'pnl_pct': pnl,
+                'duration': trade_duration,
+                'leverage': position.leverage
+            })
 
-                    # DEFENSIVE: Ensure leverage is not zero (should never happen, but be safe)
-                    leverage = position.leverage if position.leverage > 0 else 1
+            # 2026 FEATURE: Record trade in performance metrics
+            try:
+                exit_price = position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage)
+                self.performance_2026.record_trade(
+                    entry_price=position.entry_price,
+                    exit_price=exit_price,
+                    side=position.side,
+                    size=position.amount,
+                    pnl=pnl,
+                    entry_time=position.entry_time,
+                    exit_time=datetime.now(),
+                    strategy=getattr(position, 'strategy', 'unknown')
+                )
 
-                    self.analytics.record_trade({
+                # Record for strategy selector if strategy is known
+                if hasattr(position, 'strategy'):
+                    self.strategy_selector_2026.record_strategy_outcome(
+                        position.strategy, pnl
+                    )
+            except Exception as e:
+                self.logger.debug(f"Error recording 2026 metrics: {e}")
+
+            # Record outcome for ML model
+            ohlcv = self.client.get_ohlcv(symbol, timeframe='1h', limit=100)
+            df = Indicators.calculate_all(ohlcv)
+            indicators = Indicators.get_latest_indicators(df)
+
+            signal = 'BUY' if position.side == 'long' else 'SELL'
+            self.ml_model.record_outcome(indicators, signal, pnl)
+
+            # 2025 AI ENHANCEMENT: Update attention weights based on trade outcome
+            try:
+                features = self.ml_model.prepare_features(indicators).flatten()
+                trade_success = pnl > 0.005  # Profitable trade
+                self.attention_features_2025.update_attention_weights(features, trade_success)
+                self.logger.debug(f"Updated attention weights based on trade outcome (success: {trade_success})")
+            except Exception as e:
+                self.logger.debug(f"Error updating attention weights: {e}")
+
+            # Record outcome for risk manager (for streak tracking)
+            self.risk_manager.record_trade_outcome(pnl)
+
+            # 2025 OPTIMIZATION: Record trade for Bayesian Kelly
+            try:
+                is_win = pnl > 0.005  # >0.5% is a win
+                self.bayesian_kelly.update_trade_outcome(is_win, pnl)
+            except Exception as e:
+                self.logger.debug(f"Error recording Bayesian Kelly trade: {e}")
+
+            # ENHANCED ML: Update Reinforcement Learning Q-values
+            try:
+                if hasattr(position, 'rl_strategy') and hasattr(position, 'market_regime') and hasattr(position, 'entry_volatility'):
+                    # Calculate reward (normalized profit)
+                    reward = pnl / 0.05  # Normalize by 5% as target
+                    reward = max(-1.0, min(reward, 2.0))  # Cap between -1 and 2
+
+                    self.rl_strategy.update_q_value(
+                        position.market_regime,
+                        position.entry_volatility,
+                        position.rl_strategy,
+                        reward
+                    )
+                    self.logger.debug(f"Updated RL Q-value for {position.rl_strategy} in {position.market_regime}")
+            except Exception as e:
+                self.logger.debug(f"Error updating RL Q-value: {e}")
+
+            # ENHANCED ML: Update deep learning model with trade outcome
+            try:
+                if self.deep_learning_predictor is not None:
+                    features = self.ml_model.prepare_features(indicators).flatten()
+                    label = 1 if (signal == 'BUY' and pnl > 0.005) or (signal == 'SELL' and pnl > 0.005) else 0
+                    self.deep_learning_predictor.update(features, label)
+            except Exception as e:
+                self.logger.debug(f"Error updating deep learning model: {e}")
+
+            # Update dashboard with closed trade
+            if self.dashboard:
+                try:
+                    exit_price = position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage)
+                    hours = int(trade_duration // 60)
+                    minutes = int(trade_duration % 60)
+                    self.dashboard.add_trade({
                         'symbol': symbol,
                         'side': position.side,
                         'entry_price': position.entry_price,
-                        'exit_price': position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage),
-                        'pnl': pnl,
+                        'exit_price': exit_price,
+                        'amount': position.amount,
+                        'pnl': pnl * (position.amount * position.entry_price),  # Dollar amount
                         'pnl_pct': pnl,
-                        'duration': trade_duration,
-                        'leverage': position.leverage
+                        'duration': f"{hours}h {minutes}m",
+                        'timestamp': datetime.now()
                     })
-
-                    # 2026 FEATURE: Record trade in performance metrics
-                    try:
-                        exit_price = position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage)
-                        self.performance_2026.record_trade(
-                            entry_price=position.entry_price,
-                            exit_price=exit_price,
-                            side=position.side,
-                            size=position.amount,
-                            pnl=pnl,
-                            entry_time=position.entry_time,
-                            exit_time=datetime.now(),
-                            strategy=getattr(position, 'strategy', 'unknown')
-                        )
-
-                        # Record for strategy selector if strategy is known
-                        if hasattr(position, 'strategy'):
-                            self.strategy_selector_2026.record_strategy_outcome(
-                                position.strategy, pnl
-                            )
-                    except Exception as e:
-                        self.logger.debug(f"Error recording 2026 metrics: {e}")
-
-                    # Record outcome for ML model
-                    ohlcv = self.client.get_ohlcv(symbol, timeframe='1h', limit=100)
-                    df = Indicators.calculate_all(ohlcv)
-                    indicators = Indicators.get_latest_indicators(df)
-
-                    signal = 'BUY' if position.side == 'long' else 'SELL'
-                    self.ml_model.record_outcome(indicators, signal, pnl)
-
-                    # 2025 AI ENHANCEMENT: Update attention weights based on trade outcome
-                    try:
-                        features = self.ml_model.prepare_features(indicators).flatten()
-                        trade_success = pnl > 0.005  # Profitable trade
-                        self.attention_features_2025.update_attention_weights(features, trade_success)
-                        self.logger.debug(f"Updated attention weights based on trade outcome (success: {trade_success})")
-                    except Exception as e:
-                        self.logger.debug(f"Error updating attention weights: {e}")
-
-                    # Record outcome for risk manager (for streak tracking)
-                    self.risk_manager.record_trade_outcome(pnl)
-
-                    # 2025 OPTIMIZATION: Record trade for Bayesian Kelly
-                    try:
-                        is_win = pnl > 0.005  # >0.5% is a win
-                        self.bayesian_kelly.update_trade_outcome(is_win, pnl)
-                    except Exception as e:
-                        self.logger.debug(f"Error recording Bayesian Kelly trade: {e}")
-
-                    # ENHANCED ML: Update Reinforcement Learning Q-values
-                    try:
-                        if hasattr(position, 'rl_strategy') and hasattr(position, 'market_regime') and hasattr(position, 'entry_volatility'):
-                            # Calculate reward (normalized profit)
-                            reward = pnl / 0.05  # Normalize by 5% as target
-                            reward = max(-1.0, min(reward, 2.0))  # Cap between -1 and 2
-
-                            self.rl_strategy.update_q_value(
-                                position.market_regime,
-                                position.entry_volatility,
-                                position.rl_strategy,
-                                reward
-                            )
-                            self.logger.debug(f"Updated RL Q-value for {position.rl_strategy} in {position.market_regime}")
-                    except Exception as e:
-                        self.logger.debug(f"Error updating RL Q-value: {e}")
-
-                    # ENHANCED ML: Update deep learning model with trade outcome
-                    try:
-                        features = self.ml_model.prepare_features(indicators).flatten()
-                        label = 1 if (signal == 'BUY' and pnl > 0.005) or (signal == 'SELL' and pnl > 0.005) else 0
-                        self.deep_learning_predictor.update(features, label)
-                    except Exception as e:
-                        self.logger.debug(f"Error updating deep learning model: {e}")
-
-                    # Update dashboard with closed trade
-                    if self.dashboard:
-                        try:
-                            exit_price = position.entry_price * (1 + pnl / leverage) if position.side == 'long' else position.entry_price * (1 - pnl / leverage)
-                            hours = int(trade_duration // 60)
-                            minutes = int(trade_duration % 60)
-                            self.dashboard.add_trade({
-                                'symbol': symbol,
-                                'side': position.side,
-                                'entry_price': position.entry_price,
-                                'exit_price': exit_price,
-                                'amount': position.amount,
-                                'pnl': pnl * (position.amount * position.entry_price),  # Dollar amount
-                                'pnl_pct': pnl,
-                                'duration': f"{hours}h {minutes}m",
-                                'timestamp': datetime.now()
-                            })
-                        except Exception as e:
-                            self.logger.debug(f"Error updating dashboard with trade: {e}")
-
                 except Exception as e:
-                    self.logger.error(f"Error recording closed position {symbol}: {e}", exc_info=True)
+                    self.logger.debug(f"Error updating dashboard with trade: {e}")
+
         except Exception as e:
-            # Generator-level exception (e.g., API error fetching positions)
-            # Log and continue - position monitor will retry on next cycle
-            self.logger.error(f"Error during position update iteration: {e}", exc_info=True)
+            self.logger.error(f"Error recording closed position {symbol}: {e}", exc_info=True)
 
     def _background_scanner(self):
         """Background thread that continuously scans for opportunities with adaptive intervals"""
@@ -1230,6 +1392,9 @@ class TradingBot:
                         with self._position_monitor_lock:
                             self._last_position_check = datetime.now()
 
+                if not self._first_position_check_done:
+                    self._report_first_position_check()
+
                 # Short sleep to avoid CPU hogging but stay responsive
                 time.sleep(Config.LIVE_LOOP_INTERVAL)  # Use config constant for consistency
 
@@ -1239,6 +1404,26 @@ class TradingBot:
 
         self.logger.info("👁️ Position monitor thread stopped")
 
+    def _report_first_position_check(self):
+        """Log how long open positions went unmonitored after the process started"""
+        self._first_position_check_done = True
+        elapsed = time.time() - self.startup_metrics['process_start']
+        self.startup_metrics['first_position_check'] = elapsed
+        self.logger.info(
+            f"⏱️  First position check {elapsed:.2f}s after process start "
+            f"({self.position_manager.get_open_positions_count()} open position(s) monitored)"
+        )
+
+    def _start_position_monitor(self):
+        """Start the position monitor thread; returns False if it is already running"""
+        if self._position_monitor_thread is not None and self._position_monitor_thread.is_alive():
+            return False
+        self.logger.info("👁️ Starting dedicated position monitor thread (PRIORITY: CRITICAL)...")
+        self._position_monitor_running = True
+        self._position_monitor_thread = threading.Thread(target=self._position_monitor, daemon=True, name="PositionMonitor")
+        self._position_monitor_thread.start()
+        return True
+
     def _get_latest_opportunities(self):
         """Get the latest opportunities from background scanner in a thread-safe manner"""
         with self._scan_lock:
@@ -1377,6 +1562,9 @@ class TradingBot:
         if Config.ENABLE_DCA:
             try:
                 active_dca_positions = self.dca_strategy.get_active_dca_positions()
+                if len(self.position_manager.positions) > 1:
+                    # One bulk ticker refresh serves every get_ticker() in the DCA checks
+                    self.client.get_all_tickers()
                 for symbol in active_dca_positions:
                     if symbol in self.position_manager.positions:
                         # Get current price
@@ -1528,9 +1716,8 @@ class TradingBot:
         # Check if we should retrain the ML model
         time_since_retrain = (datetime.now() - self.last_retrain_time).total_seconds()
         if time_since_retrain > Config.RETRAIN_INTERVAL:
-            self.logger.info("🤖 Retraining ML model...")
-            if self.ml_model.train():
-                self.logger.info("ML model retrained successfully")
+            # Fits in a separate process; the new model is hot-swapped when it passes validation
+            self.ml_model.train_async()
             self.last_retrain_time = datetime.now()
 
         self.last_scan_time = datetime.now()
@@ -1552,12 +1739,9 @@ class TradingBot:
 
             # Calculate total P&L from analytics
             initial_balance = 10000  # Default, will be updated if available
-            if hasattr(self.analytics, 'equity_curve') and len(self.analytics.equity_curve) > 0:
-                eq0 = self.analytics.equity_curve[0]
-                if isinstance(eq0, dict) and 'balance' in eq0 and isinstance(eq0['balance'], (int, float)) and eq0['balance'] > 0:
-                    initial_balance = eq0['balance']
-                else:
-                    initial_balance = 10000
+            tracked_initial = self.analytics.initial_balance
+            if isinstance(tracked_initial, (int, float)) and tracked_initial > 0:
+                initial_balance = tracked_initial
             total_pnl = current_balance - initial_balance
 
             # Update performance stats
@@ -1579,8 +1763,10 @@ class TradingBot:
                 'profit_factor': getattr(self.performance_2026, 'calculate_profit_factor', lambda: 0)()
             })
 
-            # Update open positions
+            # Update open positions (one bulk ticker refresh serves every get_ticker() below)
             positions_data = []
+            if len(self.position_manager.positions) > 1:
+                self.client.get_all_tickers()
             for symbol, pos in self.position_manager.positions.items():
                 # Get current price
                 ticker = self.client.get_ticker(symbol)
@@ -1709,6 +1895,16 @@ class TradingBot:
 
     def run(self):
         """Main bot loop with truly live continuous monitoring"""
+        if not self._components_ready.is_set():
+            # A failed build is retried in the background (degraded mode) rather than stopping the monitor
+            self.logger.info("⏳ Waiting for background initialization (positions already monitored)...")
+            while not self._components_ready.wait(timeout=0.5):
+                if not self._position_monitor_running:  # Shutdown requested during startup
+                    break
+            if not self._components_ready.is_set():
+                self.shutdown()
+                return
+
         self.running = True
         self.logger.info("=" * 60)
         self.logger.info("🚀 BOT STARTED SUCCESSFULLY!")
@@ -1728,6 +1924,10 @@ class TradingBot:
             self.logger.info("   4️⃣  Dashboard Updater (data refresh)")
         self.logger.info("=" * 60)
 
+        # Build the lazily loaded engines (TensorFlow predictor etc.) now on a background
+        # thread, so the first trading cycle that uses them does not pay for the import
+        self.components.preload()
+
         # Start dashboard server if enabled
         if self.dashboard:
             self.logger.info("🌐 Starting dashboard server thread...")
@@ -1757,13 +1957,9 @@ class TradingBot:
         # CRITICAL: Start position monitor thread FIRST to ensure priority access to API
         # This prevents API call collisions and ensures critical position monitoring
         # happens before less critical market scanning
-        self.logger.info("👁️ Starting dedicated position monitor thread (PRIORITY: CRITICAL)...")
-        self._position_monitor_running = True
-        self._position_monitor_thread = threading.Thread(target=self._position_monitor, daemon=True, name="PositionMonitor")
-        self._position_monitor_thread.start()
-
-        # Give position monitor a head start to establish priority
-        time.sleep(0.5)  # 500ms delay ensures position monitor is running first
+        if self._start_position_monitor():
+            # Give position monitor a head start to establish priority
+            time.sleep(0.5)  # 500ms delay ensures position monitor is running first
 
         # Start background scanner thread AFTER position monitor
         self.logger.info("🔍 Starting background scanner thread (PRIORITY: NORMAL)...")
@@ -1851,15 +2047,9 @@ class TradingBot:
             # Clean up analytics old equity records (keep last 7 days)
             from datetime import timedelta
             cutoff_time = datetime.now() - timedelta(days=7)
-            if hasattr(self.analytics, 'equity_curve'):
-                original_len = len(self.analytics.equity_curve)
-                self.analytics.equity_curve = [
-                    eq for eq in self.analytics.equity_curve
-                    if eq.get('timestamp', datetime.min) > cutoff_time
-                ]
-                cleaned = original_len - len(self.analytics.equity_curve)
-                if cleaned > 0:
-                    self.logger.debug(f"Cleaned analytics history: removed {cleaned} old records")
+            cleaned = self.analytics.prune_equity_before(cutoff_time)
+            if cleaned > 0:
+                self.logger.debug(f"Cleaned analytics history: removed {cleaned} old records")
 
             # Force garbage collection
             collected = gc.collect()
@@ -1892,15 +2082,17 @@ class TradingBot:
             except Exception as e:
                 self.logger.debug(f"Error saving ML model: {e}")
 
-            # Save deep learning model
+            # Save deep learning model (nothing to save if it was never loaded)
             try:
-                self.deep_learning_predictor.save()
+                if self.components.is_loaded('deep_learning_predictor'):
+                    self.deep_learning_predictor.save()
             except Exception as e:
                 self.logger.debug(f"Error saving deep learning model: {e}")
 
             # Save RL Q-table
             try:
-                self.rl_strategy.save_q_table()
+                if self.components.is_loaded('rl_strategy'):
+                    self.rl_strategy.save_q_table()
             except Exception as e:
                 self.logger.debug(f"Error saving RL Q-table: {e}")
 
@@ -1922,6 +2114,12 @@ class TradingBot:
             except Exception as e:
                 self.logger.debug(f"Error saving risk manager state: {e}")
 
+            # Save position stops and trailing state for the next startup
+            try:
+                self.position_manager.save_state()
+            except Exception as e:
+                self.logger.debug(f"Error saving position manager state: {e}")
+
             self.logger.debug("✅ Periodic state save complete")
 
         except Exception as e:
@@ -1933,6 +2131,13 @@ class TradingBot:
         self.logger.info("🛑 SHUTTING DOWN BOT...")
         self.logger.info("=" * 60)
 
+        # Staged startup: let background initialization finish so the states
+        # saved below belong to fully built components
+        self._startup_stop.set()  # No further retries of a failed background initialization
+        if self._startup_thread and self._startup_thread.is_alive():
+            self.logger.info("⏳ Waiting for background initialization to finish...")
+            self._startup_thread.join(timeout=60)
+
         # Stop dashboard threads first
         if self.dashboard:
             self._dashboard_running = False
@@ -1962,6 +2167,12 @@ class TradingBot:
                 else:
                     self.logger.info("✅ Background scanner thread stopped")
 
+        # Release scanner worker processes (SCANNER_EXECUTION_MODE='process')
+        try:
+            self.scanner.shutdown()
+        except Exception as e:
+            self.logger.error(f"Error stopping scanner workers: {e}")
+
         # Stop position monitor thread
         if self._position_monitor_thread:
             self._position_monitor_running = False  # Always set flag to False to stop any running thread
@@ -1988,6 +2199,7 @@ class TradingBot:
 
         # Save ML model to preserve training data and performance metrics
         try:
+            self.ml_model.shutdown()  # Abandon any background retrain
             self.ml_model.save_model()
             self.logger.info("💾 ML model saved successfully")
         except Exception as e:
@@ -1995,14 +2207,16 @@ class TradingBot:
 
         # ENHANCED ML: Save deep learning and RL models
         try:
-            self.deep_learning_predictor.save()
-            self.logger.info("💾 Deep learning model saved successfully")
+            if self.components.is_loaded('deep_learning_predictor'):
+                self.deep_learning_predictor.save()
+                self.logger.info("💾 Deep learning model saved successfully")
         except Exception as e:
             self.logger.error(f"Error saving deep learning model: {e}")
 
         try:
-            self.rl_strategy.save_q_table()
-            self.logger.info("💾 Reinforcement learning Q-table saved successfully")
+            if self.components.is_loaded('rl_strategy'):
+                self.rl_strategy.save_q_table()
+                self.logger.info("💾 Reinforcement learning Q-table saved successfully")
         except Exception as e:
             self.logger.error(f"Error saving RL Q-table: {e}")
 
@@ -2027,6 +2241,12 @@ class TradingBot:
         except Exception as e:
             self.logger.error(f"Error saving risk manager state: {e}")
 
+        # Save position stops and trailing state so a restart resumes them
+        try:
+            self.position_manager.save_state()
+        except Exception as e:
+            self.logger.error(f"Error saving position manager state: {e}")
+
         # Close WebSocket and API connections
         try:
             self.client.close()
@@ -2041,7 +2261,7 @@ class TradingBot:
 def main():
     """Main entry point"""
     try:
-        bot = TradingBot()
+        bot = TradingBot(fast_startup=Config.FAST_STARTUP)
         bot.run()
     except Exception as e:
         logger = Logger.get_logger()
@@ -0,0 +1,107 @@
+"""
+Fixed-capacity NumPy ring buffer for streaming OHLCV candles
+
+WebSocket candle updates arrive continuously for hundreds of
+(symbol, timeframe) streams. Each stream gets a preallocated buffer with O(1)
+append / in-place update of the forming candle and its own lock, so the
+message handler never contends with readers of other streams.
+
+Features:
+- Preallocated [timestamp, open, high, low, close, volume] rows (float64)
+- O(1) append and forming-candle update, no list shifting
+- Mirrored storage: the newest N candles are always one contiguous slice,
+  so readers get zero-copy views
+- Per-buffer lock
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+class CandleRingBuffer:
+    """
+    Ring buffer of OHLCV candles for one (symbol, timeframe) stream.
+
+    Every row is written twice (at i and i + capacity), so the last n rows
+    are always buffer[head - n + 1 + capacity : head + 1 + capacity].
+    """
+
+    def __init__(self, capacity: int = 500):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of candles kept
+        """
+        self.capacity = capacity
+        self._data = np.zeros((2 * capacity, 6))
+        self._head = -1  # Index (0..capacity-1) of the newest candle
+        self._count = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest candle, or None if empty"""
+        with self.lock:
+            return int(self._data[self._head, 0]) if self._count else None
+
+    def update(self, candle: List[float]):
+        """
+        Append a candle, or revise the newest one if the timestamp matches
+
+        Args:
+            candle: [timestamp, open, high, low, close, volume]
+        """
+        with self.lock:
+            if self._count and self._data[self._head, 0] == candle[0]:
+                head = self._head
+            else:
+                head = (self._head + 1) % self.capacity
+                self._head = head
+                self._count = min(self._count + 1, self.capacity)
+            self._data[head] = candle
+            self._data[head + self.capacity] = candle
+
+    def view(self, limit: int = None) -> Optional[np.ndarray]:
+        """
+        Zero-copy view of the newest candles (oldest first)
+
+        The view is read-only. The forming candle is revised in place, and rows
+        are overwritten once capacity - n newer candles have arrived; copy the
+        view if it must outlive that.
+
+        Args:
+            limit: Maximum number of candles (default: all)
+
+        Returns:
+            Array of shape (n, 6), or None if the buffer is empty
+        """
+        with self.lock:
+            if not self._count:
+                return None
+            n = self._count if limit is None else min(limit, self._count)
+            end = self._head + 1 + self.capacity
+            view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def to_list(self, limit: int = None) -> Optional[List[List]]:
+        """
+        Copy of the newest candles as [timestamp, open, high, low, close, volume] lists
+
+        Returns:
+            List of candles (timestamps as int), or None if the buffer is empty
+        """
+        with self.lock:
+            if not self._count:
+                return None
+            n = self._count if limit is None else min(limit, self._count)
+            end = self._head + 1 + self.capacity
+            rows = self._data[end - n:end].tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        return rows
@@ -0,0 +1,267 @@
+"""
+Persistent local OHLCV candle store
+
+Keeps every candle the bot has fetched in a local SQLite file keyed by
+(symbol, timeframe, timestamp), so that repeated scans only need to ask the
+exchange for candles newer than the last stored one instead of re-downloading
+the full history every time. The store survives restarts.
+
+Features:
+- Append/upsert by (symbol, timeframe, timestamp); the forming candle is revised in place
+- Last stored timestamp per key is cached in memory (no query on the hot path)
+- Old candles are pruned to a bounded history per key
+- WAL journal so readers never block the writer
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from logger import Logger
+
+_TIMEFRAME_UNITS_MS = {
+    'm': 60_000,
+    'h': 3_600_000,
+    'd': 86_400_000,
+    'w': 604_800_000,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Convert a ccxt timeframe string (e.g. '1m', '4h', '1d') to milliseconds
+
+    Raises:
+        ValueError: If the timeframe is not recognized
+    """
+    match = re.fullmatch(r'(\d+)([mhdw])', timeframe or '')
+    if not match:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * _TIMEFRAME_UNITS_MS[match.group(2)]
+
+
+class CandleStore:
+    """
+    Append-only local OHLCV store backed by SQLite.
+    """
+
+    def __init__(self, path: str = 'data/candles.db', max_candles: int = 1000):
+        """
+        Initialize candle store.
+
+        Args:
+            path: SQLite database file (':memory:' for a process-local store)
+            max_candles: Candles kept per (symbol, timeframe); older ones are pruned
+        """
+        self.path = path
+        self.max_candles = max_candles
+        self.logger = Logger.get_logger()
+        self._lock = threading.Lock()
+        self._last_ts: Dict[Tuple[str, str], Optional[int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL,
+                PRIMARY KEY (symbol, timeframe, ts)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Timestamp (ms) of the newest stored candle, or None if nothing is stored"""
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._last_ts:
+                row = self.conn.execute(
+                    'SELECT MAX(ts) FROM candles WHERE symbol = ? AND timeframe = ?', key
+                ).fetchone()
+                self._last_ts[key] = row[0] if row else None
+            return self._last_ts[key]
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """Every stored (symbol, timeframe) pair, sorted"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT DISTINCT symbol, timeframe FROM candles ORDER BY symbol, timeframe'
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def get_candles(self, symbol: str, timeframe: str, limit: int = 100) -> List[List]:
+        """
+        Get the most recent stored candles
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            limit: Maximum number of candles
+
+        Returns:
+            List of [timestamp, open, high, low, close, volume], oldest first
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT ts, open, high, low, close, volume FROM candles '
+                'WHERE symbol = ? AND timeframe = ? ORDER BY ts DESC LIMIT ?',
+                (symbol, timeframe, int(limit))
+            ).fetchall()
+        return [list(row) for row in reversed(rows)]
+
+    def iter_candles(self, symbol: str, timeframe: str, since: Optional[int] = None,
+                     until: Optional[int] = None, batch_size: int = 5000) -> Iterator[List]:
+        """
+        Stream stored candles oldest first without loading them all
+
+        Pages through the primary key (ts > last seen) so each batch is an
+        index range scan and at most batch_size candles are held at once.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            since: Only candles with timestamp >= since (ms)
+            until: Only candles with timestamp <= until (ms)
+            batch_size: Candles fetched per query
+
+        Yields:
+            [timestamp, open, high, low, close, volume]
+        """
+        last_ts = -1 if since is None else int(since) - 1
+        upper = 2 ** 62 if until is None else int(until)
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    'SELECT ts, open, high, low, close, volume FROM candles '
+                    'WHERE symbol = ? AND timeframe = ? AND ts > ? AND ts <= ? ORDER BY ts LIMIT ?',
+                    (symbol, timeframe, last_ts, upper, int(batch_size))
+                ).fetchall()
+            for row in rows:
+                yield list(row)
+            if len(rows) < batch_size:
+                return
+            last_ts = rows[-1][0]
+
+    def upsert(self, symbol: str, timeframe: str, candles: List[List]) -> int:
+        """
+        Store candles, replacing any already stored with the same timestamp
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            candles: List of [timestamp, open, high, low, close, volume]
+
+        Returns:
+            Number of candles written
+        """
+        rows = [
+            (symbol, timeframe, int(c[0]), float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5]))
+            for c in candles
+        ]
+        if not rows:
+            return 0
+
+        key = (symbol, timeframe)
+        newest = max(row[2] for row in rows)
+        with self._lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO candles (symbol, timeframe, ts, open, high, low, close, volume) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            if self.max_candles:
+                self.conn.execute(
+                    'DELETE FROM candles WHERE symbol = ? AND timeframe = ? AND ts < ('
+                    'SELECT ts FROM candles WHERE symbol = ? AND timeframe = ? '
+                    'ORDER BY ts DESC LIMIT 1 OFFSET ?)',
+                    (symbol, timeframe, symbol, timeframe, self.max_candles - 1)
+                )
+            self.conn.commit()
+            previous = self._last_ts.get(key)
+            self._last_ts[key] = newest if previous is None else max(previous, newest)
+        return len(rows)
+
+    def delta_since(self, symbol: str, timeframe: str, limit: int,
+                    now_ms: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        Plan a fetch of only the candles missing from the stored history
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            limit: Number of candles the caller wants
+            now_ms: Current time in ms (defaults to the wall clock)
+
+        Returns:
+            (since, fetch_limit) for the exchange request, starting at the newest
+            stored candle since it may still have been forming, or None when the
+            store does not hold ``limit`` contiguous, recent enough candles and a
+            full fetch is needed
+        """
+        tf_ms = timeframe_to_ms(timeframe)
+        last_ts = self.last_timestamp(symbol, timeframe)
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        if last_ts is None or now_ms - last_ts >= limit * tf_ms:
+            return None
+        stored = self.get_candles(symbol, timeframe, limit)
+        if len(stored) < limit or stored[-1][0] - stored[0][0] != (limit - 1) * tf_ms:
+            return None
+        missing = int((now_ms - last_ts) // tf_ms) + 1
+        return last_ts, missing + 1
+
+    def merge_delta(self, symbol: str, timeframe: str, since: int, candles: List[List],
+                    limit: int) -> Optional[List[List]]:
+        """
+        Store the result of a fetch planned by delta_since
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            since: Start of the fetch, as returned by delta_since
+            candles: Candles returned by the exchange
+            limit: Number of candles the caller wants
+
+        Returns:
+            The newest ``limit`` stored candles, or None (nothing stored) when the
+            fetch is empty or would leave a gap after the stored history
+        """
+        if not candles or candles[0][0] > since + timeframe_to_ms(timeframe):
+            return None
+        self.upsert(symbol, timeframe, candles)
+        return self.get_candles(symbol, timeframe, limit)
+
+    def clear(self, symbol: str = None, timeframe: str = None):
+        """Delete stored candles for one key, one symbol, or everything"""
+        with self._lock:
+            if symbol is None:
+                self.conn.execute('DELETE FROM candles')
+                self._last_ts.clear()
+            elif timeframe is None:
+                self.conn.execute('DELETE FROM candles WHERE symbol = ?', (symbol,))
+                self._last_ts = {k: v for k, v in self._last_ts.items() if k[0] != symbol}
+            else:
+                self.conn.execute('DELETE FROM candles WHERE symbol = ? AND timeframe = ?', (symbol, timeframe))
+                self._last_ts.pop((symbol, timeframe), None)
+            self.conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing candle store: {e}")
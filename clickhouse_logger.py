@@ -4,16 +4,28 @@ ClickHouse Logger
 High-performance columnar database logger for trading data.
 ClickHouse is ideal for time-series data and analytics.
 
+The log_* methods only append a row to a bounded queue and return; a
+background thread collects rows into per-table buffers and inserts them in
+batches, so logging never waits on the database.
+
 Features:
-- Async batch inserts for high throughput
+- Async batch inserts for high throughput (columnar inserts on ClickHouse,
+  executemany on SQLite)
+- Per-table buffers flushed every batch_size rows or flush_interval seconds
+- Backpressure: above the high-water mark signals and metrics are sampled,
+  a full queue drops rows; both are counted per table
+- Queue depth and flush latency metrics via get_metrics()
 - Automatic table creation
 - Multiple data types (trades, orders, metrics, signals)
 - Compression and partitioning
-- Falls back to SQLite if ClickHouse unavailable
+- Falls back to SQLite (WAL mode) if ClickHouse unavailable
 """
 
+import queue
 import sqlite3
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from logger import Logger
 import json
@@ -26,6 +38,12 @@ except ImportError:
     CLICKHOUSE_AVAILABLE = False
     ClickHouseClient = None
 
+TABLES = ('trades', 'orders', 'signals', 'metrics')
+
+# Tables whose rows may be sampled under load; trades and orders are only
+# ever dropped when the queue is completely full
+SAMPLED_TABLES = ('signals', 'metrics')
+
 
 class ClickHouseLogger:
     """
@@ -41,7 +59,12 @@ class ClickHouseLogger:
         user: str = 'default',
         password: str = '',
         use_sqlite_fallback: bool = True,
-        sqlite_path: str = 'trading_data.db'
+        sqlite_path: str = 'trading_data.db',
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_queue: int = 50000,
+        high_water: float = 0.8,
+        sample_every: int = 10
     ):
         """
         Initialize ClickHouse logger.
@@ -54,6 +77,11 @@ class ClickHouseLogger:
             password: Password
             use_sqlite_fallback: Use SQLite if ClickHouse unavailable
             sqlite_path: SQLite database path for fallback
+            batch_size: Buffered rows per table that trigger an insert
+            flush_interval: Max seconds a buffered row waits before it is inserted
+            max_queue: Rows held for the writer thread before new ones are dropped
+            high_water: Queue fill fraction above which signals/metrics are sampled
+            sample_every: Under load, keep one signal/metric row out of this many
         """
         self.host = host
         self.port = port
@@ -66,6 +94,25 @@ class ClickHouseLogger:
         self.client = None
         self.sqlite_conn = None
         self.using_clickhouse = False
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.sample_every = max(1, sample_every)
+        self._high_water = int(max_queue * high_water)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._db_lock = threading.Lock()  # Writer thread and query() share the connection
+        self._metrics_lock = threading.Lock()
+        self._sample_counters = {table: 0 for table in SAMPLED_TABLES}
+        self._counts = {
+            table: {'queued': 0, 'written': 0, 'dropped': 0, 'sampled_out': 0, 'failed': 0}
+            for table in TABLES
+        }
+        self._flushes = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_last = 0.0
+        self._flush_ms_max = 0.0
+        self._writer_thread = None
         
         # Try to connect to ClickHouse
         if CLICKHOUSE_AVAILABLE:
@@ -92,7 +139,13 @@ class ClickHouseLogger:
         if not self.using_clickhouse and use_sqlite_fallback:
             self.logger.info(f"📊 Using SQLite fallback: {sqlite_path}")
             self.sqlite_conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self.sqlite_conn.execute('PRAGMA journal_mode=WAL')
+            self.sqlite_conn.execute('PRAGMA synchronous=NORMAL')
             self._create_tables_sqlite()
+
+        if self.using_clickhouse or self.sqlite_conn:
+            self._writer_thread = threading.Thread(target=self._writer, daemon=True, name="ClickHouseLogger")
+            self._writer_thread.start()
     
     def _create_tables_clickhouse(self):
         """Create tables in ClickHouse."""
@@ -229,12 +282,15 @@ class ClickHouseLogger:
         except Exception as e:
             self.logger.error(f"Error creating SQLite tables: {e}")
     
-    def log_trade(self, trade_data: Dict):
+    def log_trade(self, trade_data: Dict) -> bool:
         """
         Log a trade.
         
         Args:
             trade_data: Dictionary with trade information
+
+        Returns:
+            True if the row was queued (False if dropped or sampled out)
         """
         try:
             data = {
@@ -249,25 +305,21 @@ class ClickHouseLogger:
                 'trade_id': trade_data.get('trade_id', '')
             }
             
-            if self.using_clickhouse:
-                self.client.execute('INSERT INTO trades VALUES', [tuple(data.values())])
-            elif self.sqlite_conn:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute(
-                    'INSERT INTO trades VALUES (?,?,?,?,?,?,?,?,?)',
-                    tuple(data.values())
-                )
-                self.sqlite_conn.commit()
-                
+            return self._enqueue('trades', tuple(data.values()))
+
         except Exception as e:
             self.logger.error(f"Error logging trade: {e}")
+            return False
     
-    def log_order(self, order_data: Dict):
+    def log_order(self, order_data: Dict) -> bool:
         """
         Log an order.
         
         Args:
             order_data: Dictionary with order information
+
+        Returns:
+            True if the row was queued (False if dropped or sampled out)
         """
         try:
             data = {
@@ -283,25 +335,21 @@ class ClickHouseLogger:
                 'avg_fill_price': float(order_data.get('avg_fill_price', 0))
             }
             
-            if self.using_clickhouse:
-                self.client.execute('INSERT INTO orders VALUES', [tuple(data.values())])
-            elif self.sqlite_conn:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute(
-                    'INSERT INTO orders VALUES (?,?,?,?,?,?,?,?,?,?)',
-                    tuple(data.values())
-                )
-                self.sqlite_conn.commit()
-                
+            return self._enqueue('orders', tuple(data.values()))
+
         except Exception as e:
             self.logger.error(f"Error logging order: {e}")
+            return False
     
-    def log_signal(self, signal_data: Dict):
+    def log_signal(self, signal_data: Dict) -> bool:
         """
         Log a trading signal.
         
         Args:
             signal_data: Dictionary with signal information
+
+        Returns:
+            True if the row was queued (False if dropped or sampled out)
         """
         try:
             metadata = signal_data.get('metadata', {})
@@ -318,20 +366,13 @@ class ClickHouseLogger:
                 'metadata': metadata
             }
             
-            if self.using_clickhouse:
-                self.client.execute('INSERT INTO signals VALUES', [tuple(data.values())])
-            elif self.sqlite_conn:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute(
-                    'INSERT INTO signals VALUES (?,?,?,?,?,?,?)',
-                    tuple(data.values())
-                )
-                self.sqlite_conn.commit()
-                
+            return self._enqueue('signals', tuple(data.values()))
+
         except Exception as e:
             self.logger.error(f"Error logging signal: {e}")
+            return False
     
-    def log_metric(self, metric_name: str, metric_value: float, tags: Optional[Dict] = None):
+    def log_metric(self, metric_name: str, metric_value: float, tags: Optional[Dict] = None) -> bool:
         """
         Log a metric.
         
@@ -339,6 +380,9 @@ class ClickHouseLogger:
             metric_name: Name of metric
             metric_value: Value of metric
             tags: Optional tags dictionary
+
+        Returns:
+            True if the row was queued (False if dropped or sampled out)
         """
         try:
             tags_str = json.dumps(tags) if tags else '{}'
@@ -350,19 +394,137 @@ class ClickHouseLogger:
                 'tags': tags_str
             }
             
-            if self.using_clickhouse:
-                self.client.execute('INSERT INTO metrics VALUES', [tuple(data.values())])
-            elif self.sqlite_conn:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute(
-                    'INSERT INTO metrics VALUES (?,?,?,?)',
-                    tuple(data.values())
-                )
-                self.sqlite_conn.commit()
-                
+            return self._enqueue('metrics', tuple(data.values()))
+
         except Exception as e:
             self.logger.error(f"Error logging metric: {e}")
+            return False
     
+    def _enqueue(self, table: str, row: Tuple) -> bool:
+        """Hand a row to the writer thread without blocking, applying the overload policy"""
+        if self._writer_thread is None:
+            return False
+
+        counts = self._counts[table]
+        if table in SAMPLED_TABLES and self._queue.qsize() >= self._high_water:
+            with self._metrics_lock:
+                self._sample_counters[table] += 1
+                keep = self._sample_counters[table] % self.sample_every == 0
+                if not keep:
+                    counts['sampled_out'] += 1
+            if not keep:
+                return False
+
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            with self._metrics_lock:
+                counts['dropped'] += 1
+            return False
+        with self._metrics_lock:
+            counts['queued'] += 1
+        return True
+
+    def _writer(self):
+        """Writer thread: collect queued rows per table and insert them in batches"""
+        buffers: Dict[str, List[Tuple]] = {table: [] for table in TABLES}
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            command = None
+            if item is not None:
+                name, payload = item
+                if name in ('_flush', '_stop'):
+                    command = item
+                else:
+                    rows = buffers[name]
+                    rows.append(payload)
+                    if len(rows) >= self.batch_size:
+                        self._insert(name, rows)
+                        buffers[name] = []
+
+            if command is not None or time.monotonic() >= deadline:
+                for table, rows in buffers.items():
+                    if rows:
+                        self._insert(table, rows)
+                        buffers[table] = []
+                deadline = time.monotonic() + self.flush_interval
+                if command is not None:
+                    command[1].set()
+                    if command[0] == '_stop':
+                        return
+
+    def _insert(self, table: str, rows: List[Tuple]):
+        """Insert one batch: columnar on ClickHouse, executemany on SQLite"""
+        started = time.perf_counter()
+        try:
+            with self._db_lock:
+                if self.using_clickhouse:
+                    self.client.execute(f'INSERT INTO {table} VALUES', list(zip(*rows)), columnar=True)
+                else:
+                    placeholders = ','.join('?' * len(rows[0]))
+                    self.sqlite_conn.executemany(
+                        f'INSERT INTO {table} VALUES ({placeholders})',
+                        [tuple(v.isoformat(sep=' ') if isinstance(v, datetime) else v for v in row)
+                         for row in rows]
+                    )
+                    self.sqlite_conn.commit()
+            written, failed = len(rows), 0
+        except Exception as e:
+            self.logger.error(f"Error inserting {len(rows)} row(s) into {table}: {e}")
+            written, failed = 0, len(rows)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._metrics_lock:
+            self._counts[table]['written'] += written
+            self._counts[table]['failed'] += failed
+            self._flushes += 1
+            self._flush_ms_total += elapsed_ms
+            self._flush_ms_last = elapsed_ms
+            self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+
+    def _signal_writer(self, command: str, timeout: float) -> bool:
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((command, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Insert everything queued so far and wait for it.
+
+        Returns:
+            True if the writer finished within timeout
+        """
+        return self._signal_writer('_flush', timeout)
+
+    def get_metrics(self) -> Dict:
+        """
+        Get ingestion metrics.
+
+        Returns:
+            Dictionary with queue depth, flush latency and per-table row counts
+        """
+        with self._metrics_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self.max_queue,
+                'flushes': self._flushes,
+                'flush_latency_ms_last': self._flush_ms_last,
+                'flush_latency_ms_avg': self._flush_ms_total / self._flushes if self._flushes else 0.0,
+                'flush_latency_ms_max': self._flush_ms_max,
+                'tables': {table: dict(counts) for table, counts in self._counts.items()},
+            }
+
     def query(self, sql: str) -> List[tuple]:
         """
         Execute a query.
@@ -374,20 +536,26 @@ class ClickHouseLogger:
             List of tuples with results
         """
         try:
-            if self.using_clickhouse:
-                return self.client.execute(sql)
-            elif self.sqlite_conn:
-                cursor = self.sqlite_conn.cursor()
-                cursor.execute(sql)
-                return cursor.fetchall()
+            self.flush()
+            with self._db_lock:
+                if self.using_clickhouse:
+                    return self.client.execute(sql)
+                elif self.sqlite_conn:
+                    cursor = self.sqlite_conn.cursor()
+                    cursor.execute(sql)
+                    return cursor.fetchall()
         except Exception as e:
             self.logger.error(f"Error executing query: {e}")
             return []
     
     def close(self):
-        """Close database connections."""
+        """Insert everything queued, stop the writer and close database connections."""
+        if self._writer_thread is not None:
+            self._signal_writer('_stop', timeout=30.0)
+            self._writer_thread = None
         if self.sqlite_conn:
             self.sqlite_conn.close()
+            self.sqlite_conn = None
         self.logger.info("Database connections closed")
     
     def get_status(self) -> Dict:
@@ -402,5 +570,6 @@ class ClickHouseLogger:
             'clickhouse_available': CLICKHOUSE_AVAILABLE,
             'connected': self.using_clickhouse or (self.sqlite_conn is not None),
             'host': self.host if self.using_clickhouse else None,
-            'database': self.database if self.using_clickhouse else self.sqlite_path
+            'database': self.database if self.using_clickhouse else self.sqlite_path,
+            'queue_depth': self._queue.qsize()
         }
@@ -0,0 +1,450 @@
+"""
+Compiled, NumPy-only inference for the gradient-boosting signal ensemble
+
+Flattens the trained MLModel pipeline (StandardScaler ->
+CalibratedClassifierCV(sigmoid) -> soft VotingClassifier of XGBoost /
+LightGBM / CatBoost) into plain arrays stored in one .npz file, and scores
+it with NumPy alone. Export needs the fitted estimator objects; loading and
+scoring need neither sklearn nor any boosting library.
+
+Features:
+- Every tree of every booster in one node table; all trees are walked
+  together, one vectorized step per tree level
+- Split conditions normalized to `x < threshold` at export: LightGBM `<=`
+  and CatBoost `>` borders are nudged to the next representable value, and
+  XGBoost/CatBoost splits read float32-rounded feature copies, as the
+  libraries compare in float32
+- CatBoost oblivious trees expanded into regular trees
+- Saved without pickle (np.load(..., allow_pickle=False))
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+SIGMOID, SOFTMAX = 0, 1
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * x))  # Overflow-free logistic
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class _TreeTable:
+    """Accumulates flattened trees while compiling"""
+
+    def __init__(self, n_features: int):
+        self.n_features = n_features
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.default_left, self.value = [], []
+        self.tree_root, self.tree_member, self.tree_output = [], [], []
+
+    def node(self, feature: int = 0, threshold: float = 0.0, default_left: bool = False,
+             value: float = 0.0, float32: bool = False) -> int:
+        """Add a node (a leaf until link() is called) and return its index"""
+        idx = len(self.feature)
+        # float32 splits read the float32-rounded copy of the features (columns n_features..)
+        self.feature.append(feature + (self.n_features if float32 else 0))
+        self.threshold.append(threshold)
+        self.left.append(idx)  # Leaves point to themselves, so extra walk steps are no-ops
+        self.right.append(idx)
+        self.default_left.append(default_left)
+        self.value.append(value)
+        return idx
+
+    def link(self, idx: int, left: int, right: int):
+        self.left[idx] = left
+        self.right[idx] = right
+
+    def add_tree(self, root: int, member: int, output: int):
+        self.tree_root.append(root)
+        self.tree_member.append(member)
+        self.tree_output.append(output)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'node_feature': np.asarray(self.feature, dtype=np.int32),
+            'node_threshold': np.asarray(self.threshold, dtype=np.float64),
+            'node_children': np.column_stack([self.left, self.right]).astype(np.int32).reshape(-1, 2),
+            'node_default_left': np.asarray(self.default_left, dtype=bool),
+            'node_value': np.asarray(self.value, dtype=np.float64),
+            'tree_root': np.asarray(self.tree_root, dtype=np.int32),
+            'tree_member': np.asarray(self.tree_member, dtype=np.int32),
+            'tree_output': np.asarray(self.tree_output, dtype=np.int32),
+        }
+
+
+def _next_up32(value: float) -> float:
+    return float(np.nextafter(np.float32(value), np.float32(np.inf)))
+
+
+def _compile_xgboost(estimator, table: _TreeTable, member: int, feature_names: List[str]):
+    booster = estimator.get_booster()
+    config = json.loads(booster.save_config())['learner']
+    objective = config['objective']['name']
+    n_classes = int(config['learner_model_param']['num_class'])
+    n_outputs = n_classes if n_classes > 2 else 1
+
+    base_score = np.atleast_1d(np.asarray(json.loads(config['learner_model_param']['base_score']), dtype=np.float64))
+    if objective == 'binary:logistic':
+        bias = np.log(base_score / (1.0 - base_score))  # Stored as a probability
+    elif objective in ('multi:softprob', 'multi:softmax'):
+        bias = base_score
+    else:
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+    bias = np.broadcast_to(bias, (n_outputs,))
+
+    names = booster.feature_names or feature_names
+    index = {name: i for i, name in enumerate(names)}
+    index.update({f'f{i}': i for i in range(len(names))})
+
+    def build(node) -> int:
+        if 'leaf' in node:
+            return table.node(value=float(node['leaf']))
+        children = {child['nodeid']: child for child in node['children']}
+        idx = table.node(feature=index[node['split']], threshold=float(np.float32(node['split_condition'])),
+                         default_left=node['missing'] == node['yes'], float32=True)
+        table.link(idx, build(children[node['yes']]), build(children[node['no']]))
+        return idx
+
+    for t, dump in enumerate(booster.get_dump(dump_format='json')):
+        table.add_tree(build(json.loads(dump)), member, t % n_outputs)
+    return n_outputs, bias, (SOFTMAX if n_outputs > 1 else SIGMOID)
+
+
+def _compile_lightgbm(estimator, table: _TreeTable, member: int):
+    model = estimator.booster_.dump_model()
+    n_outputs = int(model['num_tree_per_iteration'])
+    objective = model['objective'].split()
+    scale = 1.0
+    if objective[0] == 'binary':
+        scale = next((float(p.split(':')[1]) for p in objective[1:] if p.startswith('sigmoid:')), 1.0)
+    elif objective[0] not in ('multiclass', 'softmax'):
+        raise ValueError(f"Unsupported LightGBM objective: {model['objective']}")
+
+    def build(node) -> int:
+        if 'leaf_value' in node:
+            return table.node(value=scale * float(node['leaf_value']))
+        if node['decision_type'] != '<=':
+            raise ValueError(f"Unsupported LightGBM split: {node['decision_type']}")
+        threshold = float(node['threshold'])
+        # missing_type 'None': NaN is scored as 0.0, so it goes where 0.0 goes
+        default_left = node['default_left'] if node['missing_type'] != 'None' else 0.0 <= threshold
+        idx = table.node(feature=int(node['split_feature']), threshold=float(np.nextafter(threshold, np.inf)),
+                         default_left=bool(default_left))
+        table.link(idx, build(node['left_child']), build(node['right_child']))
+        return idx
+
+    for t, tree in enumerate(model['tree_info']):
+        table.add_tree(build(tree['tree_structure']), member, t % n_outputs)
+    return n_outputs, np.zeros(n_outputs), (SOFTMAX if n_outputs > 1 else SIGMOID)
+
+
+def _compile_catboost(estimator, table: _TreeTable, member: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.json')
+        estimator.save_model(path, format='json')
+        with open(path) as f:
+            model = json.load(f)
+
+    float_features = model['features_info'].get('float_features', [])
+    if len(float_features) == 0 or set(model['features_info']) - {'float_features'}:
+        raise ValueError("Only CatBoost models on float features can be compiled")
+    flat_index = {f['feature_index']: f['flat_feature_index'] for f in float_features}
+    nan_left = {f['feature_index']: f.get('nan_value_treatment') != 'AsTrue' for f in float_features}
+
+    scale, bias = model['scale_and_bias']
+    bias = np.atleast_1d(np.asarray(bias, dtype=np.float64))
+    n_outputs = len(bias)
+
+    for tree in model['oblivious_trees']:
+        splits = tree['splits']
+        depth = len(splits)
+        values = np.asarray(tree['leaf_values'], dtype=np.float64).reshape(1 << depth, n_outputs)
+
+        def build(level: int, leaf: int, output: int) -> int:
+            # Leaf index bit `level` is set when the feature is above that level's border
+            if level == depth:
+                return table.node(value=scale * values[leaf, output])
+            split = splits[level]
+            if split.get('split_type', 'FloatFeature') != 'FloatFeature':
+                raise ValueError(f"Unsupported CatBoost split: {split['split_type']}")
+            feature = split['float_feature_index']
+            idx = table.node(feature=flat_index[feature], threshold=_next_up32(split['border']),
+                             default_left=nan_left[feature], float32=True)
+            table.link(idx, build(level + 1, leaf, output), build(level + 1, leaf | (1 << level), output))
+            return idx
+
+        for output in range(n_outputs):
+            table.add_tree(build(0, 0, output), member, output)
+
+    return n_outputs, scale * bias, (SOFTMAX if n_outputs > 1 else SIGMOID)
+
+
+def _compile_booster(estimator, table: _TreeTable, member: int, feature_names: List[str]):
+    kind = type(estimator).__name__
+    if kind == 'XGBClassifier':
+        return _compile_xgboost(estimator, table, member, feature_names)
+    if kind == 'LGBMClassifier':
+        return _compile_lightgbm(estimator, table, member)
+    if kind == 'CatBoostClassifier':
+        return _compile_catboost(estimator, table, member)
+    raise ValueError(f"Unsupported estimator for compilation: {kind}")
+
+
+def compile_model(model, scaler, feature_names: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Flatten a trained MLModel pipeline into arrays
+
+    Args:
+        model: Fitted CalibratedClassifierCV (sigmoid) over a soft VotingClassifier,
+               a soft VotingClassifier, or a single XGBoost/LightGBM/CatBoost classifier
+        scaler: Fitted StandardScaler applied before the model
+        feature_names: Feature order the model was trained on
+
+    Returns:
+        Dict of arrays for save_compiled_model() / CompiledModel
+
+    Raises:
+        ValueError: If the pipeline contains something that cannot be compiled
+    """
+    n_features = len(feature_names)
+    table = _TreeTable(n_features)
+    classes = np.asarray(model.classes_)
+
+    calibrated = type(model).__name__ == 'CalibratedClassifierCV'
+    if calibrated:
+        if model.method != 'sigmoid':
+            raise ValueError(f"Unsupported calibration method: {model.method}")
+        folds = [(c.estimator, c.calibrators) for c in model.calibrated_classifiers_]
+    else:
+        folds = [(model, [])]
+
+    member_fold, member_weight, member_link, member_bias = [], [], [], []
+    calib_fold, calib_column, calib_class, calib_a, calib_b = [], [], [], [], []
+    fold_width = []
+
+    for f, (estimator, calibrators) in enumerate(folds):
+        if type(estimator).__name__ == 'VotingClassifier':
+            if estimator.voting != 'soft':
+                raise ValueError("Only soft-voting ensembles can be compiled")
+            members = estimator.estimators_
+            weights = np.ones(len(members)) if estimator.weights is None else np.asarray(estimator.weights, dtype=float)
+        else:
+            members, weights = [estimator], np.ones(1)
+        weights = weights / weights.sum()
+
+        widths = set()
+        for booster, weight in zip(members, weights):
+            m = len(member_fold)
+            n_outputs, bias, link = _compile_booster(booster, table, m, feature_names)
+            widths.add(2 if n_outputs == 1 else n_outputs)
+            member_fold.append(f)
+            member_weight.append(weight)
+            member_link.append(link)
+            member_bias.append(np.asarray(bias, dtype=np.float64))
+        if len(widths) != 1:
+            raise ValueError("Ensemble members disagree on the number of classes")
+        fold_width.append(widths.pop())
+
+        # Calibrator k maps column k of the fold's probabilities to its class
+        # (binary: one calibrator for the positive column)
+        positions = np.searchsorted(classes, np.asarray(estimator.classes_))
+        binary = len(classes) == 2
+        for k, calibrator in enumerate(calibrators):
+            calib_fold.append(f)
+            calib_column.append(1 if binary else k)
+            calib_class.append(1 if binary else int(positions[k]))
+            calib_a.append(float(calibrator.a_))
+            calib_b.append(float(calibrator.b_))
+
+    max_outputs = max(len(b) for b in member_bias)
+    bias = np.zeros((len(member_bias), max_outputs))
+    for m, b in enumerate(member_bias):
+        bias[m, :len(b)] = b
+
+    arrays = table.arrays()
+    arrays.update({
+        'meta': np.asarray(json.dumps({'format_version': FORMAT_VERSION, 'calibrated': calibrated})),
+        'feature_names': np.asarray(feature_names),
+        'classes': classes,
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else np.zeros(n_features),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else np.ones(n_features),
+        'fold_width': np.asarray(fold_width, dtype=np.int32),
+        'member_fold': np.asarray(member_fold, dtype=np.int32),
+        'member_weight': np.asarray(member_weight, dtype=np.float64),
+        'member_link': np.asarray(member_link, dtype=np.int8),
+        'member_bias': bias,
+        'calib_fold': np.asarray(calib_fold, dtype=np.int32),
+        'calib_column': np.asarray(calib_column, dtype=np.int32),
+        'calib_class': np.asarray(calib_class, dtype=np.int32),
+        'calib_a': np.asarray(calib_a, dtype=np.float64),
+        'calib_b': np.asarray(calib_b, dtype=np.float64),
+    })
+    return arrays
+
+
+class ArrayScaler:
+    """
+    NumPy-only stand-in for a fitted StandardScaler
+
+    Holds the mean_/scale_ that compile_model() and MLModel._scale() read, so
+    the compiled serving path and an untrained MLModel never import sklearn.
+    Like a StandardScaler with set_output('pandas'), it returns a DataFrame
+    for a DataFrame input.
+    """
+
+    with_mean = True
+    with_std = True
+
+    def __init__(self, mean: np.ndarray = None, scale: np.ndarray = None):
+        self.mean_ = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale_ = None if scale is None else np.asarray(scale, dtype=np.float64)
+
+    def fit(self, X, y=None) -> 'ArrayScaler':
+        values = np.asarray(X, dtype=np.float64)
+        self.mean_ = values.mean(axis=0)
+        scale = values.std(axis=0)
+        # Constant columns are left unscaled, as StandardScaler does
+        self.scale_ = np.where(scale < 10 * np.finfo(np.float64).eps, 1.0, scale)
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X):
+        if self.mean_ is None:
+            raise ValueError("ArrayScaler is not fitted yet")
+        scaled = (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+        if hasattr(X, 'columns'):
+            import pandas as pd
+            return pd.DataFrame(scaled, columns=X.columns, index=X.index)
+        return scaled
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+
+def save_compiled_model(arrays: Dict[str, np.ndarray], path: str):
+    """Write compiled arrays atomically to `path` (.npz)"""
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+class CompiledModel:
+    """
+    NumPy-only scorer for a compiled ensemble
+
+    predict_proba() takes unscaled feature rows, like MLModel's pipeline.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        meta = json.loads(str(arrays['meta']))
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model version: {meta.get('format_version')}")
+        self.calibrated = meta['calibrated']
+        self.feature_names = [str(name) for name in arrays['feature_names']]
+        self.classes_ = arrays['classes']
+        # Scaling folded into predict_proba(), as a scaler object for callers that need one
+        self.scaler = ArrayScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+        # Identifies the pickled model the arrays were exported from (set by MLModel)
+        self.source = str(arrays['source']) if 'source' in arrays else None
+        for name, array in arrays.items():
+            if name not in ('meta', 'feature_names', 'classes', 'source'):
+                setattr(self, name, array)
+
+        # Walk steps needed to reach the deepest leaf (one level of all trees at a time)
+        self.max_depth = 0
+        frontier = self.tree_root
+        while True:
+            frontier = frontier[self.node_children[frontier, 0] != frontier]
+            if len(frontier) == 0:
+                break
+            frontier = self.node_children[frontier].ravel()
+            self.max_depth += 1
+
+        # Tree -> (member, output) column map, so leaf values are summed in one matrix product
+        max_outputs = self.member_bias.shape[1]
+        self._tree_columns = np.zeros((len(self.tree_root), len(self.member_fold) * max_outputs))
+        self._tree_columns[np.arange(len(self.tree_root)), self.tree_member * max_outputs + self.tree_output] = 1.0
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledModel':
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def _tree_outputs(self, X: np.ndarray) -> np.ndarray:
+        """Raw scores: (n_samples, n_members, max_outputs)"""
+        n = len(X)
+        # Float64 features plus their float32-rounded copies for float32 splits, flattened
+        # so each level is one gather (row offset + feature column)
+        features = np.hstack([X, X.astype(np.float32).astype(np.float64)])
+        row_offset = (np.arange(n) * features.shape[1])[:, None]
+        features = features.ravel()
+        has_nan = np.isnan(X).any()
+        children = self.node_children.ravel()
+
+        node = np.broadcast_to(self.tree_root, (n, len(self.tree_root)))
+        for _ in range(self.max_depth):
+            x = features[row_offset + self.node_feature[node]]
+            go_right = x >= self.node_threshold[node]
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.node_default_left[node]
+            node = children[2 * node + go_right]
+
+        raw = self.node_value[node] @ self._tree_columns
+        return raw.reshape(n, *self.member_bias.shape) + self.member_bias
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for unscaled feature rows
+
+        Args:
+            features: (n_samples, n_features) array
+
+        Returns:
+            (n_samples, n_classes) array, columns in classes_ order
+        """
+        X = (np.atleast_2d(np.asarray(features, dtype=np.float64)) - self.scaler_mean) / self.scaler_scale
+        raw = self._tree_outputs(X)
+        n, n_classes = len(X), len(self.classes_)
+
+        mean_proba = np.zeros((n, n_classes))
+        for f, width in enumerate(self.fold_width):
+            fold_proba = np.zeros((n, width))
+            for m in np.flatnonzero(self.member_fold == f):
+                if self.member_link[m] == SOFTMAX:
+                    proba = _softmax(raw[:, m, :width])
+                else:
+                    p = _sigmoid(raw[:, m, 0])
+                    proba = np.column_stack([1.0 - p, p])
+                fold_proba += self.member_weight[m] * proba
+
+            if not self.calibrated:
+                mean_proba += fold_proba
+                continue
+
+            proba = np.zeros((n, n_classes))
+            for c in np.flatnonzero(self.calib_fold == f):
+                proba[:, self.calib_class[c]] = _sigmoid(
+                    -(self.calib_a[c] * fold_proba[:, self.calib_column[c]] + self.calib_b[c]))
+            if n_classes == 2:
+                proba[:, 0] = 1.0 - proba[:, 1]
+            else:
+                denominator = proba.sum(axis=1, keepdims=True)
+                proba = np.divide(proba, denominator, out=np.full_like(proba, 1.0 / n_classes),
+                                  where=denominator != 0)
+            mean_proba += proba
+
+        mean_proba /= len(self.fold_width)
+        mean_proba[(1.0 < mean_proba) & (mean_proba <= 1.0 + 1e-5)] = 1.0
+        return mean_proba
@@ -61,6 +61,34 @@ class Config:
 
     # WebSocket Configuration
     ENABLE_WEBSOCKET = os.getenv('ENABLE_WEBSOCKET', 'true').lower() in ('true', '1', 'yes')
+    ENABLE_LOCAL_ORDER_BOOK = os.getenv('ENABLE_LOCAL_ORDER_BOOK', 'true').lower() in ('true', '1', 'yes')  # Serve get_order_book from WebSocket L2 books
+
+    # Market Data Recorder Configuration
+    ENABLE_MARKET_RECORDER = os.getenv('ENABLE_MARKET_RECORDER', 'false').lower() in ('true', '1', 'yes')  # Tee WebSocket ticker/candle/level2 messages to disk
+    MARKET_RECORDER_PATH = os.getenv('MARKET_RECORDER_PATH', 'data/recordings')
+    MARKET_RECORDER_ROWS_PER_FILE = int(os.getenv('MARKET_RECORDER_ROWS_PER_FILE', '50000'))  # Rows buffered per (stream, date, symbol) before a file is written
+    MARKET_RECORDER_FLUSH_INTERVAL = float(os.getenv('MARKET_RECORDER_FLUSH_INTERVAL', '60'))  # Max seconds a buffered row waits before it is written
+
+    # Local Candle Store Configuration
+    ENABLE_CANDLE_STORE = os.getenv('ENABLE_CANDLE_STORE', 'true').lower() in ('true', '1', 'yes')  # Persist REST candles locally and only fetch newer ones
+    CANDLE_STORE_PATH = os.getenv('CANDLE_STORE_PATH', 'data/candles.db')
+    CANDLE_STORE_MAX_CANDLES = int(os.getenv('CANDLE_STORE_MAX_CANDLES', '1000'))  # History kept per (symbol, timeframe)
+
+    # REST Rate Limiter Configuration (KuCoin resource pools, weight per window)
+    ENABLE_RATE_LIMITER = os.getenv('ENABLE_RATE_LIMITER', 'true').lower() in ('true', '1', 'yes')  # Proactive token buckets instead of ccxt pacing + reactive 429 sleeps
+    RATE_LIMIT_PUBLIC_WEIGHT = float(os.getenv('RATE_LIMIT_PUBLIC_WEIGHT', '2000'))  # Public (market data) pool quota
+    RATE_LIMIT_PRIVATE_WEIGHT = float(os.getenv('RATE_LIMIT_PRIVATE_WEIGHT', '2000'))  # Futures private pool quota (VIP0)
+    RATE_LIMIT_WINDOW = float(os.getenv('RATE_LIMIT_WINDOW', '30'))  # Quota window in seconds
+    RATE_LIMIT_CRITICAL_RESERVE = float(os.getenv('RATE_LIMIT_CRITICAL_RESERVE', '0.2'))  # Share of each pool only CRITICAL calls may use
+
+    # Request Coalescing Configuration
+    ENABLE_REQUEST_COALESCING = os.getenv('ENABLE_REQUEST_COALESCING', 'true').lower() in ('true', '1', 'yes')  # Share in-flight identical REST requests
+    TICKER_CACHE_TTL = float(os.getenv('TICKER_CACHE_TTL', '1.0'))  # Freshness budget (s) for REST tickers (CRITICAL calls always fetch)
+    TICKER_SNAPSHOT_TTL = float(os.getenv('TICKER_SNAPSHOT_TTL', '1.0'))  # Max age (s) of the bulk ticker snapshot before a refresh
+
+    # Async Client Configuration
+    ASYNC_CLIENT_MAX_CONCURRENCY = int(os.getenv('ASYNC_CLIENT_MAX_CONCURRENCY', '50'))  # Non-critical API calls in flight at once on AsyncKuCoinClient
+    ASYNC_CLIENT_MAX_CONNECTIONS = int(os.getenv('ASYNC_CLIENT_MAX_CONNECTIONS', '100'))  # Pooled HTTP connections in the shared aiohttp session
 
     # Dashboard Configuration
     ENABLE_DASHBOARD = os.getenv('ENABLE_DASHBOARD', 'true').lower() in ('true', '1', 'yes')
@@ -83,11 +111,16 @@ class Config:
     CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '10'))  # 10s = continuous scanning for faster opportunity detection (was 60s)
     POSITION_UPDATE_INTERVAL = int(float(os.getenv('POSITION_UPDATE_INTERVAL', '3.0')))  # 3s (reduced from 5s, 40% faster trailing stops, responsive without rate limiting)
     LIVE_LOOP_INTERVAL = float(os.getenv('LIVE_LOOP_INTERVAL', '0.1'))  # 100ms = truly live monitoring, fast response to market changes
+    FAST_STARTUP = os.getenv('FAST_STARTUP', 'true').lower() in ('true', '1', 'yes')  # Restore and monitor positions first, build scanner/ML/dashboard in the background
+    STARTUP_RETRY_INTERVAL = float(os.getenv('STARTUP_RETRY_INTERVAL', '30'))  # 30s between retries of a failed background startup (positions stay monitored, no new entries)
     TRAILING_STOP_PERCENTAGE = float(os.getenv('TRAILING_STOP_PERCENTAGE', '0.02'))  # 2% trailing stop = industry standard, balances protection vs noise
     MAX_OPEN_POSITIONS = int(os.getenv('MAX_OPEN_POSITIONS', '3'))  # 3 positions = balanced diversification without overextension
     MAX_WORKERS = int(os.getenv('MAX_WORKERS', '20'))  # 20 workers = fast parallel scanning while staying under API rate limits
     CACHE_DURATION = int(os.getenv('CACHE_DURATION', '300'))  # 5 min cache for scanning (live data always used for trading)
     STALE_DATA_MULTIPLIER = int(os.getenv('STALE_DATA_MULTIPLIER', '2'))  # 2x CHECK_INTERVAL = reasonable tolerance for opportunity data
+    SCANNER_EXECUTION_MODE = os.getenv('SCANNER_EXECUTION_MODE', 'thread').lower()  # 'thread' = scan_pair per worker, 'batch' = threaded fetch + one vectorized indicator pass, 'process' = threaded fetch + process-pool evaluation, 'async' = coroutine fetch on AsyncKuCoinClient + vectorized indicator pass
+    SCANNER_PROCESS_WORKERS = int(os.getenv('SCANNER_PROCESS_WORKERS', '0'))  # Worker processes for 'process' mode (0 = one per CPU)
+    ENABLE_INCREMENTAL_INDICATORS = os.getenv('ENABLE_INCREMENTAL_INDICATORS', 'true').lower() in ('true', '1', 'yes')  # O(1) indicator updates per (symbol, timeframe) while scanning
 
     # DCA Strategy Configuration
     ENABLE_DCA = os.getenv('ENABLE_DCA', 'true').lower() in ('true', '1', 'yes')
@@ -114,6 +147,9 @@ class Config:
     # Machine Learning
     RETRAIN_INTERVAL = int(os.getenv('RETRAIN_INTERVAL', '86400'))
     ML_MODEL_PATH = os.getenv('ML_MODEL_PATH', 'models/signal_model.pkl')
+    ENABLE_COMPILED_MODEL = os.getenv('ENABLE_COMPILED_MODEL', 'true').lower() in ('true', '1', 'yes')  # Score with the NumPy-only export of the ensemble
+    ENABLE_ML_SCAN_RANKING = os.getenv('ENABLE_ML_SCAN_RANKING', 'false').lower() in ('true', '1', 'yes')  # Let confident ML predictions rescale scan scores (off: ml_signal/ml_confidence are annotations only)
+    ENABLE_DEEP_LEARNING = os.getenv('ENABLE_DEEP_LEARNING', 'true').lower() in ('true', '1', 'yes')  # Build the TensorFlow signal predictor (imported on first use)
 
     @classmethod
     def auto_configure_from_balance(cls, available_balance: float):
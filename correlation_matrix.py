@@ -1,11 +1,15 @@
 """
 Real-time correlation matrix for multi-asset risk management
+
+Prices feed a RollingCorrelationEngine, so the full matrix is one vectorized
+step over running sums rather than a corrcoef per ordered pair.
 """
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from logger import Logger
+from rolling_correlation import RollingCorrelationEngine
 
 class CorrelationMatrix:
     """Track real-time correlations between trading pairs"""
@@ -19,8 +23,8 @@ class CorrelationMatrix:
         """
         self.logger = Logger.get_logger()
         self.lookback_periods = lookback_periods
-        self.price_history = {}  # symbol -> list of prices
-        self.correlation_cache = {}
+        # lookback_periods prices -> lookback_periods - 1 returns; 20 prices minimum
+        self.engine = RollingCorrelationEngine(window=max(1, lookback_periods - 1), min_periods=19)
         self.last_update = {}
 
     def update_price(self, symbol: str, price: float, timestamp: datetime = None):
@@ -35,18 +39,7 @@ class CorrelationMatrix:
         if timestamp is None:
             timestamp = datetime.now()
 
-        if symbol not in self.price_history:
-            self.price_history[symbol] = []
-
-        self.price_history[symbol].append({
-            'timestamp': timestamp,
-            'price': price
-        })
-
-        # Keep only recent history
-        if len(self.price_history[symbol]) > self.lookback_periods:
-            self.price_history[symbol] = self.price_history[symbol][-self.lookback_periods:]
-
+        self.engine.update_price(symbol, price)
         self.last_update[symbol] = timestamp
 
     def calculate_correlation(self, symbol1: str, symbol2: str) -> Optional[float]:
@@ -60,30 +53,7 @@ class CorrelationMatrix:
         Returns:
             Correlation coefficient (-1 to 1) or None if insufficient data
         """
-        if symbol1 not in self.price_history or symbol2 not in self.price_history:
-            return None
-
-        prices1 = [p['price'] for p in self.price_history[symbol1]]
-        prices2 = [p['price'] for p in self.price_history[symbol2]]
-
-        # Need matching lengths
-        min_len = min(len(prices1), len(prices2))
-        if min_len < 20:  # Need minimum data
-            return None
-
-        prices1 = prices1[-min_len:]
-        prices2 = prices2[-min_len:]
-
-        # Calculate returns
-        returns1 = np.diff(prices1) / prices1[:-1]
-        returns2 = np.diff(prices2) / prices2[:-1]
-
-        # Calculate correlation
-        if len(returns1) > 0 and len(returns2) > 0:
-            correlation = np.corrcoef(returns1, returns2)[0, 1]
-            return correlation
-
-        return None
+        return self.engine.correlation(symbol1, symbol2)
 
     def get_correlation_matrix(self, symbols: List[str]) -> pd.DataFrame:
         """
@@ -95,15 +65,8 @@ class CorrelationMatrix:
         Returns:
             DataFrame with correlation matrix
         """
-        n = len(symbols)
-        matrix = np.ones((n, n))
-
-        for i, sym1 in enumerate(symbols):
-            for j, sym2 in enumerate(symbols):
-                if i != j:
-                    corr = self.calculate_correlation(sym1, sym2)
-                    if corr is not None:
-                        matrix[i, j] = corr
+        # Pairs without enough data show 1.0, as before
+        matrix = np.nan_to_num(self.engine.correlation_matrix(symbols), nan=1.0)
 
         df = pd.DataFrame(matrix, index=symbols, columns=symbols)
         return df
@@ -120,13 +83,12 @@ class CorrelationMatrix:
         Returns:
             List of (symbol1, symbol2, correlation) tuples
         """
-        uncorrelated = []
-
-        for i, sym1 in enumerate(symbols):
-            for j, sym2 in enumerate(symbols[i+1:], i+1):
-                corr = self.calculate_correlation(sym1, sym2)
-                if corr is not None and abs(corr) < threshold:
-                    uncorrelated.append((sym1, sym2, corr))
+        matrix = self.engine.correlation_matrix(symbols)
+        rows, cols = np.triu_indices(len(symbols), k=1)
+        values = matrix[rows, cols]
+        keep = ~np.isnan(values) & (np.abs(values) < threshold)
+        uncorrelated = [(symbols[i], symbols[j], float(corr))
+                        for i, j, corr in zip(rows[keep], cols[keep], values[keep])]
 
         return sorted(uncorrelated, key=lambda x: abs(x[2]))
 
@@ -144,15 +106,12 @@ class CorrelationMatrix:
         if len(symbols) < 2:
             return 0.0
 
-        correlations = []
-        for i, sym1 in enumerate(symbols):
-            for sym2 in symbols[i+1:]:
-                corr = self.calculate_correlation(sym1, sym2)
-                if corr is not None:
-                    correlations.append(abs(corr))
+        matrix = self.engine.correlation_matrix(symbols)
+        correlations = np.abs(matrix[np.triu_indices(len(symbols), k=1)])
+        correlations = correlations[~np.isnan(correlations)]
 
-        if correlations:
-            return np.mean(correlations)
+        if len(correlations):
+            return float(np.mean(correlations))
         return 0.0
 
     def get_diversification_score(self, positions: Dict[str, float]) -> float:
@@ -258,16 +217,14 @@ class CorrelationMatrix:
             return {symbols[0]: 1.0}
 
         # Calculate average correlation for each symbol
-        avg_correlations = {}
-        for sym in symbols:
-            corrs = []
-            for other in symbols:
-                if sym != other:
-                    corr = self.calculate_correlation(sym, other)
-                    if corr is not None:
-                        corrs.append(abs(corr))
-
-            avg_correlations[sym] = np.mean(corrs) if corrs else 0.5
+        matrix = np.abs(self.engine.correlation_matrix(symbols))
+        np.fill_diagonal(matrix, np.nan)
+        counts = np.sum(~np.isnan(matrix), axis=1)
+        sums = np.nansum(matrix, axis=1)
+        avg_correlations = {
+            sym: sums[i] / counts[i] if counts[i] else 0.5
+            for i, sym in enumerate(symbols)
+        }
 
         # Weight inversely to correlation (less correlated = higher weight)
         inverse_corrs = {sym: 1.0 - corr for sym, corr in avg_correlations.items()}
@@ -307,12 +264,13 @@ class CorrelationMatrix:
         report += "\n"
 
         # Find highly correlated pairs
+        pairs = self.engine.correlation_matrix(symbols)
         high_corr = []
         for i, sym1 in enumerate(symbols):
-            for sym2 in symbols[i+1:]:
-                corr = self.calculate_correlation(sym1, sym2)
-                if corr is not None and abs(corr) > 0.7:
-                    high_corr.append((sym1, sym2, corr))
+            for j in range(i + 1, len(symbols)):
+                corr = pairs[i, j]
+                if not np.isnan(corr) and abs(corr) > 0.7:
+                    high_corr.append((sym1, symbols[j], float(corr)))
 
         if high_corr:
             report += "\n⚠️  High Correlations (>0.7):\n"
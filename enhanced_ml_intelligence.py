@@ -10,17 +10,13 @@ from collections import deque
 import joblib
 import os
 
-try:
-    import tensorflow as tf
-    from tensorflow import keras
-    from tensorflow.keras import layers, models, optimizers
-    from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-
+from lazy_components import module_available
 from logger import Logger
 
+# TensorFlow takes seconds to import: DeepLearningSignalPredictor imports it when
+# constructed, so the lightweight classes below do not pay for it
+TENSORFLOW_AVAILABLE = module_available('tensorflow')
+
 
 class DeepLearningSignalPredictor:
     """
@@ -36,11 +32,19 @@ class DeepLearningSignalPredictor:
         self.scaler = None
         self.feature_buffer = deque(maxlen=sequence_length)
         self.model_path = 'models/deep_signal_model.keras'
+        self._keras = None
 
         if not TENSORFLOW_AVAILABLE:
             self.logger.warning("TensorFlow not available, DeepLearningSignalPredictor disabled")
             return
 
+        try:
+            from tensorflow import keras
+        except ImportError as e:
+            self.logger.warning(f"TensorFlow import failed ({e}), DeepLearningSignalPredictor disabled")
+            return
+        self._keras = keras
+
         # Create models directory
         os.makedirs('models', exist_ok=True)
 
@@ -57,8 +61,9 @@ class DeepLearningSignalPredictor:
 
     def _build_model(self):
         """Build advanced LSTM + Dense neural network"""
-        if not TENSORFLOW_AVAILABLE:
+        if self._keras is None:
             return
+        layers, models, optimizers = self._keras.layers, self._keras.models, self._keras.optimizers
 
         try:
             # Input: sequence of features over time
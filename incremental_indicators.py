@@ -0,0 +1,436 @@
+"""
+Incremental technical indicator engine
+
+Keeps running sums and EMA states per (symbol, timeframe) so that a new or
+revised candle is folded in with O(1) work instead of recomputing every
+indicator column from scratch like Indicators.calculate_all does.
+
+Features:
+- Same columns (and values, within float tolerance) as Indicators.calculate_all
+- O(1) update per new candle, in-place revision of the still-forming candle
+- Compact preallocated NumPy buffers, contiguous views for DataFrame output
+- EMA/MACD/ATR re-seeded in place when a REST window slides forward
+- Automatic rebuild when the incoming history does not line up with the state
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import Indicators, OUTPUT_COLUMNS, MIN_CANDLES
+from logger import Logger
+
+# Per-candle intermediates needed to slide windows forward
+_HIDDEN_COLUMNS = ['_gain', '_loss', '_tpv', '_stoch_raw', '_tr']
+_ALL_COLUMNS = OUTPUT_COLUMNS + _HIDDEN_COLUMNS
+_COL = {name: i for i, name in enumerate(_ALL_COLUMNS)}
+
+_LONGEST_WINDOW = 50
+
+# Layout of the scalar state vector
+(_S_EMA12, _S_EMA26, _S_MACD_SIG, _S_ATR, _S_TR_SEED,
+ _S_SUM_C20, _S_NZ_C20, _S_SUM_C50, _S_NZ_C50,
+ _S_SUM_V20, _S_NZ_V20, _S_SUM_V50, _S_NZ_V50,
+ _S_SUM_TPV50, _S_NZ_TPV50, _S_SUM_GAIN, _S_NZ_GAIN, _S_SUM_LOSS, _S_NZ_LOSS) = range(19)
+_STATE_SIZE = 19
+
+_NAN = float('nan')
+
+
+def _div(a: float, b: float) -> float:
+    """Divide with NumPy float semantics (x/0 -> +/-inf, 0/0 -> nan)"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return _NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _ema(prev: float, value: float, alpha: float) -> float:
+    """One step of pandas ewm(adjust=False)"""
+    return ((1.0 - alpha) * prev + alpha * value) / ((1.0 - alpha) + alpha)
+
+
+def _slide(total: float, nonzero: float, added: float, removed: Optional[float]) -> Tuple[float, float]:
+    """
+    Slide a running window sum by one value.
+
+    A count of non-zero members is tracked alongside the sum so an all-zero
+    window reports exactly 0.0 instead of accumulated rounding residue.
+    """
+    total += added
+    nonzero += added != 0
+    if removed is not None:
+        total -= removed
+        nonzero -= removed != 0
+    if nonzero == 0:
+        total = 0.0
+    return total, nonzero
+
+
+class IndicatorStream:
+    """
+    Indicator state for a single (symbol, timeframe) candle stream.
+
+    The last candle is treated as still forming: it is evaluated from the
+    committed state but only committed once a newer candle arrives, so it can
+    be revised any number of times at O(1) cost.
+    """
+
+    _ALPHA_12 = 2.0 / (12 + 1)
+    _ALPHA_26 = 2.0 / (26 + 1)
+    _ALPHA_9 = 2.0 / (9 + 1)
+
+    def __init__(self, capacity: int = 200):
+        """
+        Initialize an empty stream.
+
+        Args:
+            capacity: Number of most recent candles kept for output
+        """
+        self.capacity = max(int(capacity), _LONGEST_WINDOW + 14)
+        # Every row is written twice (slot and slot + capacity) so the most
+        # recent `capacity` rows are always available as one contiguous view
+        self._buf = np.full((2 * self.capacity, len(_ALL_COLUMNS)), np.nan)
+        self._state = np.zeros(_STATE_SIZE)
+        self._pending_state: Optional[np.ndarray] = None
+        self._committed = 0  # Candles folded into self._state
+        self._origin = 0  # Row the recursive indicators are seeded at
+        self.lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Number of candles seen, including the forming one"""
+        return self._committed + (1 if self._pending_state is not None else 0)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp (ms) of the most recent candle, or None if empty"""
+        if self.size == 0:
+            return None
+        return float(self._row(self.size - 1)[_COL['timestamp']])
+
+    @property
+    def origin(self) -> int:
+        """Row the EMA/MACD/ATR recursions currently start from"""
+        return self._origin
+
+    def _row(self, index: int) -> np.ndarray:
+        return self._buf[index % self.capacity + self.capacity]
+
+    def _value(self, index: int, column: str) -> float:
+        return float(self._buf[index % self.capacity + self.capacity, _COL[column]])
+
+    def _window(self, end: int, length: int, column: str) -> np.ndarray:
+        """Contiguous view of `length` committed values ending before `end`"""
+        stop = end % self.capacity + self.capacity
+        return self._buf[stop - length:stop, _COL[column]]
+
+    def update(self, candle) -> None:
+        """
+        Fold a candle into the stream.
+
+        A candle with the same timestamp as the forming candle revises it;
+        a newer timestamp commits the forming candle and starts a new one.
+
+        Args:
+            candle: [timestamp, open, high, low, close, volume]
+        """
+        timestamp = float(candle[0])
+        if self._pending_state is not None:
+            if timestamp == self.last_timestamp:
+                self._evaluate(self._committed, candle)
+                return
+            if timestamp < self.last_timestamp:
+                raise ValueError(f"Candle at {timestamp} is older than stream head {self.last_timestamp}")
+            self._state = self._pending_state
+            self._committed += 1
+        self._evaluate(self._committed, candle)
+
+    def _evaluate(self, i: int, candle) -> None:
+        """Compute row `i` from the committed state and stage the resulting state"""
+        ts, o, h, l, c, v = (float(x) for x in candle[:6])
+        s = self._state.tolist()
+        prev_close = self._value(i - 1, 'close') if i > 0 else _NAN
+
+        def removed(lag: int, column: str) -> Optional[float]:
+            return self._value(i - lag, column) if i >= lag else None
+
+        # Moving averages
+        s[_S_SUM_C20], s[_S_NZ_C20] = _slide(s[_S_SUM_C20], s[_S_NZ_C20], c, removed(20, 'close'))
+        s[_S_SUM_C50], s[_S_NZ_C50] = _slide(s[_S_SUM_C50], s[_S_NZ_C50], c, removed(50, 'close'))
+        sma_20 = s[_S_SUM_C20] / 20 if i >= 19 else _NAN
+        sma_50 = s[_S_SUM_C50] / 50 if i >= 49 else _NAN
+
+        # EMA / MACD
+        if i == 0:
+            s[_S_EMA12] = s[_S_EMA26] = c
+        else:
+            s[_S_EMA12] = _ema(s[_S_EMA12], c, self._ALPHA_12)
+            s[_S_EMA26] = _ema(s[_S_EMA26], c, self._ALPHA_26)
+        macd = s[_S_EMA12] - s[_S_EMA26]
+        s[_S_MACD_SIG] = macd if i == 0 else _ema(s[_S_MACD_SIG], macd, self._ALPHA_9)
+
+        # RSI (simple 14-period averages of gains and losses)
+        delta = c - prev_close if i > 0 else 0.0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        s[_S_SUM_GAIN], s[_S_NZ_GAIN] = _slide(s[_S_SUM_GAIN], s[_S_NZ_GAIN], gain, removed(14, '_gain'))
+        s[_S_SUM_LOSS], s[_S_NZ_LOSS] = _slide(s[_S_SUM_LOSS], s[_S_NZ_LOSS], loss, removed(14, '_loss'))
+        rsi = 50.0
+        if i >= 13 and s[_S_SUM_LOSS] != 0:
+            rsi = 100 - (100 / (1 + (s[_S_SUM_GAIN] / 14) / (s[_S_SUM_LOSS] / 14)))
+
+        # Stochastic oscillator (14, 3)
+        stoch_raw = _NAN
+        stoch_d = _NAN
+        if i >= 13:
+            lowest = min(l, float(self._window(i, 13, 'low').min()))
+            highest = max(h, float(self._window(i, 13, 'high').max()))
+            stoch_raw = 100 * _div(c - lowest, highest - lowest)
+            if i >= 15:
+                stoch_d = (float(self._window(i, 2, '_stoch_raw').sum()) + stoch_raw) / 3
+        stoch_k = 50.0 if math.isnan(stoch_raw) else stoch_raw
+        stoch_d = 50.0 if math.isnan(stoch_d) else stoch_d
+
+        # Bollinger Bands
+        bb_high = bb_low = _NAN
+        bb_width = 0.03
+        if i >= 19:
+            window = np.append(self._window(i, 19, 'close'), c)
+            bb_std = float(np.sqrt(((window - sma_20) ** 2).sum() / 19))
+            bb_high = sma_20 + bb_std * 2
+            bb_low = sma_20 - bb_std * 2
+            width = _div(bb_high - bb_low, sma_20) if sma_20 != 0 else _NAN
+            if not (math.isnan(width) or math.isinf(width)):
+                bb_width = width
+
+        # ATR (Wilder smoothing, zeros during warm-up like ta's AverageTrueRange)
+        true_range = h - l
+        if i > 0:
+            true_range = max(true_range, abs(h - prev_close), abs(l - prev_close))
+        atr = 0.0
+        if i < 13:
+            s[_S_TR_SEED] += true_range
+        elif i == 13:
+            atr = (s[_S_TR_SEED] + true_range) / 14
+        else:
+            atr = (s[_S_ATR] * 13 + true_range) / 14
+        s[_S_ATR] = atr
+
+        # Volume
+        s[_S_SUM_V20], s[_S_NZ_V20] = _slide(s[_S_SUM_V20], s[_S_NZ_V20], v, removed(20, 'volume'))
+        volume_sma = s[_S_SUM_V20] / min(i + 1, 20)
+        volume_ratio = _div(v, volume_sma) if volume_sma != 0 else _NAN
+        if math.isnan(volume_ratio):
+            volume_ratio = 1.0
+
+        # Momentum
+        momentum = _div(c, self._value(i - 10, 'close')) - 1 if i >= 10 else _NAN
+
+        # VWAP (rolling 50)
+        tpv = (h + l + c) / 3 * v
+        s[_S_SUM_TPV50], s[_S_NZ_TPV50] = _slide(s[_S_SUM_TPV50], s[_S_NZ_TPV50], tpv, removed(50, '_tpv'))
+        s[_S_SUM_V50], s[_S_NZ_V50] = _slide(s[_S_SUM_V50], s[_S_NZ_V50], v, removed(50, 'volume'))
+        vwap = _div(s[_S_SUM_TPV50], s[_S_SUM_V50])
+
+        row = (
+            ts, o, h, l, c, v,
+            sma_20, sma_50, s[_S_EMA12], s[_S_EMA26], macd, s[_S_MACD_SIG], macd - s[_S_MACD_SIG],
+            rsi, stoch_k, stoch_d, bb_high, sma_20, bb_low, bb_width,
+            atr, volume_sma, volume_ratio, momentum, momentum * 100, vwap,
+            gain, loss, tpv, stoch_raw, true_range
+        )
+        slot = i % self.capacity
+        self._buf[slot] = row
+        self._buf[slot + self.capacity] = row
+        self._pending_state = np.array(s)
+
+    def reseed(self, index: int) -> None:
+        """
+        Restart the recursive indicators (EMA, MACD, ATR) at row `index`.
+
+        Indicators.calculate_all seeds them at the first candle it is given,
+        so when a caller's window slides forward the stored rows and state
+        are corrected to that new seed. The recursions are linear in their
+        seed, so each correction is a decaying geometric term and no candle
+        has to be evaluated again.
+
+        Args:
+            index: Row of the new first candle (at least 14 rows before the head)
+        """
+        if index == self._origin:
+            return
+        if not self._origin < index <= self.size - 14 or self.size - index > self.capacity:
+            raise ValueError(f"Cannot re-seed rows {self._origin}..{self.size - 1} at {index}")
+
+        slots = np.arange(index, self.size) % self.capacity
+        rows = self._buf[slots + self.capacity]
+        j = np.arange(len(rows), dtype=float)
+        r12, r26, r9 = 1 - self._ALPHA_12, 1 - self._ALPHA_26, 1 - self._ALPHA_9
+
+        # EMAs restart at the first close; MACD signal restarts at the new MACD (zero)
+        d12 = rows[0, _COL['close']] - rows[0, _COL['ema_12']]
+        d26 = rows[0, _COL['close']] - rows[0, _COL['ema_26']]
+        macd_shift = d12 * r12 ** j - d26 * r26 ** j
+        signal_shift = (r9 ** j * -rows[0, _COL['macd_signal']]
+                        + self._ALPHA_9 * (d12 * r12 * (r12 ** j - r9 ** j) / (r12 - r9)
+                                           - d26 * r26 * (r26 ** j - r9 ** j) / (r26 - r9)))
+        rows[:, _COL['ema_12']] += d12 * r12 ** j
+        rows[:, _COL['ema_26']] += d26 * r26 ** j
+        rows[:, _COL['macd']] += macd_shift
+        rows[:, _COL['macd_signal']] += signal_shift
+        rows[:, _COL['macd_diff']] += macd_shift - signal_shift
+
+        # ATR: zeros during the new warm-up, then the mean of the first 14 true
+        # ranges (the first one without a previous close) decayed by Wilder smoothing
+        first_tr = rows[0, _COL['high']] - rows[0, _COL['low']]
+        seed = (first_tr + rows[1:14, _COL['_tr']].sum()) / 14
+        rows[13:, _COL['atr']] += (seed - rows[13, _COL['atr']]) * (13 / 14) ** j[:-13]
+        rows[:13, _COL['atr']] = 0.0
+
+        self._buf[slots] = rows
+        self._buf[slots + self.capacity] = rows
+        for state, i in ((self._state, self._committed - 1), (self._pending_state, self._committed)):
+            if state is not None and i >= index:
+                row = self._row(i)
+                state[_S_EMA12] = row[_COL['ema_12']]
+                state[_S_EMA26] = row[_COL['ema_26']]
+                state[_S_MACD_SIG] = row[_COL['macd_signal']]
+                state[_S_ATR] = row[_COL['atr']]
+        self._origin = index
+
+    def view(self, rows: int) -> np.ndarray:
+        """
+        Zero-copy view of the most recent rows (OUTPUT_COLUMNS order).
+
+        Args:
+            rows: Number of rows, at most min(size, capacity)
+        """
+        if rows > min(self.size, self.capacity):
+            raise ValueError(f"Requested {rows} rows, stream holds {min(self.size, self.capacity)}")
+        stop = (self.size - 1) % self.capacity + self.capacity + 1
+        return self._buf[stop - rows:stop, :len(OUTPUT_COLUMNS)]
+
+    def to_dataframe(self, rows: int) -> pd.DataFrame:
+        """Build a DataFrame shaped like Indicators.calculate_all output"""
+        df = pd.DataFrame(self.view(rows), columns=OUTPUT_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+        return df
+
+
+class IncrementalIndicatorEngine:
+    """
+    Registry of IndicatorStream objects keyed by (symbol, timeframe).
+
+    Drop-in replacement for Indicators.calculate_all for callers that poll
+    the same symbols repeatedly (e.g. MarketScanner.scan_pair).
+    """
+
+    def __init__(self, min_capacity: int = 200):
+        """
+        Initialize indicator engine.
+
+        Args:
+            min_capacity: Minimum candles retained per stream
+        """
+        self.min_capacity = min_capacity
+        self.logger = Logger.get_logger()
+        self._streams: Dict[Tuple[str, str], IndicatorStream] = {}
+        self._lock = threading.Lock()
+        self.stats = {'incremental': 0, 'full_builds': 0, 'fallbacks': 0}
+
+    def calculate(self, symbol: str, timeframe: str, ohlcv_data: List) -> pd.DataFrame:
+        """
+        Calculate indicators for a symbol/timeframe, reusing previous state
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe (e.g. '1h')
+            ohlcv_data: List of [timestamp, open, high, low, close, volume]
+
+        Returns:
+            DataFrame with the same columns as Indicators.calculate_all
+            (empty if fewer than 50 candles)
+        """
+        if ohlcv_data is None or isinstance(ohlcv_data, pd.DataFrame):
+            return Indicators.calculate_all(ohlcv_data)
+        if len(ohlcv_data) < MIN_CANDLES:
+            return pd.DataFrame()
+
+        key = (symbol, timeframe)
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None or stream.capacity < len(ohlcv_data):
+                stream = IndicatorStream(max(self.min_capacity, len(ohlcv_data)))
+                self._streams[key] = stream
+
+        try:
+            with stream.lock:
+                start = self._sync_index(stream, ohlcv_data)
+                if start is None:
+                    stream = self._rebuild(key, len(ohlcv_data))
+                    start = 0
+                elif stream.size:
+                    # Match calculate_all, which seeds EMA/ATR at the window's first candle
+                    stream.reseed(stream.size - 1 - start)
+                self.stats['full_builds' if start == 0 else 'incremental'] += 1
+                for candle in ohlcv_data[start:]:
+                    stream.update(candle)
+                return stream.to_dataframe(len(ohlcv_data))
+        except Exception as e:
+            self.logger.debug(f"Incremental indicators failed for {symbol} {timeframe}: {e}")
+            self.stats['fallbacks'] += 1
+            self.reset(symbol, timeframe)
+            return Indicators.calculate_all(ohlcv_data)
+
+    def _rebuild(self, key: Tuple[str, str], rows: int) -> IndicatorStream:
+        stream = IndicatorStream(max(self.min_capacity, rows))
+        with self._lock:
+            self._streams[key] = stream
+        return stream
+
+    @staticmethod
+    def _sync_index(stream: IndicatorStream, ohlcv_data: List) -> Optional[int]:
+        """
+        Find where new data starts relative to the stream head.
+
+        Returns:
+            Index of the first candle to feed, or None if the stream must be rebuilt
+        """
+        head = stream.last_timestamp
+        if head is None:
+            return 0
+        # The head is normally the last or second-to-last candle
+        for idx in range(len(ohlcv_data) - 1, -1, -1):
+            ts = float(ohlcv_data[idx][0])
+            if ts == head:
+                # Rows before the head must line up with what the stream holds
+                rows_before = idx
+                if rows_before + 1 > min(stream.size, stream.capacity):
+                    return None
+                # Windows can only slide forward, over enough candles to re-seed the ATR
+                if stream.size - 1 - rows_before < stream.origin or rows_before < 13:
+                    return None
+                first = stream.view(rows_before + 1)[0, 0]
+                return idx if first == float(ohlcv_data[0][0]) else None
+            if ts < head:
+                break
+        return None
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Drop state for one stream, all timeframes of a symbol, or everything"""
+        with self._lock:
+            if symbol is None:
+                self._streams.clear()
+                return
+            for key in [k for k in self._streams if k[0] == symbol and timeframe in (None, k[1])]:
+                del self._streams[key]
+
+    def get_stats(self) -> Dict:
+        """Get engine usage statistics"""
+        with self._lock:
+            return {**self.stats, 'streams': len(self._streams)}
@@ -9,6 +9,16 @@ from ta.trend import SMAIndicator, EMAIndicator, MACD
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volatility import BollingerBands, AverageTrueRange
 
+# Columns produced by Indicators.calculate_all, in order
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+INDICATOR_COLUMNS = [
+    'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_diff',
+    'rsi', 'stoch_k', 'stoch_d', 'bb_high', 'bb_mid', 'bb_low', 'bb_width',
+    'atr', 'volume_sma', 'volume_ratio', 'momentum', 'roc', 'vwap'
+]
+OUTPUT_COLUMNS = OHLCV_COLUMNS + INDICATOR_COLUMNS
+MIN_CANDLES = 50  # Minimum candles for calculate_all to return indicators
+
 class Indicators:
     """Calculate technical indicators for trading"""
 
@@ -2,11 +2,17 @@
 KuCoin Futures API Client Wrapper
 """
 import ccxt
+import sqlite3
 import time
 import threading
 import queue
 from typing import List, Dict, Optional, Callable, Any
 from logger import Logger
+from config import Config
+from candle_store import CandleStore
+from rate_limiter import WeightedRateLimiter, get_rate_limiter
+from request_coalescer import RequestCoalescer
+from ticker_snapshot import TickerSnapshot
 from enum import IntEnum
 from kucoin_websocket import KuCoinWebSocket
 from functools import wraps
@@ -62,7 +68,18 @@ class KuCoinClient:
         self._pending_critical_calls = 0  # Track critical calls in progress
         self._critical_call_lock = threading.Lock()
         self._closing = False  # Flag to indicate client is shutting down
+        self._call_context = threading.local()  # Priority of the API call running on this thread
+        # Kept for connect_websocket(), which may run after __init__ (staged bot startup)
+        self._credentials = (api_key, api_secret, api_passphrase)
 
+        # PERFORMANCE: Proactive weighted token buckets shared by every REST call site
+        self.rate_limiter = get_rate_limiter() if Config.ENABLE_RATE_LIMITER else None
+
+        # PERFORMANCE: Concurrent identical REST requests share one in-flight call
+        self._coalescer = RequestCoalescer() if Config.ENABLE_REQUEST_COALESCING else None
+
+        # PERFORMANCE: Bulk ticker snapshot shared by position monitoring, DCA, dashboard and scanner
+        self._ticker_snapshot = TickerSnapshot()
 
         # PRIORITY 1 SAFETY: Symbol metadata cache for exchange invariant validation
         self._symbol_metadata_cache = {}  # Cache symbol specs (min qty, price step, etc.)
@@ -76,20 +93,17 @@ class KuCoinClient:
         self._max_time_drift_ms = 5000  # Max 5 seconds drift allowed
         self._sync_check_interval = 3600  # Check every hour
 
+        # PERFORMANCE: Local candle store so REST OHLCV requests only fetch new candles
+        self._candle_store = None
+        self._candle_store_failed = False
+        self._candle_store_lock = threading.Lock()
+        self._candle_store_stats = {'delta_fetches': 0, 'full_fetches': 0, 'candles_fetched': 0}
+
         try:
-            self.exchange = ccxt.kucoinfutures({
-                'apiKey': api_key,
-                'secret': api_secret,
-                'password': api_passphrase,
-                'enableRateLimit': True,
-                # PERFORMANCE: Enable session reuse for better connection management
-                'timeout': 30000,  # 30 second timeout
-                'options': {
-                    'defaultType': 'future',
-                    'adjustForTimeDifference': True,
-                },
-            })
+            self.exchange = self._create_exchange(api_key, api_secret, api_passphrase)
             self.logger.info("KuCoin Futures client initialized successfully")
+            if self.rate_limiter is not None:
+                self._install_rate_limiter()
             self.logger.info("✅ API Call Priority System: ENABLED (Trading operations have priority)")
 
             # PRIORITY 1 SAFETY: Verify clock sync at startup
@@ -108,30 +122,110 @@ class KuCoinClient:
             self.websocket = None
             self.enable_websocket = enable_websocket
             if enable_websocket:
-                try:
-                    self.websocket = KuCoinWebSocket(api_key, api_secret, api_passphrase)
-                    self.websocket.connect()
-                    if self.websocket.is_connected():
-                        self.logger.info("✅ WebSocket API: ENABLED (Real-time market data)")
-                        self.logger.info("   📊 Data Source: WebSocket for tickers & OHLCV")
-                        self.logger.info("   💼 Trading: REST API for orders & positions")
-                    else:
-                        self.logger.warning("⚠️  WebSocket connection failed, will use REST API only")
-                        self.websocket = None
-                except Exception as e:
-                    self.logger.warning(f"⚠️  Could not initialize WebSocket: {e}, will use REST API only")
-                    self.websocket = None
+                self.connect_websocket()
 
         except Exception as e:
             self.logger.error(f"Failed to initialize KuCoin client: {e}")
             raise
 
+    def connect_websocket(self) -> bool:
+        """Connect the real-time market data feed
+
+        Called from __init__ when enable_websocket is set; the bot's staged
+        startup creates the client without it and connects later, so the
+        REST calls that restore positions do not wait for the handshake.
+
+        Returns:
+            True if connected; on failure the client keeps using REST only
+        """
+        self.enable_websocket = True
+        try:
+            self.websocket = self._create_websocket(*self._credentials)
+            self.websocket.connect()
+            if self.websocket.is_connected():
+                self.logger.info("✅ WebSocket API: ENABLED (Real-time market data)")
+                self.logger.info("   📊 Data Source: WebSocket for tickers & OHLCV")
+                self.logger.info("   💼 Trading: REST API for orders & positions")
+                return True
+            self.logger.warning("⚠️  WebSocket connection failed, will use REST API only")
+        except Exception as e:
+            self.logger.warning(f"⚠️  Could not initialize WebSocket: {e}, will use REST API only")
+        self.websocket = None
+        return False
+
+    def _create_exchange(self, api_key: str, api_secret: str, api_passphrase: str):
+        """Create the ccxt exchange every REST call goes through"""
+        return ccxt.kucoinfutures({
+            'apiKey': api_key,
+            'secret': api_secret,
+            'password': api_passphrase,
+            # The shared token-bucket limiter replaces ccxt's own pacing when enabled
+            'enableRateLimit': self.rate_limiter is None,
+            # PERFORMANCE: Enable session reuse for better connection management
+            'timeout': 30000,  # 30 second timeout
+            'options': {
+                'defaultType': 'future',
+                'adjustForTimeDifference': True,
+            },
+        })
+
+    def _create_websocket(self, api_key: str, api_secret: str, api_passphrase: str) -> KuCoinWebSocket:
+        """Create the WebSocket feed for real-time market data (connected by the caller)"""
+        return KuCoinWebSocket(api_key, api_secret, api_passphrase)
+
+    def _current_priority(self) -> APICallPriority:
+        """Priority of the API call running on this thread (NORMAL outside _execute_with_priority)"""
+        return getattr(self._call_context, 'priority', APICallPriority.NORMAL)
+
+    def _install_rate_limiter(self):
+        """Route every REST request through the shared weighted rate limiter
+
+        ccxt sends all REST requests through exchange.fetch2 with the endpoint's
+        cost, so wrapping it covers every call site, including direct
+        exchange calls that bypass _handle_api_error.
+        """
+        exchange = self.exchange
+        send = exchange.fetch2
+
+        def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            cost = exchange.calculate_rate_limiter_cost(api, method, path, params, config)
+            pool = WeightedRateLimiter.pool_for(api)
+            self.rate_limiter.acquire(pool, WeightedRateLimiter.weight_for(cost), self._current_priority())
+            self._call_context.last_pool = pool  # A 429 on this request penalizes only this pool
+            return send(path, api, method, params, headers, body, config)
+
+        exchange.fetch2 = fetch2
+        self.logger.info("✅ Weighted rate limiter: ENABLED (critical lane reserved)")
+
+    def _rate_limit_delay(self, attempt: int, exponential_backoff: bool, base_delay: float) -> float:
+        """Delay before retrying after a rate limit error
+
+        With the shared limiter, the failing request's pool is emptied instead
+        so every caller of that pool backs off together and the next request
+        waits only as long as the pool needs to refill for its priority (the
+        other pool is untouched; all pools if the request's pool is unknown).
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.penalize(getattr(self._call_context, 'last_pool', None))
+            return 0
+        delay = (2 ** attempt) * base_delay if exponential_backoff else base_delay
+        return min(delay, 30)
+
+    def get_request_cache_stats(self) -> Dict:
+        """Hit / miss / coalesced counters of the REST request coalescer"""
+        return self._coalescer.get_stats() if self._coalescer is not None else {}
+
+    def get_rate_limit_metrics(self) -> Dict:
+        """Per-pool utilization and wait statistics of the shared rate limiter"""
+        return self.rate_limiter.get_metrics() if self.rate_limiter is not None else {}
+
     def _wait_for_critical_calls(self, priority: APICallPriority):
         """
         Wait if there are pending critical calls and current call is not critical.
         This ensures trading operations complete before scanning operations start.
+        Calls made from inside a critical call are part of it and never wait.
         """
-        if priority > APICallPriority.CRITICAL:
+        if priority > APICallPriority.CRITICAL and self._current_priority() > APICallPriority.CRITICAL:
             # Non-critical call - wait for any pending critical calls to complete
             max_wait = 5.0  # Maximum 5 seconds wait
             start_time = time.time()
@@ -215,15 +309,8 @@ class KuCoinClient:
 
             except ccxt.RateLimitExceeded as e:
                 last_exception = e
-                # Calculate backoff delay
-                base_delay = 1  # Base delay in seconds
-                if exponential_backoff:
-                    delay = (2 ** attempt) * base_delay  # 1s, 2s, 4s, 8s...
-                else:
-                    delay = base_delay  # Fixed 1s delay
-
-                # Cap maximum delay at 30 seconds
-                delay = min(delay, 30)
+                # Backoff 1s, 2s, 4s... capped at 30s (or let the shared limiter pace the retry)
+                delay = self._rate_limit_delay(attempt, exponential_backoff, base_delay=1)
 
                 if attempt < effective_retries - 1:
                     self.logger.warning(
@@ -313,11 +400,7 @@ class KuCoinClient:
 
                 # 429 errors - rate limit (should be caught above, but just in case)
                 elif '429' in error_str or 'too many' in error_str:
-                    if exponential_backoff:
-                        delay = (2 ** attempt)
-                    else:
-                        delay = 2
-                    delay = min(delay, 30)
+                    delay = self._rate_limit_delay(attempt, exponential_backoff, base_delay=2)
 
                     if attempt < effective_retries - 1:
                         self.logger.warning(
@@ -390,6 +473,10 @@ class KuCoinClient:
         # Track if this is a critical call
         self._track_critical_call(priority, increment=True)
 
+        # Nested calls inherit the most urgent priority of the call they belong to
+        previous_priority = getattr(self._call_context, 'priority', None)
+        self._call_context.priority = priority if previous_priority is None else min(previous_priority, priority)
+
         try:
             # Log priority for critical operations
             if priority == APICallPriority.CRITICAL:
@@ -399,6 +486,10 @@ class KuCoinClient:
             result = func(*args, **kwargs)
             return result
         finally:
+            if previous_priority is None:
+                del self._call_context.priority
+            else:
+                self._call_context.priority = previous_priority
             # Always decrement critical call counter
             self._track_critical_call(priority, increment=False)
 
@@ -432,13 +523,13 @@ class KuCoinClient:
                 # Optionally fetch volume data from tickers
                 if include_volume:
                     try:
-                        tickers = self.exchange.fetch_tickers()
+                        # The bulk request also refreshes the shared ticker snapshot
+                        tickers = self.get_all_tickers(max_age=0)
                         for future in futures:
-                            symbol = future['symbol']
-                            if symbol in tickers:
-                                ticker = tickers[symbol]
+                            ticker = tickers.get(future['symbol'])
+                            if ticker:
                                 # Add 24h quote volume (volume in quote currency, e.g., USDT)
-                                future['quoteVolume'] = ticker.get('quoteVolume', 0)
+                                future['quoteVolume'] = ticker.get('quoteVolume') or 0
                         self.logger.debug(f"Added volume data for {len(futures)} futures")
                     except Exception as e:
                         self.logger.warning(f"Could not fetch volume data: {e}")
@@ -510,6 +601,13 @@ class KuCoinClient:
                     # Fall through to REST API if no WebSocket data
                     self.logger.debug(f"No WebSocket data for {symbol}, using REST API")
 
+        # Non-critical callers can read a fresh bulk snapshot instead of sending a request
+        if min(priority, self._current_priority()) > APICallPriority.CRITICAL \
+                and self._ticker_snapshot.age() <= Config.TICKER_SNAPSHOT_TTL:
+            ticker = self._ticker_snapshot.get(symbol)
+            if ticker and ticker['last'] is not None:
+                return ticker
+
         # Fallback to REST API
         def _fetch():
             def _fetch_ticker():
@@ -528,7 +626,63 @@ class KuCoinClient:
 
             return result
 
-        return self._execute_with_priority(_fetch, priority, f'get_ticker({symbol})')
+        # Trading decisions always send their own request: an in-flight non-critical
+        # leader may itself be waiting for this critical operation to finish
+        effective = min(priority, self._current_priority())
+        if self._coalescer is None or effective == APICallPriority.CRITICAL:
+            return self._execute_with_priority(_fetch, priority, f'get_ticker({symbol})')
+
+        # One lane per priority: a HIGH read never waits on a NORMAL leader held back by the rate limiter
+        return self._coalescer.get(
+            'ticker', (symbol,),
+            lambda: self._execute_with_priority(_fetch, priority, f'get_ticker({symbol})'),
+            Config.TICKER_CACHE_TTL, lane=int(effective)
+        )
+
+    def get_all_tickers(self, max_age: float = None,
+                        priority: APICallPriority = APICallPriority.NORMAL) -> TickerSnapshot:
+        """Get a bulk ticker snapshot of every contract
+
+        One fetch_tickers request replaces per-symbol polling. The snapshot is
+        shared: once refreshed, get_ticker() serves non-critical callers from it
+        until it is older than Config.TICKER_SNAPSHOT_TTL.
+
+        Args:
+            max_age: Reuse the current snapshot if it is at most this old in seconds
+                (defaults to Config.TICKER_SNAPSHOT_TTL; 0 forces a refresh)
+            priority: Priority level for the refresh request
+
+        Returns:
+            TickerSnapshot (use .get(symbol) for a ticker dict, .column(name) for arrays).
+            The previous snapshot is returned if the refresh fails.
+        """
+        if max_age is None:
+            max_age = Config.TICKER_SNAPSHOT_TTL
+        if self._ticker_snapshot.age() <= max_age or getattr(self, '_closing', False):
+            return self._ticker_snapshot
+
+        def _fetch():
+            tickers = self._handle_api_error(
+                self.exchange.fetch_tickers,
+                max_retries=2,
+                exponential_backoff=True,
+                operation_name="get_all_tickers"
+            )
+            if tickers:
+                self._ticker_snapshot.update(tickers)
+                self.logger.debug(f"Refreshed ticker snapshot ({len(tickers)} symbols)")
+            return tickers
+
+        def _refresh():
+            return self._execute_with_priority(_fetch, priority, 'get_all_tickers')
+
+        effective = min(priority, self._current_priority())
+        if self._coalescer is not None and effective > APICallPriority.CRITICAL:
+            # Same-priority refreshes share one request; the snapshot is the cache, so only success is passed back
+            self._coalescer.get('tickers', (), lambda: bool(_refresh()) or None, 0, lane=int(effective))
+        else:
+            _refresh()
+        return self._ticker_snapshot
 
     def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> List:
         """Get OHLCV data for a symbol with retry logic
@@ -580,6 +734,13 @@ class KuCoinClient:
         # Fallback to REST API
         def _fetch():
             def _fetch_ohlcv():
+                store = self._get_candle_store()
+                if store is not None:
+                    try:
+                        return self._fetch_ohlcv_delta(store, symbol, timeframe, limit)
+                    except (sqlite3.Error, ValueError) as e:
+                        self.logger.warning(f"Candle store unavailable for {symbol} {timeframe}: {e}")
+
                 ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
                 if not ohlcv:
                     self.logger.warning(f"Empty OHLCV data returned for {symbol}")
@@ -601,6 +762,65 @@ class KuCoinClient:
         # Execute with NORMAL priority - will wait for CRITICAL and HIGH operations
         return self._execute_with_priority(_fetch, APICallPriority.NORMAL, f'get_ohlcv({symbol})')
 
+    def _get_candle_store(self) -> Optional[CandleStore]:
+        """Open the local candle store on first use (None if disabled or unavailable)"""
+        if not Config.ENABLE_CANDLE_STORE or self._candle_store_failed:
+            return None
+        with self._candle_store_lock:
+            if self._candle_store is None:
+                try:
+                    self._candle_store = CandleStore(Config.CANDLE_STORE_PATH, Config.CANDLE_STORE_MAX_CANDLES)
+                    self.logger.info(f"📦 Local candle store: {Config.CANDLE_STORE_PATH}")
+                except Exception as e:
+                    self.logger.warning(f"Could not open candle store, using full REST fetches: {e}")
+                    self._candle_store_failed = True
+            return self._candle_store
+
+    def _fetch_ohlcv_delta(self, store: CandleStore, symbol: str, timeframe: str, limit: int) -> List:
+        """Fetch only candles newer than the last stored one and merge them into the store
+
+        The delta is planned and merged by the store (shared with AsyncKuCoinClient).
+        Falls back to a full fetch of ``limit`` candles when the store does not
+        hold a contiguous, recent enough history for this symbol and timeframe.
+
+        Args:
+            store: Local candle store
+            symbol: Trading pair symbol
+            timeframe: Timeframe (1h, 4h, 1d, etc.)
+            limit: Number of candles to return
+
+        Returns:
+            List of OHLCV candles, oldest first
+        """
+        delta = store.delta_since(symbol, timeframe, limit)
+        if delta is not None:
+            since, fetch_limit = delta
+            fresh = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=fetch_limit)
+            merged = store.merge_delta(symbol, timeframe, since, fresh, limit)
+            if merged is not None:
+                with self._candle_store_lock:
+                    self._candle_store_stats['delta_fetches'] += 1
+                    self._candle_store_stats['candles_fetched'] += len(fresh)
+                self.logger.debug(f"Fetched {len(fresh)} new candles for {symbol} {timeframe} (delta)")
+                return merged
+
+        ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        if not ohlcv:
+            self.logger.warning(f"Empty OHLCV data returned for {symbol}")
+            return []
+
+        store.upsert(symbol, timeframe, ohlcv)
+        with self._candle_store_lock:
+            self._candle_store_stats['full_fetches'] += 1
+            self._candle_store_stats['candles_fetched'] += len(ohlcv)
+        self.logger.debug(f"Fetched {len(ohlcv)} candles for {symbol} from REST API")
+        return ohlcv
+
+    def get_candle_store_stats(self) -> Dict:
+        """Get delta/full fetch counters for the local candle store"""
+        with self._candle_store_lock:
+            return dict(self._candle_store_stats)
+
     def get_balance(self) -> Dict:
         """Get account balance - HIGH priority for position monitoring"""
         def _fetch():
@@ -1664,9 +1884,26 @@ class KuCoinClient:
             symbol: Trading pair symbol
             limit: Number of bid/ask levels to fetch
 
+        Uses the local WebSocket L2 book if it is in sync (no network round-trip),
+        falls back to REST.
+
         Returns:
             Dict with 'bids' and 'asks' lists, or None if error
         """
+        if Config.ENABLE_LOCAL_ORDER_BOOK and self.websocket and self.websocket.is_connected():
+            order_book = self.websocket.get_orderbook(symbol, depth=limit)
+            if order_book:
+                return {
+                    'bids': order_book['bids'],
+                    'asks': order_book['asks'],
+                    'timestamp': order_book['timestamp']
+                }
+            if not self.websocket.has_orderbook(symbol) and not self._should_use_rest_api():
+                # Build a local book for next time; this call is served by REST
+                self.websocket.subscribe_orderbook(
+                    symbol, self._market_id(symbol), snapshot_fetcher=self._fetch_order_book_snapshot
+                )
+
         try:
             order_book = self.exchange.fetch_order_book(symbol, limit=limit)
             return {
@@ -1678,6 +1915,20 @@ class KuCoinClient:
             self.logger.error(f"Error fetching order book for {symbol}: {e}")
             return None
 
+    def _market_id(self, symbol: str) -> Optional[str]:
+        """Exchange market id for a symbol (e.g. 'XBTUSDTM'), or None if unknown"""
+        try:
+            return self.exchange.market(symbol)['id']
+        except Exception:
+            return None
+
+    def _fetch_order_book_snapshot(self, symbol: str) -> Optional[Dict]:
+        """Full-depth REST snapshot (with sequence as 'nonce') for the local L2 book"""
+        return self._execute_with_priority(
+            lambda: self.exchange.fetch_order_book(symbol),
+            APICallPriority.NORMAL, f'order_book_snapshot({symbol})'
+        )
+
     def validate_price_with_slippage(self, symbol: str, side: str,
                                     expected_price: float,
                                     max_slippage: float = 0.005) -> tuple[bool, float]:
@@ -1919,6 +2170,10 @@ class KuCoinClient:
             finally:
                 self.websocket = None
 
+        if getattr(self, '_candle_store', None) is not None:
+            self._candle_store.close()
+            self._candle_store = None
+
         # Mark the exchange as closed to prevent further API calls
         if hasattr(self, 'exchange'):
             self._closing = True
@@ -10,9 +10,14 @@ import websocket
 import hmac
 import hashlib
 import base64
+import numpy as np
 from typing import Dict, Optional, Callable, List
 from datetime import datetime
+from config import Config
 from logger import Logger
+from candle_ring_buffer import CandleRingBuffer
+from l2_order_book import L2OrderBook
+from market_recorder import MarketDataRecorder
 
 
 class KuCoinWebSocket:
@@ -22,6 +27,9 @@ class KuCoinWebSocket:
     WS_PUBLIC_URL = "wss://ws-api-futures.kucoin.com"
     WS_PRIVATE_URL = "wss://ws-api-futures.kucoin.com"
 
+    # Candles kept per (symbol, timeframe) stream
+    CANDLE_CAPACITY = 500
+
     def __init__(self, api_key: str = None, api_secret: str = None, api_passphrase: str = None):
         """
         Initialize WebSocket client
@@ -45,9 +53,29 @@ class KuCoinWebSocket:
         # Data storage (thread-safe)
         self._data_lock = threading.Lock()
         self._tickers = {}  # symbol -> ticker data
-        self._candles = {}  # (symbol, timeframe) -> list of candles
+        # PERFORMANCE: (symbol, timeframe) -> CandleRingBuffer, each with its own lock,
+        # so candle updates never contend with readers of other streams
+        self._candles = {}
+        self._candles_lock = threading.Lock()  # Only taken to create a new buffer
         self._orderbooks = {}  # symbol -> orderbook data
 
+        # Local L2 books built from a REST snapshot plus level2 sequence deltas
+        self._l2_books = {}  # exchange market id -> L2OrderBook
+        self._l2_market_ids = {}  # symbol -> exchange market id
+        self._l2_snapshot_fetcher = None  # Callable[[symbol], order book dict with 'nonce']
+        self._l2_resyncing = set()
+        self._l2_lock = threading.Lock()
+
+        # Optional tee of every ticker/candle/level2 message to columnar files on disk
+        self.recorder = None
+        if Config.ENABLE_MARKET_RECORDER:
+            self.recorder = MarketDataRecorder(
+                Config.MARKET_RECORDER_PATH,
+                rows_per_file=Config.MARKET_RECORDER_ROWS_PER_FILE,
+                flush_interval=Config.MARKET_RECORDER_FLUSH_INTERVAL
+            )
+            self.logger.info(f"📼 Market data recorder: {Config.MARKET_RECORDER_PATH}")
+
         # Subscriptions
         self._subscriptions = set()
         # KuCoin's documented maximum subscription limit per connection is 400.
@@ -136,6 +164,8 @@ class KuCoinWebSocket:
         if self.ws:
             self.ws.close()
         self.connected = False
+        if self.recorder is not None:
+            self.recorder.close()
         self.logger.info("🔌 WebSocket disconnected")
 
     def _on_open(self, ws):
@@ -148,6 +178,10 @@ class KuCoinWebSocket:
         # Send ping to keep connection alive
         self._start_ping()
 
+        # Deltas were missed while disconnected - local books must be rebuilt
+        for book in list(self._l2_books.values()):
+            book.invalidate()
+
         # Resubscribe to channels if any - with rate limiting
         if self._subscriptions:
             self.logger.info(f"Resubscribing to {len(self._subscriptions)} channels with rate limiting...")
@@ -193,6 +227,11 @@ class KuCoinWebSocket:
                             }
                             kucoin_tf = tf_map.get(timeframe, timeframe)
                             self._subscribe_candles(kucoin_symbol, kucoin_tf, skip_rate_limit=True)
+                    elif subscription.startswith('orderbook:'):
+                        symbol = subscription.split(':', 1)[1]
+                        market_id = self._l2_market_ids.get(symbol)
+                        if market_id and self._subscribe_orderbook(market_id, skip_rate_limit=True):
+                            self._request_orderbook_resync(market_id)
 
                     # Small delay between each subscription
                     time.sleep(self._subscription_delay)
@@ -291,6 +330,9 @@ class KuCoinWebSocket:
             topic = data.get('topic', '')
             payload = data.get('data', {})
 
+            if self.recorder is not None:
+                self.recorder.record(topic, payload)
+
             # Handle ticker updates
             if 'ticker' in topic:
                 symbol = topic.split(':')[1] if ':' in topic else None
@@ -328,42 +370,50 @@ class KuCoinWebSocket:
             }
             self.logger.debug(f"Updated ticker for {symbol}: {self._tickers[symbol]['last']}")
 
-    def _update_candle(self, symbol: str, timeframe: str, data: dict):
-        """Update candlestick data (thread-safe)"""
-        with self._data_lock:
-            key = (symbol, timeframe)
-            if key not in self._candles:
-                self._candles[key] = []
-
-            # Parse candle data
-            candle = data.get('candles', [])
-            if len(candle) >= 6:
-                # Format: [timestamp, open, high, low, close, volume]
-                new_candle = [
-                    int(candle[0]),  # timestamp
-                    float(candle[1]),  # open
-                    float(candle[2]),  # high
-                    float(candle[3]),  # low
-                    float(candle[4]),  # close
-                    float(candle[5])   # volume
-                ]
-
-                # Update or append candle
-                candles = self._candles[key]
-                if candles and candles[-1][0] == new_candle[0]:
-                    # Update existing candle
-                    candles[-1] = new_candle
-                else:
-                    # Append new candle
-                    candles.append(new_candle)
-                    # Keep only last 500 candles
-                    if len(candles) > 500:
-                        candles.pop(0)
+    def _candle_buffer(self, key: tuple) -> CandleRingBuffer:
+        """Get or create the ring buffer for a (symbol, timeframe) stream"""
+        buffer = self._candles.get(key)
+        if buffer is None:
+            with self._candles_lock:
+                buffer = self._candles.setdefault(key, CandleRingBuffer(self.CANDLE_CAPACITY))
+        return buffer
 
-                self.logger.debug(f"Updated candle for {symbol} {timeframe}")
+    def _update_candle(self, symbol: str, timeframe: str, data: dict):
+        """Update candlestick data (thread-safe, locks only this stream's buffer)"""
+        buffer = self._candle_buffer((symbol, timeframe))
+
+        # Parse candle data
+        candle = data.get('candles', [])
+        if len(candle) >= 6:
+            # Format: [timestamp, open, high, low, close, volume]
+            new_candle = [
+                int(candle[0]),  # timestamp
+                float(candle[1]),  # open
+                float(candle[2]),  # high
+                float(candle[3]),  # low
+                float(candle[4]),  # close
+                float(candle[5])   # volume
+            ]
+
+            # Update the forming candle in place or append a new one (O(1))
+            buffer.update(new_candle)
+
+            self.logger.debug(f"Updated candle for {symbol} {timeframe}")
 
     def _update_orderbook(self, symbol: str, data: dict):
-        """Update orderbook data (thread-safe)"""
+        """Update orderbook data (thread-safe)
+
+        level2 deltas ('change' + 'sequence') go to the local L2 book; a sequence
+        gap triggers a resync. Depth snapshots replace the stored snapshot.
+        """
+        book = self._l2_books.get(symbol)
+        if book is not None and 'change' in data:
+            price, side, size = L2OrderBook.parse_change(data['change'])
+            if not book.apply_delta(data.get('sequence', 0), price, side, size):
+                self.logger.debug(f"Order book sequence gap for {symbol}, resyncing")
+                self._request_orderbook_resync(symbol)
+            return
+
         with self._data_lock:
             self._orderbooks[symbol] = {
                 'symbol': symbol,
@@ -503,6 +553,128 @@ class KuCoinWebSocket:
                 self.logger.error(f"Error subscribing to candles {kucoin_symbol}: {e}")
             return False
 
+    def subscribe_orderbook(self, symbol: str, market_id: str = None,
+                            snapshot_fetcher: Callable[[str], Optional[Dict]] = None) -> bool:
+        """
+        Maintain a local L2 order book for a symbol
+
+        The book is built from a REST snapshot plus level2 deltas and resynced
+        automatically whenever a sequence gap is detected.
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT:USDT')
+            market_id: Exchange market id used in the topic (e.g., 'XBTUSDTM')
+            snapshot_fetcher: Function returning a full order book dict with
+                'bids', 'asks' and 'nonce' (sequence) for the symbol
+        """
+        if not self.connected:
+            self.logger.warning("WebSocket not connected, cannot subscribe")
+            return False
+
+        if snapshot_fetcher is not None:
+            self._l2_snapshot_fetcher = snapshot_fetcher
+        if self._l2_snapshot_fetcher is None:
+            self.logger.warning(f"No order book snapshot source, cannot maintain local book for {symbol}")
+            return False
+
+        subscription_key = f'orderbook:{symbol}'
+        if subscription_key in self._subscriptions:
+            return True
+
+        # Check subscription limit
+        if len(self._subscriptions) >= self._max_subscriptions:
+            self.logger.warning(f"Subscription limit reached ({self._max_subscriptions}), cannot subscribe to order book {symbol}")
+            return False
+
+        market_id = market_id or symbol.replace('/', '').replace(':', '')
+        with self._l2_lock:
+            self._l2_market_ids[symbol] = market_id
+            self._l2_books.setdefault(market_id, L2OrderBook(symbol))
+
+        self._subscriptions.add(subscription_key)
+        if not self._subscribe_orderbook(market_id):
+            return False
+        # Deltas are buffered until the snapshot arrives
+        self._request_orderbook_resync(market_id)
+        return True
+
+    def _subscribe_orderbook(self, market_id: str, skip_rate_limit: bool = False) -> bool:
+        """Internal method to subscribe to level2 deltas with optional rate limiting"""
+        try:
+            if not self.connected or self.ws is None:
+                self.logger.debug(f"WebSocket not connected, skipping subscription to order book {market_id}")
+                return False
+
+            if not skip_rate_limit:
+                with self._subscription_lock:
+                    elapsed = time.time() - self._last_subscription_time
+                    if elapsed < self._subscription_delay:
+                        time.sleep(self._subscription_delay - elapsed)
+                    self._last_subscription_time = time.time()
+
+            sub_msg = {
+                "id": str(int(time.time() * 1000)),
+                "type": "subscribe",
+                "topic": f"/contractMarket/level2:{market_id}",
+                "privateChannel": False,
+                "response": True
+            }
+            self.ws.send(json.dumps(sub_msg))
+            self.logger.info(f"📖 Subscribed to order book: {market_id}")
+            return True
+        except Exception as e:
+            self.logger.debug(f"Error subscribing to order book {market_id}: {e}")
+            return False
+
+    def _request_orderbook_resync(self, market_id: str):
+        """Rebuild a local book from a fresh REST snapshot in the background"""
+        with self._l2_lock:
+            if market_id in self._l2_resyncing or market_id not in self._l2_books:
+                return
+            self._l2_resyncing.add(market_id)
+        threading.Thread(target=self._resync_orderbook, args=(market_id,), daemon=True).start()
+
+    def _resync_orderbook(self, market_id: str, max_attempts: int = 3):
+        """Fetch snapshots until the buffered deltas can be bridged"""
+        book = self._l2_books[market_id]
+        try:
+            for attempt in range(max_attempts):
+                try:
+                    snapshot = self._l2_snapshot_fetcher(book.symbol)
+                    if snapshot and snapshot.get('nonce') is not None:
+                        if book.apply_snapshot(snapshot.get('bids', []), snapshot.get('asks', []), snapshot['nonce']):
+                            self.logger.debug(f"Order book for {book.symbol} synced at sequence {book.sequence}")
+                            return
+                except Exception as e:
+                    self.logger.debug(f"Order book snapshot for {book.symbol} failed: {e}")
+                time.sleep(0.5 * (attempt + 1))
+            self.logger.warning(f"Could not sync local order book for {book.symbol}, using REST")
+        finally:
+            with self._l2_lock:
+                self._l2_resyncing.discard(market_id)
+
+    def unsubscribe_orderbook(self, symbol: str):
+        """Stop maintaining the local L2 book for a symbol"""
+        self._subscriptions.discard(f'orderbook:{symbol}')
+        with self._l2_lock:
+            market_id = self._l2_market_ids.pop(symbol, None)
+            if market_id is not None:
+                self._l2_books.pop(market_id, None)
+        if market_id is None or not self.connected or self.ws is None:
+            return False
+        try:
+            self.ws.send(json.dumps({
+                "id": str(int(time.time() * 1000)),
+                "type": "unsubscribe",
+                "topic": f"/contractMarket/level2:{market_id}",
+                "privateChannel": False,
+                "response": True
+            }))
+            return True
+        except Exception as e:
+            self.logger.debug(f"Error unsubscribing from order book {market_id}: {e}")
+            return False
+
     def unsubscribe_ticker(self, symbol: str):
         """
         Unsubscribe from ticker updates for a symbol
@@ -614,6 +786,28 @@ class KuCoinWebSocket:
                     self.logger.debug(f"Ticker data for {symbol} is stale ({age/1000:.1f}s old)")
             return None
 
+    def get_orderbook(self, symbol: str, depth: int = 20) -> Optional[Dict]:
+        """
+        Get the best levels of the local L2 order book
+
+        Args:
+            symbol: Trading pair symbol
+            depth: Number of levels per side
+
+        Returns:
+            Dict with 'bids'/'asks' ([price, size], best first), 'timestamp' and
+            'nonce', or None if the book is not subscribed or not in sync
+        """
+        if not self.connected:
+            return None
+        market_id = self._l2_market_ids.get(symbol)
+        book = self._l2_books.get(market_id) if market_id else None
+        return book.snapshot(depth) if book is not None else None
+
+    def has_orderbook(self, symbol: str) -> bool:
+        """Check if a local L2 order book is maintained for symbol"""
+        return symbol in self._l2_market_ids
+
     def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[List]:
         """
         Get cached OHLCV data from WebSocket stream
@@ -626,13 +820,28 @@ class KuCoinWebSocket:
         Returns:
             List of OHLCV candles or None if not available
         """
-        with self._data_lock:
-            key = (symbol, timeframe)
-            candles = self._candles.get(key)
-            if candles:
-                # Return up to 'limit' most recent candles
-                return candles[-limit:] if len(candles) > limit else candles.copy()
-            return None
+        buffer = self._candles.get((symbol, timeframe))
+        # Return up to 'limit' most recent candles
+        return buffer.to_list(limit) if buffer is not None else None
+
+    def get_ohlcv_array(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[np.ndarray]:
+        """
+        Get cached OHLCV data as a zero-copy NumPy view
+
+        The view is read-only and the forming candle is revised in place;
+        copy it if it must be kept across many candle updates.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Timeframe
+            limit: Maximum number of candles to return
+
+        Returns:
+            Array of shape (n, 6) [timestamp, open, high, low, close, volume], oldest first,
+            or None if not available
+        """
+        buffer = self._candles.get((symbol, timeframe))
+        return buffer.view(limit) if buffer is not None else None
 
     def is_connected(self) -> bool:
         """Check if WebSocket is connected"""
@@ -645,5 +854,4 @@ class KuCoinWebSocket:
 
     def has_candles(self, symbol: str, timeframe: str) -> bool:
         """Check if candle data is available for symbol and timeframe"""
-        with self._data_lock:
-            return (symbol, timeframe) in self._candles
+        return (symbol, timeframe) in self._candles
@@ -0,0 +1,181 @@
+"""
+Local Level 2 order book maintained from a REST snapshot plus WebSocket deltas
+
+KuCoin Futures publishes every change of the full book on the level2 topic as
+"price,side,size" with a per-symbol sequence number. A local book is built by
+buffering deltas, applying a REST snapshot, replaying the buffered deltas newer
+than the snapshot's sequence, and then applying each delta in order. A gap in
+the sequence marks the book out of sync until the next snapshot.
+
+Features:
+- Sorted price arrays per side: best-N levels are read in O(N)
+- Sequence-number checking with gap detection
+- Deltas received while (re)syncing are buffered and replayed
+- Per-book lock
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class _BookSide:
+    """One side of the book as parallel ascending price / size lists"""
+
+    def __init__(self, descending: bool):
+        self.descending = descending  # True for bids (best = highest price)
+        self.prices: List[float] = []
+        self.sizes: List[float] = []
+
+    def load(self, levels: List):
+        pairs = sorted((float(p), float(s)) for p, s, *_ in levels if float(s) > 0)
+        self.prices = [p for p, _ in pairs]
+        self.sizes = [s for _, s in pairs]
+
+    def set(self, price: float, size: float):
+        i = bisect_left(self.prices, price)
+        exists = i < len(self.prices) and self.prices[i] == price
+        if size <= 0:
+            if exists:
+                del self.prices[i]
+                del self.sizes[i]
+        elif exists:
+            self.sizes[i] = size
+        else:
+            self.prices.insert(i, price)
+            self.sizes.insert(i, size)
+
+    def best(self) -> Optional[float]:
+        if not self.prices:
+            return None
+        return self.prices[-1] if self.descending else self.prices[0]
+
+    def top(self, depth: int) -> List[List[float]]:
+        if self.descending:
+            start = max(0, len(self.prices) - depth)
+            return [[self.prices[i], self.sizes[i]] for i in range(len(self.prices) - 1, start - 1, -1)]
+        n = min(depth, len(self.prices))
+        return [[self.prices[i], self.sizes[i]] for i in range(n)]
+
+
+class L2OrderBook:
+    """
+    Local full-depth order book for one symbol.
+    """
+
+    def __init__(self, symbol: str, max_buffered: int = 5000):
+        """
+        Initialize an empty (unsynced) book.
+
+        Args:
+            symbol: Trading pair symbol
+            max_buffered: Deltas kept while waiting for a snapshot
+        """
+        self.symbol = symbol
+        self.lock = threading.Lock()
+        self.bids = _BookSide(descending=True)
+        self.asks = _BookSide(descending=False)
+        self.sequence: Optional[int] = None
+        self.synced = False
+        self.updated = 0.0  # time.time() of the last applied change
+        self._buffer: deque = deque(maxlen=max_buffered)
+        self.gaps = 0
+
+    @staticmethod
+    def parse_change(change: str) -> Tuple[float, str, float]:
+        """Parse a KuCoin level2 change string 'price,side,size'"""
+        price, side, size = change.split(',')
+        return float(price), side, float(size)
+
+    def _apply(self, price: float, side: str, size: float):
+        (self.bids if side == 'buy' else self.asks).set(price, size)
+
+    def apply_snapshot(self, bids: List, asks: List, sequence: int) -> bool:
+        """
+        Rebuild the book from a REST snapshot and replay newer buffered deltas
+
+        Args:
+            bids: [[price, size], ...]
+            asks: [[price, size], ...]
+            sequence: Snapshot sequence number
+
+        Returns:
+            True if the book is in sync afterwards
+        """
+        with self.lock:
+            self.bids.load(bids)
+            self.asks.load(asks)
+            self.sequence = int(sequence)
+            self.synced = True
+            buffered = sorted(self._buffer)
+            self._buffer.clear()
+            for i, (seq, price, side, size) in enumerate(buffered):
+                if seq <= self.sequence:
+                    continue
+                if seq != self.sequence + 1:
+                    # Snapshot is older than the buffered deltas can bridge; keep them for the next one
+                    self.synced = False
+                    self._buffer.extend(buffered[i:])
+                    break
+                self._apply(price, side, size)
+                self.sequence = seq
+            self.updated = time.time()
+            return self.synced
+
+    def apply_delta(self, sequence: int, price: float, side: str, size: float) -> bool:
+        """
+        Apply one incremental change
+
+        Returns:
+            False if a sequence gap was detected (the book needs a new snapshot),
+            True otherwise (applied, stale, or buffered while unsynced)
+        """
+        sequence = int(sequence)
+        with self.lock:
+            if not self.synced:
+                self._buffer.append((sequence, price, side, size))
+                return True
+            if sequence <= self.sequence:
+                return True  # Already contained in the snapshot
+            if sequence != self.sequence + 1:
+                self.synced = False
+                self.gaps += 1
+                self._buffer.clear()
+                self._buffer.append((sequence, price, side, size))
+                return False
+            self._apply(price, side, size)
+            self.sequence = sequence
+            self.updated = time.time()
+            return True
+
+    def invalidate(self):
+        """Mark the book out of sync (e.g. after a reconnect)"""
+        with self.lock:
+            self.synced = False
+            self._buffer.clear()
+
+    def best_bid_ask(self) -> Tuple[Optional[float], Optional[float]]:
+        """Best bid and best ask prices"""
+        with self.lock:
+            return self.bids.best(), self.asks.best()
+
+    def snapshot(self, depth: int = 20) -> Optional[Dict]:
+        """
+        Best-N levels in ccxt order book shape
+
+        Returns:
+            Dict with 'bids' (best first), 'asks' (best first), 'timestamp' (ms)
+            and 'nonce', or None if the book is not in sync
+        """
+        with self.lock:
+            if not self.synced:
+                return None
+            return {
+                'symbol': self.symbol,
+                'bids': self.bids.top(depth),
+                'asks': self.asks.top(depth),
+                'timestamp': int(self.updated * 1000),
+                'nonce': self.sequence,
+            }
@@ -0,0 +1,105 @@
+"""
+Lazy construction of optional, import-heavy bot components
+
+Some engines pull in frameworks that take seconds to import (TensorFlow,
+the boosting libraries, optuna). Registering them here instead of building
+them in TradingBot.__init__ defers that cost until the engine is first used,
+and skips it entirely for engines disabled in Config.
+
+Features:
+- Factories run once, on first get(); concurrent callers wait for the same build
+- Disabled components resolve to None without importing anything
+- Per-component build time (including its imports) for startup reports
+- module_available(): check an optional dependency without importing it
+"""
+
+import importlib.util
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from logger import Logger
+
+
+def module_available(name: str) -> bool:
+    """True if `name` can be imported, checked without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyComponentRegistry:
+    """
+    Named components built on first access.
+    """
+
+    def __init__(self):
+        self.logger = Logger.get_logger()
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._enabled: Dict[str, bool] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._build_times: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], enabled: bool = True):
+        """
+        Register a component
+
+        Args:
+            name: Component name
+            factory: Zero-argument callable that imports what it needs and returns the instance
+            enabled: Disabled components are never built; get() returns None
+        """
+        self._factories[name] = factory
+        self._enabled[name] = enabled
+        self._locks[name] = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def is_enabled(self, name: str) -> bool:
+        return self._enabled.get(name, False)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the component, building it on first call (None if disabled)"""
+        instance = self._instances.get(name)
+        if instance is not None or not self._enabled[name]:
+            return instance
+
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._build_times[name] = time.perf_counter() - start
+                self.logger.info(f"⏱️  Loaded {name} on first use ({self._build_times[name]:.2f}s)")
+        return self._instances[name]
+
+    def preload(self, names: Iterable[str] = None) -> threading.Thread:
+        """Build enabled components on a background thread so first use does not wait"""
+        names = [n for n in (names if names is not None else self._factories) if self._enabled.get(n)]
+
+        def build():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    self.logger.error(f"Error preloading {name}: {e}")
+
+        thread = threading.Thread(target=build, daemon=True, name="ComponentPreload")
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Dict]:
+        """Per component: enabled, loaded and build seconds (None until built)"""
+        return {
+            name: {
+                'enabled': self._enabled[name],
+                'loaded': name in self._instances,
+                'build_seconds': self._build_times.get(name),
+            }
+            for name in self._factories
+        }
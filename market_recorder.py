@@ -0,0 +1,362 @@
+"""
+Market data recorder for WebSocket streams
+
+Tees the ticker, candle and level2 messages KuCoinWebSocket receives into
+compressed columnar files so live sessions can be backtested and replayed
+later. The socket handler only timestamps the message and puts it on a
+bounded queue; parsing, batching and file I/O happen on a background thread.
+
+Layout (one compressed .npz file per flushed batch, one array per column):
+    <root>/<stream>/date=YYYY-MM-DD/symbol=<symbol>/part-<first ts>-<seq>.npz
+
+Features:
+- Never blocks the WebSocket thread: full queue -> message dropped and counted
+- Per-(stream, date, symbol) column buffers, written when rows_per_file is
+  reached or flush_interval has passed (files rotate with every write)
+- Partitioned by UTC date and symbol, so a time-range query only opens the
+  files of the requested days
+- load_recording() returns a time range as NumPy arrays, sorted by timestamp
+"""
+
+import glob
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from logger import Logger
+
+# Column name -> dtype for each recorded stream. 'timestamp' is the local
+# receive time in ms and is what queries filter and sort on.
+STREAM_COLUMNS = {
+    'ticker': {
+        'timestamp': np.int64,
+        'exchange_ts': np.int64,
+        'sequence': np.int64,
+        'price': np.float64,
+        'size': np.float64,
+        'bid': np.float64,
+        'bid_size': np.float64,
+        'ask': np.float64,
+        'ask_size': np.float64,
+    },
+    'candle': {
+        'timestamp': np.int64,
+        'candle_ts': np.int64,
+        'open': np.float64,
+        'high': np.float64,
+        'low': np.float64,
+        'close': np.float64,
+        'volume': np.float64,
+    },
+    'level2': {
+        'timestamp': np.int64,
+        'sequence': np.int64,
+        'price': np.float64,
+        'side': np.int8,  # 1 = bid, -1 = ask
+        'size': np.float64,
+        'snapshot': np.int8,  # 1 for levels of a depth snapshot, 0 for sequence deltas
+    },
+}
+
+_DAY = timedelta(days=1)
+
+
+def _float(value, default: float = np.nan) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _int(value, default: int = -1) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def stream_for_topic(topic: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Map a WebSocket topic to (stream, symbol, timeframe)
+
+    Returns:
+        ('ticker' | 'candle' | 'level2', symbol, timeframe or ''), or None for
+        topics that are not recorded
+    """
+    if ':' not in topic:
+        return None
+    channel, _, rest = topic.partition(':')
+    if 'ticker' in channel:
+        return 'ticker', rest, ''
+    if 'candle' in channel:
+        # Same split KuCoinWebSocket._handle_data_message uses for candle topics
+        parts = topic.split(':')
+        return 'candle', parts[1], parts[2] if len(parts) > 2 else ''
+    if 'level2' in channel or 'depth' in channel:
+        return 'level2', rest, ''
+    return None
+
+
+def parse_rows(stream: str, received_ms: int, payload: Dict) -> List[Tuple]:
+    """Convert one message payload into rows in STREAM_COLUMNS order"""
+    if stream == 'ticker':
+        return [(
+            received_ms,
+            _int(payload.get('ts')),
+            _int(payload.get('sequence')),
+            _float(payload.get('price')),
+            _float(payload.get('size')),
+            _float(payload.get('bestBidPrice')),
+            _float(payload.get('bestBidSize')),
+            _float(payload.get('bestAskPrice')),
+            _float(payload.get('bestAskSize')),
+        )]
+
+    if stream == 'candle':
+        candle = payload.get('candles') or []
+        if len(candle) < 6:
+            return []
+        # Same column interpretation as KuCoinWebSocket._update_candle
+        return [(received_ms, _int(candle[0])) + tuple(_float(v) for v in candle[1:6])]
+
+    if stream == 'level2':
+        sequence = _int(payload.get('sequence'))
+        change = payload.get('change')
+        if change:
+            price, side, size = change.split(',')
+            return [(received_ms, sequence, _float(price), 1 if side == 'buy' else -1, _float(size), 0)]
+        rows = [(received_ms, sequence, _float(p), 1, _float(s), 1) for p, s, *_ in payload.get('bids', [])]
+        rows += [(received_ms, sequence, _float(p), -1, _float(s), 1) for p, s, *_ in payload.get('asks', [])]
+        return rows
+
+    return []
+
+
+def _day(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime('%Y-%m-%d')
+
+
+def _safe_name(name: str) -> str:
+    return name.replace('/', '-').replace(':', '_')
+
+
+class MarketDataRecorder:
+    """
+    Background writer of WebSocket market data to partitioned columnar files.
+    """
+
+    def __init__(self, root: str = 'data/recordings', rows_per_file: int = 50000,
+                 flush_interval: float = 60.0, max_queue: int = 100000):
+        """
+        Initialize recorder.
+
+        Args:
+            root: Directory the stream partitions are written under
+            rows_per_file: Rows buffered per (stream, date, symbol) before a file is written
+            flush_interval: Max seconds a buffered row waits before it is written
+            max_queue: Messages held for the writer thread before new ones are dropped
+        """
+        self.root = root
+        self.rows_per_file = rows_per_file
+        self.flush_interval = flush_interval
+        self.logger = Logger.get_logger()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._buffers: Dict[Tuple[str, str, str], List[Tuple]] = {}
+        self._file_seq = 0
+        self._stats = {'messages': 0, 'dropped': 0, 'rows': 0, 'files': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="MarketDataRecorder")
+        self._thread.start()
+
+    def record(self, topic: str, payload: Dict, received_ms: int = None) -> bool:
+        """
+        Queue one WebSocket data message (called on the socket thread, never blocks)
+
+        Args:
+            topic: Message topic (e.g. '/contractMarket/ticker:XBTUSDTM')
+            payload: Message 'data' dict
+            received_ms: Receive time in ms (default: now)
+
+        Returns:
+            True if queued, False if the queue was full or the recorder is closed
+        """
+        if not self._running:
+            return False
+        if received_ms is None:
+            received_ms = int(time.time() * 1000)
+        try:
+            self._queue.put_nowait((topic, payload, received_ms))
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['dropped'] += 1
+            return False
+
+    def _run(self):
+        """Writer thread: parse queued messages into buffers and flush them"""
+        last_flush = time.monotonic()
+        while self._running or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=min(1.0, self.flush_interval))
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                self._buffer(*item)
+                # Drain whatever else is waiting without blocking
+                while True:
+                    try:
+                        self._buffer(*self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush()
+                last_flush = time.monotonic()
+        self._flush()
+
+    def _buffer(self, topic: str, payload: Dict, received_ms: int):
+        try:
+            mapped = stream_for_topic(topic)
+            if mapped is None:
+                return
+            stream, symbol, timeframe = mapped
+            if timeframe:
+                symbol = f'{symbol}_{timeframe}'
+            rows = parse_rows(stream, received_ms, payload)
+        except Exception as e:
+            with self._stats_lock:
+                self._stats['errors'] += 1
+            self.logger.debug(f"Recorder could not parse {topic}: {e}")
+            return
+
+        key = (stream, _day(received_ms), symbol)
+        buffer = self._buffers.setdefault(key, [])
+        buffer.extend(rows)
+        with self._stats_lock:
+            self._stats['messages'] += 1
+            self._stats['rows'] += len(rows)
+        if len(buffer) >= self.rows_per_file:
+            self._write(key, self._buffers.pop(key))
+
+    def _flush(self):
+        """Write every non-empty buffer"""
+        for key in list(self._buffers):
+            rows = self._buffers.pop(key)
+            if rows:
+                self._write(key, rows)
+
+    def _write(self, key: Tuple[str, str, str], rows: List[Tuple]):
+        stream, day, symbol = key
+        columns = STREAM_COLUMNS[stream]
+        directory = os.path.join(self.root, stream, f'date={day}', f'symbol={_safe_name(symbol)}')
+        self._file_seq += 1
+        path = os.path.join(directory, f'part-{rows[0][0]}-{self._file_seq:06d}.npz')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            arrays = {
+                name: np.fromiter((row[i] for row in rows), dtype=dtype, count=len(rows))
+                for i, (name, dtype) in enumerate(columns.items())
+            }
+            tmp_path = path[:-4] + '.tmp.npz'
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)  # Readers never see a half-written part
+            with self._stats_lock:
+                self._stats['files'] += 1
+        except Exception as e:
+            with self._stats_lock:
+                self._stats['errors'] += 1
+            self.logger.error(f"Recorder could not write {path}: {e}")
+
+    def get_stats(self) -> Dict:
+        """Counters: messages, dropped, rows, files, errors, queued"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting messages, write everything buffered and stop the writer thread"""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(timeout)
+        stats = self.get_stats()
+        self.logger.info(
+            f"📼 Market recorder closed: {stats['rows']} rows in {stats['files']} files "
+            f"({stats['dropped']} messages dropped)"
+        )
+
+
+def list_symbols(root: str, stream: str) -> List[str]:
+    """Symbol partitions recorded for a stream (file-system names), sorted"""
+    names = {
+        os.path.basename(path)[len('symbol='):]
+        for path in glob.glob(os.path.join(root, stream, 'date=*', 'symbol=*'))
+    }
+    return sorted(names)
+
+
+def load_recording(root: str, stream: str, symbol: str, start_ms: int = None,
+                   end_ms: int = None) -> Dict[str, np.ndarray]:
+    """
+    Load a recorded time range as NumPy arrays
+
+    Only the date partitions overlapping [start_ms, end_ms] are opened.
+
+    Args:
+        root: Recorder root directory
+        stream: 'ticker', 'candle' or 'level2'
+        symbol: Symbol as recorded (candles as '<symbol>_<timeframe>')
+        start_ms: Only rows received at or after this time
+        end_ms: Only rows received at or before this time
+
+    Returns:
+        {column: array} for the stream's columns, sorted by 'timestamp'
+        (empty arrays if nothing matches)
+    """
+    if stream not in STREAM_COLUMNS:
+        raise ValueError(f"Unknown stream: {stream}")
+    columns = STREAM_COLUMNS[stream]
+    base = os.path.join(root, stream)
+
+    if start_ms is not None and end_ms is not None:
+        day = datetime.fromtimestamp(start_ms / 1000, timezone.utc).date()
+        last = datetime.fromtimestamp(end_ms / 1000, timezone.utc).date()
+        days = []
+        while day <= last:
+            days.append(f'date={day.isoformat()}')
+            day += _DAY
+    else:
+        days = ['date=*']
+
+    paths = []
+    for day in days:
+        paths.extend(glob.glob(os.path.join(base, day, f'symbol={_safe_name(symbol)}', 'part-*.npz')))
+    paths = [path for path in sorted(paths) if not path.endswith('.tmp.npz')]
+
+    parts = {name: [] for name in columns}
+    for path in paths:
+        with np.load(path) as part:
+            for name in columns:
+                parts[name].append(part[name])
+
+    if not paths:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in columns.items()}
+    result = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+    timestamps = result['timestamp']
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start_ms is not None:
+        mask &= timestamps >= start_ms
+    if end_ms is not None:
+        mask &= timestamps <= end_ms
+    order = np.argsort(timestamps[mask], kind='stable')
+    return {name: array[mask][order] for name, array in result.items()}
@@ -3,11 +3,15 @@ Market scanner to find the best trading pairs
 """
 import time
 import threading
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 from datetime import datetime, timedelta
 from kucoin_client import KuCoinClient
+from async_kucoin_client import AsyncKuCoinClient
 from indicators import Indicators
+from incremental_indicators import IncrementalIndicatorEngine
+from batch_indicators import BatchIndicators
+from scan_workers import ProcessScanEvaluator, evaluate_frames
 from signals import SignalGenerator
 from logger import Logger
 from config import Config
@@ -40,6 +44,24 @@ class MarketScanner:
         self._cached_futures = None
         self._futures_cache_duration = 300  # Cache futures list for 5 minutes
 
+        # OPTIMIZATION: Stateful indicators so each scan only folds in new/revised candles
+        self.indicator_engine = IncrementalIndicatorEngine() if Config.ENABLE_INCREMENTAL_INDICATORS else None
+
+        # Persistent worker pool for SCANNER_EXECUTION_MODE='process' (created on first use)
+        self._process_evaluator = None
+
+        # Coroutine-based fetcher for SCANNER_EXECUTION_MODE='async' (created on first use)
+        self._async_client = None
+
+        # Optional MLModel; when set, each scan's opportunities are scored in one predict_batch call
+        self.ml_model = None
+
+    def _calculate_indicators(self, symbol: str, timeframe: str, ohlcv: List):
+        """Calculate indicators, incrementally when the engine is enabled"""
+        if self.indicator_engine is not None:
+            return self.indicator_engine.calculate(symbol, timeframe, ohlcv)
+        return Indicators.calculate_all(ohlcv)
+
     def scan_pair(self, symbol: str) -> Tuple[str, float, str, float, Dict]:
         """
         Scan a single trading pair with caching as fallback only
@@ -110,7 +132,7 @@ class MarketScanner:
 
             # Calculate indicators
             self.scanning_logger.debug(f"  Calculating indicators...")
-            df_1h = Indicators.calculate_all(ohlcv_1h)
+            df_1h = self._calculate_indicators(symbol, '1h', ohlcv_1h)
             if df_1h.empty:
                 self.logger.warning(f"Could not calculate indicators for {symbol}, checking cache...")
                 self.scanning_logger.warning(f"  ⚠ Indicator calculation failed, checking cache...")
@@ -130,34 +152,10 @@ class MarketScanner:
                 return result
 
             # Calculate indicators for higher timeframes
-            df_4h = Indicators.calculate_all(ohlcv_4h) if ohlcv_4h and len(ohlcv_4h) >= 20 else None
-            df_1d = Indicators.calculate_all(ohlcv_1d) if ohlcv_1d and len(ohlcv_1d) >= 20 else None
+            df_4h = self._calculate_indicators(symbol, '4h', ohlcv_4h) if ohlcv_4h and len(ohlcv_4h) >= 20 else None
+            df_1d = self._calculate_indicators(symbol, '1d', ohlcv_1d) if ohlcv_1d and len(ohlcv_1d) >= 20 else None
 
-            # Generate signal with multi-timeframe analysis
-            self.scanning_logger.debug(f"  Generating trading signal...")
-            signal, confidence, reasons = self.signal_generator.generate_signal(df_1h, df_4h, df_1d)
-
-            # Calculate score
-            score = self.signal_generator.calculate_score(df_1h)
-
-            # Extract metrics for market context (return as 6th element in tuple)
-            indicators = Indicators.get_latest_indicators(df_1h)
-            metrics = {
-                'volatility': indicators.get('bb_width', 0.03),
-                'volume_ratio': indicators.get('volume_ratio', 1.0)
-            } if indicators else None
-
-            self.scanning_logger.info(f"  Result: Signal={signal}, Score={score:.2f}, Confidence={confidence:.2%}")
-            if reasons:
-                self.scanning_logger.debug(f"  Reasons: {', '.join([f'{k}={v}' for k, v in reasons.items()])}")
-
-            result = (symbol, score, signal, confidence, reasons, metrics)
-
-            # Cache the result (thread-safe)
-            with self._cache_lock:
-                self.cache[cache_key] = (result, time.time())
-
-            return result
+            return self._evaluate_pair(symbol, df_1h, df_4h, df_1d)
 
         except Exception as e:
             self.logger.error(f"Error scanning {symbol}: {e}, checking cache...")
@@ -177,6 +175,240 @@ class MarketScanner:
                 self.cache[cache_key] = (result, time.time())
             return result
 
+    def _run_threaded(self, func, symbols: List[str], max_workers: int) -> Tuple[Dict[str, Any], int, int]:
+        """
+        Run func(symbol) for every symbol on a thread pool with timeout handling
+
+        Returns:
+            Tuple of (symbol -> result for completed calls, timeout count, error count)
+        """
+        completed = {}
+        timeout_count = 0
+        error_count = 0
+
+        # Scan pairs in parallel with timeout handling
+        scan_timeout = 10  # 10 seconds timeout per pair
+        # Calculate overall timeout accounting for parallelism
+        # With parallel execution, total time should be much less than sequential
+        overall_timeout = max(60, (len(symbols) * 2) // max_workers)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit all tasks in parallel
+            # Rate limiting: ccxt library has built-in rate limiting via enableRateLimit=True
+            # (see kucoin_client.py line 90). The library automatically throttles requests
+            # to stay within exchange limits. Additional error handling below catches rate
+            # limit exceptions if they occur despite ccxt's throttling.
+            future_to_symbol = {}
+            for symbol in symbols:
+                future_to_symbol[executor.submit(func, symbol)] = symbol
+
+            try:
+                for future in as_completed(future_to_symbol, timeout=overall_timeout):
+                    symbol = future_to_symbol.get(future, 'unknown')
+                    try:
+                        completed[symbol] = future.result(timeout=scan_timeout)
+                    except TimeoutError:
+                        timeout_count += 1
+                        self.logger.warning(f"⏱️ Scan timeout for {symbol} (>{scan_timeout}s)")
+                        self.scanning_logger.warning(f"  ⏱️ Timeout: {symbol}")
+                    except Exception as e:
+                        error_count += 1
+                        # Check if it's a rate limit error
+                        error_str = str(e).lower()
+                        if 'rate limit' in error_str or '429' in error_str:
+                            self.logger.warning(f"⚠️ Rate limit hit for {symbol}: {e}")
+                            self.scanning_logger.warning(f"  ⚠️ Rate limit: {symbol}")
+                        else:
+                            self.logger.error(f"Error scanning {symbol}: {e}")
+                            self.scanning_logger.error(f"  ✗ Error scanning {symbol}: {e}")
+            except TimeoutError:
+                # Overall timeout for entire scan exceeded
+                # Cancel remaining futures to free up resources
+                remaining_futures = [f for f in future_to_symbol.keys() if not f.done()]
+                for future in remaining_futures:
+                    future.cancel()
+                self.logger.warning(f"⏱️ Overall scan timeout exceeded ({overall_timeout}s) - cancelled {len(remaining_futures)} pending scans")
+                self.scanning_logger.warning(f"⏱️ Overall scan timeout - cancelled {len(remaining_futures)} pending scans")
+
+        return completed, timeout_count, error_count
+
+    def _fetch_pair_ohlcv(self, symbol: str) -> Dict[str, List]:
+        """Fetch the 1h/4h/1d OHLCV histories used by scan_pair"""
+        return {
+            '1h': self.client.get_ohlcv(symbol, timeframe='1h', limit=100),
+            '4h': self.client.get_ohlcv(symbol, timeframe='4h', limit=50),
+            '1d': self.client.get_ohlcv(symbol, timeframe='1d', limit=30),
+        }
+
+    def _screen_fetched(self, fetched: Dict[str, Dict[str, List]]) -> Tuple[List[Tuple], Dict[str, Dict[str, List]]]:
+        """
+        Split fetched OHLCV into error results and symbols ready for evaluation
+
+        Returns:
+            Tuple of (fallback results for unusable symbols, symbol -> OHLCV by timeframe)
+        """
+        scan_results = []
+        ready = {}
+        for symbol, ohlcv in fetched.items():
+            ohlcv_1h = ohlcv['1h']
+            if not ohlcv_1h:
+                scan_results.append(self._fallback_result(symbol, 'No OHLCV data'))
+            elif len(ohlcv_1h) < 50:
+                scan_results.append(self._fallback_result(symbol, f'Insufficient data: {len(ohlcv_1h)} candles'))
+            else:
+                ready[symbol] = ohlcv
+        return scan_results, ready
+
+    def scan_pairs_batched(self, symbols: List[str], max_workers: int) -> Tuple[List[Tuple], int, int]:
+        """
+        Scan pairs with threaded fetching and one vectorized indicator pass per timeframe
+
+        OHLCV for all symbols is fetched on the thread pool (I/O-bound), then stacked
+        into (symbols x candles x fields) tensors and run through BatchIndicators
+        once per timeframe. Signals are generated from per-symbol views of the
+        result, so results match scan_pair.
+
+        Returns:
+            Tuple of (scan results, timeout count, error count)
+        """
+        fetched, timeout_count, error_count = self._run_threaded(self._fetch_pair_ohlcv, symbols, max_workers)
+        scan_results, ready = self._screen_fetched(fetched)
+        scan_results.extend(self._evaluate_batched(ready))
+        return scan_results, timeout_count, error_count
+
+    def scan_pairs_async(self, symbols: List[str], max_workers: int) -> Tuple[List[Tuple], int, int]:
+        """
+        Scan pairs with coroutine fetching on AsyncKuCoinClient and one vectorized indicator pass
+
+        Every OHLCV request is a coroutine on the async client's event loop
+        (one shared HTTP session, NORMAL priority queue), so a full-market scan
+        needs no fetch threads. Evaluation is the same as scan_pairs_batched.
+
+        Returns:
+            Tuple of (scan results, timeout count, error count)
+        """
+        if self._async_client is None:
+            self._async_client = AsyncKuCoinClient.from_client(self.client)
+
+        scan_timeout = 10  # 10 seconds timeout per pair
+        overall_timeout = max(60, (len(symbols) * 2) // max_workers)
+        timeframes = {'1h': 100, '4h': 50, '1d': 30}
+        try:
+            outcomes = self._async_client.run(
+                self._async_client.fetch_ohlcv_many(symbols, timeframes, timeout=scan_timeout),
+                timeout=overall_timeout
+            )
+        except TimeoutError:
+            self.logger.warning(f"⏱️ Overall scan timeout exceeded ({overall_timeout}s)")
+            self.scanning_logger.warning("⏱️ Overall scan timeout - async fetch cancelled")
+            return [], len(symbols), 0
+
+        fetched = {}
+        timeout_count = 0
+        error_count = 0
+        for symbol, outcome in outcomes.items():
+            if isinstance(outcome, TimeoutError):
+                timeout_count += 1
+                self.logger.warning(f"⏱️ Scan timeout for {symbol} (>{scan_timeout}s)")
+                self.scanning_logger.warning(f"  ⏱️ Timeout: {symbol}")
+            elif isinstance(outcome, BaseException):
+                error_count += 1
+                self.logger.error(f"Error scanning {symbol}: {outcome}")
+                self.scanning_logger.error(f"  ✗ Error scanning {symbol}: {outcome}")
+            else:
+                fetched[symbol] = outcome
+
+        scan_results, ready = self._screen_fetched(fetched)
+        scan_results.extend(self._evaluate_batched(ready))
+        return scan_results, timeout_count, error_count
+
+    def _evaluate_batched(self, ready: Dict[str, Dict[str, List]]) -> List[Tuple]:
+        """Run BatchIndicators once per timeframe over fetched OHLCV and evaluate every symbol"""
+        scan_results = []
+        frames = {
+            timeframe: BatchIndicators.calculate_many({
+                symbol: ohlcv[timeframe] for symbol, ohlcv in ready.items()
+                if timeframe == '1h' or (ohlcv[timeframe] and len(ohlcv[timeframe]) >= 20)
+            })
+            for timeframe in ('1h', '4h', '1d')
+        }
+
+        for symbol in ready:
+            try:
+                df_1h = frames['1h'][symbol]
+                if df_1h.empty:
+                    scan_results.append(self._fallback_result(symbol, 'Indicator calculation failed'))
+                    continue
+                scan_results.append(
+                    self._evaluate_pair(symbol, df_1h, frames['4h'].get(symbol), frames['1d'].get(symbol))
+                )
+            except Exception as e:
+                self.logger.error(f"Error scanning {symbol}: {e}")
+                scan_results.append(self._fallback_result(symbol, str(e)))
+
+        return scan_results
+
+    def scan_pairs_multiprocess(self, symbols: List[str], max_workers: int) -> Tuple[List[Tuple], int, int]:
+        """
+        Scan pairs with threaded fetching and signal evaluation on a process pool
+
+        Candles are handed to the persistent ProcessScanEvaluator through shared
+        memory; workers compute indicators, signals and scores off the GIL.
+
+        Returns:
+            Tuple of (scan results, timeout count, error count)
+        """
+        fetched, timeout_count, error_count = self._run_threaded(self._fetch_pair_ohlcv, symbols, max_workers)
+        scan_results, ready = self._screen_fetched(fetched)
+
+        if self._process_evaluator is None:
+            self._process_evaluator = ProcessScanEvaluator(Config.SCANNER_PROCESS_WORKERS)
+        evaluations = self._process_evaluator.evaluate(ready, self.signal_generator.adaptive_threshold)
+
+        for symbol in ready:
+            evaluation = evaluations.get(symbol)
+            if evaluation is None or isinstance(evaluation, Exception):
+                error = str(evaluation) if evaluation is not None else 'No evaluation result'
+                self.logger.error(f"Error scanning {symbol}: {error}")
+                scan_results.append(self._fallback_result(symbol, error))
+            else:
+                scan_results.append(self._store_result(symbol, *evaluation))
+
+        return scan_results, timeout_count, error_count
+
+    def _evaluate_pair(self, symbol: str, df_1h, df_4h, df_1d) -> Tuple:
+        """Generate signal, score and context metrics from indicator frames and cache the result"""
+        self.scanning_logger.debug(f"  Generating trading signal...")
+        return self._store_result(symbol, *evaluate_frames(self.signal_generator, df_1h, df_4h, df_1d))
+
+    def _store_result(self, symbol: str, score: float, signal: str, confidence: float,
+                      reasons: Dict, metrics: Dict) -> Tuple:
+        """Log and cache an evaluated scan result"""
+        self.scanning_logger.info(f"  Result: Signal={signal}, Score={score:.2f}, Confidence={confidence:.2%}")
+        if reasons:
+            self.scanning_logger.debug(f"  Reasons: {', '.join([f'{k}={v}' for k, v in reasons.items()])}")
+
+        result = (symbol, score, signal, confidence, reasons, metrics)
+
+        # Cache the result (thread-safe)
+        with self._cache_lock:
+            self.cache[symbol] = (result, time.time())
+
+        return result
+
+    def _fallback_result(self, symbol: str, error: str) -> Tuple:
+        """Return a fresh cached scan result if available, otherwise cache and return an error result"""
+        with self._cache_lock:
+            if symbol in self.cache:
+                cached_data, timestamp = self.cache[symbol]
+                cache_age = time.time() - timestamp
+                if cache_age < self.cache_duration:
+                    self.logger.info(f"Using cached data as fallback for {symbol} (age: {int(cache_age)}s)")
+                    return cached_data
+            result = (symbol, 0.0, 'HOLD', 0.0, {'error': error}, None)
+            self.cache[symbol] = (result, time.time())
+        return result
+
     def _filter_high_priority_pairs(self, symbols: List[str], futures_data: List[Dict]) -> List[str]:
         """
         Smart filtering to prioritize high-quality pairs
@@ -209,6 +441,38 @@ class MarketScanner:
 
         return priority_pairs
 
+    def _score_with_ml(self, results: List[Dict], indicators_list: List[Dict]):
+        """
+        Attach 'ml_signal'/'ml_confidence' to opportunities using one batched model call
+
+        With Config.ENABLE_ML_SCAN_RANKING a confident (> 0.5) BUY/SELL
+        prediction also scales the opportunity's score up when it agrees with
+        the scan signal and down when it contradicts it; otherwise the ranking
+        is unchanged. Results without indicators (e.g. cached fallbacks) are
+        left unscored.
+        """
+        if self.ml_model is None or not results:
+            return
+        scored = [i for i, indicators in enumerate(indicators_list) if indicators]
+        if not scored:
+            return
+        try:
+            start = time.perf_counter()
+            predictions = self.ml_model.predict_batch([indicators_list[i] for i in scored])
+            for i, (ml_signal, ml_confidence) in zip(scored, predictions):
+                result = results[i]
+                result['ml_signal'] = ml_signal
+                result['ml_confidence'] = ml_confidence
+                if Config.ENABLE_ML_SCAN_RANKING and ml_signal != 'HOLD' and ml_confidence > 0.5 \
+                        and 'score' in result:
+                    edge = ml_confidence - 0.5
+                    result['score'] *= (1 + edge) if ml_signal == result.get('signal') else (1 - edge)
+            self.scanning_logger.info(
+                f"ML scored {len(scored)} opportunities in one batch ({(time.perf_counter() - start) * 1000:.1f}ms)"
+            )
+        except Exception as e:
+            self.logger.debug(f"Batched ML scoring error: {e}")
+
     def scan_all_pairs(self, max_workers: int = None, use_cache: bool = True) -> List[Dict]:
         """
         Scan all available trading pairs in parallel with smart filtering
@@ -261,86 +525,55 @@ class MarketScanner:
         self.scanning_logger.info(f"\nScanning pairs in parallel...")
 
         results = []
+        opportunity_indicators = []
         scan_count = 0
-        timeout_count = 0
-        error_count = 0
-
-        # Scan pairs in parallel with timeout handling
-        scan_timeout = 10  # 10 seconds timeout per pair
-        # Calculate overall timeout accounting for parallelism
-        # With parallel execution, total time should be much less than sequential
-        overall_timeout = max(60, (len(filtered_symbols) * 2) // max_workers)
 
         # Track aggregate metrics for market context analysis
         total_volatility = 0.0
         total_volume_ratio = 0.0
         metrics_count = 0
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks in parallel
-            # Rate limiting: ccxt library has built-in rate limiting via enableRateLimit=True
-            # (see kucoin_client.py line 90). The library automatically throttles requests
-            # to stay within exchange limits. Additional error handling below catches rate
-            # limit exceptions if they occur despite ccxt's throttling.
-            future_to_symbol = {}
-            for symbol in filtered_symbols:
-                future_to_symbol[executor.submit(self.scan_pair, symbol)] = symbol
-
-            try:
-                for future in as_completed(future_to_symbol, timeout=overall_timeout):
-                    try:
-                        # Get result with timeout (now includes metrics as 6th element)
-                        scan_result = future.result(timeout=scan_timeout)
-                        symbol, score, signal, confidence, reasons = scan_result[:5]
-                        metrics = scan_result[5] if len(scan_result) > 5 else None
-
-                        scan_count += 1
-
-                        # Aggregate metrics for market context
-                        if metrics:
-                            total_volatility += metrics.get('volatility', 0.03)
-                            total_volume_ratio += metrics.get('volume_ratio', 1.0)
-                            metrics_count += 1
-
-                        # Log all scanned pairs for debugging
-                        self.logger.debug(f"Scanned {symbol}: Signal={signal}, Confidence={confidence:.2f}, Score={score:.2f}")
-
-                        if signal != 'HOLD' and score > 0:
-                            results.append({
-                                'symbol': symbol,
-                                'score': score,
-                                'signal': signal,
-                                'confidence': confidence,
-                                'reasons': reasons
-                            })
-                            self.scanning_logger.info(f"✓ Found opportunity: {symbol} - {signal} (score: {score:.2f}, confidence: {confidence:.2%})")
-                        else:
-                            self.logger.debug(f"Skipped {symbol}: signal={signal}, score={score:.2f}")
-                            self.scanning_logger.debug(f"  Skipped {symbol}: {signal} (score: {score:.2f})")
-                    except TimeoutError:
-                        timeout_count += 1
-                        symbol = future_to_symbol.get(future, 'unknown')
-                        self.logger.warning(f"⏱️ Scan timeout for {symbol} (>{scan_timeout}s)")
-                        self.scanning_logger.warning(f"  ⏱️ Timeout: {symbol}")
-                    except Exception as e:
-                        error_count += 1
-                        symbol = future_to_symbol.get(future, 'unknown')
-                        # Check if it's a rate limit error
-                        error_str = str(e).lower()
-                        if 'rate limit' in error_str or '429' in error_str:
-                            self.logger.warning(f"⚠️ Rate limit hit for {symbol}: {e}")
-                            self.scanning_logger.warning(f"  ⚠️ Rate limit: {symbol}")
-                        else:
-                            self.logger.error(f"Error scanning {symbol}: {e}")
-                            self.scanning_logger.error(f"  ✗ Error scanning {symbol}: {e}")
-            except TimeoutError:
-                # Overall timeout for entire scan exceeded
-                # Cancel remaining futures to free up resources
-                remaining_futures = [f for f in future_to_symbol.keys() if not f.done()]
-                for future in remaining_futures:
-                    future.cancel()
-                self.logger.warning(f"⏱️ Overall scan timeout exceeded ({overall_timeout}s) - cancelled {len(remaining_futures)} pending scans")
-                self.scanning_logger.warning(f"⏱️ Overall scan timeout - cancelled {len(remaining_futures)} pending scans")
+        if Config.SCANNER_EXECUTION_MODE == 'batch':
+            scan_results, timeout_count, error_count = self.scan_pairs_batched(filtered_symbols, max_workers)
+        elif Config.SCANNER_EXECUTION_MODE == 'process':
+            scan_results, timeout_count, error_count = self.scan_pairs_multiprocess(filtered_symbols, max_workers)
+        elif Config.SCANNER_EXECUTION_MODE == 'async':
+            scan_results, timeout_count, error_count = self.scan_pairs_async(filtered_symbols, max_workers)
+        else:
+            pair_results, timeout_count, error_count = self._run_threaded(self.scan_pair, filtered_symbols, max_workers)
+            scan_results = list(pair_results.values())
+
+        for scan_result in scan_results:
+            # Scan results include metrics as 6th element
+            symbol, score, signal, confidence, reasons = scan_result[:5]
+            metrics = scan_result[5] if len(scan_result) > 5 else None
+
+            scan_count += 1
+
+            # Aggregate metrics for market context
+            if metrics:
+                total_volatility += metrics.get('volatility', 0.03)
+                total_volume_ratio += metrics.get('volume_ratio', 1.0)
+                metrics_count += 1
+
+            # Log all scanned pairs for debugging
+            self.logger.debug(f"Scanned {symbol}: Signal={signal}, Confidence={confidence:.2f}, Score={score:.2f}")
+
+            if signal != 'HOLD' and score > 0:
+                results.append({
+                    'symbol': symbol,
+                    'score': score,
+                    'signal': signal,
+                    'confidence': confidence,
+                    'reasons': reasons
+                })
+                opportunity_indicators.append(metrics.get('indicators') if metrics else None)
+                self.scanning_logger.info(f"✓ Found opportunity: {symbol} - {signal} (score: {score:.2f}, confidence: {confidence:.2%})")
+            else:
+                self.logger.debug(f"Skipped {symbol}: signal={signal}, score={score:.2f}")
+                self.scanning_logger.debug(f"  Skipped {symbol}: {signal} (score: {score:.2f})")
+
+        self._score_with_ml(results, opportunity_indicators)
 
         # Sort by score descending
         results.sort(key=lambda x: x['score'], reverse=True)
@@ -519,4 +752,15 @@ class MarketScanner:
             self.cache.clear()
             self.scan_results_cache = []
             self.last_full_scan = None
+        if self.indicator_engine is not None:
+            self.indicator_engine.reset()
         self.logger.info("Market scanner cache cleared")
+
+    def shutdown(self):
+        """Release scanner worker processes and the async client"""
+        if self._process_evaluator is not None:
+            self._process_evaluator.shutdown()
+            self._process_evaluator = None
+        if self._async_client is not None:
+            self._async_client.shutdown()
+            self._async_client = None
@@ -5,19 +5,20 @@ Provides deep learning capabilities alongside traditional ML models
 import os
 import numpy as np
 from typing import Dict, Tuple, Optional
+from lazy_components import module_available
 from logger import Logger
 
-try:
-    import tensorflow as tf
-    from tensorflow import keras
-    from tensorflow.keras import layers, models, callbacks
-    TENSORFLOW_AVAILABLE = True
-    KerasModel = keras.Model
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-    KerasModel = object  # Fallback type
+# Checked without importing: TensorFlow itself is imported on first use (see _keras)
+TENSORFLOW_AVAILABLE = module_available('tensorflow')
+if not TENSORFLOW_AVAILABLE:
     Logger.get_logger().warning("TensorFlow not available. Neural network features disabled.")
 
+
+def _keras():
+    """Keras module, imported on first call (TensorFlow takes seconds to import)"""
+    from tensorflow import keras
+    return keras
+
 class NeuralNetworkModel:
     """Deep learning model for trading signal prediction"""
 
@@ -37,12 +38,14 @@ class NeuralNetworkModel:
         # Load existing model if available
         self.load_model()
 
-    def create_model(self) -> Optional[KerasModel]:
+    def create_model(self) -> Optional['keras.Model']:
         """Create a neural network architecture optimized for trading signals"""
         if not TENSORFLOW_AVAILABLE:
             return None
 
         try:
+            keras = _keras()
+            layers, models = keras.layers, keras.models
             model = models.Sequential([
                 # Input layer with batch normalization
                 layers.Dense(128, activation='relu', input_shape=(self.input_dim,)),
@@ -86,7 +89,7 @@ class NeuralNetworkModel:
 
         try:
             if os.path.exists(self.model_path):
-                self.model = keras.models.load_model(self.model_path)
+                self.model = _keras().models.load_model(self.model_path)
                 self.logger.info(f"Loaded neural network model from {self.model_path}")
             else:
                 self.logger.info("No existing neural network model found")
@@ -132,6 +135,7 @@ class NeuralNetworkModel:
                     return False
 
             # Prepare callbacks
+            callbacks = _keras().callbacks
             early_stopping = callbacks.EarlyStopping(
                 monitor='val_loss',
                 patience=10,
@@ -5,16 +5,112 @@ This module performs Monte Carlo simulation to identify fragile parameters
 that can significantly impact strategy performance.
 
 AUDIT FIX: HIGH-3 - Parameter sensitivity analysis
+
+Every distinct parameter set is backtested once per sweep: variations shared
+between parameters (such as the base values) are deduplicated, the remaining
+backtests run on a process pool, and results are kept in a content-addressed
+cache keyed on the parameter dict plus fingerprints of the data and of the
+backtest function (its bytecode, and the pickled state of callable objects,
+so edited functions and differently configured instances never share
+results). The cache is persisted as sensitivity_cache.json next to the
+results file so later and overlapping sweeps reuse earlier backtests.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Callable, Any
+from typing import Dict, List, Tuple, Callable, Any, Optional
 from dataclasses import dataclass
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import functools
+import hashlib
 import json
+import os
+import pickle
+import types
 from datetime import datetime
 
+CACHE_FILENAME = 'sensitivity_cache.json'
+
+
+def convert_to_json_serializable(obj):
+    """Convert numpy types to Python native types"""
+    if isinstance(obj, (np.integer, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64)):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {k: convert_to_json_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_to_json_serializable(item) for item in obj]
+    elif obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    else:
+        return str(obj)
+
+
+def fingerprint_data(data: Any) -> str:
+    """
+    Content hash of the backtest input data
+
+    Args:
+        data: DataFrame, Series, NumPy array, or anything with a stable repr
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        columns = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr(columns).encode())
+    elif isinstance(data, np.ndarray):
+        digest.update(repr((data.shape, data.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+    else:
+        digest.update(repr(data).encode())
+    return digest.hexdigest()
+
+
+def _hash_code(code: types.CodeType, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, digest)  # Nested functions, lambdas and comprehensions
+        else:
+            digest.update(repr(const).encode())
+
+
+def fingerprint_callable(func: Callable) -> str:
+    """
+    Hash identifying a backtest function and what it computes
+
+    Args:
+        func: Function, functools.partial, bound method or callable object
+
+    Returns:
+        Hex SHA-256 digest of the qualified name and bytecode (constants and
+        nested code included), plus the pickled state of anything that is not
+        a plain function (partial arguments, instance attributes)
+    """
+    digest = hashlib.sha256()
+    target = func.func if isinstance(func, functools.partial) else func
+    named = target if hasattr(target, '__qualname__') else type(target)
+    digest.update(f"{named.__module__}.{named.__qualname__}".encode())
+
+    code = getattr(target, '__code__', None) or getattr(getattr(type(target), '__call__', None), '__code__', None)
+    if code is not None:
+        _hash_code(code, digest)
+    if not isinstance(func, types.FunctionType):
+        try:
+            digest.update(pickle.dumps(func))
+        except Exception:
+            digest.update(repr(func).encode())
+    return digest.hexdigest()
+
 
 @dataclass
 class ParameterSpec:
@@ -63,17 +159,143 @@ class ParameterSpec:
 class ParameterSensitivityAnalyzer:
     """Analyze parameter sensitivity through Monte Carlo simulation"""
 
-    def __init__(self, backtest_func: Callable, metric_name: str = 'sharpe_ratio'):
+    def __init__(self, backtest_func: Callable, metric_name: str = 'sharpe_ratio',
+                 data: Any = None, cache_path: str = None,
+                 max_workers: int = 0, func_version: str = None,
+                 results_path: str = 'sensitivity_analysis.json'):
         """
         Initialize sensitivity analyzer
 
         Args:
             backtest_func: Function that takes params dict and returns results dict
+                           (module-level for parallel runs, so it can be pickled)
             metric_name: Name of metric to analyze (e.g., 'sharpe_ratio', 'total_pnl')
+            data: Data the backtest runs on (or a precomputed fingerprint string).
+                  Results are only persisted when this is given.
+            cache_path: JSON file holding cached backtest results
+                        (default: sensitivity_cache.json next to results_path)
+            max_workers: Worker processes for parallel runs (0 = one per CPU)
+            func_version: Identifies the backtest in cache keys instead of
+                          fingerprint_callable(backtest_func), which is taken
+                          once here (set it for callables whose pickled state
+                          changes between runs, e.g. ones holding a result log)
+            results_path: Default file for save_results
         """
         self.backtest_func = backtest_func
         self.metric_name = metric_name
         self.results = []
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.func_fingerprint = func_version if func_version is not None else fingerprint_callable(backtest_func)
+
+        if data is None:
+            self.data_fingerprint = None
+        else:
+            self.data_fingerprint = data if isinstance(data, str) else fingerprint_data(data)
+        self.results_path = results_path
+        # A default cache follows the results file, wherever save_results writes it
+        self._cache_follows_results = cache_path is None
+        if cache_path is None:
+            cache_path = self._cache_path_for(results_path)
+        self.cache_path = cache_path if self.data_fingerprint is not None else None
+        self._cache: Dict[str, Dict] = {}
+        self._cache_dirty = False
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._load_cache()
+
+    def cache_key(self, params: Dict[str, Any]) -> str:
+        """Content address of one backtest: parameter dict + data fingerprint + backtest function"""
+        payload = json.dumps({
+            'func': self.func_fingerprint,
+            'data': self.data_fingerprint,
+            'params': convert_to_json_serializable(params)
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _cache_path_for(results_path: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(results_path)), CACHE_FILENAME)
+
+    def _load_cache(self):
+        if self.cache_path:
+            self._cache = self._read_cache(self.cache_path)
+
+    @staticmethod
+    def _read_cache(path: str) -> Dict[str, Dict]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f).get('entries', {})
+        except Exception as e:
+            print(f"Could not load sensitivity cache {path}: {e}")
+            return {}
+
+    def save_cache(self):
+        """Persist cached backtest results"""
+        if not self.cache_path or not self._cache_dirty:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'updated': datetime.now().isoformat(), 'entries': self._cache}, f)
+        os.replace(tmp_path, self.cache_path)
+        self._cache_dirty = False
+
+    def _store(self, key: str, backtest_results: Dict) -> Dict:
+        # Stored as it reads back from the cache file, so fresh runs and cache hits look alike
+        self._cache[key] = json.loads(json.dumps(convert_to_json_serializable(backtest_results)))
+        self._cache_dirty = self._cache_dirty or self.cache_path is not None
+        return copy.deepcopy(self._cache[key])
+
+    def _run_backtest(self, params: Dict[str, Any]) -> Dict:
+        """Run one backtest through the cache"""
+        key = self.cache_key(params)
+        if key in self._cache:
+            self.cache_hits += 1
+            return copy.deepcopy(self._cache[key])
+        self.cache_misses += 1
+        return self._store(key, self.backtest_func(params))
+
+    def _variation_params(self, param_spec: ParameterSpec, base_params: Dict[str, Any],
+                          num_samples: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        variations = []
+        for value in param_spec.get_variations(num_samples):
+            # Create params with variation
+            test_params = base_params.copy()
+            test_params[param_spec.name] = value
+            variations.append((value, test_params))
+        return variations
+
+    def _prefetch_parallel(self, param_sets: List[Dict[str, Any]]):
+        """Backtest every uncached, distinct parameter set on a process pool"""
+        pending = {}
+        for params in param_sets:
+            key = self.cache_key(params)
+            if key not in self._cache and key not in pending:
+                pending[key] = params
+        if not pending:
+            return
+
+        try:
+            pickle.dumps(self.backtest_func)
+        except Exception:
+            print("Backtest function cannot be pickled, running sensitivity backtests sequentially")
+            return
+
+        print(f"Running {len(pending)} backtests on {self.max_workers} processes "
+              f"({len(param_sets) - len(pending)} reused)")
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            futures = {key: executor.submit(self.backtest_func, params) for key, params in pending.items()}
+            for key, future in futures.items():
+                try:
+                    self._store(key, future.result())
+                    self.cache_misses += 1
+                except Exception:
+                    # Left uncached; analyze_single_parameter reruns it and records the error
+                    pass
 
     def analyze_single_parameter(self,
                                 param_spec: ParameterSpec,
@@ -90,17 +312,11 @@ class ParameterSensitivityAnalyzer:
         Returns:
             Dict with sensitivity analysis results
         """
-        variations = param_spec.get_variations(num_samples)
-
         results = []
-        for value in variations:
-            # Create params with variation
-            test_params = base_params.copy()
-            test_params[param_spec.name] = value
-
-            # Run backtest
+        for value, test_params in self._variation_params(param_spec, base_params, num_samples):
+            # Run backtest (cached results are reused)
             try:
-                backtest_results = self.backtest_func(test_params)
+                backtest_results = self._run_backtest(test_params)
                 metric_value = backtest_results.get(self.metric_name, 0)
 
                 results.append({
@@ -182,30 +398,20 @@ class ParameterSensitivityAnalyzer:
         all_results = []
 
         if parallel:
-            # Parallel processing (faster but more resource-intensive)
-            with ProcessPoolExecutor() as executor:
-                futures = {
-                    executor.submit(
-                        self.analyze_single_parameter,
-                        spec,
-                        base_params,
-                        num_samples
-                    ): spec for spec in parameter_specs
-                }
-
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        all_results.append(result)
-                    except Exception as e:
-                        spec = futures[future]
-                        print(f"Error analyzing {spec.name}: {e}")
-        else:
-            # Sequential processing
-            for spec in parameter_specs:
+            # Parallel processing: every distinct uncached parameter set across all specs
+            # goes to the process pool once; the per-spec analysis below reads the cache
+            self._prefetch_parallel([
+                params for spec in parameter_specs
+                for _, params in self._variation_params(spec, base_params, num_samples)
+            ])
+
+        for spec in parameter_specs:
+            if not parallel:
                 print(f"Analyzing parameter: {spec.name}")
-                result = self.analyze_single_parameter(spec, base_params, num_samples)
-                all_results.append(result)
+            result = self.analyze_single_parameter(spec, base_params, num_samples)
+            all_results.append(result)
+
+        self.save_cache()
 
         # Sort by sensitivity score (highest first)
         all_results.sort(key=lambda x: x['sensitivity_score'], reverse=True)
@@ -290,26 +496,9 @@ class ParameterSensitivityAnalyzer:
 
         return "\n".join(lines)
 
-    def save_results(self, results: List[Dict], filename: str = "sensitivity_analysis.json"):
-        """Save results to JSON file"""
-
-        def convert_to_json_serializable(obj):
-            """Convert numpy types to Python native types"""
-            if isinstance(obj, (np.integer, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float64)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {k: convert_to_json_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_to_json_serializable(item) for item in obj]
-            elif obj is None or isinstance(obj, (str, int, float, bool)):
-                return obj
-            else:
-                return str(obj)
-
+    def save_results(self, results: List[Dict], filename: str = None):
+        """Save results to JSON file (default: results_path); a default cache is saved beside it"""
+        filename = filename or self.results_path
         # Convert results to serializable format
         serializable_results = []
         for result in results:
@@ -330,6 +519,14 @@ class ParameterSensitivityAnalyzer:
             }, f, indent=2)
 
         print(f"Results saved to {filename}")
+        if self._cache_follows_results and self.cache_path is not None:
+            cache_path = self._cache_path_for(filename)
+            if cache_path != self.cache_path:
+                # Results moved to another directory: merge into the cache kept there
+                self._cache = {**self._read_cache(cache_path), **self._cache}
+                self.cache_path = cache_path
+                self._cache_dirty = bool(self._cache)
+        self.save_cache()
 
 
 def example_usage():
@@ -10,6 +10,7 @@ from collections import deque
 from datetime import datetime
 from typing import Dict, Optional
 from logger import Logger
+from rate_limiter import get_rate_limit_metrics
 
 
 class PerformanceMonitor:
@@ -35,6 +36,9 @@ class PerformanceMonitor:
         self._api_retry_count = 0
         self._last_api_reset = time.time()
 
+        # Request coalescing / micro-cache counters per endpoint
+        self._request_cache: Dict[str, Dict[str, int]] = {}
+
         # Thread safety
         self._lock = threading.Lock()
 
@@ -74,6 +78,12 @@ class PerformanceMonitor:
         if duration > self.API_THRESHOLD:
             self.logger.debug(f"Slow API call: {duration:.2f}s")
 
+    def record_request_cache(self, endpoint: str, outcome: str):
+        """Record a request cache outcome ('hits', 'misses' or 'coalesced') for an endpoint"""
+        with self._lock:
+            counters = self._request_cache.setdefault(endpoint, {'hits': 0, 'misses': 0, 'coalesced': 0})
+            counters[outcome] += 1
+
     def record_position_update(self, duration: float):
         """Record position update duration"""
         with self._lock:
@@ -127,6 +137,14 @@ class PerformanceMonitor:
                     'avg_time': avg_update_time,
                     'samples': len(self._position_update_times),
                     'last_time': self._position_update_times[-1] if self._position_update_times else None
+                },
+                'rate_limit': get_rate_limit_metrics(),
+                'request_cache': {
+                    endpoint: {
+                        **counters,
+                        'saved_rate': (counters['hits'] + counters['coalesced']) / max(1, sum(counters.values()))
+                    }
+                    for endpoint, counters in self._request_cache.items()
                 }
             }
 
@@ -173,6 +191,19 @@ class PerformanceMonitor:
         if api['retry_rate'] > 0.10:  # > 10% retries
             self.logger.warning(f"  ⚠️  HIGH RETRY RATE: {api['retry_rate']:.1%}")
 
+        # Rate limiter pools
+        for pool, pool_stats in stats['rate_limit'].items():
+            self.logger.info(f"Rate Limit Pool ({pool}):")
+            self.logger.info(f"  Utilization: {pool_stats['utilization']:.1%}")
+            self.logger.info(f"  Waits: {pool_stats['waits']} (max {pool_stats['max_wait']:.2f}s)")
+            self.logger.info(f"  429 penalties: {pool_stats['penalties']}")
+
+        # Request coalescing / micro-cache
+        for endpoint, cache in stats['request_cache'].items():
+            self.logger.info(f"Request Cache ({endpoint}):")
+            self.logger.info(f"  Hits: {cache['hits']}, Coalesced: {cache['coalesced']}, Misses: {cache['misses']}")
+            self.logger.info(f"  Requests saved: {cache['saved_rate']:.1%}")
+
         # Position updates
         update = stats['position_update']
         if update['samples'] > 0:
@@ -188,6 +219,7 @@ class PerformanceMonitor:
             self._api_call_count = 0
             self._api_error_count = 0
             self._api_retry_count = 0
+            self._request_cache.clear()
             self._last_api_reset = time.time()
 
     def check_health(self) -> tuple[bool, str]:
@@ -0,0 +1,266 @@
+"""
+Portfolio-level multi-symbol backtesting on a shared event clock
+
+The live bot picks among many symbols under MAX_OPEN_POSITIONS and the
+RiskManager's diversification rules, with one margin balance shared by every
+position. This backtester replays that setting: each symbol's candles come
+from its own iterator, the iterators are heap-merged into one time-ordered
+stream, and all candles with the same timestamp form one step of the clock.
+
+Features:
+- heapq.merge of per-symbol candle iterators (one candle per symbol in memory)
+- Candles streamed from the CandleStore or CSV files, never one big DataFrame
+- RiskManager.should_open_position and check_portfolio_diversification gate
+  every entry; simulated daily loss feeds the daily loss limit
+- Shared margin balance with BacktestEngine fee, funding and slippage accounting
+- Bounded per-symbol lookback window handed to the strategy
+"""
+
+import heapq
+import itertools
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from backtest_engine import BacktestEngine
+from config import Config
+from logger import Logger
+from risk_manager import RiskManager
+
+_DAY_MS = 86_400_000
+
+
+def iter_csv_candles(path: str, chunksize: int = 10000) -> Iterator[List]:
+    """
+    Stream candles from a CSV file with timestamp, open, high, low, close, volume columns
+
+    Only one chunk of rows is held in memory at a time.
+
+    Yields:
+        [timestamp, open, high, low, close, volume]
+    """
+    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        for row in chunk[columns].itertuples(index=False, name=None):
+            yield [int(row[0]), *map(float, row[1:])]
+
+
+def _tag(symbol: str, candles: Iterable[List]) -> Iterator[Tuple[int, str, List]]:
+    for candle in candles:
+        yield int(candle[0]), symbol, candle
+
+
+class PortfolioBacktester:
+    """
+    Multi-symbol backtest with shared margin and live-bot entry rules.
+    """
+
+    def __init__(self, initial_balance: float = 10000,
+                 risk_manager: Optional[RiskManager] = None,
+                 trading_fee_rate: float = 0.0006,
+                 funding_rate: float = 0.0001,
+                 slippage_bps: float = 5.0,
+                 lookback: int = 100):
+        """
+        Initialize portfolio backtester
+
+        Args:
+            initial_balance: Starting capital shared by all symbols
+            risk_manager: RiskManager applying the entry rules (default: built from Config)
+            trading_fee_rate: Trading fee as decimal
+            funding_rate: Funding rate per 8 hours
+            slippage_bps: Expected slippage in basis points
+            lookback: Candles per symbol kept for the strategy
+        """
+        self.logger = Logger.get_logger()
+        self.engine = BacktestEngine(initial_balance=initial_balance,
+                                     trading_fee_rate=trading_fee_rate,
+                                     funding_rate=funding_rate,
+                                     slippage_bps=slippage_bps)
+        if risk_manager is None:
+            risk_manager = RiskManager(
+                Config.MAX_POSITION_SIZE or initial_balance,
+                Config.RISK_PER_TRADE or 0.02,
+                Config.MAX_OPEN_POSITIONS
+            )
+        self.risk_manager = risk_manager
+        self.lookback = lookback
+
+        self.positions: Dict[str, Dict] = {}
+        self.rejected_signals = Counter()
+        self.steps = 0
+        self.max_concurrent_positions = 0
+
+    def run(self, sources: Dict[str, Iterable[List]], strategy_func: Callable,
+            use_next_bar_execution: bool = True) -> Dict:
+        """
+        Run the portfolio backtest
+
+        Args:
+            sources: Symbol -> iterable of [timestamp, open, high, low, close, volume],
+                     each oldest first (e.g. CandleStore.iter_candles / iter_csv_candles)
+            strategy_func: Function taking (symbol, history, balance, positions) and
+                           returning a signal dict or None. history is a deque of the
+                           symbol's recent candles (newest last), positions maps
+                           symbol -> open position. A 'score' key ranks competing
+                           signals in the same step (highest first).
+            use_next_bar_execution: If True, fill at the symbol's next candle open
+
+        Returns:
+            Backtest results dictionary (BacktestEngine.calculate_results plus
+            'symbols', 'steps', 'max_concurrent_positions' and 'rejected_signals')
+        """
+        engine = self.engine
+        engine.reset()
+        self.positions = {}
+        self.rejected_signals = Counter()
+        self.steps = 0
+        self.max_concurrent_positions = 0
+        # Daily loss is simulated on the backtest clock, not taken from live state
+        self.risk_manager.daily_loss = 0.0
+
+        histories: Dict[str, Deque[List]] = {symbol: deque(maxlen=self.lookback) for symbol in sources}
+        last_close: Dict[str, float] = {}
+        pending: Dict[str, Dict] = {}
+        day, day_start_equity = None, engine.initial_balance
+
+        self.logger.info(f"Starting portfolio backtest over {len(sources)} symbols")
+        try:
+            merged = heapq.merge(*(_tag(symbol, candles) for symbol, candles in sources.items()),
+                                 key=lambda event: (event[0], event[1]))
+
+            for ts, events in itertools.groupby(merged, key=lambda event: event[0]):
+                events = list(events)
+                self.steps += 1
+
+                # Fill entries decided on the previous step at this candle's open
+                for _, symbol, candle in events:
+                    signal = pending.pop(symbol, None)
+                    if signal is not None:
+                        self._open(symbol, signal, float(candle[1]), candle, ts)
+
+                # Exits at the close, as in BacktestEngine.check_exits
+                for _, symbol, candle in events:
+                    close = float(candle[4])
+                    last_close[symbol] = close
+                    histories[symbol].append(candle)
+                    position = self.positions.get(symbol)
+                    if position is not None:
+                        reason = self._exit_reason(position, close)
+                        if reason:
+                            self._close(symbol, close, reason, ts)
+
+                equity = self._equity(last_close)
+                engine.equity_curve.append({'timestamp': ts, 'balance': engine.balance, 'equity': equity})
+                if ts // _DAY_MS != day:
+                    day, day_start_equity = ts // _DAY_MS, equity
+                self.risk_manager.daily_loss = max(0.0, (day_start_equity - equity) / day_start_equity) \
+                    if day_start_equity > 0 else 0.0
+
+                self._collect_entries(events, histories, pending, strategy_func,
+                                      use_next_bar_execution, ts)
+                self.max_concurrent_positions = max(self.max_concurrent_positions, len(self.positions))
+
+            for symbol in list(self.positions):
+                self._close(symbol, last_close[symbol], 'backtest_end', None)
+
+            results = engine.calculate_results()
+            results.update({
+                'symbols': len(sources),
+                'steps': self.steps,
+                'max_concurrent_positions': self.max_concurrent_positions,
+                'rejected_signals': dict(self.rejected_signals),
+            })
+            self.logger.info(
+                f"Portfolio backtest complete: {self.steps} steps, "
+                f"{results.get('total_trades', 0)} trades, final balance ${engine.balance:.2f}"
+            )
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error in portfolio backtest: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return {}
+
+    def _collect_entries(self, events: List[Tuple[int, str, List]], histories: Dict[str, Deque[List]],
+                         pending: Dict[str, Dict], strategy_func: Callable,
+                         use_next_bar_execution: bool, ts: int):
+        """Ask the strategy for signals and admit them through the risk checks"""
+        candidates = []
+        for _, symbol, candle in events:
+            if symbol in self.positions or symbol in pending:
+                continue
+            signal = strategy_func(symbol, histories[symbol], self.engine.balance, self.positions)
+            if signal and signal != 'HOLD':
+                candidates.append((signal.get('score', 0), symbol, signal, candle))
+
+        # Best-scored symbols get the free slots first, like MarketScanner.get_best_pairs
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for _, symbol, signal, candle in candidates:
+            # Pending fills already hold a slot
+            held = list(self.positions) + list(pending)
+            should_open, reason = self.risk_manager.should_open_position(len(held), self.engine.balance)
+            if not should_open:
+                self.rejected_signals['risk_limit'] += 1
+                self.logger.debug(f"Portfolio backtest skip {symbol}: {reason}")
+                continue
+            is_diversified, reason = self.risk_manager.check_portfolio_diversification(symbol, held)
+            if not is_diversified:
+                self.rejected_signals['diversification'] += 1
+                self.logger.debug(f"Portfolio backtest skip {symbol}: {reason}")
+                continue
+
+            if use_next_bar_execution:
+                pending[symbol] = signal
+            else:
+                self._open(symbol, signal, float(candle[4]), candle, ts)
+
+    def _open(self, symbol: str, signal: Dict, price: float, candle: List, ts: int):
+        position = self.engine._open_position(
+            side=signal.get('side', 'long'),
+            amount=signal.get('amount', 100),
+            leverage=signal.get('leverage', 10),
+            entry_price=price,
+            volume=float(candle[5]),
+            stop_loss=signal.get('stop_loss'),
+            take_profit=signal.get('take_profit'),
+            entry_time=ts
+        )
+        if position is None:
+            self.rejected_signals['margin'] += 1
+            return
+        position['symbol'] = symbol
+        self.positions[symbol] = position
+
+    def _close(self, symbol: str, price: float, reason: str, ts: Optional[int]):
+        position = self.positions.pop(symbol)
+        self.engine._settle_position(position, price, reason)
+        trade = self.engine.closed_trades[-1]
+        trade['symbol'] = symbol
+        trade['entry_time'] = position['entry_time']
+        trade['exit_time'] = ts
+
+    @staticmethod
+    def _exit_reason(position: Dict, close: float) -> Optional[str]:
+        if position['side'] == 'long':
+            if close <= position['stop_loss']:
+                return 'stop_loss'
+            if close >= position['take_profit']:
+                return 'take_profit'
+        else:
+            if close >= position['stop_loss']:
+                return 'stop_loss'
+            if close <= position['take_profit']:
+                return 'take_profit'
+        return None
+
+    def _equity(self, last_close: Dict[str, float]) -> float:
+        equity = self.engine.balance
+        for symbol, position in self.positions.items():
+            entry = position['entry_price']
+            direction = 1 if position['side'] == 'long' else -1
+            price_change = direction * (last_close[symbol] - entry) / entry
+            equity += price_change * position['amount'] * entry * position['leverage']
+        return equity
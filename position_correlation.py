@@ -6,6 +6,7 @@ import numpy as np
 from typing import Dict, List, Tuple
 from logger import Logger
 from datetime import datetime, timedelta
+from rolling_correlation import RollingCorrelationEngine
 
 
 class PositionCorrelationManager:
@@ -64,6 +65,9 @@ class PositionCorrelationManager:
         # Price history cache for correlation calculation
         self.price_history = {}  # symbol -> list of prices
         self.max_history_length = 100
+        # Aligned return windows for the data-driven correlations; the window
+        # matches calculate_correlation's default lookback (50 prices)
+        self.correlation_engine = RollingCorrelationEngine(window=49, min_periods=5)
 
         self.logger.info("🔗 Position Correlation Manager initialized")
 
@@ -107,6 +111,7 @@ class PositionCorrelationManager:
                 'price': price,
                 'timestamp': datetime.now()
             })
+            self.correlation_engine.update_price(symbol, price)
 
             # Keep only recent history
             if len(self.price_history[symbol]) > self.max_history_length:
@@ -154,23 +159,11 @@ class PositionCorrelationManager:
                 else:
                     return 0.3
 
-            # Align histories by timestamp (simple approach: use min length)
-            min_len = min(len(history1), len(history2))
-            prices1 = [h['price'] for h in history1[-min_len:]]
-            prices2 = [h['price'] for h in history2[-min_len:]]
+            # Returns aligned on the engine's shared tick clock (None if < 5 overlapping)
+            correlation = self.correlation_engine.correlation(symbol1, symbol2, lookback_periods - 1)
 
-            # Calculate returns
-            returns1 = np.diff(prices1) / prices1[:-1]
-            returns2 = np.diff(prices2) / prices2[:-1]
-
-            # Calculate correlation
-            if len(returns1) < 5 or len(returns2) < 5:
-                return 0.3  # Not enough data
-
-            correlation = np.corrcoef(returns1, returns2)[0, 1]
-
-            # Handle NaN
-            if np.isnan(correlation):
+            # Not enough data, or a flat series
+            if correlation is None:
                 return 0.3
 
             return correlation
@@ -220,14 +213,19 @@ class PositionCorrelationManager:
             if not symbols:
                 return {}
 
-            matrix = {}
-            for sym1 in symbols:
-                matrix[sym1] = {}
-                for sym2 in symbols:
-                    if sym1 == sym2:
-                        matrix[sym1][sym2] = 1.0
-                    else:
-                        matrix[sym1][sym2] = self.calculate_correlation(sym1, sym2)
+            # All data-driven pairs in one vectorized step
+            values = self.correlation_engine.correlation_matrix(symbols)
+            counts = {sym: len(self.price_history.get(sym, ())) for sym in symbols}
+
+            matrix = {sym: {sym: 1.0} for sym in symbols}
+            for i, sym1 in enumerate(symbols):
+                for j in range(i + 1, len(symbols)):
+                    sym2 = symbols[j]
+                    corr = values[i, j]
+                    if np.isnan(corr) or counts[sym1] < 10 or counts[sym2] < 10:
+                        # Category estimates / defaults for pairs without enough data
+                        corr = self.calculate_correlation(sym1, sym2)
+                    matrix[sym1][sym2] = matrix[sym2][sym1] = float(corr)
 
             return matrix
 
@@ -1,8 +1,10 @@
 """
 Position management with trailing stop loss
 """
+import os
 import time
 import threading
+import joblib
 import pandas as pd
 from typing import Dict, Optional, Tuple
 from datetime import datetime
@@ -890,6 +892,18 @@ class Position:
 class PositionManager:
     """Manage open positions with trailing stops and advanced exit strategies"""
 
+    # Per-position tracking state persisted across restarts; the rest (amount,
+    # leverage, entry price) always comes from the exchange on sync
+    PERSISTED_FIELDS = (
+        'entry_time', 'stop_loss', 'take_profit', 'highest_price', 'lowest_price',
+        'trailing_stop_activated', 'max_favorable_excursion', 'initial_stop_loss',
+        'initial_take_profit', 'breakeven_plus_activated', 'trailing_tp_activated',
+        'peak_profit', 'strategy', 'rl_strategy', 'market_regime', 'entry_volatility',
+        'accumulation_adds',
+    )
+    # Saved state only applies to the same position (DCA adds move the average entry a little)
+    RESTORE_ENTRY_TOLERANCE = 0.005
+
     def __init__(self, client: KuCoinClient, trailing_stop_percentage: float = 0.02):
         self.client = client
         self.trailing_stop_percentage = trailing_stop_percentage
@@ -904,6 +918,60 @@ class PositionManager:
         # but protects against future multi-threaded enhancements
         self._positions_lock = threading.Lock()
 
+        # Tracking state from the previous session, applied by sync_existing_positions
+        self.state_path = 'models/position_manager_state.pkl'
+        self._saved_state: Dict[str, Dict] = {}
+
+    def save_state(self):
+        """Save stops, trailing state and strategy tags of open positions to disk"""
+        try:
+            with self._positions_lock:
+                state = {
+                    symbol: {
+                        'side': position.side,
+                        'entry_price': position.entry_price,
+                        **{field: getattr(position, field) for field in self.PERSISTED_FIELDS
+                           if hasattr(position, field)},
+                    }
+                    for symbol, position in self.positions.items()
+                }
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            joblib.dump(state, tmp_path)
+            os.replace(tmp_path, self.state_path)
+            self.logger.info(f"💾 Position manager state saved ({len(state)} position(s))")
+        except Exception as e:
+            self.logger.error(f"Error saving position manager state: {e}")
+
+    def load_state(self) -> int:
+        """Load the previous session's position state (applied on the next sync)
+
+        Returns:
+            Number of positions with saved state
+        """
+        try:
+            if os.path.exists(self.state_path):
+                self._saved_state = joblib.load(self.state_path)
+                self.logger.info(f"📂 Position manager state loaded ({len(self._saved_state)} position(s))")
+        except Exception as e:
+            self.logger.error(f"Error loading position manager state: {e}")
+            self._saved_state = {}
+        return len(self._saved_state)
+
+    def _restore_saved_state(self, position: 'Position') -> bool:
+        """Apply saved tracking state to a position synced from the exchange"""
+        saved = self._saved_state.pop(position.symbol, None)
+        if not saved or saved.get('side') != position.side:
+            return False
+        saved_entry = saved.get('entry_price') or 0
+        if saved_entry <= 0 or abs(position.entry_price - saved_entry) / saved_entry > self.RESTORE_ENTRY_TOLERANCE:
+            return False
+
+        for field in self.PERSISTED_FIELDS:
+            if saved.get(field) is not None:
+                setattr(position, field, saved[field])
+        return True
+
     def _get_price_for_pnl(self, ticker: Dict) -> Tuple[Optional[float], str]:
         """Extract the appropriate price for P&L calculation from ticker data
 
@@ -1044,6 +1112,16 @@ class PositionManager:
                 elif side == 'short' and current_price < entry_price:
                     position.lowest_price = current_price
 
+                # Same position as last session: keep its stops and trailing state
+                # instead of the conservative defaults above
+                if self._restore_saved_state(position):
+                    stop_loss, take_profit = position.stop_loss, position.take_profit
+                    if side == 'long' and current_price > (position.highest_price or 0):
+                        position.highest_price = current_price
+                    elif side == 'short' and position.lowest_price is not None and current_price < position.lowest_price:
+                        position.lowest_price = current_price
+                    self.logger.info(f"Restored saved stops and trailing state for {symbol}")
+
                 # Thread-safe position addition
                 with self._positions_lock:
                     self.positions[symbol] = position
@@ -1489,6 +1567,13 @@ class PositionManager:
             self.position_logger.info(f"UPDATING {position_count} OPEN POSITION(S) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             self.position_logger.info(f"{'='*80}")
 
+        if position_count > 1:
+            # PERFORMANCE: One bulk ticker refresh serves every get_ticker() below
+            try:
+                self.client.get_all_tickers()
+            except Exception as e:
+                self.logger.debug(f"Bulk ticker refresh failed, using per-symbol tickers: {e}")
+
         for symbol in positions_snapshot:
             try:
                 # Thread-safe access to position
@@ -0,0 +1,224 @@
+"""
+Proactive weighted token-bucket rate limiter for KuCoin REST calls
+
+KuCoin meters REST traffic in resource pools: every endpoint has a weight and
+each pool refills a fixed quota per 30 s window. Instead of letting ccxt pace
+calls blindly and sleeping 1-30 s after a 429, every request reserves its
+weight from the matching pool before it is sent.
+
+Features:
+- One bucket per pool ('public' market data, 'private' account/trading)
+- Endpoint weights taken from ccxt's per-endpoint cost table (cost = 2 x weight)
+- CRITICAL calls may use the whole bucket; a reserved share is kept for them,
+  so scanning can only spend spare capacity above the reserve
+- Shared by every client in the process (get_rate_limiter())
+- Utilization / wait metrics for monitoring
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from config import Config
+from logger import Logger
+
+# Priority values match kucoin_client.APICallPriority (CRITICAL=1 ... LOW=4)
+_CRITICAL, _HIGH = 1, 2
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with a priority-dependent floor.
+    """
+
+    def __init__(self, name: str, capacity: float, window: float, reserve_fraction: float = 0.2):
+        """
+        Initialize token bucket.
+
+        Args:
+            name: Pool name (for logs and metrics)
+            capacity: Weight available per window
+            window: Window length in seconds (refill rate = capacity / window)
+            reserve_fraction: Share of the bucket only CRITICAL calls may use
+        """
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / window
+        self.reserve = self.capacity * reserve_fraction
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._acquired_calls = 0
+        self._acquired_weight = 0.0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._penalties = 0
+
+    def _floor(self, priority: int) -> float:
+        """Tokens that must stay in the bucket after a call of this priority"""
+        if priority <= _CRITICAL:
+            return 0.0
+        if priority == _HIGH:
+            return self.reserve / 2
+        return self.reserve
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def try_acquire(self, weight: float, priority: int) -> float:
+        """
+        Take weight from the bucket if the priority's floor allows it
+
+        Returns:
+            0.0 if the weight was taken, otherwise seconds until it could be
+        """
+        weight = min(float(weight), self.capacity - self._floor(priority))
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            needed = self._floor(priority) + weight - self._tokens
+            if needed <= 0:
+                self._tokens -= weight
+                self._acquired_calls += 1
+                self._acquired_weight += weight
+                return 0.0
+            return needed / self.refill_rate
+
+    def _record_wait(self, waited: float):
+        if waited > 0:
+            with self._lock:
+                self._waits += 1
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+
+    def acquire(self, weight: float, priority: int = 3) -> float:
+        """
+        Block until weight is available for this priority
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire(weight, priority)
+            if wait == 0.0:
+                break
+            time.sleep(min(wait, 1.0))
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    async def acquire_async(self, weight: float, priority: int = 3) -> float:
+        """Asyncio version of acquire() (sleeps without blocking the event loop)"""
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire(weight, priority)
+            if wait == 0.0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    def penalize(self):
+        """Empty the bucket after the exchange reported a rate limit hit"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+            self._penalties += 1
+
+    def get_metrics(self) -> Dict:
+        """Current utilization and wait statistics"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'capacity': self.capacity,
+                'available': self._tokens,
+                'utilization': 1.0 - self._tokens / self.capacity,
+                'calls': self._acquired_calls,
+                'weight': self._acquired_weight,
+                'waits': self._waits,
+                'total_wait_time': self._wait_time,
+                'max_wait': self._max_wait,
+                'penalties': self._penalties,
+            }
+
+
+class WeightedRateLimiter:
+    """
+    Routes each request's weight to the matching KuCoin resource pool.
+    """
+
+    def __init__(self, public_weight: float = None, private_weight: float = None,
+                 window: float = None, reserve_fraction: float = None):
+        """
+        Initialize rate limiter (defaults come from Config.RATE_LIMIT_*).
+
+        Args:
+            public_weight: Weight per window for public market-data endpoints
+            private_weight: Weight per window for private account/trading endpoints
+            window: Window length in seconds
+            reserve_fraction: Share of each pool reserved for CRITICAL calls
+        """
+        window = window or Config.RATE_LIMIT_WINDOW
+        reserve_fraction = Config.RATE_LIMIT_CRITICAL_RESERVE if reserve_fraction is None else reserve_fraction
+        self.logger = Logger.get_logger()
+        self.pools = {
+            'public': TokenBucket('public', public_weight or Config.RATE_LIMIT_PUBLIC_WEIGHT, window, reserve_fraction),
+            'private': TokenBucket('private', private_weight or Config.RATE_LIMIT_PRIVATE_WEIGHT, window, reserve_fraction),
+        }
+
+    @staticmethod
+    def pool_for(api) -> str:
+        """Map a ccxt api name ('futuresPublic', 'futuresPrivate', ...) to a pool"""
+        name = api[0] if isinstance(api, (list, tuple)) else api
+        return 'public' if 'public' in str(name).lower() else 'private'
+
+    @staticmethod
+    def weight_for(cost: Optional[float]) -> float:
+        """Convert a ccxt endpoint cost to KuCoin request weight"""
+        return max(1.0, float(cost or 2) / 2)
+
+    def acquire(self, pool: str, weight: float, priority: int = 3) -> float:
+        """Reserve weight in a pool, blocking as needed. Returns seconds waited."""
+        waited = self.pools[pool].acquire(weight, priority)
+        if waited > 1.0:
+            self.logger.debug(f"Rate limiter: waited {waited:.2f}s for {weight:g} weight in {pool} pool")
+        return waited
+
+    async def acquire_async(self, pool: str, weight: float, priority: int = 3) -> float:
+        """Asyncio version of acquire()"""
+        return await self.pools[pool].acquire_async(weight, priority)
+
+    def penalize(self, pool: str = None):
+        """Empty one pool (or all) after a 429 so every caller backs off together"""
+        for name, bucket in self.pools.items():
+            if pool is None or name == pool:
+                bucket.penalize()
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Per-pool utilization and wait statistics"""
+        return {name: bucket.get_metrics() for name, bucket in self.pools.items()}
+
+
+# Global shared instance
+_rate_limiter: Optional[WeightedRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> WeightedRateLimiter:
+    """Get the process-wide rate limiter shared by all clients"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = WeightedRateLimiter()
+        return _rate_limiter
+
+
+def get_rate_limit_metrics() -> Dict[str, Dict]:
+    """Metrics of the shared rate limiter ({} if no client has created it)"""
+    return _rate_limiter.get_metrics() if _rate_limiter is not None else {}
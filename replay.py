@@ -0,0 +1,1024 @@
+"""
+Deterministic market replay for the real TradingBot decision path
+
+BacktestEngine runs a simplified strategy function; everything the live bot
+actually does (MarketScanner.scan_pair -> SignalGenerator -> RiskManager ->
+PositionManager.update_positions) normally needs the exchange. This module
+swaps the exchange for recorded data: a ccxt-compatible ReplayExchange and a
+ReplayWebSocket serve tickers, candles and order books from disk at the time
+of a SimulatedClock, and a ReplayKuCoinClient puts them behind the unmodified
+KuCoinClient code paths. ReplayRunner then drives TradingBot step by step, so
+hours of market data run in seconds and every run over the same data makes
+the same decisions.
+
+Features:
+- SimulatedClock patched into the bot's modules (time.time/monotonic/sleep, datetime.now)
+- Point-in-time lookups only: a candle is visible once it has closed
+- Missing 4h/1d series are aggregated from the finest recorded timeframe
+- Recorded tickers and order books are used when present, otherwise synthesized from candles
+- Simulated fills with taker fees, one-way positions and shared cross margin
+- Report with P&L, drawdown and wall-clock latency of scans, cycles and position updates
+"""
+
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import ccxt
+import numpy as np
+
+from candle_store import CandleStore, timeframe_to_ms
+from config import Config
+from kucoin_client import KuCoinClient
+from logger import Logger
+
+DERIVED_TIMEFRAMES = ('1h', '4h', '1d')
+_DAY_MS = 86_400_000
+_REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SimulatedClock:
+    """
+    Replay clock in epoch seconds.
+
+    sleep() advances the clock instead of blocking, so waits inside the bot
+    (order fill polling, retry backoff) cost no wall-clock time.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        """Current simulated time in seconds"""
+        with self._lock:
+            return self._now
+
+    def time_ms(self) -> int:
+        """Current simulated time in milliseconds"""
+        return int(self.time() * 1000)
+
+    def now(self, tz=None) -> datetime:
+        """Current simulated time as a datetime"""
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def set(self, seconds: float):
+        """Move the clock to an absolute time (never backwards)"""
+        with self._lock:
+            self._now = max(self._now, float(seconds))
+
+    def sleep(self, seconds: float):
+        """Advance the clock by seconds"""
+        if seconds and seconds > 0:
+            with self._lock:
+                self._now += float(seconds)
+
+    @contextmanager
+    def installed(self) -> Iterator['SimulatedClock']:
+        """
+        Make the bot's modules read this clock
+
+        Every repository module that did ``import time`` or
+        ``from datetime import datetime`` gets a clock-backed stand-in for the
+        duration of the block. Library modules and time.perf_counter are
+        untouched, so wall-clock latency can still be measured.
+        """
+        if SimulatedDatetime._clock is not None:
+            raise RuntimeError("Another SimulatedClock is already installed")
+
+        clock_time = _ClockTime(self)
+        patched = []
+        for module in list(sys.modules.values()):
+            path = getattr(module, '__file__', None)
+            if not path or module is sys.modules[__name__]:
+                continue
+            if os.path.dirname(os.path.abspath(path)) != _REPO_DIR:
+                continue
+            if getattr(module, 'time', None) is time:
+                patched.append((module, 'time', time))
+                module.time = clock_time
+            if getattr(module, 'datetime', None) is datetime:
+                patched.append((module, 'datetime', datetime))
+                module.datetime = SimulatedDatetime
+
+        SimulatedDatetime._clock = self
+        try:
+            yield self
+        finally:
+            SimulatedDatetime._clock = None
+            for module, name, original in patched:
+                setattr(module, name, original)
+
+
+class _ClockTime:
+    """Stand-in for the time module that reads a SimulatedClock"""
+
+    def __init__(self, clock: SimulatedClock):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock.time()
+
+    def monotonic(self) -> float:
+        return self._clock.time()
+
+    def sleep(self, seconds: float):
+        self._clock.sleep(seconds)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class SimulatedDatetime(datetime):
+    """datetime whose now()/utcnow()/today() read the installed SimulatedClock"""
+
+    _clock: Optional[SimulatedClock] = None
+
+    @classmethod
+    def now(cls, tz=None) -> datetime:
+        if cls._clock is None:
+            return datetime.now(tz)
+        return cls._clock.now(tz)
+
+    @classmethod
+    def utcnow(cls) -> datetime:
+        return cls.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def today(cls) -> datetime:
+        return cls.now()
+
+
+def resample_candles(candles: np.ndarray, timeframe_ms: int) -> np.ndarray:
+    """
+    Aggregate OHLCV rows into a coarser timeframe
+
+    Args:
+        candles: Array of shape (n, 6) [timestamp, open, high, low, close, volume], oldest first
+        timeframe_ms: Target candle length in milliseconds
+
+    Returns:
+        Array of shape (m, 6) with one row per bucket that has data
+    """
+    if len(candles) == 0:
+        return np.empty((0, 6))
+    buckets = candles[:, 0] // timeframe_ms * timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)]
+    out = np.empty((len(starts), 6))
+    out[:, 0] = buckets[starts]
+    out[:, 1] = candles[starts, 1]
+    out[:, 2] = np.maximum.reduceat(candles[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(candles[:, 3], starts)
+    out[:, 4] = candles[ends - 1, 4]
+    out[:, 5] = np.add.reduceat(candles[:, 5], starts)
+    return out
+
+
+class _Series:
+    """Candles of one (symbol, timeframe), indexed by the time each becomes visible"""
+
+    def __init__(self, candles: np.ndarray, timeframe_ms: int):
+        self.candles = candles
+        self.timeframe_ms = timeframe_ms
+        self.visible_at = (candles[:, 0] + timeframe_ms).astype(np.int64)
+
+    def visible(self, now_ms: int) -> int:
+        """Number of candles closed at now_ms"""
+        return int(np.searchsorted(self.visible_at, now_ms, side='right'))
+
+
+class ReplayData:
+    """
+    Recorded market data with point-in-time lookups.
+
+    Candles are only served once closed (open time + timeframe <= now), so
+    the replay never looks ahead. Tickers and order books come from recorded
+    snapshots when available; otherwise they are synthesized from the latest
+    closed candle of the symbol's finest timeframe with a fixed spread.
+    """
+
+    def __init__(self, candles: Dict[Tuple[str, str], List], tickers: Dict[str, List[Dict]] = None,
+                 order_books: Dict[str, List[Dict]] = None, spread: float = 0.0002,
+                 derive_timeframes: Tuple[str, ...] = DERIVED_TIMEFRAMES):
+        """
+        Initialize replay data.
+
+        Args:
+            candles: {(symbol, timeframe): [[timestamp, open, high, low, close, volume], ...]}
+            tickers: Optional {symbol: [ticker dict with 'timestamp' (ms), ...]}
+            order_books: Optional {symbol: [{'timestamp', 'bids', 'asks'}, ...]}
+            spread: Relative bid/ask spread of synthesized tickers and books
+            derive_timeframes: Timeframes aggregated from the finest recorded one when missing
+        """
+        self.spread = spread
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        for (symbol, timeframe), rows in candles.items():
+            array = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+            if len(array) == 0:
+                continue
+            array = array[np.argsort(array[:, 0], kind='stable')]
+            self._series[(symbol, timeframe)] = _Series(array, timeframe_to_ms(timeframe))
+
+        self.symbols = sorted({symbol for symbol, _ in self._series})
+        self._base: Dict[str, _Series] = {}
+        for symbol in self.symbols:
+            self._base[symbol] = min(
+                (series for (sym, _), series in self._series.items() if sym == symbol),
+                key=lambda series: series.timeframe_ms
+            )
+            base = self._base[symbol]
+            for timeframe in derive_timeframes:
+                tf_ms = timeframe_to_ms(timeframe)
+                if (symbol, timeframe) not in self._series and tf_ms > base.timeframe_ms:
+                    self._series[(symbol, timeframe)] = _Series(resample_candles(base.candles, tf_ms), tf_ms)
+
+        # Running quote volume of the base series for 24h ticker volume
+        self._quote_volume = {
+            symbol: np.r_[0.0, np.cumsum(base.candles[:, 4] * base.candles[:, 5])]
+            for symbol, base in self._base.items()
+        }
+        self._tickers = self._index_snapshots(tickers)
+        self._order_books = self._index_snapshots(order_books)
+
+    @staticmethod
+    def _index_snapshots(snapshots: Optional[Dict[str, List[Dict]]]) -> Dict[str, Tuple[List[int], List[Dict]]]:
+        indexed = {}
+        for symbol, items in (snapshots or {}).items():
+            items = sorted(items, key=lambda item: item['timestamp'])
+            indexed[symbol] = ([int(item['timestamp']) for item in items], items)
+        return indexed
+
+    @classmethod
+    def from_candle_store(cls, path: str, symbols: List[str] = None, timeframes: List[str] = None,
+                          **kwargs) -> 'ReplayData':
+        """
+        Load candles from a CandleStore database
+
+        Args:
+            path: CandleStore SQLite file
+            symbols: Only these symbols (default: all stored)
+            timeframes: Only these timeframes (default: all stored)
+            **kwargs: Passed to ReplayData (tickers, order_books, spread, ...)
+        """
+        store = CandleStore(path, max_candles=0)
+        try:
+            candles = {}
+            for symbol, timeframe in store.keys():
+                if symbols is not None and symbol not in symbols:
+                    continue
+                if timeframes is not None and timeframe not in timeframes:
+                    continue
+                candles[(symbol, timeframe)] = list(store.iter_candles(symbol, timeframe))
+        finally:
+            store.close()
+        return cls(candles, **kwargs)
+
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> 'ReplayData':
+        """
+        Load a recording directory
+
+        Layout: candles.db (CandleStore), plus optional tickers.jsonl and
+        orderbooks.jsonl with one JSON snapshot per line carrying 'symbol'
+        and 'timestamp' (ms).
+        """
+        snapshots = {}
+        for name in ('tickers', 'orderbooks'):
+            path = os.path.join(directory, f'{name}.jsonl')
+            if not os.path.exists(path):
+                continue
+            by_symbol: Dict[str, List[Dict]] = {}
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        by_symbol.setdefault(item['symbol'], []).append(item)
+            snapshots[name] = by_symbol
+        return cls.from_candle_store(
+            os.path.join(directory, 'candles.db'),
+            tickers=snapshots.get('tickers'), order_books=snapshots.get('orderbooks'), **kwargs
+        )
+
+    @property
+    def start_ms(self) -> int:
+        """Earliest time any candle is visible"""
+        return min(int(series.visible_at[0]) for series in self._base.values())
+
+    @property
+    def end_ms(self) -> int:
+        """Time the last recorded candle closes"""
+        return max(int(series.visible_at[-1]) for series in self._base.values())
+
+    @property
+    def base_timeframe_ms(self) -> int:
+        """Finest recorded candle length across all symbols"""
+        return min(series.timeframe_ms for series in self._base.values())
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._base
+
+    def has_candles(self, symbol: str, timeframe: str) -> bool:
+        return (symbol, timeframe) in self._series
+
+    def candles(self, symbol: str, timeframe: str, now_ms: int, limit: int = 100) -> np.ndarray:
+        """Up to limit closed candles at now_ms, oldest first (read-only view, may be empty)"""
+        series = self._series.get((symbol, timeframe))
+        if series is None:
+            return np.empty((0, 6))
+        end = series.visible(now_ms)
+        view = series.candles[max(0, end - int(limit)):end]
+        view.flags.writeable = False
+        return view
+
+    def ohlcv(self, symbol: str, timeframe: str, now_ms: int, limit: int = 100) -> List[List]:
+        """Closed candles at now_ms as ccxt OHLCV lists"""
+        rows = self.candles(symbol, timeframe, now_ms, limit).tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        return rows
+
+    def ticker(self, symbol: str, now_ms: int) -> Optional[Dict]:
+        """Latest ticker at now_ms (recorded if available, else from the last closed candle)"""
+        recorded = self._latest(self._tickers, symbol, now_ms)
+        if recorded is not None:
+            return dict(recorded)
+
+        base = self._base.get(symbol)
+        if base is None:
+            return None
+        end = base.visible(now_ms)
+        if end == 0:
+            return None
+        last = float(base.candles[end - 1, 4])
+        window_start = int(np.searchsorted(base.visible_at, now_ms - _DAY_MS, side='right'))
+        window = base.candles[window_start:end]
+        quote_volume = self._quote_volume[symbol]
+        half_spread = last * self.spread / 2
+        return {
+            'symbol': symbol,
+            'last': last,
+            'bid': last - half_spread,
+            'ask': last + half_spread,
+            'mark': last,
+            'high': float(window[:, 2].max()),
+            'low': float(window[:, 3].min()),
+            'volume': float(window[:, 5].sum()),
+            'quoteVolume': float(quote_volume[end] - quote_volume[window_start]),
+            'timestamp': int(now_ms),
+            'datetime': datetime.fromtimestamp(now_ms / 1000, timezone.utc).isoformat(),
+        }
+
+    def order_book(self, symbol: str, now_ms: int, depth: int = 20) -> Optional[Dict]:
+        """Order book at now_ms (recorded if available, else a ladder around the ticker)"""
+        recorded = self._latest(self._order_books, symbol, now_ms)
+        if recorded is not None:
+            return {
+                'symbol': symbol,
+                'bids': [list(level) for level in recorded.get('bids', [])[:depth]],
+                'asks': [list(level) for level in recorded.get('asks', [])[:depth]],
+                'timestamp': int(recorded['timestamp']),
+                'nonce': recorded.get('nonce'),
+            }
+
+        ticker = self.ticker(symbol, now_ms)
+        if ticker is None:
+            return None
+        base = self._base[symbol]
+        end = base.visible(now_ms)
+        size = max(float(base.candles[end - 1, 5]) / max(depth, 1), 1.0)
+        step = ticker['last'] * self.spread
+        return {
+            'symbol': symbol,
+            'bids': [[ticker['bid'] - i * step, size] for i in range(depth)],
+            'asks': [[ticker['ask'] + i * step, size] for i in range(depth)],
+            'timestamp': int(now_ms),
+            'nonce': end,
+        }
+
+    @staticmethod
+    def _latest(index: Dict[str, Tuple[List[int], List[Dict]]], symbol: str, now_ms: int) -> Optional[Dict]:
+        entry = index.get(symbol)
+        if entry is None:
+            return None
+        timestamps, items = entry
+        position = bisect.bisect_right(timestamps, now_ms)
+        return items[position - 1] if position else None
+
+
+class ReplayExchange:
+    """
+    ccxt-compatible exchange stand-in that fills orders against ReplayData.
+
+    Implements the subset of ccxt.kucoinfutures that KuCoinClient uses.
+    Market orders fill at the ask (buy) or bid (sell) with a taker fee;
+    limit and stop orders rest until the price reaches them (match_orders()).
+    Positions are one-way and share one cross-margin USDT balance.
+    """
+
+    def __init__(self, data: ReplayData, clock: SimulatedClock, initial_balance: float = 10000.0,
+                 taker_fee: float = 0.0006, maker_fee: float = 0.0002):
+        """
+        Initialize replay exchange.
+
+        Args:
+            data: Recorded market data
+            clock: Clock that decides which data is visible
+            initial_balance: Starting USDT wallet balance
+            taker_fee: Fee rate of market and marketable orders
+            maker_fee: Fee rate of resting limit orders
+        """
+        self.data = data
+        self.clock = clock
+        self.initial_balance = float(initial_balance)
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.logger = Logger.get_logger()
+
+        self.wallet = float(initial_balance)
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.fills: List[Dict] = []
+        self.fees_paid = 0.0
+        self.realized_pnl = 0.0
+        self.leverage: Dict[str, int] = {}
+        self._order_seq = 0
+        self._lock = threading.RLock()
+
+        self.markets = {
+            symbol: {
+                'id': symbol.split('/')[0] + 'USDTM',
+                'symbol': symbol,
+                'type': 'swap',
+                'swap': True,
+                'future': False,
+                'active': True,
+                'contractSize': 1,
+                'limits': {'amount': {'min': 1, 'max': 1_000_000}, 'cost': {'min': None, 'max': None}},
+                'precision': {'amount': 1, 'price': None},
+            }
+            for symbol in data.symbols
+        }
+
+    # Market data
+
+    def load_markets(self, reload: bool = False) -> Dict[str, Dict]:
+        return self.markets
+
+    def market(self, symbol: str) -> Dict:
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"replay has no market {symbol}")
+        return self.markets[symbol]
+
+    def fetch_time(self) -> int:
+        return self.clock.time_ms()
+
+    def fetch_ticker(self, symbol: str) -> Dict:
+        ticker = self.data.ticker(self.market(symbol)['symbol'], self.clock.time_ms())
+        if ticker is None:
+            raise ccxt.ExchangeError(f"no replay data for {symbol} yet")
+        return ticker
+
+    def fetch_tickers(self, symbols: List[str] = None) -> Dict[str, Dict]:
+        now_ms = self.clock.time_ms()
+        tickers = {}
+        for symbol in symbols or self.data.symbols:
+            ticker = self.data.ticker(symbol, now_ms)
+            if ticker is not None:
+                tickers[symbol] = ticker
+        return tickers
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: int = None, limit: int = 100,
+                    params: Dict = None) -> List[List]:
+        rows = self.data.ohlcv(symbol, timeframe, self.clock.time_ms(), limit or 100)
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+        return rows
+
+    def fetch_order_book(self, symbol: str, limit: int = None, params: Dict = None) -> Dict:
+        book = self.data.order_book(symbol, self.clock.time_ms(), limit or 100)
+        if book is None:
+            raise ccxt.ExchangeError(f"no replay data for {symbol} yet")
+        return book
+
+    # Account
+
+    def set_position_mode(self, hedged: bool, symbol: str = None, params: Dict = None):
+        if hedged:
+            raise ccxt.NotSupported("replay only supports one-way positions")
+
+    def set_margin_mode(self, margin_mode: str, symbol: str = None, params: Dict = None):
+        return {'marginMode': margin_mode}
+
+    def set_leverage(self, leverage: int, symbol: str = None, params: Dict = None):
+        with self._lock:
+            self.leverage[symbol] = int(leverage)
+        return {'leverage': leverage}
+
+    def _unrealized(self, now_ms: int) -> float:
+        total = 0.0
+        for symbol, position in self.positions.items():
+            ticker = self.data.ticker(symbol, now_ms)
+            if ticker is not None:
+                direction = 1 if position['side'] == 'long' else -1
+                total += direction * (ticker['last'] - position['entryPrice']) * position['contracts']
+        return total
+
+    def equity(self) -> float:
+        """Wallet balance plus unrealized P&L of open positions"""
+        with self._lock:
+            return self.wallet + self._unrealized(self.clock.time_ms())
+
+    def fetch_balance(self, params: Dict = None) -> Dict:
+        with self._lock:
+            total = self.wallet + self._unrealized(self.clock.time_ms())
+            used = sum(position['margin'] for position in self.positions.values())
+            free = total - used
+            return {
+                'free': {'USDT': free},
+                'used': {'USDT': used},
+                'total': {'USDT': total},
+                'USDT': {'free': free, 'used': used, 'total': total},
+            }
+
+    def fetch_positions(self, symbols: List[str] = None, params: Dict = None) -> List[Dict]:
+        now_ms = self.clock.time_ms()
+        with self._lock:
+            positions = []
+            for symbol, position in self.positions.items():
+                ticker = self.data.ticker(symbol, now_ms)
+                mark = ticker['last'] if ticker else position['entryPrice']
+                direction = 1 if position['side'] == 'long' else -1
+                positions.append({
+                    'symbol': symbol,
+                    'side': position['side'],
+                    'contracts': position['contracts'],
+                    'contractSize': 1,
+                    'entryPrice': position['entryPrice'],
+                    'markPrice': mark,
+                    'leverage': position['leverage'],
+                    'initialMargin': position['margin'],
+                    'unrealizedPnl': direction * (mark - position['entryPrice']) * position['contracts'],
+                    'marginMode': 'cross',
+                    'timestamp': now_ms,
+                    'info': {'realLeverage': position['leverage']},
+                })
+            return positions
+
+    # Orders
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: float = None,
+                     params: Dict = None) -> Dict:
+        params = params or {}
+        now_ms = self.clock.time_ms()
+        ticker = self.fetch_ticker(symbol)
+        if amount is None or amount <= 0:
+            raise ccxt.InvalidOrder(f"invalid amount {amount}")
+        if type == 'limit' and price is None:
+            raise ccxt.InvalidOrder("limit order requires a price")
+
+        with self._lock:
+            reduce_only = bool(params.get('reduceOnly'))
+            if reduce_only and not self._reduces_position({'symbol': symbol, 'side': side}):
+                raise ccxt.InvalidOrder(f"reduce-only {side} order would not reduce a position in {symbol}")
+
+            self._order_seq += 1
+            order = {
+                'id': f'replay-{self._order_seq}',
+                'symbol': symbol,
+                'type': type,
+                'side': side,
+                'amount': float(amount),
+                'price': price,
+                'stopPrice': params.get('stopPrice'),
+                'reduceOnly': reduce_only,
+                'leverage': self.leverage.get(symbol, 1),
+                'status': 'open',
+                'filled': 0.0,
+                'remaining': float(amount),
+                'average': None,
+                'cost': 0.0,
+                'fee': None,
+                'timestamp': now_ms,
+                'datetime': datetime.fromtimestamp(now_ms / 1000, timezone.utc).isoformat(),
+            }
+            fill_price = self._marketable_price(order, ticker)
+            if fill_price is not None:
+                self._fill(order, fill_price, self.taker_fee)
+            elif type == 'market':
+                raise ccxt.ExchangeError(f"market order for {symbol} could not be priced")
+            self.orders[order['id']] = order
+            return dict(order)
+
+    def _reduces_position(self, order: Dict) -> bool:
+        """Whether an order's side is opposite to the open position in its symbol"""
+        position = self.positions.get(order['symbol'])
+        return position is not None and position['side'] != ('long' if order['side'] == 'buy' else 'short')
+
+    def _marketable_price(self, order: Dict, ticker: Dict) -> Optional[float]:
+        """Fill price if the order executes against the current ticker, else None"""
+        if order['stopPrice'] is not None:
+            stop = float(order['stopPrice'])
+            triggered = ticker['last'] >= stop if order['side'] == 'buy' else ticker['last'] <= stop
+            if not triggered:
+                return None
+            order['stopPrice'] = None  # Triggered stops rest as plain limit orders
+        touch = ticker['ask'] if order['side'] == 'buy' else ticker['bid']
+        if order['type'] == 'market':
+            return touch
+        if order['side'] == 'buy':
+            return touch if touch <= order['price'] else None
+        return touch if touch >= order['price'] else None
+
+    def _fill(self, order: Dict, price: float, fee_rate: float):
+        """Execute an order in full and update the position and wallet"""
+        symbol, amount = order['symbol'], order['remaining']
+        position = self.positions.get(symbol)
+        side = 'long' if order['side'] == 'buy' else 'short'
+        if order['reduceOnly']:
+            # Reduce-only orders never exceed the position they close
+            amount = min(amount, position['contracts'])
+        fee = amount * price * fee_rate
+
+        closed = realized = 0.0
+        if position is not None and position['side'] != side:
+            closed = min(amount, position['contracts'])
+            direction = 1 if position['side'] == 'long' else -1
+            realized = direction * (price - position['entryPrice']) * closed
+        opened = 0.0 if order['reduceOnly'] else amount - closed
+
+        leverage = max(1, int(order['leverage']))
+        margin = opened * price / leverage
+        if opened > 0:
+            released = position['margin'] * closed / position['contracts'] if closed else 0.0
+            used = sum(p['margin'] for p in self.positions.values()) - released
+            free = self.wallet + realized - fee + self._unrealized(self.clock.time_ms()) - used
+            if margin > free:
+                raise ccxt.InsufficientFunds(
+                    f"insufficient margin for {symbol}: required {margin:.2f}, free {free:.2f}"
+                )
+
+        if closed:
+            position['margin'] *= 1 - closed / position['contracts']
+            position['contracts'] -= closed
+            if position['contracts'] <= 1e-12:
+                del self.positions[symbol]
+        if opened > 0:
+            position = self.positions.get(symbol)
+            if position is None:
+                self.positions[symbol] = {
+                    'side': side, 'contracts': opened, 'entryPrice': price,
+                    'leverage': leverage, 'margin': margin,
+                }
+            else:
+                total = position['contracts'] + opened
+                position['entryPrice'] = (position['entryPrice'] * position['contracts'] + price * opened) / total
+                position['contracts'] = total
+                position['margin'] += margin
+
+        self.wallet += realized - fee
+        self.realized_pnl += realized
+        self.fees_paid += fee
+        order.update({
+            'status': 'closed', 'filled': amount, 'remaining': 0.0, 'average': price,
+            'cost': amount * price, 'fee': {'currency': 'USDT', 'cost': fee},
+        })
+        self.fills.append({
+            'timestamp': self.clock.time_ms(), 'order_id': order['id'], 'symbol': symbol,
+            'side': order['side'], 'amount': amount, 'price': price, 'fee': fee, 'realized_pnl': realized,
+        })
+
+    def match_orders(self):
+        """Fill resting limit and stop orders the current prices have reached"""
+        with self._lock:
+            for order in self.orders.values():
+                if order['status'] != 'open':
+                    continue
+                if order['reduceOnly'] and not self._reduces_position(order):
+                    # Nothing left to reduce: the exchange cancels the order instead of filling it
+                    order['status'] = 'canceled'
+                    continue
+                ticker = self.data.ticker(order['symbol'], self.clock.time_ms())
+                if ticker is None:
+                    continue
+                was_stop = order['stopPrice'] is not None
+                price = self._marketable_price(order, ticker)
+                if price is None:
+                    continue
+                # A triggered stop executes as a taker; only resting limit orders earn the maker rate
+                fee_rate = self.taker_fee if was_stop else self.maker_fee
+                try:
+                    self._fill(order, order['price'] if order['type'] == 'limit' else price, fee_rate)
+                except ccxt.InsufficientFunds as e:
+                    self.logger.debug(f"Replay order {order['id']} rejected: {e}")
+                    order['status'] = 'rejected'
+
+    def fetch_order(self, id: str, symbol: str = None, params: Dict = None) -> Dict:
+        with self._lock:
+            if id not in self.orders:
+                raise ccxt.OrderNotFound(f"replay order {id} not found")
+            return dict(self.orders[id])
+
+    def cancel_order(self, id: str, symbol: str = None, params: Dict = None) -> Dict:
+        with self._lock:
+            order = self.orders.get(id)
+            if order is None or order['status'] != 'open':
+                raise ccxt.OrderNotFound(f"replay order {id} is not open")
+            order['status'] = 'canceled'
+            return dict(order)
+
+
+class ReplayWebSocket:
+    """
+    KuCoinWebSocket stand-in that serves ReplayData at the clock's time.
+
+    Subscriptions are recorded but every recorded stream is always available.
+    """
+
+    def __init__(self, data: ReplayData, clock: SimulatedClock):
+        self.data = data
+        self.clock = clock
+        self.connected = False
+        self._subscriptions = set()
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def subscribe_ticker(self, symbol: str):
+        self._subscriptions.add(('ticker', symbol))
+
+    def subscribe_candles(self, symbol: str, timeframe: str = '1h'):
+        self._subscriptions.add(('candles', symbol, timeframe))
+
+    def subscribe_orderbook(self, symbol: str, market_id: str = None, snapshot_fetcher: Callable = None) -> bool:
+        self._subscriptions.add(('orderbook', symbol))
+        return True
+
+    def unsubscribe_ticker(self, symbol: str):
+        self._subscriptions.discard(('ticker', symbol))
+
+    def unsubscribe_candles(self, symbol: str, timeframe: str = '1h'):
+        self._subscriptions.discard(('candles', symbol, timeframe))
+
+    def unsubscribe_orderbook(self, symbol: str):
+        self._subscriptions.discard(('orderbook', symbol))
+
+    def get_subscription_count(self) -> int:
+        return len(self._subscriptions)
+
+    def get_ticker(self, symbol: str) -> Optional[Dict]:
+        return self.data.ticker(symbol, self.clock.time_ms())
+
+    def get_orderbook(self, symbol: str, depth: int = 20) -> Optional[Dict]:
+        return self.data.order_book(symbol, self.clock.time_ms(), depth)
+
+    def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[List]:
+        rows = self.data.ohlcv(symbol, timeframe, self.clock.time_ms(), limit)
+        return rows or None
+
+    def get_ohlcv_array(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[np.ndarray]:
+        view = self.data.candles(symbol, timeframe, self.clock.time_ms(), limit)
+        return view if len(view) else None
+
+    def has_ticker(self, symbol: str) -> bool:
+        return self.data.has_symbol(symbol)
+
+    def has_orderbook(self, symbol: str) -> bool:
+        return self.data.has_symbol(symbol)
+
+    def has_candles(self, symbol: str, timeframe: str) -> bool:
+        return self.data.has_candles(symbol, timeframe)
+
+
+class ReplayKuCoinClient(KuCoinClient):
+    """
+    KuCoinClient backed by a ReplayExchange (and optionally a ReplayWebSocket).
+
+    Every client method runs unchanged; only the exchange and WebSocket
+    underneath are replaced. The shared rate limiter and the persistent
+    candle store are bypassed so replays neither wait on request pacing nor
+    write recorded candles into the live store.
+    """
+
+    def __init__(self, exchange: ReplayExchange, websocket: ReplayWebSocket = None):
+        self._replay_exchange = exchange
+        self._replay_websocket = websocket
+        super().__init__('replay', 'replay', 'replay', enable_websocket=websocket is not None)
+
+    def _create_exchange(self, api_key: str, api_secret: str, api_passphrase: str) -> ReplayExchange:
+        return self._replay_exchange
+
+    def _create_websocket(self, api_key: str, api_secret: str, api_passphrase: str) -> ReplayWebSocket:
+        return self._replay_websocket
+
+    def _install_rate_limiter(self):
+        self.rate_limiter = None
+
+    def _get_candle_store(self) -> Optional[CandleStore]:
+        return None
+
+
+@contextmanager
+def _config_overrides(**values):
+    """Temporarily set Config attributes; attributes the bot auto-configures are restored too"""
+    names = set(values) | {'LEVERAGE', 'MAX_POSITION_SIZE', 'RISK_PER_TRADE', 'MIN_PROFIT_THRESHOLD'}
+    saved = {name: getattr(Config, name) for name in names if hasattr(Config, name)}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name in names:
+            if name in saved:
+                setattr(Config, name, saved[name])
+            elif hasattr(Config, name):
+                delattr(Config, name)
+
+
+@contextmanager
+def _environ_defaults(**values):
+    """Temporarily set environment variables that are unset or empty"""
+    missing = {name: value for name, value in values.items() if not os.environ.get(name)}
+    saved = {name: os.environ[name] for name in missing if name in os.environ}
+    os.environ.update(missing)
+    try:
+        yield
+    finally:
+        for name in missing:
+            if name in saved:
+                os.environ[name] = saved[name]
+            else:
+                os.environ.pop(name, None)
+
+
+def _latency_summary(samples: List[float]) -> Dict:
+    values = np.asarray(samples) * 1000
+    return {
+        'count': len(values),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'max_ms': float(values.max()),
+    }
+
+
+class ReplayRunner:
+    """
+    Drive the real TradingBot over recorded data on a simulated clock.
+
+    One step replaces the bot's three live loops: the position monitor
+    (update_open_positions every position_interval), the background scanner
+    (get_best_pairs every scan_interval) and the main loop (run_cycle every
+    Config.CHECK_INTERVAL). Steps run on one thread, so a replay is
+    reproducible. State files are not saved at the end of a replay.
+    """
+
+    def __init__(self, data: ReplayData, start_ms: int = None, end_ms: int = None,
+                 step_seconds: float = 60.0, scan_interval: float = None, position_interval: float = None,
+                 warmup_bars: int = 100, initial_balance: float = 10000.0, use_websocket: bool = True,
+                 taker_fee: float = 0.0006, bot_factory: Callable = None):
+        """
+        Initialize replay runner.
+
+        Args:
+            data: Recorded market data
+            start_ms: Replay start (default: warmup_bars finest candles after the data starts)
+            end_ms: Replay end (default: when the last recorded candle closes)
+            step_seconds: Simulated seconds per step
+            scan_interval: Seconds between market scans (default: Config.CHECK_INTERVAL)
+            position_interval: Seconds between position updates
+                (default: max(step_seconds, Config.POSITION_UPDATE_INTERVAL))
+            warmup_bars: Candles of history available before the first step
+            initial_balance: Starting USDT balance
+            use_websocket: Serve market data through ReplayWebSocket (else REST paths only)
+            taker_fee: Fee rate of market orders
+            bot_factory: Callable(client) -> TradingBot (default: TradingBot(client=client))
+        """
+        self.data = data
+        self.start_ms = start_ms if start_ms is not None else data.start_ms + warmup_bars * data.base_timeframe_ms
+        self.end_ms = end_ms if end_ms is not None else data.end_ms
+        self.step_seconds = step_seconds
+        self.scan_interval = scan_interval if scan_interval is not None else Config.CHECK_INTERVAL
+        self.position_interval = position_interval if position_interval is not None \
+            else max(step_seconds, Config.POSITION_UPDATE_INTERVAL)
+        self.initial_balance = initial_balance
+        self.use_websocket = use_websocket
+        self.taker_fee = taker_fee
+        self.bot_factory = bot_factory
+        self.logger = Logger.get_logger()
+
+        self.clock = SimulatedClock(self.start_ms / 1000)
+        self.exchange = None
+        self.bot = None
+        self.equity_curve: List[Tuple[int, float]] = []
+        self._latencies: Dict[str, List[float]] = {}
+
+    def _timed(self, stage: str, func: Callable, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._latencies.setdefault(stage, []).append(time.perf_counter() - started)
+
+    def _make_bot(self, client: ReplayKuCoinClient):
+        if self.bot_factory is not None:
+            return self.bot_factory(client)
+        from bot import TradingBot
+        return TradingBot(client=client)
+
+    def run(self) -> Dict:
+        """
+        Replay [start_ms, end_ms) through the bot
+
+        Returns:
+            Report dict with P&L, trade counts, drawdown, speed and per-stage latency
+        """
+        self.exchange = ReplayExchange(self.data, self.clock, self.initial_balance, taker_fee=self.taker_fee)
+        websocket = ReplayWebSocket(self.data, self.clock) if self.use_websocket else None
+        end = self.end_ms / 1000
+        steps = 0
+        wall_start = time.perf_counter()
+
+        overrides = {'ENABLE_DASHBOARD': False}
+        for name in ('API_KEY', 'API_SECRET', 'API_PASSPHRASE'):
+            if not getattr(Config, name, None):
+                overrides[name] = 'replay'
+        # Config.validate() checks the environment, not the Config attributes
+        credentials = {f'KUCOIN_{name}': 'replay' for name in ('API_KEY', 'API_SECRET', 'API_PASSPHRASE')}
+
+        with _config_overrides(**overrides), _environ_defaults(**credentials), self.clock.installed():
+            client = ReplayKuCoinClient(self.exchange, websocket)
+            self.bot = bot = self._make_bot(client)
+            self.logger.info(
+                f"▶️  Replaying {len(self.data.symbols)} symbols from "
+                f"{self.clock.now().isoformat()} to {datetime.fromtimestamp(end).isoformat()}"
+            )
+            next_scan = next_cycle = next_position_check = self.clock.time()
+            try:
+                while self.clock.time() < end:
+                    now = self.clock.time()
+                    self.exchange.match_orders()
+
+                    if now >= next_position_check:
+                        if bot.position_manager.get_open_positions_count() > 0:
+                            self._timed('position_update', bot.update_open_positions)
+                        next_position_check = now + self.position_interval
+
+                    if now >= next_scan:
+                        opportunities = self._timed('scan', bot.scanner.get_best_pairs, n=5)
+                        with bot._scan_lock:
+                            bot._latest_opportunities = opportunities
+                            bot._last_opportunity_update = self.clock.now()
+                        next_scan = now + self.scan_interval
+
+                    if now >= next_cycle:
+                        self._timed('cycle', bot.run_cycle)
+                        next_cycle = now + Config.CHECK_INTERVAL
+
+                    self.equity_curve.append((self.clock.time_ms(), self.exchange.equity()))
+                    steps += 1
+                    self.clock.set(now + self.step_seconds)
+            finally:
+                try:
+                    bot.scanner.shutdown()
+                finally:
+                    client.close()
+
+        return self._report(steps, time.perf_counter() - wall_start)
+
+    def _report(self, steps: int, wall_seconds: float) -> Dict:
+        equity = np.array([value for _, value in self.equity_curve]) if self.equity_curve \
+            else np.array([self.initial_balance])
+        peaks = np.maximum.accumulate(equity)
+        simulated_seconds = (self.clock.time_ms() - self.start_ms) / 1000
+        final_equity = float(equity[-1])
+        return {
+            'start_ms': self.start_ms,
+            'end_ms': self.clock.time_ms(),
+            'steps': steps,
+            'simulated_seconds': simulated_seconds,
+            'wall_seconds': wall_seconds,
+            'speedup': simulated_seconds / wall_seconds if wall_seconds > 0 else float('inf'),
+            'initial_balance': self.initial_balance,
+            'final_equity': final_equity,
+            'total_pnl': final_equity - self.initial_balance,
+            'return_pct': (final_equity - self.initial_balance) / self.initial_balance * 100,
+            'realized_pnl': self.exchange.realized_pnl,
+            'fees_paid': self.exchange.fees_paid,
+            'fills': len(self.exchange.fills),
+            'open_positions': len(self.exchange.positions),
+            'max_drawdown_pct': float(((peaks - equity) / peaks).max() * 100),
+            'latency': {stage: _latency_summary(samples) for stage, samples in self._latencies.items()},
+        }
@@ -0,0 +1,136 @@
+"""
+Single-flight request coalescing with a short TTL micro-cache
+
+Position updates, the DCA loop, the dashboard and the scanner often ask for
+the same data (e.g. a ticker) within milliseconds of each other. Instead of
+sending one REST request per caller, concurrent callers for the same key share
+one in-flight request, and a result younger than the endpoint's freshness
+budget is served from memory.
+
+Features:
+- Single-flight: one leader performs the request, followers wait for its result;
+  callers only join a leader in the same lane (e.g. the same call priority)
+- Per-call freshness budget (max_age); 0 disables the cache but still coalesces
+- Failed requests (None or exceptions) are never cached
+- Every caller gets its own copy of the result, so mutating it affects no one else
+- Hit / miss / coalesced counters reported to PerformanceMonitor
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from logger import Logger
+from performance_monitor import get_monitor
+
+
+class _InFlight:
+    """Result slot shared by the leader and followers of one request"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    Deduplicates concurrent identical requests and caches results briefly.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        """
+        Initialize request coalescer.
+
+        Args:
+            max_entries: Cached results kept before expired entries are purged
+        """
+        self.logger = Logger.get_logger()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def _record(self, endpoint: str, outcome: str):
+        self._stats[outcome] += 1
+        try:
+            get_monitor().record_request_cache(endpoint, outcome)
+        except Exception as e:
+            self.logger.debug(f"Performance monitoring failed in RequestCoalescer: {e}")
+
+    def get(self, endpoint: str, args: Tuple, fetch: Callable[[], Any], max_age: float,
+            lane: Hashable = None) -> Any:
+        """
+        Return a fresh cached result, join an in-flight request, or fetch
+
+        Args:
+            endpoint: Endpoint name (metrics label and part of the key)
+            args: Hashable request arguments (e.g. (symbol,))
+            fetch: Function performing the request
+            max_age: Freshness budget in seconds for cached results
+            lane: Only an in-flight request of the same lane is joined, so an urgent
+                caller never waits on a leader held back behind other work; cached
+                results are shared by all lanes
+
+        Returns:
+            A copy of the (possibly shared) result of fetch()
+        """
+        key = (endpoint,) + tuple(args)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and max_age > 0 and time.monotonic() - cached[0] <= max_age:
+                self._record(endpoint, 'hits')
+                return copy.deepcopy(cached[1])
+
+            flight_key = key + (lane,)
+            flight = self._in_flight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[flight_key] = flight
+                self._record(endpoint, 'misses')
+            else:
+                self._record(endpoint, 'coalesced')
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fetch()
+            return copy.deepcopy(flight.result)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+                if flight.error is None and flight.result is not None:
+                    self._store(key, flight.result)
+            flight.done.set()
+
+    def _store(self, key: Hashable, result: Any):
+        """Cache a result (caller holds the lock)"""
+        now = time.monotonic()
+        if len(self._cache) >= self.max_entries:
+            # Drop the oldest half; entries are only useful for a second or two
+            keep = sorted(self._cache.items(), key=lambda item: item[1][0])[len(self._cache) // 2:]
+            self._cache = dict(keep)
+        self._cache[key] = (now, result)
+
+    def invalidate(self, endpoint: str = None):
+        """Drop cached results for one endpoint (or all)"""
+        with self._lock:
+            if endpoint is None:
+                self._cache.clear()
+            else:
+                self._cache = {k: v for k, v in self._cache.items() if k[0] != endpoint}
+
+    def get_stats(self) -> Dict:
+        """Hit / miss / coalesced counters and current cache size"""
+        with self._lock:
+            return {**self._stats, 'entries': len(self._cache), 'in_flight': len(self._in_flight)}
@@ -0,0 +1,226 @@
+"""
+Streaming rolling correlation engine
+
+Keeps the last `window` returns of every tracked symbol in one
+(symbols x window) array, aligned on a shared tick clock, together with
+running pairwise sums. Each committed tick updates the sums with two outer
+products (the new returns in, the evicted ones out), so the full correlation
+matrix comes out of one vectorized step instead of a corrcoef per pair.
+
+Features:
+- Tick alignment: a tick closes when a symbol reports a second price (or on
+  commit()/read); symbols without a new price carry their last one forward
+- Pairwise overlap masks, so a symbol added later is correlated only over the
+  ticks both symbols have data for
+- Running sums resynchronized from the window every `window` ticks, so
+  floating-point drift from add/subtract never accumulates
+- Thread-safe; the arrays grow as symbols are added
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class RollingCorrelationEngine:
+    """
+    Rolling return correlations for many symbols with O(symbols^2) vectorized
+    work per tick and O(1) work per price update.
+    """
+
+    def __init__(self, window: int = 99, min_periods: int = 19, initial_capacity: int = 16):
+        """
+        Initialize engine.
+
+        Args:
+            window: Number of returns (ticks) kept per symbol
+            min_periods: Overlapping returns a pair needs before it has a correlation
+            initial_capacity: Symbol slots allocated up front (grows as needed)
+        """
+        self.window = window
+        self.min_periods = min_periods
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._allocate(initial_capacity)
+        self._head = 0  # Ring slot the next tick is written to
+        self._ticks = 0
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate storage for `capacity` symbols, keeping existing data"""
+        def grow(name, shape, fill):
+            array = np.full(shape, fill)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[tuple(slice(0, s) for s in old.shape)] = old
+            setattr(self, name, array)
+
+        grow('_returns', (capacity, self.window), 0.0)
+        grow('_valid', (capacity, self.window), 0.0)  # 1.0 where the return exists
+        grow('_prices', (capacity,), np.nan)  # Price at the last closed tick
+        grow('_pending', (capacity,), np.nan)  # Price reported for the open tick
+        # Pairwise running sums over ticks where both symbols have a return:
+        # count, sum of x_i, sum of x_i^2 (row symbol i, column symbol j), sum of x_i * x_j
+        for name in ('_n', '_sx', '_sxx', '_sxy'):
+            grow(name, (capacity, capacity), 0.0)
+        self._capacity = capacity
+
+    def _slot(self, symbol: str) -> int:
+        idx = self._index.get(symbol)
+        if idx is None:
+            idx = len(self._index)
+            if idx >= self._capacity:
+                self._allocate(self._capacity * 2)
+            self._index[symbol] = idx
+        return idx
+
+    @property
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def update_price(self, symbol: str, price: float):
+        """
+        Record the latest price of a symbol for the current tick
+
+        A second price for the same symbol closes the current tick first.
+        """
+        with self._lock:
+            idx = self._slot(symbol)
+            if not np.isnan(self._pending[idx]):
+                self._commit()
+            self._pending[idx] = price
+
+    def update_prices(self, prices: Dict[str, float]):
+        """Record one tick of prices for many symbols and close it"""
+        with self._lock:
+            indices = [self._slot(symbol) for symbol in prices]
+            if not np.isnan(self._pending[indices]).all():
+                self._commit()
+            self._pending[indices] = list(prices.values())
+            self._commit()
+
+    def commit(self):
+        """Close the current tick (no-op if no price arrived since the last one)"""
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        n = len(self._index)
+        pending = self._pending[:n]
+        if np.isnan(pending).all():
+            return
+
+        previous = self._prices[:n]
+        current = np.where(np.isnan(pending), previous, pending)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = current / previous - 1.0
+        valid = np.isfinite(returns) & (previous != 0)
+        x = np.where(valid, returns, 0.0)
+        m = valid.astype(float)
+
+        slot = self._head
+        if self._ticks >= self.window:
+            self._accumulate(self._returns[:n, slot], self._valid[:n, slot], -1.0)
+        self._returns[:n, slot] = x
+        self._valid[:n, slot] = m
+        self._accumulate(x, m, 1.0)
+
+        self._prices[:n] = current
+        self._pending[:n] = np.nan
+        self._head = (slot + 1) % self.window
+        self._ticks += 1
+        if self._ticks % self.window == 0:
+            self._resync()
+
+    def _accumulate(self, x: np.ndarray, m: np.ndarray, sign: float):
+        """Add (sign=1) or remove (sign=-1) one tick's returns from the running sums"""
+        n = len(x)
+        self._n[:n, :n] += sign * np.outer(m, m)
+        self._sx[:n, :n] += sign * np.outer(x, m)
+        self._sxx[:n, :n] += sign * np.outer(x * x, m)
+        self._sxy[:n, :n] += sign * np.outer(x, x)
+
+    def _resync(self):
+        """Recompute the running sums exactly from the window"""
+        n = len(self._index)
+        x, m = self._returns[:n], self._valid[:n]
+        self._n[:n, :n] = m @ m.T
+        self._sx[:n, :n] = x @ m.T
+        self._sxx[:n, :n] = (x * x) @ m.T
+        self._sxy[:n, :n] = x @ x.T
+
+    def correlation_matrix(self, symbols: List[str]) -> np.ndarray:
+        """
+        Correlation matrix for the given symbols in one vectorized step
+
+        Closes the current tick first.
+
+        Returns:
+            (len(symbols), len(symbols)) array; 1.0 on the diagonal, NaN where a
+            pair has fewer than min_periods overlapping returns, a flat series,
+            or a symbol that was never updated
+        """
+        with self._lock:
+            self._commit()
+            known = [self._index.get(symbol, -1) for symbol in symbols]
+            idx = np.array([i for i in known if i >= 0], dtype=int)
+            sub = np.ix_(idx, idx)
+            count, sx, sxx, sxy = self._n[sub], self._sx[sub], self._sxx[sub], self._sxy[sub]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_i = sx / count
+            mean_j = mean_i.T
+            var_i = sxx / count - mean_i ** 2
+            var_j = var_i.T
+            corr = (sxy / count - mean_i * mean_j) / np.sqrt(var_i * var_j)
+        # A variance that is only rounding noise relative to the mean square is a flat series
+        flat = var_i <= 1e-12 * (sxx / np.maximum(count, 1))
+        corr[(count < self.min_periods) | flat | flat.T] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+
+        result = np.full((len(symbols), len(symbols)), np.nan)
+        positions = [pos for pos, i in enumerate(known) if i >= 0]
+        result[np.ix_(positions, positions)] = corr
+        np.fill_diagonal(result, 1.0)
+        return result
+
+    def correlation(self, symbol1: str, symbol2: str, lookback: int = None) -> Optional[float]:
+        """
+        Correlation of one pair
+
+        Args:
+            symbol1: First symbol
+            symbol2: Second symbol
+            lookback: Only use the last `lookback` ticks (default: the whole window)
+
+        Returns:
+            Correlation coefficient, or None if the pair has too little data
+        """
+        if lookback is None or lookback >= self.window:
+            value = self.correlation_matrix([symbol1, symbol2])[0, 1]
+            return None if np.isnan(value) else float(value)
+
+        with self._lock:
+            self._commit()
+            if symbol1 not in self._index or symbol2 not in self._index:
+                return None
+            ticks = min(lookback, self._ticks)
+            slots = (self._head - 1 - np.arange(ticks)) % self.window
+            rows = [self._index[symbol1], self._index[symbol2]]
+            x = self._returns[np.ix_(rows, slots)]
+            both = (self._valid[np.ix_(rows, slots)] > 0).all(axis=0)
+
+        if both.sum() < self.min_periods:
+            return None
+        x = x[:, both]
+        if np.ptp(x[0]) == 0 or np.ptp(x[1]) == 0:
+            return None
+        return float(np.corrcoef(x[0], x[1])[0, 1])
+
+    def observations(self, symbol: str) -> int:
+        """Returns of a symbol inside the window"""
+        with self._lock:
+            self._commit()
+            idx = self._index.get(symbol)
+            return 0 if idx is None else int(self._n[idx, idx])
@@ -0,0 +1,233 @@
+"""
+Process-pool signal evaluation for the market scanner
+
+Fetching OHLCV is I/O-bound and stays on threads, but indicator math and
+signal generation are CPU-bound and serialize under the GIL. This module
+moves that stage to a persistent pool of warmed-up worker processes.
+
+Features:
+- Persistent ProcessPoolExecutor, each worker holds its own SignalGenerator
+- Raw candles are packed once into a shared memory block (no pickled DataFrames)
+- Workers run BatchIndicators on their chunk, then generate signals and scores
+- Same evaluation function as the in-process scanner paths
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from batch_indicators import BatchIndicators
+from indicators import Indicators
+from logger import Logger
+
+TIMEFRAMES = ('1h', '4h', '1d')
+
+# Per-process signal generator, created by the pool initializer
+_worker_generator = None
+
+
+def evaluate_frames(signal_generator, df_1h, df_4h=None, df_1d=None) -> Tuple[float, str, float, Dict, Optional[Dict]]:
+    """
+    Generate signal, score and market-context metrics from indicator frames
+
+    Returns:
+        Tuple of (score, signal, confidence, reasons, metrics)
+    """
+    # Generate signal with multi-timeframe analysis
+    signal, confidence, reasons = signal_generator.generate_signal(df_1h, df_4h, df_1d)
+
+    # Calculate score
+    score = signal_generator.calculate_score(df_1h)
+
+    # Extract metrics for market context
+    indicators = Indicators.get_latest_indicators(df_1h)
+    metrics = {
+        'volatility': indicators.get('bb_width', 0.03),
+        'volume_ratio': indicators.get('volume_ratio', 1.0),
+        'indicators': indicators  # Latest 1h row, for batched ML scoring
+    } if indicators else None
+
+    return score, signal, confidence, reasons, metrics
+
+
+def _synthetic_ohlcv(n: int = 100) -> np.ndarray:
+    """Deterministic candles used to warm up a worker"""
+    close = 100 + np.sin(np.arange(n) / 5.0)
+    return np.column_stack([
+        np.arange(n) * 3_600_000.0, close, close * 1.001, close * 0.999, close, np.full(n, 1000.0)
+    ])
+
+
+def _init_worker():
+    """Build the worker's SignalGenerator and run one evaluation so imports and caches are hot"""
+    global _worker_generator
+    from signals import SignalGenerator
+    _worker_generator = SignalGenerator()
+    try:
+        frames = BatchIndicators.calculate_many({'WARMUP': _synthetic_ohlcv()})
+        evaluate_frames(_worker_generator, frames['WARMUP'])
+    except Exception:
+        pass
+
+
+def _evaluate_chunk(shm_name: str, total_rows: int, layout: Dict[str, Dict[str, Tuple[int, int]]],
+                    adaptive_threshold: float) -> Dict[str, Tuple]:
+    """
+    Evaluate a chunk of symbols whose candles live in shared memory
+
+    Args:
+        shm_name: Name of the shared memory block holding all candles
+        total_rows: Number of candle rows in the block
+        layout: symbol -> timeframe -> (row offset, row count)
+        adaptive_threshold: Current SignalGenerator.adaptive_threshold of the scanner
+
+    Returns:
+        symbol -> (score, signal, confidence, reasons, metrics), or an Exception instance
+    """
+    _worker_generator.adaptive_threshold = adaptive_threshold
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        candles = np.ndarray((total_rows, 6), dtype=np.float64, buffer=shm.buf)
+        frames = {}
+        for timeframe in TIMEFRAMES:
+            # calculate_many stacks the slices into its own tensor, so nothing
+            # returned below references the shared block
+            histories = {}
+            for symbol, spans in layout.items():
+                if timeframe in spans:
+                    offset, rows = spans[timeframe]
+                    histories[symbol] = candles[offset:offset + rows]
+            frames[timeframe] = BatchIndicators.calculate_many(histories)
+            del histories
+        del candles
+    finally:
+        shm.close()
+
+    results = {}
+    for symbol in layout:
+        try:
+            df_1h = frames['1h'][symbol]
+            if df_1h.empty:
+                results[symbol] = ValueError('Indicator calculation failed')
+                continue
+            results[symbol] = evaluate_frames(
+                _worker_generator, df_1h, frames['4h'].get(symbol), frames['1d'].get(symbol)
+            )
+        except Exception as e:
+            results[symbol] = e
+    return results
+
+
+class ProcessScanEvaluator:
+    """
+    Persistent process pool that turns fetched OHLCV into scan evaluations.
+    """
+
+    def __init__(self, max_workers: int = 0):
+        """
+        Initialize process scan evaluator.
+
+        Args:
+            max_workers: Worker processes (0 = one per CPU)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = Logger.get_logger()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+            self.logger.info(f"⚡ Scanner process pool started with {self.max_workers} workers")
+        return self._executor
+
+    @staticmethod
+    def _pack(ohlcv_by_symbol: Dict[str, Dict[str, List]]) -> Tuple[Dict[str, np.ndarray], Dict, Dict[str, Exception]]:
+        """Convert candles to float arrays and assign row offsets in the shared block"""
+        arrays = {}
+        layout = {}
+        failed = {}
+        offset = 0
+        for symbol, by_timeframe in ohlcv_by_symbol.items():
+            try:
+                converted = {}
+                for timeframe in TIMEFRAMES:
+                    ohlcv = by_timeframe.get(timeframe)
+                    # Same rule as scan_pair: higher timeframes need at least 20 candles
+                    if not ohlcv or (timeframe != '1h' and len(ohlcv) < 20):
+                        continue
+                    array = np.asarray(ohlcv, dtype=np.float64)
+                    if array.ndim != 2 or array.shape[1] < 6:
+                        raise ValueError(f"Malformed {timeframe} candles with shape {array.shape}")
+                    converted[timeframe] = array[:, :6]
+            except (ValueError, TypeError, IndexError) as e:
+                failed[symbol] = e
+                continue
+            spans = {}
+            for timeframe, array in converted.items():
+                arrays[(symbol, timeframe)] = array
+                spans[timeframe] = (offset, len(array))
+                offset += len(array)
+            layout[symbol] = spans
+        return arrays, layout, failed
+
+    def evaluate(self, ohlcv_by_symbol: Dict[str, Dict[str, List]], adaptive_threshold: float,
+                 timeout: float = 60) -> Dict[str, Tuple]:
+        """
+        Evaluate symbols on the process pool
+
+        Args:
+            ohlcv_by_symbol: symbol -> timeframe -> list of OHLCV candles
+            adaptive_threshold: Scanner's current adaptive confidence threshold
+            timeout: Seconds to wait for all chunks
+
+        Returns:
+            symbol -> (score, signal, confidence, reasons, metrics), or an Exception instance
+        """
+        arrays, layout, results = self._pack(ohlcv_by_symbol)
+        if not layout:
+            return results
+
+        total_rows = sum(len(a) for a in arrays.values())
+        shm = shared_memory.SharedMemory(create=True, size=max(total_rows * 6 * 8, 1))
+        try:
+            block = np.ndarray((total_rows, 6), dtype=np.float64, buffer=shm.buf)
+            for (symbol, timeframe), array in arrays.items():
+                offset, rows = layout[symbol][timeframe]
+                block[offset:offset + rows] = array
+            del block
+
+            symbols = list(layout)
+            n_chunks = min(len(symbols), self.max_workers * 2)
+            chunks = [symbols[i::n_chunks] for i in range(n_chunks)]
+            executor = self._get_executor()
+            futures = [
+                (chunk, executor.submit(_evaluate_chunk, shm.name, total_rows,
+                                        {s: layout[s] for s in chunk}, adaptive_threshold))
+                for chunk in chunks
+            ]
+            deadline = time.time() + timeout
+            for chunk, future in futures:
+                try:
+                    results.update(future.result(timeout=max(0.0, deadline - time.time())))
+                except Exception as e:
+                    self.logger.error(f"Scanner worker failed for {len(chunk)} symbols: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        self._executor = None
+                    for symbol in chunk:
+                        results[symbol] = e
+                    future.cancel()
+        finally:
+            shm.close()
+            shm.unlink()
+        return results
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,222 @@
+"""
+Startup-time benchmark for the trading bot
+
+Imports each module in a fresh interpreter with `python -X importtime` so
+nothing is already cached, and reports how long each one takes to import
+together with the heaviest dependencies it pulls in. It also constructs a
+TradingBot (on a replay client, with the configured model and state files)
+to catch frameworks that are only imported while components are built.
+
+Usage:
+    python startup_benchmark.py                 # default module list + bot construction
+    python startup_benchmark.py bot ml_model    # specific modules
+    python startup_benchmark.py --no-bot        # skip the bot construction case
+    python startup_benchmark.py --json          # machine-readable output
+    python startup_benchmark.py --top 5         # dependencies listed per module
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    'bot',
+    'kucoin_client',
+    'market_scanner',
+    'signals',
+    'ml_model',
+    'compiled_model',
+    'enhanced_ml_intelligence',
+    'neural_network_model',
+    'automl',
+    'dashboard',
+]
+
+# Framework imports a lazily loaded engine should not trigger at startup
+HEAVY_FRAMEWORKS = ['tensorflow', 'torch', 'optuna', 'sklearn', 'xgboost', 'lightgbm', 'catboost', 'flask', 'plotly']
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Parse `-X importtime` output
+
+    Returns:
+        One {'name', 'depth', 'self_ms', 'cumulative_ms'} entry per import, in
+        the order printed (a package is listed after the imports it triggered)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, raw_name = line[len('import time:'):].split('|', 2)
+        except ValueError:
+            continue
+        name = raw_name.strip()
+        imports.append({
+            'name': name,
+            'depth': (len(raw_name) - len(raw_name.lstrip())) // 2,
+            'self_ms': int(self_us) / 1000.0,
+            'cumulative_ms': int(cumulative_us) / 1000.0,
+        })
+    return imports
+
+
+def module_subtree(imports: List[Dict], module: str) -> List[Dict]:
+    """The import entry for `module` and everything imported underneath it"""
+    for index, entry in enumerate(imports):
+        if entry['name'] == module and entry['depth'] == 0:
+            start = index
+            while start > 0 and imports[start - 1]['depth'] > entry['depth']:
+                start -= 1
+            return imports[start:index + 1]
+    return []
+
+
+def measure_module(module: str, top: int = 8) -> Dict:
+    """Import `module` in a fresh interpreter and summarize its import cost"""
+    probe = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_FRAMEWORKS!r} if m in sys.modules))"
+    )
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'unknown error'
+        return {'module': module, 'ok': False, 'error': error, 'wall_ms': wall_ms}
+
+    subtree = module_subtree(parse_importtime(proc.stderr), module)
+    root = subtree[-1] if subtree else None
+    # Top-level packages only, so e.g. numpy._core does not crowd out other libraries
+    packages = {}
+    for entry in subtree[:-1]:
+        if '.' not in entry['name']:
+            packages[entry['name']] = max(packages.get(entry['name'], 0.0), entry['cumulative_ms'])
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return {
+        'module': module,
+        'ok': True,
+        'import_ms': root['cumulative_ms'] if root else 0.0,
+        'wall_ms': wall_ms,
+        'heavy_frameworks': [m for m in proc.stdout.strip().split(',') if m],
+        'heaviest_dependencies': [
+            {'name': name, 'cumulative_ms': cumulative_ms} for name, cumulative_ms in heaviest
+        ],
+    }
+
+
+# Builds TradingBot(client=...) on an offline replay exchange and reports JSON timings
+BOT_CONSTRUCTION_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from bot import TradingBot
+from replay import ReplayData, ReplayExchange, ReplayKuCoinClient, SimulatedClock
+imported = time.perf_counter()
+data = ReplayData({('BTC/USDT:USDT', '1h'): [[0, 100.0, 101.0, 99.0, 100.0, 10.0]]})
+client = ReplayKuCoinClient(ReplayExchange(data, SimulatedClock(3600), 10000.0))
+built = time.perf_counter()
+bot = TradingBot(client=client)
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'construct_ms': (done - built) * 1000,
+                  'heavy_frameworks': [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure_bot_construction(env: Dict[str, str] = None) -> Dict:
+    """
+    Import and construct a TradingBot in a fresh interpreter
+
+    Args:
+        env: Extra environment variables (e.g. ML_MODEL_PATH) for the bot's Config
+
+    Returns:
+        {'module': 'TradingBot()', 'ok', 'import_ms', 'construct_ms', 'wall_ms', 'heavy_frameworks'}
+    """
+    child_env = dict(os.environ)
+    for name in ('KUCOIN_API_KEY', 'KUCOIN_API_SECRET', 'KUCOIN_API_PASSPHRASE'):
+        child_env.setdefault(name, 'benchmark')  # Config.validate() needs credentials; no request is sent
+    child_env['ENABLE_DASHBOARD'] = 'false'
+    child_env.update(env or {})
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', BOT_CONSTRUCTION_PROBE % (HEAVY_FRAMEWORKS,)],
+        capture_output=True, text=True, env=child_env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'unknown error'
+        return {'module': 'TradingBot()', 'ok': False, 'error': error, 'wall_ms': wall_ms}
+    return {'module': 'TradingBot()', 'ok': True, 'wall_ms': wall_ms, **json.loads(lines[-1])}
+
+
+def print_report(results: List[Dict]):
+    imports = [r for r in results if r['module'] != 'TradingBot()']
+    constructions = [r for r in results if r['module'] == 'TradingBot()']
+
+    print("\n" + "=" * 80)
+    print("STARTUP IMPORT COST (fresh interpreter per module)")
+    print("=" * 80)
+    print(f"{'Module':<28}{'Import (ms)':>12}{'Process (ms)':>14}  Heavy frameworks loaded")
+    print("-" * 80)
+    for result in sorted(imports, key=lambda r: r.get('import_ms', 0.0), reverse=True):
+        if not result['ok']:
+            print(f"{result['module']:<28}{'failed':>12}{result['wall_ms']:>14.0f}  {result['error']}")
+            continue
+        frameworks = ', '.join(result['heavy_frameworks']) or '-'
+        print(f"{result['module']:<28}{result['import_ms']:>12.0f}{result['wall_ms']:>14.0f}  {frameworks}")
+
+    for result in constructions:
+        print("\n" + "-" * 80)
+        if not result['ok']:
+            print(f"TradingBot() construction failed: {result['error']}")
+            continue
+        frameworks = ', '.join(result['heavy_frameworks']) or '-'
+        print(f"TradingBot() - import {result['import_ms']:.0f} ms, construction {result['construct_ms']:.0f} ms, "
+              f"process {result['wall_ms']:.0f} ms")
+        print(f"   Heavy frameworks loaded: {frameworks}")
+
+    for result in imports:
+        if not result['ok'] or not result['heaviest_dependencies']:
+            continue
+        print(f"\n{result['module']} - heaviest dependencies:")
+        for dep in result['heaviest_dependencies']:
+            print(f"   {dep['name']:<32}{dep['cumulative_ms']:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-module import cost of the trading bot")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument('--top', type=int, default=8, help="Dependencies listed per module")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    parser.add_argument('--no-bot', action='store_true', help="Skip the TradingBot construction case")
+    args = parser.parse_args()
+
+    results = [measure_module(module, top=args.top) for module in args.modules]
+    if not args.no_bot:
+        results.append(measure_bot_construction())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == '__main__':
+    main()
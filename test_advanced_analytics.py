@@ -0,0 +1,167 @@
+"""
+Unit tests for the ring-buffer backed AdvancedAnalytics
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import advanced_analytics
+from advanced_analytics import AdvancedAnalytics, HistoryRingBuffer, TRADE_DTYPE
+
+
+@pytest.fixture
+def analytics(tmp_path, monkeypatch):
+    monkeypatch.setattr(advanced_analytics, 'LEGACY_STATE_PATH', str(tmp_path / 'missing.pkl'))
+    monkeypatch.chdir(tmp_path)
+    return AdvancedAnalytics(max_history_size=20)
+
+
+def reference_equity_metrics(balances):
+    """The original full-scan formulas"""
+    peak, max_dd, max_dd_dollars, drawdowns = balances[0], 0.0, 0.0, []
+    for balance in balances:
+        peak = max(peak, balance)
+        max_dd = max(max_dd, (peak - balance) / peak)
+        max_dd_dollars = max(max_dd_dollars, peak - balance)
+        drawdowns.append((peak - balance) / peak * 100)
+    return {
+        'calmar': (balances[-1] - balances[0]) / balances[0] * 365 / max_dd,
+        'recovery': (balances[-1] - balances[0]) / max_dd_dollars,
+        'ulcer': np.sqrt(np.mean(np.square(drawdowns))),
+    }
+
+
+class TestHistoryRingBuffer:
+    """Test cases for the structured ring buffer."""
+
+    def test_append_evicts_oldest_and_view_is_contiguous(self):
+        buffer = HistoryRingBuffer(np.dtype([('timestamp', '<f8'), ('balance', '<f8')]), 3)
+        assert len(buffer.view()) == 0
+        evicted = [buffer.append((i, i * 10.0)) for i in range(5)]
+
+        assert evicted[:3] == [None, None, None]
+        assert evicted[3]['balance'] == 0.0 and evicted[4]['balance'] == 10.0
+        assert buffer.view()['balance'].tolist() == [20.0, 30.0, 40.0]
+
+        buffer.replace(buffer.view()[1:].copy())
+        assert buffer.view()['timestamp'].tolist() == [3.0, 4.0]
+
+
+class TestRunningMetrics:
+    """Test cases for incrementally maintained metrics."""
+
+    def test_trade_metrics_match_full_recomputation_over_window(self, analytics):
+        rng = np.random.default_rng(7)
+        pnls = rng.normal(0.002, 0.03, 50).round(4)
+        for pnl in pnls:
+            analytics.record_trade({'symbol': 'BTC/USDT:USDT', 'side': 'long', 'pnl': pnl,
+                                    'pnl_pct': pnl, 'duration': 30})
+
+        window = pnls[-20:]
+        metrics = analytics.get_comprehensive_metrics()
+        assert metrics['total_trades'] == 20
+        assert metrics['win_rate'] == pytest.approx(np.mean(window > 0))
+        assert metrics['avg_loss'] == pytest.approx(window[window < 0].mean())
+        assert metrics['profit_factor'] == pytest.approx(window[window > 0].sum() / -window[window < 0].sum())
+        assert metrics['information_ratio'] == pytest.approx(window.mean() / window.std())
+        assert sum(metrics['trade_distribution'].values()) == np.count_nonzero(window)
+
+        # Annualization uses one trade per day when all trades are from today
+        downside = window[window < 0]
+        expected_sortino = window.mean() * 20 * 365 / (downside.std() * np.sqrt(20 * 365))
+        assert metrics['sortino_ratio'] == pytest.approx(expected_sortino)
+
+    def test_streaks_ignore_break_even_trades(self, analytics):
+        for pnl in [1, 1, 0, 1, -1, -1, 0, -1, 1]:
+            analytics.record_trade({'pnl': pnl, 'pnl_pct': pnl / 100})
+        assert analytics.calculate_consecutive_wins_losses() == {
+            'max_wins': 3, 'max_losses': 3, 'current_streak': 1
+        }
+
+    def test_equity_metrics_match_full_recomputation(self, analytics):
+        balances = [1000, 1040, 990, 1010, 950, 1100, 1080, 1150]
+        for balance in balances:
+            analytics.record_equity(balance)
+
+        expected = reference_equity_metrics(balances)
+        assert analytics.calculate_calmar_ratio() == pytest.approx(expected['calmar'])
+        assert analytics.calculate_recovery_factor() == pytest.approx(expected['recovery'])
+        assert analytics.calculate_ulcer_index() == pytest.approx(expected['ulcer'])
+        assert analytics.initial_balance == 1000
+
+    def test_equity_metrics_cover_only_the_buffered_window(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(advanced_analytics, 'LEGACY_STATE_PATH', str(tmp_path / 'missing.pkl'))
+        monkeypatch.chdir(tmp_path)
+        analytics = AdvancedAnalytics(max_history_size=50)
+        # A deep drawdown early on that has left the 50-point window
+        balances = [1000.0, 400.0] + list(np.linspace(800, 1400, 118) + np.sin(np.arange(118)) * 40)
+        for balance in balances:
+            analytics.record_equity(balance)
+
+        expected = reference_equity_metrics(balances[-50:])
+        assert analytics.calculate_calmar_ratio() == pytest.approx(expected['calmar'])
+        assert analytics.calculate_recovery_factor() == pytest.approx(expected['recovery'])
+        assert analytics.calculate_ulcer_index() == pytest.approx(expected['ulcer'])
+        assert analytics.initial_balance == pytest.approx(balances[-50])
+
+    def test_sliding_drawdown_stats_track_every_window_without_rescans(self, analytics, monkeypatch):
+        monkeypatch.setattr(advanced_analytics._EquityStats, 'from_records',
+                            classmethod(lambda cls, records: pytest.fail('window rescanned')))
+        rng = np.random.default_rng(3)
+        # Rallies, ties and a long slide, so the window's peak keeps leaving it
+        balances = np.concatenate([np.cumsum(rng.normal(0, 15, 60)) + 1000, np.round(rng.normal(1000, 5, 30)),
+                                   1200 - np.arange(40) * 7.0])
+        for i, balance in enumerate(balances):
+            analytics.record_equity(balance)
+            window = balances[max(0, i - 19):i + 1]
+            peaks = np.maximum.accumulate(window)
+            assert analytics.calculate_ulcer_index() == pytest.approx(
+                np.sqrt(np.mean(np.square((peaks - window) / peaks * 100))) if len(window) > 1 else 0.0, abs=1e-9)
+            if len(window) > 1 and (peaks - window).max() > 0:
+                assert analytics.calculate_recovery_factor() == pytest.approx(
+                    (window[-1] - window[0]) / (peaks - window).max())
+
+    def test_prune_restarts_drawdown_stats(self, analytics):
+        for balance in [1000, 500, 600]:
+            analytics.record_equity(balance)
+        analytics.prune_equity_before(datetime.now() + timedelta(seconds=1))
+        assert analytics.equity_curve == [] and analytics.initial_balance is None
+
+        for balance in [600, 660]:
+            analytics.record_equity(balance)
+        assert analytics.calculate_recovery_factor() == float('inf')
+
+
+class TestAppendOnlyState:
+    """Test cases for the binary state files."""
+
+    def test_save_appends_only_new_records(self, analytics):
+        for i in range(5):
+            analytics.record_trade({'symbol': f'S{i}', 'pnl': i, 'pnl_pct': i / 100})
+        analytics.save_state()
+        trades_file = os.path.join(analytics.state_path, 'trades.bin')
+        assert os.path.getsize(trades_file) == 5 * TRADE_DTYPE.itemsize
+
+        analytics.record_trade({'symbol': 'S5', 'pnl': 5, 'pnl_pct': 0.05})
+        analytics.save_state()
+        analytics.save_state()
+        assert os.path.getsize(trades_file) == 6 * TRADE_DTYPE.itemsize
+
+        reloaded = AdvancedAnalytics(max_history_size=20)
+        assert [t['symbol'] for t in reloaded.trade_history] == [f'S{i}' for i in range(6)]
+        assert reloaded.calculate_profit_factor() == float('inf')
+
+    def test_file_is_compacted_and_torn_append_ignored(self, analytics):
+        for i in range(45):
+            analytics.record_equity(1000 + i)
+            analytics.save_state()
+        equity_file = os.path.join(analytics.state_path, 'equity.bin')
+        assert os.path.getsize(equity_file) <= 2 * 20 * 16
+
+        with open(equity_file, 'ab') as f:
+            f.write(b'\x00' * 5)
+        reloaded = AdvancedAnalytics(max_history_size=20)
+        assert [p['balance'] for p in reloaded.equity_curve] == list(range(1025, 1045))
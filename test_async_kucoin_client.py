@@ -0,0 +1,211 @@
+"""
+Unit tests for the native asyncio KuCoin client
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import ccxt
+import pytest
+
+from async_kucoin_client import AsyncKuCoinClient
+from config import Config
+from kucoin_client import APICallPriority
+from market_scanner import MarketScanner
+from test_batch_indicators import MockScanClient
+
+
+class FakeAsyncExchange:
+    """Async exchange double serving canned market data"""
+
+    def __init__(self, config=None, ohlcv=None):
+        self.config = config or {}
+        self.ohlcv = ohlcv or {}
+        self.markets = {
+            'BTC/USDT:USDT': {'active': True, 'swap': True, 'contractSize': 0.001,
+                              'limits': {'amount': {'min': 1, 'max': 10000}, 'cost': {}}},
+        }
+        self.ticker_errors = []
+        self.calls = []
+
+    async def load_markets(self):
+        return self.markets
+
+    async def fetch_ticker(self, symbol):
+        self.calls.append(('fetch_ticker', symbol))
+        if self.ticker_errors:
+            raise self.ticker_errors.pop(0)
+        return {'symbol': symbol, 'last': 50000.0}
+
+    async def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        self.calls.append(('fetch_ohlcv', symbol, timeframe))
+        if symbol not in self.ohlcv:
+            raise ccxt.BadSymbol(symbol)
+        return self.ohlcv[symbol][-limit:]
+
+    async def fetch_balance(self):
+        self.calls.append(('fetch_balance',))
+        return {'free': {'USDT': 10000.0}}
+
+    async def fetch_positions(self):
+        return [{'symbol': 'BTC/USDT:USDT', 'contracts': 5, 'side': 'long', 'leverage': 5}]
+
+    async def set_margin_mode(self, mode, symbol):
+        self.calls.append(('set_margin_mode', symbol))
+
+    async def set_leverage(self, leverage, symbol, params=None):
+        self.calls.append(('set_leverage', leverage))
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.calls.append(('create_order', symbol, type, side, amount, params))
+        return {'id': '1', 'status': 'open', 'amount': amount}
+
+    async def fetch_order(self, order_id, symbol):
+        return {'id': order_id, 'status': 'closed', 'average': 50010.0, 'filled': 5}
+
+    async def close(self):
+        pass
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncKuCoinClient:
+    """Test cases for priority dispatch, retries and orders."""
+
+    def setup_method(self):
+        self.exchange = FakeAsyncExchange()
+        self.patchers = [
+            patch('async_kucoin_client.ccxt_async.kucoinfutures', return_value=self.exchange),
+            patch.object(Config, 'ENABLE_RATE_LIMITER', False),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def teardown_method(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_queued_calls_run_in_priority_order(self):
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p', max_concurrency=1) as client:
+                release = asyncio.Event()
+                order = []
+
+                def call(name):
+                    async def factory():
+                        order.append(name)
+                    return factory
+
+                async def blocker():
+                    await release.wait()
+
+                busy = asyncio.create_task(client._execute_with_priority(blocker, APICallPriority.NORMAL, 'busy'))
+                await asyncio.sleep(0)
+                waiting = [
+                    asyncio.create_task(client._execute_with_priority(call(p.name), p, p.name))
+                    for p in (APICallPriority.LOW, APICallPriority.NORMAL, APICallPriority.HIGH)
+                ]
+                await asyncio.sleep(0)
+
+                # CRITICAL calls do not wait for the busy dispatcher
+                await client._execute_with_priority(call('CRITICAL'), APICallPriority.CRITICAL, 'critical')
+                release.set()
+                await asyncio.gather(busy, *waiting)
+                return order
+
+        assert run(scenario()) == ['CRITICAL', 'HIGH', 'NORMAL', 'LOW']
+
+    def test_network_error_is_retried(self):
+        self.exchange.ticker_errors = [ccxt.NetworkError('connection reset')]
+
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                return await client.get_ticker('BTC/USDT:USDT')
+
+        assert run(scenario())['last'] == 50000.0
+        assert self.exchange.calls.count(('fetch_ticker', 'BTC/USDT:USDT')) == 2
+
+    def test_invalid_order_is_not_retried(self):
+        self.exchange.ticker_errors = [ccxt.InvalidOrder('bad')]
+
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                return await client.get_ticker('BTC/USDT:USDT')
+
+        assert run(scenario()) is None
+
+    def test_market_order_does_not_stall_on_own_balance_check(self):
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                start = time.time()
+                order = await client.create_market_order('BTC/USDT:USDT', 'buy', 5, leverage=5)
+                return order, time.time() - start
+
+        order, elapsed = run(scenario())
+        assert order['average'] == 50010.0
+        assert elapsed < 2.0
+        assert ('fetch_balance',) in self.exchange.calls
+        assert ('set_leverage', 5) in self.exchange.calls
+
+    def test_close_position_is_reduce_only(self):
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                return await client.close_position('BTC/USDT:USDT')
+
+        assert run(scenario()) is True
+        orders = [c for c in self.exchange.calls if c[0] == 'create_order']
+        assert orders[0][3] == 'sell' and orders[0][5]['reduceOnly'] is True
+        assert not any(c[0] == 'set_leverage' for c in self.exchange.calls)
+
+    def test_fetch_ohlcv_many_reports_failures_per_symbol(self):
+        self.exchange.ohlcv = {'GOOD': [[i, 1, 1, 1, 1, 1] for i in range(100)]}
+
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                return await client.fetch_ohlcv_many(['GOOD', 'BAD'], {'1h': 100, '4h': 50})
+
+        with patch.object(Config, 'ENABLE_CANDLE_STORE', False):
+            results = run(scenario())
+        assert len(results['GOOD']['1h']) == 100 and len(results['GOOD']['4h']) == 50
+        assert results['BAD'] == {'1h': [], '4h': []}
+
+    def test_run_bridge_from_sync_code(self):
+        client = AsyncKuCoinClient('k', 's', 'p')
+        try:
+            assert client.run(client.get_ticker('BTC/USDT:USDT'), timeout=10)['last'] == 50000.0
+        finally:
+            client.shutdown()
+
+
+class TestAsyncScannerMode:
+    """Async scanner mode returns the same results as per-pair scanning."""
+
+    def test_async_mode_matches_scan_pair(self):
+        mock_client = MockScanClient()
+        exchange = FakeAsyncExchange(ohlcv=mock_client.data)
+        with patch.object(Config, 'ENABLE_INCREMENTAL_INDICATORS', False), \
+                patch.object(Config, 'ENABLE_CANDLE_STORE', False), \
+                patch.object(Config, 'ENABLE_RATE_LIMITER', False), \
+                patch('async_kucoin_client.ccxt_async.kucoinfutures', return_value=exchange):
+            scanner = MarketScanner(mock_client)
+            scanner._async_client = AsyncKuCoinClient('k', 's', 'p')
+            symbols = list(mock_client.data)
+            try:
+                expected = {symbol: scanner.scan_pair(symbol) for symbol in symbols}
+                scanner.clear_cache()
+                results, timeouts, errors = scanner.scan_pairs_async(symbols, max_workers=4)
+            finally:
+                scanner.shutdown()
+
+        assert timeouts == 0 and errors == 0
+        assert len(results) == len(symbols)
+        for result in results:
+            assert result[:4] == pytest.approx(expected[result[0]][:4])
+            assert result[4] == expected[result[0]][4]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -4,8 +4,10 @@ This test simulates the scenario from the problem statement
 """
 import sys
 import os
+import tempfile
 import warnings
 import numpy as np
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -13,14 +15,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from ml_model import MLModel
 from attention_features_2025 import AttentionFeatureSelector
 
-def test_with_attention_weighting():
+def test_with_attention_weighting(tmp_path):
     """Test that no feature name warnings are raised when using attention-based feature weighting"""
+    model_path = str(tmp_path / 'test_attention_model.pkl')
     print("\n" + "="*70)
     print("Testing Feature Names Warning Fix with Attention Weighting")
     print("="*70)
 
     # Create ML model instance
-    model = MLModel(model_path='models/test_attention_model.pkl')
+    model = MLModel(model_path=model_path)
 
     # Initialize attention selector (2025 AI Enhancement)
     attention_selector = AttentionFeatureSelector(n_features=len(MLModel.FEATURE_NAMES), learning_rate=0.01)
@@ -157,11 +160,6 @@ def test_with_attention_weighting():
     else:
         print("   ⚠ Attention features not yet populated (expected for new model)")
 
-    # Cleanup
-    if os.path.exists('models/test_attention_model.pkl'):
-        os.remove('models/test_attention_model.pkl')
-        print("\n   ✓ Cleaned up test model file")
-
     print("\n" + "="*70)
     print("✓ Feature Names Warning Fix Verified with Attention Weighting!")
     print("="*70)
@@ -172,7 +170,7 @@ if __name__ == '__main__':
     print("Feature Names Warning Fix Test with Attention Weighting")
     print("="*70)
 
-    success = test_with_attention_weighting()
+    success = test_with_attention_weighting(Path(tempfile.mkdtemp()))
 
     if success:
         print("\n✓ TEST PASSED: No feature name warnings with attention weighting")
@@ -0,0 +1,173 @@
+"""
+Unit tests for the vectorized backtest engine mode
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_engine import BacktestEngine, infer_bars_per_day
+
+
+def make_data(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 50000 + np.cumsum(rng.normal(0, 250, n))
+    open_ = np.concatenate([[close[0]], close[:-1]]) + rng.normal(0, 50, n)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start='2024-01-01', periods=n, freq='1h'),
+        'open': open_,
+        'high': np.maximum(open_, close) + 20,
+        'low': np.minimum(open_, close) - 20,
+        'close': close,
+        'volume': rng.uniform(1, 50, n),
+    })
+
+
+def make_signals(data, every=7):
+    """State-independent signals: alternate long/short every few bars"""
+    n = len(data)
+    side = np.array([None] * n, dtype=object)
+    side[::every] = 'long'
+    side[3::every * 2] = 'short'
+    close = data['close'].to_numpy()
+    stop = np.where(side == 'long', close * 0.98, np.where(side == 'short', close * 1.02, np.nan))
+    take = np.where(side == 'long', close * 1.03, np.where(side == 'short', close * 0.97, np.nan))
+    take[::5] = np.nan  # Some signals use the default take profit
+    return pd.DataFrame({'side': side, 'amount': 0.1, 'leverage': 5.0,
+                         'stop_loss': stop, 'take_profit': take})
+
+
+def strategy_from(signals, max_open_positions=None):
+    records = signals.to_dict('records')
+
+    def strategy(row, balance, positions):
+        signal = records[row.name]
+        if not isinstance(signal['side'], str):
+            return None
+        if max_open_positions is not None and len(positions) >= max_open_positions:
+            return None
+        return {k: v for k, v in signal.items() if not (isinstance(v, float) and np.isnan(v))}
+
+    return strategy
+
+
+def assert_same_results(loop, vectorized):
+    for key in ('total_trades', 'winning_trades', 'losing_trades'):
+        assert loop[key] == vectorized[key]
+    for key in ('win_rate', 'total_pnl', 'gross_pnl', 'total_pnl_pct', 'final_balance', 'sharpe_ratio',
+                'max_drawdown', 'total_trading_fees', 'total_funding_fees', 'total_slippage', 'total_fees'):
+        assert vectorized[key] == pytest.approx(loop[key], rel=1e-9, abs=1e-9), key
+
+    assert [t['exit_reason'] for t in vectorized['trades']] == [t['exit_reason'] for t in loop['trades']]
+    for a, b in zip(loop['trades'], vectorized['trades']):
+        assert b['net_pnl'] == pytest.approx(a['net_pnl'], rel=1e-9)
+        assert b['exit_price'] == a['exit_price']
+
+    equity = vectorized['equity_curve']
+    assert equity['equity'].to_numpy() == pytest.approx([e['equity'] for e in loop['equity_curve']], rel=1e-9)
+    assert equity['balance'].to_numpy() == pytest.approx([e['balance'] for e in loop['equity_curve']], rel=1e-12)
+
+
+class TestVectorizedBacktest:
+    """run_backtest_vectorized matches run_backtest on the same inputs."""
+
+    def setup_method(self):
+        self.data = make_data()
+        self.signals = make_signals(self.data)
+
+    def run_both(self, next_bar, max_open_positions=None, initial_balance=10000):
+        loop = BacktestEngine(initial_balance=initial_balance).run_backtest(
+            self.data, strategy_from(self.signals, max_open_positions),
+            use_next_bar_execution=next_bar)
+        vectorized = BacktestEngine(initial_balance=initial_balance).run_backtest_vectorized(
+            self.data, self.signals, use_next_bar_execution=next_bar,
+            max_open_positions=max_open_positions)
+        return loop, vectorized
+
+    @pytest.mark.parametrize('next_bar', [True, False])
+    def test_matches_loop_engine_with_overlapping_positions(self, next_bar):
+        loop, vectorized = self.run_both(next_bar)
+        assert loop['total_trades'] > 20
+        assert_same_results(loop, vectorized)
+
+    @pytest.mark.parametrize('next_bar', [True, False])
+    def test_matches_loop_engine_one_position_at_a_time(self, next_bar):
+        loop, vectorized = self.run_both(next_bar, max_open_positions=1)
+        assert_same_results(loop, vectorized)
+
+    def test_insufficient_margin_skips_entries_like_loop(self):
+        # Small balance: many entries fail the margin check
+        loop, vectorized = self.run_both(True, initial_balance=2500)
+        assert_same_results(loop, vectorized)
+
+    def test_numeric_sides_and_no_signals(self):
+        signals = self.signals.copy()
+        signals['side'] = signals['side'].map({'long': 1, 'short': -1}).fillna(0)
+        engine = BacktestEngine(initial_balance=10000)
+        numeric = engine.run_backtest_vectorized(self.data, signals)
+        named = BacktestEngine(initial_balance=10000).run_backtest_vectorized(self.data, self.signals)
+        assert numeric['final_balance'] == named['final_balance']
+
+        empty = engine.run_backtest_vectorized(self.data, {'side': np.zeros(len(self.data))})
+        assert empty['total_trades'] == 0
+        assert engine.balance == 10000
+
+    def test_misaligned_signals_return_empty_results(self):
+        engine = BacktestEngine(initial_balance=10000)
+        assert engine.run_backtest_vectorized(self.data, {'side': np.ones(10)}) == {}
+
+
+def momentum_strategy(row, balance, positions):
+    """Module-level so it can be sent to walk-forward worker processes"""
+    if positions or row['close'] <= row['open']:
+        return None
+    return {'side': 'long', 'amount': 0.05, 'leverage': 5,
+            'stop_loss': row['close'] * 0.99, 'take_profit': row['close'] * 1.015}
+
+
+class TestWalkForward:
+    """Walk-forward windows follow the data's bar interval and run in parallel."""
+
+    def test_infer_bars_per_day(self):
+        hourly = pd.date_range(start='2024-01-01', periods=50, freq='1h')
+        assert infer_bars_per_day(hourly) == pytest.approx(24)
+        quarter_hours_ms = pd.Index(1_700_000_000_000 + np.arange(50) * 900_000)
+        assert infer_bars_per_day(quarter_hours_ms) == pytest.approx(96)
+        assert infer_bars_per_day(pd.RangeIndex(50)) is None
+
+    def test_window_sizes_follow_bar_interval(self):
+        data = make_data(n=24 * 4 * 20)
+        data['timestamp'] = pd.date_range(start='2024-01-01', periods=len(data), freq='15min')
+        results = BacktestEngine(initial_balance=10000).walk_forward_optimization(
+            data, momentum_strategy, train_period_days=5, test_period_days=2, max_workers=1)
+
+        # 20 days of 15m bars: windows start at day 0, 5, 10 (15 + 5 + 2 > 20)
+        assert results['num_periods'] == 3
+        first = results['period_results'][0]
+        assert first['test_start'] == pd.Timestamp('2024-01-06')
+        assert first['test_end'] == pd.Timestamp('2024-01-07 23:45')
+
+    def test_parallel_matches_sequential_in_window_order(self):
+        data = make_data(n=24 * 60)
+        sequential = BacktestEngine(initial_balance=10000).walk_forward_optimization(
+            data, momentum_strategy, train_period_days=7, test_period_days=3, max_workers=1)
+        parallel = BacktestEngine(initial_balance=10000).walk_forward_optimization(
+            data, momentum_strategy, train_period_days=7, test_period_days=3, max_workers=2)
+
+        assert parallel['num_periods'] == sequential['num_periods'] > 3
+        assert parallel['total_pnl'] == pytest.approx(sequential['total_pnl'])
+        assert [r['test_start'] for r in parallel['period_results']] == \
+            [r['test_start'] for r in sequential['period_results']]
+        assert [r['final_balance'] for r in parallel['period_results']] == \
+            pytest.approx([r['final_balance'] for r in sequential['period_results']])
+
+    def test_unpicklable_strategy_runs_in_process(self):
+        data = make_data(n=24 * 30)
+        results = BacktestEngine(initial_balance=10000).walk_forward_optimization(
+            data, lambda row, balance, positions: momentum_strategy(row, balance, positions),
+            train_period_days=7, test_period_days=3, max_workers=2)
+        assert results['num_periods'] == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,84 @@
+"""
+Unit tests for batched multi-symbol indicator computation
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from batch_indicators import BatchIndicators
+from config import Config
+from indicators import Indicators, OUTPUT_COLUMNS
+from market_scanner import MarketScanner
+from test_incremental_indicators import make_ohlcv
+
+
+class TestBatchIndicators:
+    """Test cases for the tensor indicator path."""
+
+    def test_matches_calculate_all(self):
+        """Every symbol in the batch matches the per-symbol pandas calculation."""
+        data = {f'SYM{i}': make_ohlcv(100, seed=i) for i in range(8)}
+        data['ZERO_VOL'] = make_ohlcv(100, seed=42, zero_volume=(0, 60))
+        data['LONGER'] = make_ohlcv(150, seed=7)
+        frames = BatchIndicators.calculate_many(data)
+
+        for symbol, ohlcv in data.items():
+            expected = Indicators.calculate_all(ohlcv)
+            actual = frames[symbol]
+            assert (expected['timestamp'].values == actual['timestamp'].values).all()
+            for col in OUTPUT_COLUMNS[1:]:
+                np.testing.assert_allclose(
+                    actual[col].to_numpy(float), expected[col].to_numpy(float),
+                    rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f'{symbol} {col}'
+                )
+
+    def test_short_history_is_empty(self):
+        frames = BatchIndicators.calculate_many({'NEW': make_ohlcv(30), 'NONE': None})
+        assert frames['NEW'].empty
+        assert frames['NONE'].empty
+
+    def test_frames_are_views(self):
+        """Per-symbol frames wrap the output tensor instead of copying it."""
+        symbols, tensor = BatchIndicators.stack_ohlcv({'A': make_ohlcv(60, seed=1), 'B': make_ohlcv(60, seed=2)})
+        indicators = BatchIndicators.calculate_all(tensor)
+        assert indicators.shape == (2, 60, len(OUTPUT_COLUMNS))
+
+        df = BatchIndicators.frame(indicators, 1)
+        assert np.shares_memory(df['rsi'].to_numpy(), indicators)
+        assert df['close'].iloc[-1] == tensor[1, -1, 4]
+
+
+class MockScanClient:
+    """Client serving canned OHLCV histories"""
+
+    def __init__(self):
+        self.data = {f'SYM{i}/USDT:USDT': make_ohlcv(100, seed=i) for i in range(6)}
+        self.data['NEW/USDT:USDT'] = make_ohlcv(20)
+
+    def get_ohlcv(self, symbol, timeframe='1h', limit=100):
+        return self.data[symbol][-limit:]
+
+
+class TestBatchedScanner:
+    """Batch scanner mode returns the same results as per-pair scanning."""
+
+    def test_batch_mode_matches_scan_pair(self):
+        with patch.object(Config, 'ENABLE_INCREMENTAL_INDICATORS', False):
+            scanner = MarketScanner(MockScanClient())
+        symbols = list(scanner.client.data)
+
+        expected = {symbol: scanner.scan_pair(symbol) for symbol in symbols}
+        scanner.clear_cache()
+        results, timeouts, errors = scanner.scan_pairs_batched(symbols, max_workers=4)
+
+        assert timeouts == 0 and errors == 0
+        assert len(results) == len(symbols)
+        for result in results:
+            assert result[:4] == pytest.approx(expected[result[0]][:4])
+            assert result[4] == expected[result[0]][4]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,115 @@
+"""
+Unit tests for the ring-buffer candle storage used by KuCoinWebSocket
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from candle_ring_buffer import CandleRingBuffer
+from kucoin_websocket import KuCoinWebSocket
+
+
+def candle(ts, close=100.0):
+    return [ts, close - 1, close + 1, close - 2, close, 10.0]
+
+
+class TestCandleRingBuffer:
+    """Test cases for append, in-place update and views."""
+
+    def setup_method(self):
+        self.buffer = CandleRingBuffer(capacity=5)
+
+    def test_empty_buffer(self):
+        assert len(self.buffer) == 0
+        assert self.buffer.view() is None
+        assert self.buffer.to_list() is None
+        assert self.buffer.last_timestamp() is None
+
+    def test_forming_candle_is_updated_in_place(self):
+        self.buffer.update(candle(1, 100.0))
+        self.buffer.update(candle(1, 105.0))
+        self.buffer.update(candle(2, 106.0))
+        assert len(self.buffer) == 2
+        assert self.buffer.to_list() == [candle(1, 105.0), candle(2, 106.0)]
+
+    def test_wraparound_keeps_newest_candles_in_order(self):
+        for ts in range(12):
+            self.buffer.update(candle(ts, 100.0 + ts))
+        assert len(self.buffer) == 5
+        assert [c[0] for c in self.buffer.to_list()] == [7, 8, 9, 10, 11]
+        assert [c[0] for c in self.buffer.to_list(limit=3)] == [9, 10, 11]
+        assert self.buffer.last_timestamp() == 11
+
+    def test_view_is_zero_copy_and_read_only(self):
+        for ts in range(8):
+            self.buffer.update(candle(ts))
+        view = self.buffer.view(limit=3)
+        assert view.shape == (3, 6)
+        assert view.flags['C_CONTIGUOUS']
+        assert np.shares_memory(view, self.buffer._data)
+        assert list(view[:, 0]) == [5, 6, 7]
+        with pytest.raises(ValueError):
+            view[0, 4] = 1.0
+
+        # The forming candle revision is visible through the view
+        self.buffer.update(candle(7, 123.0))
+        assert view[-1, 4] == 123.0
+
+    def test_timestamps_are_ints_in_lists(self):
+        self.buffer.update(candle(1_700_000_000_000))
+        assert isinstance(self.buffer.to_list()[0][0], int)
+
+
+class TestWebSocketCandleStorage:
+    """KuCoinWebSocket stores candle stream updates in ring buffers."""
+
+    def setup_method(self):
+        self.ws = KuCoinWebSocket()
+
+    def push(self, symbol, ts, close):
+        self.ws._update_candle(symbol, '1hour', {'candles': [str(ts), '1', '2', '0.5', str(close), '10']})
+
+    def test_get_ohlcv_returns_lists(self):
+        for ts in range(600):
+            self.push('XBTUSDTM', ts, 100 + ts)
+        candles = self.ws.get_ohlcv('XBTUSDTM', '1hour', limit=100)
+        assert len(candles) == 100
+        assert candles[-1] == [599, 1.0, 2.0, 0.5, 699.0, 10.0]
+        assert len(self.ws.get_ohlcv('XBTUSDTM', '1hour', limit=1000)) == KuCoinWebSocket.CANDLE_CAPACITY
+        assert self.ws.has_candles('XBTUSDTM', '1hour')
+        assert self.ws.get_ohlcv('ETHUSDTM', '1hour') is None
+
+    def test_get_ohlcv_array_matches_lists(self):
+        for ts in range(50):
+            self.push('XBTUSDTM', ts, 100 + ts)
+        array = self.ws.get_ohlcv_array('XBTUSDTM', '1hour', limit=20)
+        assert np.array_equal(array, np.array(self.ws.get_ohlcv('XBTUSDTM', '1hour', limit=20), dtype=float))
+
+    def test_concurrent_streams(self):
+        def writer(symbol):
+            for ts in range(1000):
+                self.push(symbol, ts, ts)
+
+        def reader(symbol):
+            for _ in range(200):
+                candles = self.ws.get_ohlcv(symbol, '1hour', limit=100)
+                if candles:
+                    timestamps = [c[0] for c in candles]
+                    assert timestamps == sorted(timestamps)
+
+        symbols = ['A', 'B', 'C', 'D']
+        threads = [threading.Thread(target=writer, args=(s,)) for s in symbols]
+        threads += [threading.Thread(target=reader, args=(s,)) for s in symbols]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for symbol in symbols:
+            assert self.ws.get_ohlcv(symbol, '1hour', limit=1)[0][0] == 999
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,213 @@
+"""
+Unit tests for the persistent OHLCV candle store and delta fetching
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from candle_store import CandleStore, timeframe_to_ms
+from config import Config
+
+HOUR_MS = 3_600_000
+
+
+def make_candles(start_ts, count, tf_ms=HOUR_MS, base=100.0):
+    return [[start_ts + i * tf_ms, base + i, base + i + 1, base + i - 1, base + i + 0.5, 1000.0 + i]
+            for i in range(count)]
+
+
+class TestCandleStore:
+    """Test cases for the SQLite candle store."""
+
+    def setup_method(self):
+        self.store = CandleStore(':memory:', max_candles=50)
+
+    def teardown_method(self):
+        self.store.close()
+
+    def test_timeframe_to_ms(self):
+        assert timeframe_to_ms('1m') == 60_000
+        assert timeframe_to_ms('4h') == 4 * HOUR_MS
+        assert timeframe_to_ms('1d') == 24 * HOUR_MS
+        with pytest.raises(ValueError):
+            timeframe_to_ms('1M')
+
+    def test_upsert_and_read_back(self):
+        candles = make_candles(0, 10)
+        assert self.store.upsert('BTC', '1h', candles) == 10
+        assert self.store.last_timestamp('BTC', '1h') == 9 * HOUR_MS
+        assert self.store.get_candles('BTC', '1h', 5) == candles[-5:]
+        assert self.store.last_timestamp('BTC', '4h') is None
+
+    def test_forming_candle_is_revised(self):
+        self.store.upsert('BTC', '1h', make_candles(0, 10))
+        revised = [9 * HOUR_MS, 1.0, 2.0, 0.5, 1.5, 42.0]
+        self.store.upsert('BTC', '1h', [revised])
+        candles = self.store.get_candles('BTC', '1h', 100)
+        assert len(candles) == 10
+        assert candles[-1] == revised
+
+    def test_history_is_pruned(self):
+        self.store.upsert('BTC', '1h', make_candles(0, 80))
+        candles = self.store.get_candles('BTC', '1h', 1000)
+        assert len(candles) == 50
+        assert candles[0][0] == 30 * HOUR_MS
+
+    def test_delta_is_planned_and_merged_by_the_store(self):
+        now = 20 * HOUR_MS + 60_000
+        assert self.store.delta_since('BTC', '1h', 10, now_ms=now) is None
+        self.store.upsert('BTC', '1h', make_candles(11 * HOUR_MS, 9))
+
+        # Only the newest stored candle onwards is requested
+        assert self.store.delta_since('BTC', '1h', 9, now_ms=now) == (19 * HOUR_MS, 3)
+        assert self.store.delta_since('BTC', '1h', 10, now_ms=now) is None
+
+        gap = make_candles(21 * HOUR_MS, 1)
+        assert self.store.merge_delta('BTC', '1h', 19 * HOUR_MS, gap, 9) is None
+        assert self.store.last_timestamp('BTC', '1h') == 19 * HOUR_MS
+
+        fresh = make_candles(19 * HOUR_MS, 2, base=200.0)
+        merged = self.store.merge_delta('BTC', '1h', 19 * HOUR_MS, fresh, 9)
+        assert merged[-2:] == fresh and len(merged) == 9
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / 'candles.db')
+        store = CandleStore(path)
+        store.upsert('ETH', '1h', make_candles(0, 5))
+        store.close()
+
+        reopened = CandleStore(path)
+        try:
+            assert reopened.last_timestamp('ETH', '1h') == 4 * HOUR_MS
+            assert len(reopened.get_candles('ETH', '1h', 10)) == 5
+        finally:
+            reopened.close()
+
+
+class FakeExchange:
+    """Exchange serving a fixed hourly history ending at the current hour"""
+
+    def __init__(self, count=300):
+        now = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+        self.candles = make_candles(now - (count - 1) * HOUR_MS, count)
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        self.calls.append({'since': since, 'limit': limit})
+        candles = self.candles
+        if since is not None:
+            candles = [c for c in candles if c[0] >= since][:limit]
+        elif limit:
+            candles = candles[-limit:]
+        return [list(c) for c in candles]
+
+
+class TestDeltaFetching:
+    """KuCoinClient.get_ohlcv only fetches candles newer than the stored ones."""
+
+    def setup_method(self):
+        self.exchange = FakeExchange()
+
+    def make_client(self, path):
+        from kucoin_client import KuCoinClient
+        with patch('kucoin_client.ccxt.kucoinfutures', return_value=MagicMock()):
+            client = KuCoinClient('key', 'secret', 'pass', enable_websocket=False)
+        client.exchange = self.exchange
+        return client
+
+    def test_second_fetch_is_delta(self, tmp_path):
+        with patch.object(Config, 'ENABLE_CANDLE_STORE', True), \
+                patch.object(Config, 'CANDLE_STORE_PATH', str(tmp_path / 'candles.db')):
+            client = self.make_client(tmp_path)
+            first = client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            expected_first = [list(c) for c in self.exchange.candles[-100:]]
+
+            # Revise the forming candle and append a new one
+            self.exchange.candles[-1][4] = 999.0
+            self.exchange.candles.append(make_candles(self.exchange.candles[-1][0] + HOUR_MS, 1)[0])
+            second = client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            client.close()
+
+        assert first == expected_first
+        assert second == self.exchange.candles[-100:]
+        assert self.exchange.calls[0] == {'since': None, 'limit': 100}
+        assert self.exchange.calls[1]['since'] == first[-1][0]
+        stats = client.get_candle_store_stats()
+        assert stats['full_fetches'] == 1 and stats['delta_fetches'] == 1
+
+    def test_store_survives_restart(self, tmp_path):
+        with patch.object(Config, 'ENABLE_CANDLE_STORE', True), \
+                patch.object(Config, 'CANDLE_STORE_PATH', str(tmp_path / 'candles.db')):
+            client = self.make_client(tmp_path)
+            client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            client.close()
+
+            restarted = self.make_client(tmp_path)
+            candles = restarted.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            restarted.close()
+
+        assert candles == self.exchange.candles[-100:]
+        assert self.exchange.calls[1]['since'] is not None
+
+    def test_larger_limit_falls_back_to_full_fetch(self, tmp_path):
+        with patch.object(Config, 'ENABLE_CANDLE_STORE', True), \
+                patch.object(Config, 'CANDLE_STORE_PATH', str(tmp_path / 'candles.db')):
+            client = self.make_client(tmp_path)
+            client.get_ohlcv('BTC/USDT:USDT', '1h', limit=50)
+            candles = client.get_ohlcv('BTC/USDT:USDT', '1h', limit=200)
+            client.close()
+
+        assert candles == self.exchange.candles[-200:]
+        assert self.exchange.calls[1] == {'since': None, 'limit': 200}
+
+    def test_disabled_store_fetches_full_history(self, tmp_path):
+        with patch.object(Config, 'ENABLE_CANDLE_STORE', False):
+            client = self.make_client(tmp_path)
+            client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+            client.close()
+
+        assert all(call['since'] is None for call in self.exchange.calls)
+
+
+class AsyncFakeExchange(FakeExchange):
+    async def load_markets(self):
+        return {}
+
+    async def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None):
+        return FakeExchange.fetch_ohlcv(self, symbol, timeframe, since, limit)
+
+    async def close(self):
+        pass
+
+
+class TestAsyncDeltaFetching:
+    """AsyncKuCoinClient.get_ohlcv shares the store's delta fetching."""
+
+    def test_second_fetch_is_delta(self, tmp_path):
+        import asyncio
+        from async_kucoin_client import AsyncKuCoinClient
+
+        exchange = AsyncFakeExchange()
+
+        async def scenario():
+            async with AsyncKuCoinClient('k', 's', 'p') as client:
+                first = await client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+                exchange.candles.append(make_candles(exchange.candles[-1][0] + HOUR_MS, 1)[0])
+                return first, await client.get_ohlcv('BTC/USDT:USDT', '1h', limit=100)
+
+        with patch('async_kucoin_client.ccxt_async.kucoinfutures', return_value=exchange), \
+                patch.object(Config, 'ENABLE_RATE_LIMITER', False), \
+                patch.object(Config, 'ENABLE_CANDLE_STORE', True), \
+                patch.object(Config, 'CANDLE_STORE_PATH', str(tmp_path / 'candles.db')):
+            first, second = asyncio.run(scenario())
+
+        assert first == exchange.candles[-101:-1]
+        assert second == exchange.candles[-100:]
+        assert exchange.calls[1]['since'] == first[-1][0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,76 @@
+"""
+Unit tests for the buffered ClickHouseLogger (SQLite fallback)
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+import clickhouse_logger
+from clickhouse_logger import ClickHouseLogger
+
+
+@pytest.fixture
+def sqlite_logger(tmp_path):
+    with patch.object(clickhouse_logger, 'CLICKHOUSE_AVAILABLE', False):
+        logger = ClickHouseLogger(sqlite_path=str(tmp_path / 'trading_data.db'), flush_interval=60)
+    yield logger
+    logger.close()
+
+
+class TestBufferedIngestion:
+    """Test cases for queued, batched inserts."""
+
+    def test_rows_are_batched_and_queryable(self, sqlite_logger):
+        for i in range(5):
+            assert sqlite_logger.log_signal({'symbol': 'BTC/USDT:USDT', 'type': 'ml', 'direction': 'long',
+                                             'strength': i, 'metadata': {'i': i}})
+        sqlite_logger.log_trade({'symbol': 'BTC/USDT:USDT', 'side': 'buy', 'price': 100, 'size': 1})
+        sqlite_logger.log_metric('latency_ms', 12.5, {'stage': 'scan'})
+
+        assert sqlite_logger.query('SELECT COUNT(*) FROM signals') == [(5,)]
+        assert sqlite_logger.query('SELECT price FROM trades') == [(100.0,)]
+        assert sqlite_logger.query('SELECT tags FROM metrics') == [('{"stage": "scan"}',)]
+        assert sqlite_logger.query('PRAGMA journal_mode') == [('wal',)]
+
+        metrics = sqlite_logger.get_metrics()
+        assert metrics['queue_depth'] == 0
+        assert metrics['tables']['signals']['written'] == 5
+        # One batch per table with pending rows
+        assert metrics['flushes'] == 3
+        assert metrics['flush_latency_ms_max'] >= metrics['flush_latency_ms_last'] > 0
+
+    def test_overload_samples_signals_and_drops_when_full(self, tmp_path):
+        with patch.object(clickhouse_logger, 'CLICKHOUSE_AVAILABLE', False), \
+                patch.object(ClickHouseLogger, '_writer'):
+            logger = ClickHouseLogger(sqlite_path=str(tmp_path / 'trading_data.db'),
+                                      max_queue=10, high_water=0.5, sample_every=3)
+
+        for _ in range(5):
+            assert logger.log_signal({'symbol': 'BTC/USDT:USDT'})
+        # Above the high-water mark: one signal in three is kept, trades are never sampled
+        kept = [logger.log_signal({'symbol': 'BTC/USDT:USDT'}) for _ in range(6)]
+        assert kept == [False, False, True, False, False, True]
+        for _ in range(3):
+            assert logger.log_trade({'symbol': 'BTC/USDT:USDT'})
+        assert not logger.log_order({'symbol': 'BTC/USDT:USDT'})
+
+        tables = logger.get_metrics()['tables']
+        assert tables['signals']['sampled_out'] == 4
+        assert tables['orders']['dropped'] == 1
+        assert logger.get_metrics()['queue_depth'] == 10
+        logger.sqlite_conn.close()
+
+    def test_close_writes_pending_rows(self, tmp_path):
+        path = str(tmp_path / 'trading_data.db')
+        with patch.object(clickhouse_logger, 'CLICKHOUSE_AVAILABLE', False):
+            logger = ClickHouseLogger(sqlite_path=path, flush_interval=60)
+            logger.log_order({'symbol': 'ETH/USDT:USDT', 'type': 'limit', 'price': 10})
+            logger.close()
+            assert not logger.log_order({'symbol': 'ETH/USDT:USDT'})
+
+            reopened = ClickHouseLogger(sqlite_path=path)
+            try:
+                assert reopened.query('SELECT symbol, order_type FROM orders') == [('ETH/USDT:USDT', 'limit')]
+            finally:
+                reopened.close()
@@ -0,0 +1,133 @@
+"""
+Unit tests for the compiled NumPy-only ensemble
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+pytest.importorskip('xgboost')
+pytest.importorskip('lightgbm')
+pytest.importorskip('catboost')
+
+from compiled_model import ArrayScaler, CompiledModel, compile_model
+from ml_model import MLModel
+
+
+def native_proba(ml, X):
+    return ml.model.predict_proba(ml.scaler.transform(pd.DataFrame(X, columns=MLModel.FEATURE_NAMES)))
+
+
+@pytest.fixture(scope='module', params=[(0, 1, 2), (1, 2)], ids=['multiclass', 'binary'])
+def trained(request, tmp_path_factory):
+    rng = np.random.default_rng(len(request.param))
+    ml = MLModel(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'))
+    labels = np.asarray(request.param)
+    for _ in range(180):
+        features = rng.normal(size=len(MLModel.FEATURE_NAMES)) * 3
+        label = labels[int(features[0] > 0) + int(features[1] > 2) * (len(labels) - 2)]
+        ml.training_data.append({'features': features, 'label': int(label if rng.random() > 0.2 else rng.choice(labels))})
+    assert ml.train()
+    return ml
+
+
+class TestCompiledModel:
+    """Test cases for compile_model / CompiledModel."""
+
+    def test_matches_native_probabilities(self, trained):
+        X = np.random.default_rng(8).normal(size=(300, len(MLModel.FEATURE_NAMES))) * 3
+        X[:10, 4] = np.nan
+        compiled = CompiledModel(compile_model(trained.model, trained.scaler, MLModel.FEATURE_NAMES))
+
+        np.testing.assert_allclose(compiled.predict_proba(X), native_proba(trained, X), atol=1e-7)
+        assert list(compiled.classes_) == list(trained.model.classes_)
+
+    def test_train_exports_and_reload_uses_compiled(self, trained):
+        assert trained.compiled_model is not None and os.path.exists(trained.compiled_path)
+        with np.load(trained.compiled_path, allow_pickle=False) as data:
+            assert 'node_children' in data.files
+
+        reloaded = MLModel(model_path=trained.model_path)
+        assert reloaded.compiled_model is not None
+        rows = [{'rsi': 25 + i, 'macd': i - 4.0, 'volume_ratio': 0.5 + i / 4} for i in range(8)]
+        with patch.object(reloaded.model, 'predict_proba', side_effect=AssertionError('native model used')):
+            compiled_predictions = reloaded.predict_batch(rows)
+
+        reloaded.compiled_model = None
+        native = reloaded.predict_batch(rows)
+        assert [s for s, _ in compiled_predictions] == [s for s, _ in native]
+        np.testing.assert_allclose([c for _, c in compiled_predictions], [c for _, c in native], atol=1e-7)
+
+    def test_periodic_save_keeps_compiled_model_current(self, trained):
+        trained.training_data.append({'features': [0.0] * len(MLModel.FEATURE_NAMES), 'label': 0})
+        trained.save_model()
+
+        with patch.object(MLModel, 'export_compiled_model', side_effect=AssertionError('re-exported')):
+            reloaded = MLModel(model_path=trained.model_path)
+        assert reloaded.compiled_model is not None and reloaded._pending_estimator is not None
+        assert reloaded.model_version == trained.model_version
+
+    def test_compiled_model_of_another_model_is_reexported(self, trained, tmp_path):
+        other = MLModel(model_path=str(tmp_path / 'model.pkl'))
+        other.model = trained.model
+        other.scaler = StandardScaler().fit(pd.DataFrame(np.random.default_rng(3).normal(size=(50, len(MLModel.FEATURE_NAMES))),
+                                                          columns=MLModel.FEATURE_NAMES))
+        other.save_model()
+        shutil.copy(trained.compiled_path, other.compiled_path)
+
+        reloaded = MLModel(model_path=other.model_path)
+        X = np.random.default_rng(4).normal(size=(50, len(MLModel.FEATURE_NAMES)))
+        np.testing.assert_allclose(reloaded.compiled_model.predict_proba(X), native_proba(reloaded, X), atol=1e-7)
+
+    def test_load_with_current_compiled_model_skips_boosting_imports(self, trained):
+        heavy = ['sklearn', 'xgboost', 'lightgbm', 'catboost']
+        code = (f"import sys, ml_model; ml = ml_model.MLModel(model_path={trained.model_path!r}); "
+                f"print(ml.predict({{'rsi': 30}})[1] > 0, [m for m in {heavy!r} if m in sys.modules])")
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout.strip().splitlines()[-1] == 'True []'
+
+
+class TestArrayScaler:
+    """Test cases for the NumPy-only scaler."""
+
+    def test_matches_standard_scaler(self):
+        X = pd.DataFrame(np.random.default_rng(2).normal(size=(40, 4)) * 5 + 3, columns=list('abcd'))
+        X['d'] = 7.0  # Constant column
+        scaled = ArrayScaler().fit_transform(X)
+        expected = StandardScaler().fit(X).transform(X)
+
+        assert list(scaled.columns) == list('abcd')
+        np.testing.assert_allclose(scaled.to_numpy(), expected, atol=1e-12)
+        np.testing.assert_allclose(ArrayScaler().fit(X).transform(X.to_numpy()), expected, atol=1e-12)
+
+    def test_compiled_model_scaler_matches_trained_scaler(self, trained):
+        X = np.random.default_rng(6).normal(size=(20, len(MLModel.FEATURE_NAMES)))
+        reloaded = MLModel(model_path=trained.model_path)
+        scaler = reloaded._state.scaler
+        assert isinstance(scaler, ArrayScaler) and reloaded._pending_estimator is not None
+        np.testing.assert_allclose(scaler.transform(X), trained.scaler.transform(
+            pd.DataFrame(X, columns=MLModel.FEATURE_NAMES)).to_numpy(), atol=1e-12)
+
+
+class TestCompiledFallback:
+    """Test cases for models that cannot be compiled."""
+
+    def test_unsupported_model_keeps_native_inference(self, tmp_path):
+        ml = MLModel(model_path=str(tmp_path / 'model.pkl'))
+        X = pd.DataFrame(np.random.default_rng(0).normal(size=(60, len(MLModel.FEATURE_NAMES))),
+                         columns=MLModel.FEATURE_NAMES)
+        ml.model = LogisticRegression().fit(ml.scaler.fit_transform(X), np.arange(60) % 3)
+
+        assert not ml.export_compiled_model(X)
+        assert ml.compiled_model is None and not os.path.exists(ml.compiled_path)
+        assert ml.predict({'rsi': 40})[0] in ('HOLD', 'BUY', 'SELL')
@@ -0,0 +1,100 @@
+"""
+Unit tests for the batched TradingDatabase writer (SQLite mode)
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from database import TradingDatabase
+
+HOUR_MS = 3_600_000
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = TradingDatabase(f"sqlite:///{tmp_path / 'trading.db'}", flush_interval=60)
+    yield database
+    database.close()
+
+
+def trade(symbol='BTC/USDT:USDT', pnl=10.0):
+    return {
+        'timestamp': datetime.now(), 'symbol': symbol, 'side': 'long',
+        'entry_price': 100.0, 'exit_price': 110.0, 'amount': 1.0, 'leverage': 5,
+        'pnl': pnl, 'pnl_pct': pnl / 100, 'duration_seconds': 60,
+        'signal_confidence': 0.8, 'indicators': {'rsi': 55.0}, 'exit_reason': 'take_profit',
+    }
+
+
+class TestBatchedWrites:
+    """Test cases for queued inserts and the writer thread."""
+
+    def test_inserts_are_visible_after_flush(self, db):
+        assert db.insert_trade(trade(pnl=10.0))
+        assert db.insert_trade(trade(symbol='ETH/USDT:USDT', pnl=-4.0))
+        assert db.insert_equity_snapshot(1000.0, 1010.0, 50.0, 10.0)
+
+        history = db.get_trade_history()
+        assert {t['symbol'] for t in history} == {'BTC/USDT:USDT', 'ETH/USDT:USDT'}
+        assert db.get_trade_history(symbol='ETH/USDT:USDT')[0]['indicators'] == '{"rsi": 55.0}'
+        assert db.get_equity_curve(days=1)[0]['equity'] == 1010.0
+
+        stats = db.get_performance_stats(days=1)
+        assert stats['total_trades'] == 2 and stats['winning_trades'] == 1
+
+    def test_market_data_is_upserted_in_one_batch(self, db):
+        candles = [[i * HOUR_MS, 1, 2, 0.5, 1.5, 10] for i in range(3)]
+        db.insert_market_data('BTC/USDT:USDT', candles)
+        # Same key twice in one batch: the newest row wins
+        db.insert_market_data('BTC/USDT:USDT', [[2 * HOUR_MS, 1, 2, 0.5, 9.0, 20]])
+
+        rows = db.get_market_data('BTC/USDT:USDT')
+        assert [row['close'] for row in rows] == [1.5, 1.5, 9.0]
+
+        db.insert_market_data('BTC/USDT:USDT', [[0, 1, 2, 0.5, 3.0, 30]])
+        rows = db.get_market_data('BTC/USDT:USDT')
+        assert len(rows) == 3 and rows[0]['close'] == 3.0
+
+        stats = db.get_write_stats()
+        assert stats['failed_rows'] == 0 and stats['queue_depth'] == 0
+
+    def test_batch_size_triggers_flush(self, tmp_path):
+        database = TradingDatabase(f"sqlite:///{tmp_path / 'trading.db'}", batch_size=2, flush_interval=60)
+        try:
+            database.insert_equity_snapshot(1.0)
+            database.insert_equity_snapshot(2.0)
+            for _ in range(100):
+                if database.get_write_stats()['written_rows'] == 2:
+                    break
+                database._writer_thread.join(0.05)
+            assert database.get_write_stats()['batches'] == 1
+        finally:
+            database.close()
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        with patch.object(TradingDatabase, '_writer'):
+            database = TradingDatabase(f"sqlite:///{tmp_path / 'trading.db'}", max_queue=1)
+        assert database.insert_equity_snapshot(1.0)
+        assert not database.insert_equity_snapshot(2.0)
+        assert database.get_write_stats()['dropped_rows'] == 1
+
+    def test_no_backend_is_disabled(self):
+        with patch.dict('os.environ', {'DATABASE_URL': ''}):
+            database = TradingDatabase()
+        assert database.insert_trade(trade()) is False
+        assert database.get_trade_history() == []
+        database.close()
+
+    def test_close_writes_pending_rows(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'trading.db'}"
+        database = TradingDatabase(url, flush_interval=60)
+        database.insert_trade(trade())
+        database.close()
+
+        reopened = TradingDatabase(url)
+        try:
+            assert len(reopened.get_trade_history()) == 1
+        finally:
+            reopened.close()
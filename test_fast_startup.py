@@ -0,0 +1,177 @@
+"""
+Unit tests for the staged (fast) startup path and persisted position state
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from position_manager import Position, PositionManager
+
+
+def exchange_position(symbol='BTC/USDT:USDT', side='long', entry=100.0):
+    return {'symbol': symbol, 'contracts': 2, 'side': side, 'entryPrice': entry, 'leverage': 5}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    client = Mock()
+    client.get_ticker.return_value = {'last': 104.0}
+    pm = PositionManager(client)
+    pm.state_path = str(tmp_path / 'position_manager_state.pkl')
+    return pm
+
+
+class TestPositionStatePersistence:
+    """Test cases for PositionManager.save_state / load_state."""
+
+    def test_sync_restores_saved_stops(self, manager):
+        position = Position('BTC/USDT:USDT', 'long', 100.0, 2, 5, stop_loss=101.5, take_profit=112.0)
+        position.highest_price = 106.0
+        position.trailing_stop_activated = True
+        position.strategy = 'momentum'
+        manager.positions[position.symbol] = position
+        manager.save_state()
+
+        restarted = PositionManager(manager.client)
+        restarted.state_path = manager.state_path
+        assert restarted.load_state() == 1
+        restarted.client.get_open_positions.return_value = [exchange_position()]
+        assert restarted.sync_existing_positions() == 1
+
+        synced = restarted.positions['BTC/USDT:USDT']
+        assert synced.stop_loss == 101.5 and synced.take_profit == 112.0
+        assert synced.highest_price == 106.0 and synced.trailing_stop_activated
+        assert synced.strategy == 'momentum' and synced.entry_time == position.entry_time
+
+    def test_different_position_gets_default_stops(self, manager):
+        manager.positions['BTC/USDT:USDT'] = Position('BTC/USDT:USDT', 'short', 100.0, 2, 5, stop_loss=103.0)
+        manager.save_state()
+
+        manager.positions.clear()
+        manager.load_state()
+        manager.client.get_open_positions.return_value = [exchange_position(side='long')]
+        manager.sync_existing_positions()
+
+        assert manager.positions['BTC/USDT:USDT'].stop_loss == pytest.approx(104.0 * 0.95)
+
+
+def wait_for_first_check(bot):
+    deadline = time.time() + 5
+    while 'first_position_check' not in bot.startup_metrics and time.time() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def staged_bot():
+    """A TradingBot started with fast_startup=True whose component build is held open"""
+    release = threading.Event()
+    with patch('bot.Config.validate'), patch('bot.KuCoinClient') as mock_client, \
+            patch('bot.PositionManager') as mock_pos, patch('bot.RiskManager'), \
+            patch('bot.Logger.setup', return_value=Mock()), \
+            patch('bot.Logger.setup_specialized_logger', return_value=Mock()), \
+            patch('bot.TradingBot._init_components', side_effect=lambda: release.wait(10)):
+        mock_client.return_value.get_balance.return_value = {'free': {'USDT': 1000.0}}
+        mock_pos.return_value.sync_existing_positions.return_value = 1
+        mock_pos.return_value.get_open_positions_count.return_value = 1
+        mock_pos.return_value.update_positions.return_value = iter([])
+
+        from bot import TradingBot
+        bot = TradingBot(fast_startup=True)
+        yield bot, release, mock_client
+
+        release.set()
+        bot._position_monitor_running = False
+        bot._startup_thread.join(timeout=5)
+        bot._position_monitor_thread.join(timeout=5)
+
+
+class TestFastStartup:
+    """Test cases for TradingBot(fast_startup=True)."""
+
+    def test_positions_monitored_before_components_are_built(self, staged_bot):
+        bot, release, mock_client = staged_bot
+
+        assert mock_client.call_args.kwargs['enable_websocket'] is False
+        bot.position_manager.load_state.assert_called_once()
+        bot.position_manager.sync_existing_positions.assert_called_once()
+
+        wait_for_first_check(bot)
+        assert bot.startup_metrics['first_position_check'] > 0
+        assert bot.position_manager.update_positions.called
+        assert not bot._components_ready.is_set()
+
+        release.set()
+        assert bot._components_ready.wait(5)
+        mock_client.return_value.connect_websocket.assert_called_once()
+        assert bot.startup_metrics['components_ready'] >= bot.startup_metrics['positions_restored']
+
+    def test_close_during_startup_is_recorded_once_ready(self, staged_bot):
+        bot, release, _ = staged_bot
+        wait_for_first_check(bot)  # The monitor's next update is POSITION_UPDATE_INTERVAL away
+        position = MagicMock()
+        bot.position_manager.update_positions.return_value = iter([('ETH/USDT:USDT', 0.02, position)])
+
+        with patch.object(bot, '_record_closed_position') as record:
+            bot.update_open_positions()
+            assert record.call_count == 0 and len(bot._pending_closed_positions) == 1
+
+            release.set()
+            bot._startup_thread.join(timeout=5)
+            record.assert_called_once_with('ETH/USDT:USDT', 0.02, position)
+
+    def test_failed_init_keeps_monitoring_and_retries(self):
+        attempts = []
+        succeed = threading.Event()
+
+        def init_components():
+            attempts.append(1)
+            if not succeed.is_set():
+                raise RuntimeError('scanner unavailable')
+
+        with patch('bot.Config.validate'), patch('bot.KuCoinClient') as mock_client, \
+                patch('bot.PositionManager') as mock_pos, patch('bot.RiskManager'), \
+                patch('bot.Logger.setup', return_value=Mock()), \
+                patch('bot.Logger.setup_specialized_logger', return_value=Mock()), \
+                patch('bot.Config.STARTUP_RETRY_INTERVAL', 0.05), \
+                patch('bot.TradingBot._init_components', side_effect=init_components):
+            mock_client.return_value.get_balance.return_value = {'free': {'USDT': 1000.0}}
+            mock_pos.return_value.sync_existing_positions.return_value = 1
+            mock_pos.return_value.get_open_positions_count.return_value = 1
+            mock_pos.return_value.update_positions.return_value = iter([])
+
+            from bot import TradingBot
+            bot = TradingBot(fast_startup=True)
+            try:
+                deadline = time.time() + 5
+                while len(attempts) < 3 and time.time() < deadline:
+                    time.sleep(0.01)
+                assert len(attempts) >= 3 and not bot._components_ready.is_set()
+                assert bot._position_monitor_thread.is_alive()
+                assert isinstance(bot._startup_error, RuntimeError)
+
+                succeed.set()
+                assert bot._components_ready.wait(5)
+                assert bot._startup_error is None and bot._position_monitor_thread.is_alive()
+                mock_client.return_value.connect_websocket.assert_called_once()
+            finally:
+                bot._position_monitor_running = False
+                bot._startup_stop.set()
+                bot._startup_thread.join(timeout=5)
+                bot._position_monitor_thread.join(timeout=5)
+
+    def test_run_preloads_lazy_components(self, staged_bot):
+        bot, release, _ = staged_bot
+        release.set()
+        assert bot._components_ready.wait(5)
+        bot.dashboard = None
+        bot.components = Mock()
+        bot.components.preload.side_effect = lambda: setattr(bot, 'running', False)  # Stop after startup
+
+        with patch.object(bot, 'shutdown') as shutdown, patch.object(bot, '_background_scanner'):
+            bot.run()
+
+        bot.components.preload.assert_called_once_with()
+        shutdown.assert_called_once()
@@ -4,8 +4,10 @@ Tests multiple scenarios including old models, new models, and attention weighti
 """
 import sys
 import os
+import tempfile
 import warnings
 import numpy as np
+from pathlib import Path
 import joblib
 from sklearn.preprocessing import StandardScaler
 
@@ -16,13 +18,14 @@ from ml_model import MLModel
 from attention_features_2025 import AttentionFeatureSelector
 
 
-def test_new_model_no_warnings():
+def test_new_model_no_warnings(tmp_path):
     """Test that a newly trained model doesn't produce feature name warnings"""
+    model_path = str(tmp_path / 'test_new_model.pkl')
     print("\n" + "="*70)
     print("TEST 1: New Model Training (No Warnings Expected)")
     print("="*70)
 
-    model = MLModel(model_path='models/test_new_model.pkl')
+    model = MLModel(model_path=model_path)
 
     # Generate training data
     np.random.seed(42)
@@ -65,22 +68,19 @@ def test_new_model_no_warnings():
             return False
         print(f"✓ No feature name warnings during prediction (Signal: {signal}, Confidence: {confidence:.3f})")
 
-    # Cleanup
-    if os.path.exists('models/test_new_model.pkl'):
-        os.remove('models/test_new_model.pkl')
-
     print("✓ TEST 1 PASSED")
     return True
 
 
-def test_loaded_model_no_warnings():
+def test_loaded_model_no_warnings(tmp_path):
     """Test that a loaded model doesn't produce feature name warnings"""
+    model_path = str(tmp_path / 'test_loaded_model.pkl')
     print("\n" + "="*70)
     print("TEST 2: Loaded Model (No Warnings Expected)")
     print("="*70)
 
     # First train and save a model
-    model1 = MLModel(model_path='models/test_loaded_model.pkl')
+    model1 = MLModel(model_path=model_path)
     np.random.seed(42)
 
     for i in range(150):
@@ -93,7 +93,7 @@ def test_loaded_model_no_warnings():
     print("✓ Trained and saved initial model")
 
     # Now load the model and test for warnings
-    model2 = MLModel(model_path='models/test_loaded_model.pkl')
+    model2 = MLModel(model_path=model_path)
     print("✓ Loaded model from disk")
 
     # Test prediction with warning capture
@@ -110,21 +110,18 @@ def test_loaded_model_no_warnings():
             return False
         print(f"✓ No feature name warnings during prediction (Signal: {signal}, Confidence: {confidence:.3f})")
 
-    # Cleanup
-    if os.path.exists('models/test_loaded_model.pkl'):
-        os.remove('models/test_loaded_model.pkl')
-
     print("✓ TEST 2 PASSED")
     return True
 
 
-def test_attention_weighting_no_warnings():
+def test_attention_weighting_no_warnings(tmp_path):
     """Test that attention weighting doesn't introduce feature name warnings"""
+    model_path = str(tmp_path / 'test_attention_model.pkl')
     print("\n" + "="*70)
     print("TEST 3: Attention Weighting (No Warnings Expected)")
     print("="*70)
 
-    model = MLModel(model_path='models/test_attention_model.pkl')
+    model = MLModel(model_path=model_path)
 
     # Add attention selector
     attention_selector = AttentionFeatureSelector(n_features=len(MLModel.FEATURE_NAMES), learning_rate=0.01)
@@ -175,22 +172,19 @@ def test_attention_weighting_no_warnings():
     if top_features:
         print(f"✓ Attention mechanism working - Top feature: {top_features[0][0]} ({top_features[0][1]:.6f})")
 
-    # Cleanup
-    if os.path.exists('models/test_attention_model.pkl'):
-        os.remove('models/test_attention_model.pkl')
-
     print("✓ TEST 3 PASSED")
     return True
 
 
-def test_old_scaler_format_simulation():
+def test_old_scaler_format_simulation(tmp_path):
     """Test that loading an old model (without set_output configured) still works"""
+    model_path = str(tmp_path / 'test_old_format.pkl')
     print("\n" + "="*70)
     print("TEST 4: Old Model Format Simulation (Backward Compatibility)")
     print("="*70)
 
     # Create a model with old-style scaler (no set_output)
-    model1 = MLModel(model_path='models/test_old_format.pkl')
+    model1 = MLModel(model_path=model_path)
     np.random.seed(42)
 
     for i in range(150):
@@ -206,7 +200,7 @@ def test_old_scaler_format_simulation():
     print("✓ Trained and saved model (simulating pre-fix model)")
 
     # Load the model (our fix should reconfigure the scaler)
-    model2 = MLModel(model_path='models/test_old_format.pkl')
+    model2 = MLModel(model_path=model_path)
     print("✓ Loaded old format model (scaler should be reconfigured automatically)")
 
     # Test prediction should not produce warnings due to automatic reconfiguration
@@ -223,10 +217,6 @@ def test_old_scaler_format_simulation():
             return False
         print(f"✓ No warnings after automatic scaler reconfiguration (Signal: {signal}, Confidence: {confidence:.3f})")
 
-    # Cleanup
-    if os.path.exists('models/test_old_format.pkl'):
-        os.remove('models/test_old_format.pkl')
-
     print("✓ TEST 4 PASSED")
     return True
 
@@ -274,7 +264,7 @@ if __name__ == '__main__':
     results = []
     for test_name, test_func in tests:
         try:
-            passed = test_func()
+            passed = test_func(Path(tempfile.mkdtemp()))
             results.append((test_name, passed))
             all_passed = all_passed and passed
         except Exception as e:
@@ -3,22 +3,25 @@ Test to verify that LGBMClassifier feature names warning is fixed
 """
 import sys
 import os
+import tempfile
 import warnings
 import numpy as np
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ml_model import MLModel
 
-def test_no_feature_name_warnings():
+def test_no_feature_name_warnings(tmp_path):
     """Test that no feature name warnings are raised during training and prediction"""
+    model_path = str(tmp_path / 'test_feature_names_model.pkl')
     print("\n" + "="*70)
     print("Testing Feature Names Warning Fix")
     print("="*70)
 
     # Create ML model instance
-    model = MLModel(model_path='models/test_feature_names_model.pkl')
+    model = MLModel(model_path=model_path)
 
     print("\n1. Generating training data...")
     np.random.seed(42)
@@ -141,11 +144,6 @@ def test_no_feature_name_warnings():
             return False
     print("   ✓ All predictions valid")
 
-    # Cleanup
-    if os.path.exists('models/test_feature_names_model.pkl'):
-        os.remove('models/test_feature_names_model.pkl')
-        print("\n   ✓ Cleaned up test model file")
-
     print("\n" + "="*70)
     print("✓ Feature Names Warning Fix Verified!")
     print("="*70)
@@ -156,7 +154,7 @@ if __name__ == '__main__':
     print("Feature Names Warning Fix Test Suite")
     print("="*70)
 
-    success = test_no_feature_name_warnings()
+    success = test_no_feature_name_warnings(Path(tempfile.mkdtemp()))
 
     if success:
         print("\n✓ TEST PASSED: No feature name warnings detected")
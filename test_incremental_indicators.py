@@ -0,0 +1,125 @@
+"""
+Unit tests for the incremental indicator engine
+"""
+
+import numpy as np
+import pytest
+
+from indicators import Indicators, OUTPUT_COLUMNS
+from incremental_indicators import IncrementalIndicatorEngine, IndicatorStream
+
+
+def make_ohlcv(n=300, seed=0, zero_volume=None):
+    """Generate a random-walk OHLCV series"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.005)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.005)
+    volume = rng.random(n) * 1000
+    if zero_volume:
+        volume[zero_volume[0]:zero_volume[1]] = 0
+    start = 1_700_000_000_000
+    return [[start + i * 3_600_000, open_[i], high[i], low[i], close[i], volume[i]] for i in range(n)]
+
+
+def assert_frames_match(expected, actual, columns=OUTPUT_COLUMNS[1:], tol=1e-9):
+    assert len(expected) == len(actual)
+    assert (expected['timestamp'].values == actual['timestamp'].values).all()
+    for col in columns:
+        np.testing.assert_allclose(
+            actual[col].to_numpy(float), expected[col].to_numpy(float),
+            rtol=tol, atol=tol, equal_nan=True, err_msg=col
+        )
+
+
+class TestIndicatorStream:
+    """Test cases for a single indicator stream."""
+
+    def test_matches_calculate_all(self):
+        """Streaming every candle reproduces calculate_all on the same history."""
+        data = make_ohlcv(300, zero_volume=(60, 90))
+        stream = IndicatorStream(capacity=300)
+        for candle in data:
+            stream.update(candle)
+
+        assert_frames_match(Indicators.calculate_all(data), stream.to_dataframe(len(data)))
+
+    def test_revision_of_forming_candle(self):
+        """Revising the last candle gives the same result as seeing the final value once."""
+        data = make_ohlcv(120, seed=1)
+        stream = IndicatorStream(capacity=120)
+        for candle in data[:-1]:
+            stream.update(candle)
+        draft = list(data[-1])
+        draft[4] *= 1.05
+        stream.update(draft)
+        stream.update(data[-1])
+
+        assert stream.size == len(data)
+        assert_frames_match(Indicators.calculate_all(data), stream.to_dataframe(len(data)))
+
+    def test_rejects_older_candle(self):
+        """Out-of-order candles are rejected."""
+        data = make_ohlcv(60)
+        stream = IndicatorStream()
+        for candle in data:
+            stream.update(candle)
+        with pytest.raises(ValueError):
+            stream.update(data[10])
+
+
+class TestIncrementalIndicatorEngine:
+    """Test cases for the per-(symbol, timeframe) engine."""
+
+    def test_insufficient_data(self):
+        engine = IncrementalIndicatorEngine()
+        assert engine.calculate('BTC/USDT:USDT', '1h', make_ohlcv(30)).empty
+        assert engine.calculate('BTC/USDT:USDT', '1h', None).empty
+
+    def test_sliding_window_updates_incrementally(self):
+        """Sliding REST windows are folded in without rebuilding."""
+        data = make_ohlcv(200, seed=2)
+        engine = IncrementalIndicatorEngine()
+        for end in range(100, 201):
+            df = engine.calculate('ETH/USDT:USDT', '1h', data[end - 100:end])
+
+        stats = engine.get_stats()
+        assert stats['full_builds'] == 1
+        assert stats['incremental'] == 100
+
+        # Recursive indicators are re-seeded at the window start, so every row matches
+        expected = Indicators.calculate_all(data[100:200])
+        assert_frames_match(expected, df, columns=['ema_12', 'ema_26', 'macd', 'macd_signal',
+                                                   'macd_diff', 'atr'])
+        # Past the warm-up rows of a fresh calculation, window-based indicators are exact
+        assert_frames_match(expected.tail(50), df.tail(50),
+                            columns=['sma_20', 'sma_50', 'rsi', 'stoch_k', 'stoch_d',
+                                     'bb_width', 'volume_ratio', 'momentum', 'vwap'])
+
+    def test_gap_triggers_rebuild(self):
+        """Data that does not line up with the stream rebuilds it from scratch."""
+        data = make_ohlcv(300, seed=3)
+        engine = IncrementalIndicatorEngine()
+        engine.calculate('SOL/USDT:USDT', '1h', data[:100])
+        df = engine.calculate('SOL/USDT:USDT', '1h', data[200:300])
+
+        assert engine.get_stats()['full_builds'] == 2
+        assert_frames_match(Indicators.calculate_all(data[200:300]), df)
+
+    def test_reset(self):
+        engine = IncrementalIndicatorEngine()
+        data = make_ohlcv(60)
+        engine.calculate('A', '1h', data)
+        engine.calculate('A', '4h', data)
+        engine.calculate('B', '1h', data)
+        engine.reset('A', '1h')
+        assert engine.get_stats()['streams'] == 2
+        engine.reset('A')
+        assert engine.get_stats()['streams'] == 1
+        engine.reset()
+        assert engine.get_stats()['streams'] == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,173 @@
+"""
+Unit tests for the local L2 order book and its WebSocket maintenance
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config import Config
+from kucoin_websocket import KuCoinWebSocket
+from l2_order_book import L2OrderBook
+
+SNAPSHOT = {
+    'bids': [[100.0, 1.0], [99.0, 2.0], [98.0, 3.0]],
+    'asks': [[101.0, 1.5], [102.0, 2.5], [103.0, 3.5]],
+    'nonce': 10,
+}
+
+
+class TestL2OrderBook:
+    """Test cases for snapshot + delta maintenance."""
+
+    def setup_method(self):
+        self.book = L2OrderBook('BTC/USDT:USDT')
+
+    def test_unsynced_book_has_no_snapshot(self):
+        assert self.book.snapshot() is None
+
+    def test_levels_sorted_best_first(self):
+        self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10)
+        top = self.book.snapshot(depth=2)
+        assert top['bids'] == [[100.0, 1.0], [99.0, 2.0]]
+        assert top['asks'] == [[101.0, 1.5], [102.0, 2.5]]
+        assert top['nonce'] == 10
+        assert self.book.best_bid_ask() == (100.0, 101.0)
+
+    def test_deltas_insert_update_and_remove_levels(self):
+        self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10)
+        assert self.book.apply_delta(11, 100.5, 'buy', 4.0)
+        assert self.book.apply_delta(12, 101.0, 'sell', 0)
+        assert self.book.apply_delta(13, 99.0, 'buy', 7.0)
+
+        top = self.book.snapshot(depth=3)
+        assert top['bids'] == [[100.5, 4.0], [100.0, 1.0], [99.0, 7.0]]
+        assert top['asks'][0] == [102.0, 2.5]
+        assert self.book.sequence == 13
+
+    def test_buffered_deltas_are_replayed_after_snapshot(self):
+        # Deltas 9-12 arrive before the snapshot at sequence 10
+        for seq, price in ((9, 97.0), (10, 96.0), (11, 100.5), (12, 100.7)):
+            self.book.apply_delta(seq, price, 'buy', 1.0)
+        assert self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10)
+
+        bids = [level[0] for level in self.book.snapshot()['bids']]
+        assert bids == [100.7, 100.5, 100.0, 99.0, 98.0]
+        assert self.book.sequence == 12
+
+    def test_stale_deltas_are_ignored(self):
+        self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10)
+        assert self.book.apply_delta(9, 100.0, 'buy', 0)
+        assert self.book.snapshot()['bids'][0] == [100.0, 1.0]
+
+    def test_sequence_gap_requires_resync(self):
+        self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10)
+        assert self.book.apply_delta(12, 100.5, 'buy', 4.0) is False
+        assert self.book.snapshot() is None
+        assert self.book.gaps == 1
+
+        # A snapshot that the buffered delta cannot bridge keeps the book unsynced
+        assert self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 10) is False
+        assert self.book.apply_snapshot(SNAPSHOT['bids'], SNAPSHOT['asks'], 11) is True
+        assert self.book.snapshot()['bids'][0] == [100.5, 4.0]
+
+
+class TestWebSocketOrderBook:
+    """KuCoinWebSocket keeps the local book in sync and resyncs on gaps."""
+
+    def setup_method(self):
+        self.ws = KuCoinWebSocket()
+        self.ws.connected = True
+        self.ws.ws = MagicMock()
+        self.ws._subscription_delay = 0
+        self.snapshots = []
+
+        def fetch(symbol):
+            self.snapshots.append(symbol)
+            return dict(SNAPSHOT, nonce=SNAPSHOT['nonce'] + 10 * (len(self.snapshots) - 1))
+
+        self.fetcher = fetch
+
+    def push(self, sequence, change):
+        self.ws._handle_data_message({
+            'topic': '/contractMarket/level2:XBTUSDTM',
+            'data': {'sequence': sequence, 'change': change, 'timestamp': 0},
+        })
+
+    def wait_synced(self):
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if self.ws.get_orderbook('BTC/USDT:USDT') is not None:
+                return
+            time.sleep(0.01)
+        raise AssertionError('order book did not sync')
+
+    def test_subscribe_builds_book_from_snapshot_and_deltas(self):
+        assert self.ws.subscribe_orderbook('BTC/USDT:USDT', 'XBTUSDTM', self.fetcher)
+        self.wait_synced()
+        self.push(11, '100.5,buy,4')
+        self.push(12, '101,sell,0')
+
+        book = self.ws.get_orderbook('BTC/USDT:USDT', depth=1)
+        assert book['bids'] == [[100.5, 4.0]] and book['asks'] == [[102.0, 2.5]]
+        sent = self.ws.ws.send.call_args[0][0]
+        assert '/contractMarket/level2:XBTUSDTM' in sent
+        assert self.ws.has_orderbook('BTC/USDT:USDT')
+
+    def test_gap_triggers_resync(self):
+        self.ws.subscribe_orderbook('BTC/USDT:USDT', 'XBTUSDTM', self.fetcher)
+        self.wait_synced()
+        self.push(15, '100.5,buy,4')  # 11-14 missing
+
+        # The second snapshot (sequence 20) resynchronizes the book
+        self.wait_synced()
+        assert len(self.snapshots) == 2
+        assert self.ws._l2_books['XBTUSDTM'].gaps == 1
+        self.push(21, '100.8,buy,1')
+        assert self.ws.get_orderbook('BTC/USDT:USDT')['bids'][0] == [100.8, 1.0]
+
+    def test_unsubscribe_drops_book(self):
+        self.ws.subscribe_orderbook('BTC/USDT:USDT', 'XBTUSDTM', self.fetcher)
+        self.wait_synced()
+        self.ws.unsubscribe_orderbook('BTC/USDT:USDT')
+        assert self.ws.get_orderbook('BTC/USDT:USDT') is None
+        assert not self.ws.has_orderbook('BTC/USDT:USDT')
+
+
+class TestKuCoinClientLocalOrderBook:
+    """KuCoinClient.get_order_book reads the local book before REST."""
+
+    def make_client(self):
+        from kucoin_client import KuCoinClient
+        exchange = MagicMock()
+        exchange.fetch_order_book.return_value = {'bids': [[1.0, 1.0]], 'asks': [[2.0, 1.0]], 'timestamp': 1}
+        with patch.object(Config, 'ENABLE_RATE_LIMITER', False), \
+                patch('kucoin_client.ccxt.kucoinfutures', return_value=exchange):
+            client = KuCoinClient('key', 'secret', 'pass', enable_websocket=False)
+        client.websocket = MagicMock()
+        client.websocket.is_connected.return_value = True
+        client._should_use_rest_api = MagicMock(return_value=False)
+        return client, exchange
+
+    def test_synced_local_book_avoids_rest(self):
+        client, exchange = self.make_client()
+        client.websocket.get_orderbook.return_value = {'bids': [[100.0, 1.0]], 'asks': [[101.0, 1.0]],
+                                                       'timestamp': 5, 'nonce': 10}
+        with patch.object(Config, 'ENABLE_LOCAL_ORDER_BOOK', True):
+            book = client.get_order_book('BTC/USDT:USDT', limit=20)
+        assert book['bids'] == [[100.0, 1.0]]
+        exchange.fetch_order_book.assert_not_called()
+
+    def test_first_call_subscribes_and_uses_rest(self):
+        client, exchange = self.make_client()
+        client.websocket.get_orderbook.return_value = None
+        client.websocket.has_orderbook.return_value = False
+        with patch.object(Config, 'ENABLE_LOCAL_ORDER_BOOK', True):
+            book = client.get_order_book('BTC/USDT:USDT', limit=20)
+        assert book['bids'] == [[1.0, 1.0]]
+        client.websocket.subscribe_orderbook.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
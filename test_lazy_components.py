@@ -0,0 +1,95 @@
+"""
+Unit tests for lazy component construction and deferred framework imports
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from lazy_components import LazyComponentRegistry, module_available
+
+
+class TestLazyComponentRegistry:
+    """Test cases for LazyComponentRegistry."""
+
+    def test_factory_runs_once_on_first_get(self):
+        calls = []
+        registry = LazyComponentRegistry()
+        registry.register('engine', lambda: calls.append(1) or object())
+
+        assert not registry.is_loaded('engine') and calls == []
+        first = registry.get('engine')
+        assert registry.get('engine') is first and calls == [1]
+        assert registry.status()['engine']['loaded'] and registry.status()['engine']['build_seconds'] >= 0
+
+    def test_concurrent_first_use_builds_once(self):
+        calls = []
+
+        def slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        registry = LazyComponentRegistry()
+        registry.register('engine', slow_factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('engine'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1] and len({id(r) for r in results}) == 1
+
+    def test_disabled_component_is_never_built(self):
+        registry = LazyComponentRegistry()
+        registry.register('engine', lambda: (_ for _ in ()).throw(AssertionError('built')), enabled=False)
+
+        assert 'engine' in registry and not registry.is_enabled('engine')
+        assert registry.get('engine') is None
+        registry.preload().join()
+        assert not registry.is_loaded('engine')
+
+    def test_preload_builds_in_background(self):
+        registry = LazyComponentRegistry()
+        registry.register('engine', object)
+        registry.preload(['engine']).join(timeout=5)
+        assert registry.is_loaded('engine')
+
+    def test_module_available_does_not_import(self):
+        assert module_available('json') and not module_available('no_such_module_xyz')
+
+
+def test_bot_import_defers_heavy_frameworks():
+    """Importing the bot must not load TensorFlow, optuna or the boosting libraries"""
+    heavy = ['tensorflow', 'optuna', 'xgboost', 'lightgbm', 'catboost']
+    code = f"import sys, bot, automl, neural_network_model; print([m for m in {heavy!r} if m in sys.modules])"
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_bot_construction_serves_saved_model_without_boosting_imports(tmp_path):
+    """With a current compiled model, building the bot must not unpickle the boosting ensemble"""
+    pytest.importorskip('xgboost')
+    pytest.importorskip('lightgbm')
+    pytest.importorskip('catboost')
+    from ml_model import MLModel
+    from startup_benchmark import measure_bot_construction
+
+    ml = MLModel(model_path=str(tmp_path / 'signal_model.pkl'))
+    rng = np.random.default_rng(0)
+    for _ in range(120):
+        features = rng.normal(size=len(MLModel.FEATURE_NAMES)) * 3
+        ml.training_data.append({'features': features, 'label': int(features[0] > 0) + int(features[1] > 2)})
+    assert ml.train() and ml.compiled_model is not None
+
+    result = measure_bot_construction({'ML_MODEL_PATH': ml.model_path, 'ENABLE_DEEP_LEARNING': 'false'})
+    assert result['ok'], result.get('error')
+    assert result['heavy_frameworks'] == []
@@ -0,0 +1,100 @@
+"""
+Unit tests for the WebSocket market data recorder
+"""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from market_recorder import (MarketDataRecorder, list_symbols, load_recording, parse_rows,
+                             stream_for_topic)
+
+DAY_MS = 86_400_000
+T0 = 1_700_000_000_000  # 2023-11-14 UTC
+
+
+def ticker_payload(price, ts):
+    return {'price': str(price), 'size': 1, 'bestBidPrice': str(price - 0.5), 'bestBidSize': 3,
+            'bestAskPrice': str(price + 0.5), 'bestAskSize': 4, 'sequence': 7, 'ts': ts}
+
+
+class TestParsing:
+    """Test cases for topic mapping and row conversion."""
+
+    def test_stream_for_topic(self):
+        assert stream_for_topic('/contractMarket/ticker:XBTUSDTM') == ('ticker', 'XBTUSDTM', '')
+        assert stream_for_topic('/contractMarket/candle:XBTUSDTM_1hour') == ('candle', 'XBTUSDTM_1hour', '')
+        assert stream_for_topic('/contractMarket/level2:XBTUSDTM') == ('level2', 'XBTUSDTM', '')
+        assert stream_for_topic('/contractMarket/execution:XBTUSDTM') is None
+        assert stream_for_topic('/contract/instrument') is None
+
+    def test_level2_delta_and_snapshot_rows(self):
+        delta = parse_rows('level2', T0, {'sequence': 11, 'change': '100.5,sell,2'})
+        assert delta == [(T0, 11, 100.5, -1, 2.0, 0)]
+
+        snapshot = parse_rows('level2', T0, {'sequence': 3, 'bids': [[99, 1]], 'asks': [[101, 2], [102, 5]]})
+        assert [row[3] for row in snapshot] == [1, -1, -1]
+        assert all(row[5] == 1 for row in snapshot)
+
+    def test_short_candle_is_skipped(self):
+        assert parse_rows('candle', T0, {'candles': [1, 2, 3]}) == []
+
+
+class TestMarketDataRecorder:
+    """Test cases for batched writing and range queries."""
+
+    def test_round_trip_partitioned_by_date_and_symbol(self, tmp_path):
+        root = str(tmp_path)
+        recorder = MarketDataRecorder(root, rows_per_file=2, flush_interval=60)
+        for i in range(5):
+            recorder.record('/contractMarket/ticker:XBTUSDTM', ticker_payload(100 + i, i), T0 + i * 1000)
+        recorder.record('/contractMarket/ticker:XBTUSDTM', ticker_payload(200, 9), T0 + DAY_MS)
+        recorder.record('/contractMarket/ticker:ETHUSDTM', ticker_payload(10, 0), T0)
+        recorder.close()
+
+        stats = recorder.get_stats()
+        assert stats['rows'] == 7 and stats['dropped'] == 0 and stats['errors'] == 0
+        days = sorted(os.listdir(os.path.join(root, 'ticker')))
+        assert days == ['date=2023-11-14', 'date=2023-11-15']
+        assert list_symbols(root, 'ticker') == ['ETHUSDTM', 'XBTUSDTM']
+
+        everything = load_recording(root, 'ticker', 'XBTUSDTM')
+        assert everything['price'].tolist() == [100, 101, 102, 103, 104, 200]
+        assert everything['timestamp'].dtype == np.int64
+
+        first_day = load_recording(root, 'ticker', 'XBTUSDTM', T0 + 1000, T0 + 3000)
+        assert first_day['price'].tolist() == [101, 102, 103]
+        assert first_day['bid'].tolist() == [100.5, 101.5, 102.5]
+
+    def test_empty_query_returns_typed_arrays(self, tmp_path):
+        result = load_recording(str(tmp_path), 'level2', 'XBTUSDTM', T0, T0 + 1)
+        assert set(result) == {'timestamp', 'sequence', 'price', 'side', 'size', 'snapshot'}
+        assert len(result['price']) == 0 and result['side'].dtype == np.int8
+
+        with pytest.raises(ValueError):
+            load_recording(str(tmp_path), 'trades', 'XBTUSDTM')
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        with patch.object(MarketDataRecorder, '_run'):
+            recorder = MarketDataRecorder(str(tmp_path), max_queue=2)
+        assert recorder.record('/contractMarket/ticker:XBTUSDTM', ticker_payload(1, 0), T0)
+        assert recorder.record('/contractMarket/ticker:XBTUSDTM', ticker_payload(1, 0), T0)
+        assert not recorder.record('/contractMarket/ticker:XBTUSDTM', ticker_payload(1, 0), T0)
+        assert recorder.get_stats()['dropped'] == 1
+        assert recorder.get_stats()['queued'] == 2
+
+    def test_websocket_tees_data_messages(self, tmp_path):
+        from kucoin_websocket import KuCoinWebSocket
+        ws = KuCoinWebSocket()
+        ws.recorder = MarketDataRecorder(str(tmp_path), flush_interval=60)
+        ws._handle_data_message({
+            'topic': '/contractMarket/candle:XBTUSDTM_1hour',
+            'data': {'candles': [T0, 1, 2, 0.5, 1.5, 10]},
+        })
+        ws.recorder.close()
+
+        candles = load_recording(str(tmp_path), 'candle', 'XBTUSDTM_1hour')
+        assert candles['close'].tolist() == [1.5]
+        assert candles['candle_ts'].tolist() == [T0]
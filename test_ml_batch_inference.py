@@ -0,0 +1,118 @@
+"""
+Unit tests for batched MLModel inference
+"""
+
+import warnings
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from attention_features_2025 import AttentionFeatureSelector
+from config import Config
+from market_scanner import MarketScanner
+from ml_model import MLModel
+
+
+def make_indicators(rng, n):
+    names = ['rsi', 'macd', 'macd_signal', 'macd_diff', 'stoch_k', 'stoch_d', 'bb_width',
+             'volume_ratio', 'momentum', 'roc', 'atr', 'close', 'bb_high', 'bb_low', 'bb_mid', 'ema_12', 'ema_26']
+    return [{name: float(rng.uniform(0.5, 80)) for name in names} for _ in range(n)]
+
+
+@pytest.fixture
+def model(tmp_path):
+    rng = np.random.default_rng(11)
+    ml = MLModel(model_path=str(tmp_path / 'model.pkl'))
+    X = pd.DataFrame(ml.prepare_features_batch(make_indicators(rng, 120)), columns=MLModel.FEATURE_NAMES)
+    y = rng.integers(0, 3, len(X))
+    ml.model = LogisticRegression(max_iter=500).fit(ml.scaler.fit_transform(X), y)
+    return ml
+
+
+class TestPredictBatch:
+    """Test cases for MLModel.predict_batch."""
+
+    def test_batch_matches_single_predictions(self, model):
+        model.attention_selector = AttentionFeatureSelector(n_features=len(MLModel.FEATURE_NAMES))
+        indicators = make_indicators(np.random.default_rng(5), 25)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            batch = model.predict_batch(indicators)
+
+        expected = []
+        for row in indicators:
+            features = model.attention_selector.apply_attention(model.prepare_features(row)[0])
+            scaled = model.scaler.transform(pd.DataFrame([features], columns=MLModel.FEATURE_NAMES))
+            proba = model.model.predict_proba(scaled)[0]
+            expected.append(({0: 'HOLD', 1: 'BUY', 2: 'SELL'}[int(np.argmax(proba))], proba.max()))
+
+        assert [signal for signal, _ in batch] == [signal for signal, _ in expected]
+        np.testing.assert_allclose([c for _, c in batch], [c for _, c in expected])
+        assert model.predict(indicators[3]) == batch[3]
+
+    def test_single_model_call_per_batch(self, model):
+        model.model = MagicMock(wraps=model.model, classes_=model.model.classes_)
+        model.predict_batch(make_indicators(np.random.default_rng(1), 200))
+        assert model.model.predict_proba.call_count == 1
+        model.model.predict.assert_not_called()
+
+    def test_fallbacks(self, model, tmp_path):
+        assert model.predict_batch([]) == []
+        untrained = MLModel(model_path=str(tmp_path / 'missing.pkl'))
+        assert untrained.predict_batch([{}, {}]) == [('HOLD', 0.0), ('HOLD', 0.0)]
+
+
+class TestBatchAttention:
+    """Test cases for the vectorized attention weighting."""
+
+    def test_rows_match_apply_attention(self):
+        selector = AttentionFeatureSelector(n_features=6)
+        selector.attention_weights = np.random.default_rng(2).uniform(0.5, 2.0, 6)
+        features = np.random.default_rng(3).normal(size=(4, 6))
+        features[2] = 0.0
+
+        expected = np.vstack([selector.apply_attention(row) for row in features])
+        np.testing.assert_allclose(selector.apply_attention_batch(features), expected)
+
+
+class TestScannerScoring:
+    """Test cases for scoring scan opportunities in one batch."""
+
+    def test_opportunities_scored_in_one_call(self):
+        scanner = MarketScanner(MagicMock())
+        scanner.ml_model = MagicMock()
+        scanner.ml_model.predict_batch.return_value = [('BUY', 0.8), ('SELL', 0.6)]
+        results = [{'symbol': 'A'}, {'symbol': 'B'}, {'symbol': 'C'}]
+
+        scanner._score_with_ml(results, [{'rsi': 30}, None, {'rsi': 70}])
+
+        scanner.ml_model.predict_batch.assert_called_once_with([{'rsi': 30}, {'rsi': 70}])
+        assert results[0]['ml_signal'] == 'BUY' and results[2]['ml_confidence'] == 0.6
+        assert 'ml_signal' not in results[1]
+
+    def test_model_agreement_reorders_opportunities_only_when_enabled(self):
+        client = MagicMock()
+        client.get_active_futures.return_value = [{'symbol': s} for s in 'ABC']
+        scanner = MarketScanner(client)
+        scanner._filter_high_priority_pairs = lambda symbols, futures: symbols
+        predictions = {'A': ('SELL', 0.9), 'B': ('BUY', 0.8), 'C': ('HOLD', 0.0)}
+        scanner.ml_model = MagicMock()
+        scanner.ml_model.predict_batch.side_effect = lambda rows: [predictions[row['symbol']] for row in rows]
+        scan = {'A': (60.0, 'BUY'), 'B': (50.0, 'BUY'), 'C': (55.0, 'SELL')}
+        scanner.scan_pair = lambda symbol: (symbol, scan[symbol][0], scan[symbol][1], 0.7, {},
+                                            {'indicators': {'symbol': symbol}})
+
+        with patch.object(Config, 'SCANNER_EXECUTION_MODE', 'thread'):
+            results = scanner.scan_all_pairs(max_workers=1, use_cache=False)
+            # Annotations only by default: the scan's own ranking is kept
+            assert [r['symbol'] for r in results] == ['A', 'C', 'B'] and results[0]['ml_signal'] == 'SELL'
+
+            with patch.object(Config, 'ENABLE_ML_SCAN_RANKING', True):
+                results = scanner.scan_all_pairs(max_workers=1, use_cache=False)
+
+        assert [r['symbol'] for r in results] == ['B', 'C', 'A']
+        assert results[0]['score'] == pytest.approx(50.0 * 1.3) and results[2]['score'] == pytest.approx(60.0 * 0.6)
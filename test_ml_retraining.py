@@ -0,0 +1,126 @@
+"""
+Unit tests for background MLModel retraining and hot-swapping
+"""
+
+import os
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+pytest.importorskip('xgboost')
+pytest.importorskip('lightgbm')
+pytest.importorskip('catboost')
+
+from ml_model import MLModel, fit_candidate
+
+
+def add_samples(ml, n, seed=0, start=None):
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        features = rng.normal(size=len(MLModel.FEATURE_NAMES)) * 3
+        sample = {'features': features, 'label': int(features[0] > 0) + int(features[1] > 2)}
+        if start is not None:
+            sample['timestamp'] = (start + timedelta(minutes=i)).isoformat()
+        ml.training_data.append(sample)
+
+
+@pytest.fixture
+def model(tmp_path):
+    ml = MLModel(model_path=str(tmp_path / 'model.pkl'))
+    yield ml
+    ml.shutdown()
+
+
+class TestBackgroundRetraining:
+    """Test cases for train_async."""
+
+    def test_retrain_runs_in_background_and_installs_new_version(self, model):
+        add_samples(model, 160)
+        assert model.model_version == 0
+
+        assert model.train_async()
+        assert model.retraining and not model.train_async()  # One retrain at a time
+        assert model.predict({'rsi': 30}) == ('HOLD', 0.0)  # Still serving the old (empty) model
+
+        deadline = time.time() + 120
+        # The compiled copy is written last, after the model file
+        while not os.path.exists(model.compiled_path) and time.time() < deadline:
+            time.sleep(0.1)
+        assert model.model_version == 1 and model.compiled_model is not None
+        assert model.predict({'rsi': 30})[0] in ('HOLD', 'BUY', 'SELL')
+
+        reloaded = MLModel(model_path=model.model_path)
+        assert reloaded.model_version == 1 and reloaded.compiled_model is not None
+
+    def test_candidate_worse_than_current_is_rejected(self, model):
+        current = object()
+        model.model = current
+        result = {'model': object(), 'scaler': model.scaler, 'train_score': 0.9, 'test_score': 0.55,
+                  'baseline_score': 0.6, 'feature_importance': {}, 'compiled': None, 'compile_error': None}
+
+        assert not model._install_candidate(result, validate=True)
+        assert model.model is current and model.model_version == 0
+
+        result['test_score'] = 0.6
+        assert model._install_candidate(result, validate=True)
+        assert model.model is result['model'] and model.model_version == 1
+
+    def test_failed_retrain_keeps_serving_model(self, model):
+        future = Future()
+        future.set_exception(ValueError('fit failed'))
+        model._on_training_done(future)
+        assert model.model is None and model.model_version == 0
+
+    def test_baseline_is_scored_only_on_rows_it_was_not_trained_on(self):
+        rng = np.random.default_rng(1)
+        features = rng.normal(size=(100, len(MLModel.FEATURE_NAMES)))
+        labels = (features[:, 0] > 0).astype(int)
+        baseline_model, baseline_scaler = MagicMock(), MagicMock()
+        baseline_model.score.return_value = 0.5
+        baseline_scaler.transform.side_effect = lambda X: X
+
+        result = fit_candidate(features, labels, MLModel.FEATURE_NAMES, holdout_recent=True,
+                               baseline=(baseline_model, baseline_scaler), export_compiled=False, holdout_start=90)
+
+        scored = baseline_model.score.call_args[0][0]
+        assert list(scored.index) == list(range(90, 100)) and result['holdout_samples'] == 10
+        assert result['baseline_score'] == 0.5
+
+    def test_retrain_waits_for_rows_the_current_model_has_not_seen(self, model):
+        start = datetime(2026, 1, 1)
+        add_samples(model, 160, start=start)
+        assert model.train() and model.model_version == 1
+        assert model._state.trained_through == model.training_data[-1]['timestamp']
+
+        trainer = MagicMock()
+        with patch.object(model, '_get_trainer', return_value=trainer):
+            add_samples(model, 5, seed=1, start=start + timedelta(days=1))
+            assert not model.train_async()
+
+            add_samples(model, 30, seed=2, start=start + timedelta(days=2))
+            assert model.train_async()
+        assert trainer.submit.call_args.kwargs['holdout_start'] == 160
+
+        reloaded = MLModel(model_path=model.model_path)
+        assert reloaded._state.trained_through == model._state.trained_through
+
+    def test_retrain_leaves_pickled_baseline_to_the_trainer_process(self, model):
+        start = datetime(2026, 1, 1)
+        add_samples(model, 160, start=start)
+        assert model.train()
+        reloaded = MLModel(model_path=model.model_path)
+        add_samples(reloaded, 30, seed=2, start=start + timedelta(days=1))
+
+        trainer = MagicMock()
+        with patch.object(reloaded, '_get_trainer', return_value=trainer):
+            assert reloaded.train_async()
+        assert reloaded._pending_estimator is not None  # Not unpickled on the caller's thread
+        args, kwargs = trainer.submit.call_args
+        assert isinstance(kwargs['baseline'], bytes)
+
+        result = fit_candidate(*args[1:], **{**kwargs, 'export_compiled': False})
+        assert result['baseline_score'] is not None and result['holdout_samples'] == 30
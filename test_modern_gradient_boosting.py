@@ -4,14 +4,17 @@ Verify accuracy improvements and training time reduction
 """
 import sys
 import os
+import tempfile
 import time
 import numpy as np
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def test_modern_gradient_boosting():
+def test_modern_gradient_boosting(tmp_path):
     """Test that modern gradient boosting models are properly integrated"""
+    model_path = str(tmp_path / 'test_modern_gb_model.pkl')
     print("\n" + "="*70)
     print("Testing Modern Gradient Boosting Implementation")
     print("="*70)
@@ -19,7 +22,7 @@ def test_modern_gradient_boosting():
     from ml_model import MLModel
 
     # Create ML model instance
-    model = MLModel(model_path='models/test_modern_gb_model.pkl')
+    model = MLModel(model_path=model_path)
 
     # Test 1: Verify imports and model initialization
     print("\n1. Verifying modern gradient boosting imports...")
@@ -179,11 +182,6 @@ def test_modern_gradient_boosting():
     print(f"   Estimated improvement: 2-4x faster on larger datasets")
     print(f"   Expected accuracy improvement: +5-15%")
 
-    # Cleanup
-    if os.path.exists('models/test_modern_gb_model.pkl'):
-        os.remove('models/test_modern_gb_model.pkl')
-        print("\n   ✓ Cleaned up test model file")
-
     print("\n" + "="*70)
     print("✓ All Modern Gradient Boosting Tests Passed!")
     print("="*70)
@@ -213,7 +211,7 @@ if __name__ == '__main__':
     results = []
 
     # Run tests
-    results.append(("Modern Gradient Boosting", test_modern_gradient_boosting()))
+    results.append(("Modern Gradient Boosting", test_modern_gradient_boosting(Path(tempfile.mkdtemp()))))
     results.append(("Training Speed Comparison", test_training_speed_comparison()))
 
     # Summary
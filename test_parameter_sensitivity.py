@@ -0,0 +1,171 @@
+"""
+Unit tests for parallel and cached parameter sensitivity analysis
+"""
+
+import json
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parameter_sensitivity import ParameterSensitivityAnalyzer, ParameterSpec, fingerprint_callable, fingerprint_data
+
+
+def quadratic_backtest(params):
+    """Deterministic, module-level so worker processes can import it"""
+    leverage = params['leverage']
+    risk = params['risk_per_trade']
+    sharpe = 2.0 - 0.01 * (leverage - 10) ** 2 - 50 * (risk - 0.02) ** 2
+    return {'sharpe_ratio': sharpe, 'total_pnl': sharpe * 1000, 'trades': [1, 2, 3]}
+
+
+SPECS = [
+    ParameterSpec('leverage', base_value=10, param_type='int', min_value=5, max_value=15),
+    ParameterSpec('risk_per_trade', base_value=0.02, param_type='float', min_value=0.01, max_value=0.03),
+]
+BASE = {'leverage': 10, 'risk_per_trade': 0.02}
+
+
+class CountingBacktest:
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.calls = []
+
+    def __call__(self, params):
+        self.calls.append(dict(params))
+        return quadratic_backtest(params)
+
+
+def make_data(seed=0):
+    return pd.DataFrame({'close': np.random.default_rng(seed).normal(100, 1, 50)})
+
+
+class TestParameterSensitivityCache:
+    """Test cases for deduplication and the persisted result cache."""
+
+    def test_shared_parameter_sets_run_once(self, tmp_path):
+        backtest = CountingBacktest()
+        analyzer = ParameterSensitivityAnalyzer(backtest, data=make_data(),
+                                                cache_path=str(tmp_path / 'cache.json'))
+        results = analyzer.analyze_all_parameters(SPECS, BASE, num_samples=5)
+
+        # The base parameter set appears in both sweeps but is backtested once
+        unique = {json.dumps(c, sort_keys=True, default=float) for c in backtest.calls}
+        assert len(backtest.calls) == len(unique) == 10
+        assert analyzer.cache_hits == 1
+        assert {r['parameter'] for r in results} == {'leverage', 'risk_per_trade'}
+
+    def test_cache_is_reused_across_runs_for_same_data(self, tmp_path):
+        cache_path = str(tmp_path / 'cache.json')
+        first = ParameterSensitivityAnalyzer(CountingBacktest(), data=make_data(), cache_path=cache_path)
+        expected = first.analyze_all_parameters(SPECS, BASE, num_samples=5)
+
+        backtest = CountingBacktest()
+        second = ParameterSensitivityAnalyzer(backtest, data=make_data(), cache_path=cache_path)
+        results = second.analyze_all_parameters(SPECS, BASE, num_samples=5)
+        assert backtest.calls == []
+        assert [r['mean_metric'] for r in results] == pytest.approx([r['mean_metric'] for r in expected])
+
+        # Overlapping grid: only the new variations run
+        second.analyze_single_parameter(
+            ParameterSpec('leverage', base_value=10, param_type='int', min_value=5, max_value=20), BASE, 5)
+        assert 0 < len(backtest.calls) < 5
+
+        changed = CountingBacktest()
+        ParameterSensitivityAnalyzer(changed, data=make_data(seed=1), cache_path=cache_path) \
+            .analyze_all_parameters(SPECS, BASE, num_samples=5)
+        assert len(changed.calls) == 10
+
+    def test_without_data_nothing_is_persisted(self, tmp_path):
+        cache_path = tmp_path / 'cache.json'
+        analyzer = ParameterSensitivityAnalyzer(CountingBacktest(), cache_path=str(cache_path))
+        analyzer.analyze_all_parameters(SPECS, BASE, num_samples=3)
+        assert not cache_path.exists()
+
+    def test_errors_are_not_cached(self, tmp_path):
+        def failing(params):
+            raise RuntimeError('boom')
+
+        analyzer = ParameterSensitivityAnalyzer(failing, data='fixed', cache_path=str(tmp_path / 'c.json'))
+        result = analyzer.analyze_single_parameter(SPECS[0], BASE, num_samples=3)
+        assert result['stability'] == 'UNKNOWN'
+        assert all('error' in r for r in result['results'])
+        assert analyzer._cache == {}
+
+    def test_cache_hits_return_the_same_shape_as_fresh_runs(self, tmp_path):
+        cache_path = str(tmp_path / 'cache.json')
+        fresh = ParameterSensitivityAnalyzer(quadratic_backtest, data='fixed', cache_path=cache_path)
+        first = fresh._run_backtest(BASE)
+        first['trades'].append(4)
+        fresh.save_cache()
+
+        reloaded = ParameterSensitivityAnalyzer(quadratic_backtest, data='fixed', cache_path=cache_path)
+        assert fresh._run_backtest(BASE) == reloaded._run_backtest(BASE) == quadratic_backtest(BASE)
+        assert reloaded.cache_hits == 1
+
+    def test_default_cache_sits_next_to_results(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        first = CountingBacktest()
+        analyzer = ParameterSensitivityAnalyzer(first, data='fixed',
+                                                results_path=str(tmp_path / 'out' / 'sensitivity_analysis.json'))
+        results = analyzer.analyze_all_parameters(SPECS, BASE, num_samples=3)
+        entries = json.loads((tmp_path / 'out' / 'sensitivity_cache.json').read_text())['entries']
+        assert len(entries) == len(first.calls) > 0
+        assert not (tmp_path / 'sensitivity_cache.json').exists()
+
+        # Saving the results elsewhere takes the cache along
+        (tmp_path / 'moved').mkdir()
+        analyzer.save_results(results, str(tmp_path / 'moved' / 'sensitivity_analysis.json'))
+        backtest = CountingBacktest()
+        ParameterSensitivityAnalyzer(backtest, data='fixed', results_path=str(tmp_path / 'moved' / 'other.json')) \
+            .analyze_all_parameters(SPECS, BASE, num_samples=3)
+        assert backtest.calls == []
+
+    def test_fingerprint_follows_content(self):
+        assert fingerprint_data(make_data()) == fingerprint_data(make_data())
+        assert fingerprint_data(make_data()) != fingerprint_data(make_data(seed=1))
+        assert fingerprint_data(np.arange(5)) != fingerprint_data(np.arange(5.0))
+
+    def test_edited_function_gets_new_cache_key(self, tmp_path):
+        def edited(params):
+            return {'sharpe_ratio': 0.0}
+
+        # Same module and qualified name as quadratic_backtest, different body
+        replacement = types.FunctionType(edited.__code__, quadratic_backtest.__globals__, 'quadratic_backtest')
+        replacement.__qualname__ = quadratic_backtest.__qualname__
+        original = ParameterSensitivityAnalyzer(quadratic_backtest, data='fixed', cache_path=str(tmp_path / 'c.json'))
+        changed = ParameterSensitivityAnalyzer(replacement, data='fixed', cache_path=str(tmp_path / 'c.json'))
+
+        assert original.cache_key(BASE) != changed.cache_key(BASE)
+        assert fingerprint_callable(quadratic_backtest) == fingerprint_callable(quadratic_backtest)
+
+    def test_callable_settings_are_part_of_cache_key(self):
+        assert fingerprint_callable(CountingBacktest()) == fingerprint_callable(CountingBacktest())
+        assert fingerprint_callable(CountingBacktest(scale=2.0)) != fingerprint_callable(CountingBacktest())
+
+        pinned = ParameterSensitivityAnalyzer(CountingBacktest(scale=2.0), data='fixed', func_version='v1')
+        assert pinned.cache_key(BASE) == ParameterSensitivityAnalyzer(CountingBacktest(), data='fixed',
+                                                                      func_version='v1').cache_key(BASE)
+
+
+class TestParallelSensitivity:
+    """Parallel sweeps run distinct backtests on a process pool."""
+
+    def test_parallel_matches_sequential(self, tmp_path):
+        sequential = ParameterSensitivityAnalyzer(quadratic_backtest).analyze_all_parameters(
+            SPECS, BASE, num_samples=5)
+
+        cache_path = tmp_path / 'cache.json'
+        analyzer = ParameterSensitivityAnalyzer(quadratic_backtest, data='fixed',
+                                                cache_path=str(cache_path), max_workers=2)
+        parallel = analyzer.analyze_all_parameters(SPECS, BASE, num_samples=5, parallel=True)
+
+        assert [r['parameter'] for r in parallel] == [r['parameter'] for r in sequential]
+        assert [r['cv'] for r in parallel] == pytest.approx([r['cv'] for r in sequential])
+        assert analyzer.cache_misses == 10
+        assert len(json.loads(cache_path.read_text())['entries']) == 10
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,147 @@
+"""
+Unit tests for the portfolio-level multi-symbol backtester
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_engine import BacktestEngine
+from candle_store import CandleStore
+from portfolio_backtest import PortfolioBacktester, iter_csv_candles
+from risk_manager import RiskManager
+
+HOUR_MS = 3_600_000
+
+
+def make_candles(n, seed, start=0, step=HOUR_MS, base=100.0):
+    rng = np.random.default_rng(seed)
+    close = base + np.cumsum(rng.normal(0, base * 0.01, n))
+    candles = []
+    for i in range(n):
+        open_ = close[i - 1] if i else base
+        candles.append([start + i * step, open_, max(open_, close[i]) + 0.1,
+                        min(open_, close[i]) - 0.1, float(close[i]), 1000.0])
+    return candles
+
+
+def make_risk_manager(max_open_positions):
+    with patch.object(RiskManager, 'load_state'):
+        return RiskManager(1000, 0.02, max_open_positions)
+
+
+def always_long(symbol, history, balance, positions):
+    price = history[-1][4]
+    return {'side': 'long', 'amount': 1.0, 'leverage': 5,
+            'stop_loss': price * 0.99, 'take_profit': price * 1.01, 'score': len(symbol)}
+
+
+class TestPortfolioBacktester:
+    """Test cases for the merged event clock and shared risk limits."""
+
+    def test_events_are_merged_on_one_clock(self):
+        seen = []
+
+        def record(symbol, history, balance, positions):
+            seen.append((history[-1][0], symbol))
+            return None
+
+        sources = {
+            'AAA/USDT:USDT': iter(make_candles(5, 1, start=0)),
+            'BBB/USDT:USDT': iter(make_candles(5, 2, start=HOUR_MS // 2)),
+            'CCC/USDT:USDT': iter(make_candles(3, 3, start=0, step=2 * HOUR_MS)),
+        }
+        backtester = PortfolioBacktester(risk_manager=make_risk_manager(3))
+        results = backtester.run(sources, record)
+
+        assert seen == sorted(seen)
+        assert len(seen) == 13
+        # AAA and CCC share timestamps 0, 2h and 4h
+        assert results['steps'] == 10
+        assert results['total_trades'] == 0
+
+    def test_max_open_positions_is_shared(self):
+        sources = {f'{name}/USDT:USDT': iter(make_candles(200, seed))
+                   for seed, name in enumerate(['AAA', 'BBBB', 'CCCCC', 'DDDDDD'])}
+        backtester = PortfolioBacktester(initial_balance=10000, risk_manager=make_risk_manager(2))
+        results = backtester.run(sources, always_long)
+
+        assert results['max_concurrent_positions'] == 2
+        assert results['rejected_signals']['risk_limit'] > 0
+        assert results['total_trades'] > 10
+        # Highest score (longest symbol) gets a slot on the first step
+        assert results['trades'][0]['symbol'] in ('DDDDDD/USDT:USDT', 'CCCCC/USDT:USDT')
+        assert {t['symbol'] for t in results['trades']} <= set(sources)
+
+    def test_diversification_limits_correlated_group(self):
+        # layer1 group: at most max(2, int(5 * 0.4)) = 2 positions at once
+        sources = {f'{name}/USDT:USDT': iter(make_candles(50, seed))
+                   for seed, name in enumerate(['SOL', 'AVAX', 'DOT', 'NEAR'])}
+        backtester = PortfolioBacktester(risk_manager=make_risk_manager(5))
+        results = backtester.run(sources, always_long)
+
+        assert results['max_concurrent_positions'] == 2
+        assert results['rejected_signals']['diversification'] > 0
+
+    def test_shared_margin_limits_entries(self):
+        sources = {f'{name}/USDT:USDT': iter(make_candles(20, seed, base=1000.0))
+                   for seed, name in enumerate(['AAA', 'BBB', 'CCC'])}
+        # Each entry needs ~200 margin; only two fit in a 450 balance
+        backtester = PortfolioBacktester(initial_balance=450, risk_manager=make_risk_manager(3))
+        results = backtester.run(sources, always_long)
+
+        assert results['max_concurrent_positions'] <= 2
+        assert results['rejected_signals']['margin'] > 0
+
+    def test_single_symbol_matches_backtest_engine(self):
+        candles = make_candles(300, 11)
+
+        def portfolio_strategy(symbol, history, balance, positions):
+            candle = history[-1]
+            if candle[4] > candle[1]:
+                return {'side': 'long', 'amount': 1.0, 'leverage': 5,
+                        'stop_loss': candle[4] * 0.99, 'take_profit': candle[4] * 1.02}
+            return None
+
+        def engine_strategy(row, balance, positions):
+            if positions or row['close'] <= row['open']:
+                return None
+            return {'side': 'long', 'amount': 1.0, 'leverage': 5,
+                    'stop_loss': row['close'] * 0.99, 'take_profit': row['close'] * 1.02}
+
+        data = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        expected = BacktestEngine(initial_balance=10000).run_backtest(data, engine_strategy)
+        results = PortfolioBacktester(initial_balance=10000, risk_manager=make_risk_manager(3)).run(
+            {'AAA/USDT:USDT': iter(candles)}, portfolio_strategy)
+
+        assert results['total_trades'] == expected['total_trades'] > 0
+        assert results['final_balance'] == pytest.approx(expected['final_balance'])
+        assert results['total_trading_fees'] == pytest.approx(expected['total_trading_fees'])
+        assert results['total_slippage'] == pytest.approx(expected['total_slippage'])
+
+    def test_streams_from_candle_store_and_csv(self, tmp_path):
+        store = CandleStore(path=str(tmp_path / 'candles.db'), max_candles=0)
+        store.upsert('AAA/USDT:USDT', '1h', make_candles(120, 4))
+        streamed = list(store.iter_candles('AAA/USDT:USDT', '1h', batch_size=25))
+        assert [c[0] for c in streamed] == [i * HOUR_MS for i in range(120)]
+        assert len(list(store.iter_candles('AAA/USDT:USDT', '1h', since=10 * HOUR_MS,
+                                           until=19 * HOUR_MS, batch_size=3))) == 10
+
+        csv_path = tmp_path / 'bbb.csv'
+        pd.DataFrame(make_candles(120, 5), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']) \
+            .to_csv(csv_path, index=False)
+
+        sources = {
+            'AAA/USDT:USDT': store.iter_candles('AAA/USDT:USDT', '1h', batch_size=25),
+            'BBB/USDT:USDT': iter_csv_candles(str(csv_path), chunksize=30),
+        }
+        results = PortfolioBacktester(risk_manager=make_risk_manager(3)).run(sources, always_long)
+        assert results['steps'] == 120
+        assert results['total_trades'] > 0
+        store.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,172 @@
+"""
+Unit tests for the weighted token-bucket rate limiter
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import ccxt
+import pytest
+
+from config import Config
+from kucoin_client import APICallPriority
+from rate_limiter import TokenBucket, WeightedRateLimiter
+
+
+class TestTokenBucket:
+    """Test cases for bucket floors, refill and penalties."""
+
+    def setup_method(self):
+        # 100 weight per 10 s window, 20 reserved for CRITICAL calls
+        self.bucket = TokenBucket('test', capacity=100, window=10, reserve_fraction=0.2)
+
+    def test_reserve_is_kept_for_critical_calls(self):
+        assert self.bucket.try_acquire(80, APICallPriority.NORMAL) == 0.0
+
+        # NORMAL and LOW calls may not dip into the reserve
+        assert self.bucket.try_acquire(1, APICallPriority.NORMAL) > 0
+        assert self.bucket.try_acquire(1, APICallPriority.LOW) > 0
+        # HIGH calls may use half of it, CRITICAL calls all of it
+        assert self.bucket.try_acquire(10, APICallPriority.HIGH) == 0.0
+        assert self.bucket.try_acquire(10, APICallPriority.CRITICAL) == 0.0
+        assert self.bucket.try_acquire(1, APICallPriority.CRITICAL) > 0
+
+    def test_wait_matches_refill_rate(self):
+        self.bucket.try_acquire(80, APICallPriority.NORMAL)
+        # 10 weight above the floor refills at 10 weight/s
+        assert self.bucket.try_acquire(10, APICallPriority.NORMAL) == pytest.approx(1.0, abs=0.05)
+
+    def test_acquire_blocks_until_refilled(self):
+        self.bucket.try_acquire(80, APICallPriority.NORMAL)
+        waited = self.bucket.acquire(2, APICallPriority.NORMAL)
+        assert 0.1 < waited < 0.5
+        metrics = self.bucket.get_metrics()
+        assert metrics['calls'] == 2 and metrics['waits'] == 1
+        assert metrics['max_wait'] == pytest.approx(waited)
+
+    def test_acquire_async_does_not_block_loop(self):
+        self.bucket.try_acquire(80, APICallPriority.NORMAL)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            await asyncio.gather(self.bucket.acquire_async(2, APICallPriority.NORMAL), ticker())
+
+        asyncio.run(scenario())
+        assert len(ticks) == 5
+
+    def test_penalize_empties_bucket(self):
+        self.bucket.penalize()
+        assert self.bucket.try_acquire(1, APICallPriority.CRITICAL) > 0
+        metrics = self.bucket.get_metrics()
+        assert metrics['penalties'] == 1
+        assert metrics['utilization'] == pytest.approx(1.0, abs=0.05)
+
+    def test_oversized_weight_is_capped(self):
+        # A single request heavier than the whole bucket must still be servable
+        assert self.bucket.try_acquire(500, APICallPriority.CRITICAL) == 0.0
+
+
+class TestWeightedRateLimiter:
+    """Test cases for pool routing and weights."""
+
+    def test_pool_for_api(self):
+        assert WeightedRateLimiter.pool_for('futuresPublic') == 'public'
+        assert WeightedRateLimiter.pool_for(['futuresPrivate']) == 'private'
+        assert WeightedRateLimiter.pool_for('private') == 'private'
+
+    def test_weight_for_cost(self):
+        assert WeightedRateLimiter.weight_for(2) == 1
+        assert WeightedRateLimiter.weight_for(20) == 10
+        assert WeightedRateLimiter.weight_for(None) == 1
+
+    def test_pools_are_independent(self):
+        limiter = WeightedRateLimiter(public_weight=10, private_weight=10, window=10, reserve_fraction=0)
+        limiter.acquire('public', 10)
+        assert limiter.pools['public'].try_acquire(1, APICallPriority.CRITICAL) > 0
+        assert limiter.pools['private'].try_acquire(1, APICallPriority.CRITICAL) == 0.0
+
+        limiter.penalize('private')
+        metrics = limiter.get_metrics()
+        assert metrics['private']['penalties'] == 1 and metrics['public']['penalties'] == 0
+
+
+class TestKuCoinClientRateLimiting:
+    """KuCoinClient reserves weight for every REST request at the caller's priority."""
+
+    def setup_method(self):
+        self.exchange = MagicMock()
+        self.exchange.calculate_rate_limiter_cost.return_value = 20
+        self.sent = []
+        self.exchange.fetch2.side_effect = lambda path, api, *args: self.sent.append((path, api)) or {}
+        self.limiter = MagicMock()
+        self.limiter.acquire.return_value = 0.0
+
+    def make_client(self):
+        from kucoin_client import KuCoinClient
+        with patch.object(Config, 'ENABLE_RATE_LIMITER', True), \
+                patch('kucoin_client.get_rate_limiter', return_value=self.limiter), \
+                patch('kucoin_client.ccxt.kucoinfutures', return_value=self.exchange) as factory:
+            client = KuCoinClient('key', 'secret', 'pass', enable_websocket=False)
+        assert factory.call_args[0][0]['enableRateLimit'] is False
+        self.limiter.acquire.reset_mock()
+        return client
+
+    def test_requests_acquire_at_call_priority(self):
+        client = self.make_client()
+        client._execute_with_priority(
+            lambda: client.exchange.fetch2('contracts/active', 'futuresPublic'), APICallPriority.NORMAL, 'scan'
+        )
+        client._execute_with_priority(
+            lambda: client.exchange.fetch2('orders', 'futuresPrivate', 'POST'), APICallPriority.CRITICAL, 'order'
+        )
+
+        assert self.sent == [('contracts/active', 'futuresPublic'), ('orders', 'futuresPrivate')]
+        calls = [c.args for c in self.limiter.acquire.call_args_list]
+        assert calls == [('public', 10.0, APICallPriority.NORMAL), ('private', 10.0, APICallPriority.CRITICAL)]
+
+    def test_nested_call_inherits_critical_priority(self):
+        client = self.make_client()
+        client._pending_critical_calls = 1  # another critical call in flight
+
+        def order():
+            start = time.time()
+            client._execute_with_priority(
+                lambda: client.exchange.fetch2('account-overview', 'futuresPrivate'), APICallPriority.HIGH, 'balance'
+            )
+            return time.time() - start
+
+        elapsed = client._execute_with_priority(order, APICallPriority.CRITICAL, 'order')
+        assert elapsed < 1.0
+        assert self.limiter.acquire.call_args.args[2] == APICallPriority.CRITICAL
+
+    def test_rate_limit_error_penalizes_instead_of_sleeping(self):
+        client = self.make_client()
+        assert client._rate_limit_delay(3, True, 1.0) == 0
+        self.limiter.penalize.assert_called_once_with(None)
+
+    def test_public_429_penalizes_only_the_public_pool(self):
+        client = self.make_client()
+        client.rate_limiter = limiter = WeightedRateLimiter(window=0.5)
+        attempts = []
+
+        def fetch_tickers():
+            client.exchange.fetch2('allTickers', 'futuresPublic')
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ccxt.RateLimitExceeded('429 Too Many Requests')
+            return {'ok': True}
+
+        assert client._handle_api_error(fetch_tickers, operation_name='get_all_tickers') == {'ok': True}
+        metrics = limiter.get_metrics()
+        assert metrics['public']['penalties'] == 1 and metrics['private']['penalties'] == 0
+        assert metrics['private']['available'] == metrics['private']['capacity']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
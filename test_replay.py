@@ -0,0 +1,303 @@
+"""
+Unit tests for the market replay harness
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import ccxt
+import numpy as np
+import pytest
+
+import market_scanner
+from replay import (ReplayData, ReplayExchange, ReplayKuCoinClient, ReplayRunner, ReplayWebSocket,
+                    SimulatedClock, SimulatedDatetime, resample_candles)
+
+HOUR_MS = 3_600_000
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def make_candles(n, start=0, step=HOUR_MS, base=100.0, drift=0.0):
+    candles = []
+    for i in range(n):
+        close = base + drift * (i + 1)
+        open_ = base + drift * i
+        candles.append([start + i * step, open_, max(open_, close) + 0.5, min(open_, close) - 0.5, close, 10.0])
+    return candles
+
+
+def make_exchange(candles, now_ms, balance=1000.0, taker_fee=0.0):
+    data = ReplayData({(SYMBOL, '1h'): candles}, spread=0.0)
+    clock = SimulatedClock(now_ms / 1000)
+    return ReplayExchange(data, clock, initial_balance=balance, taker_fee=taker_fee), clock
+
+
+class TestReplayData:
+    """Test cases for point-in-time lookups."""
+
+    def test_candles_are_visible_only_once_closed(self):
+        data = ReplayData({(SYMBOL, '1h'): make_candles(10)})
+
+        assert len(data.candles(SYMBOL, '1h', HOUR_MS - 1)) == 0
+        assert len(data.candles(SYMBOL, '1h', HOUR_MS)) == 1
+        rows = data.ohlcv(SYMBOL, '1h', 5 * HOUR_MS + 10, limit=3)
+        assert [row[0] for row in rows] == [2 * HOUR_MS, 3 * HOUR_MS, 4 * HOUR_MS]
+        assert isinstance(rows[0][0], int)
+
+    def test_ticker_uses_last_closed_candle(self):
+        data = ReplayData({(SYMBOL, '1h'): make_candles(30, drift=1.0)}, spread=0.001)
+
+        ticker = data.ticker(SYMBOL, 5 * HOUR_MS)
+        assert ticker['last'] == 105.0
+        assert ticker['bid'] < ticker['last'] < ticker['ask']
+        assert ticker['timestamp'] == 5 * HOUR_MS
+        assert data.ticker(SYMBOL, 0) is None
+
+        # 24h quote volume only covers the last day of candles
+        ticker = data.ticker(SYMBOL, 30 * HOUR_MS)
+        expected = sum(c[4] * c[5] for c in make_candles(30, drift=1.0)[6:])
+        assert ticker['quoteVolume'] == pytest.approx(expected)
+
+    def test_recorded_snapshots_take_precedence(self):
+        tickers = {SYMBOL: [{'symbol': SYMBOL, 'timestamp': 2 * HOUR_MS, 'last': 7.0, 'bid': 6.9, 'ask': 7.1}]}
+        books = {SYMBOL: [{'timestamp': 2 * HOUR_MS, 'bids': [[6.9, 1]], 'asks': [[7.1, 2]], 'nonce': 42}]}
+        data = ReplayData({(SYMBOL, '1h'): make_candles(5)}, tickers=tickers, order_books=books)
+
+        assert data.ticker(SYMBOL, HOUR_MS)['last'] == 100.0
+        assert data.ticker(SYMBOL, 3 * HOUR_MS)['last'] == 7.0
+        assert data.order_book(SYMBOL, 3 * HOUR_MS)['nonce'] == 42
+        assert len(data.order_book(SYMBOL, HOUR_MS, depth=5)['bids']) == 5
+
+    def test_missing_timeframes_are_derived(self):
+        candles = make_candles(48, drift=1.0)
+        data = ReplayData({(SYMBOL, '1h'): candles})
+
+        assert data.has_candles(SYMBOL, '4h') and data.has_candles(SYMBOL, '1d')
+        four_hour = data.candles(SYMBOL, '4h', 48 * HOUR_MS, limit=100)
+        assert len(four_hour) == 12
+        assert four_hour[0].tolist() == [0, 100.0, 104.5, 99.5, 104.0, 40.0]
+        # The forming 4h candle is not served until it closes
+        assert len(data.candles(SYMBOL, '4h', 7 * HOUR_MS)) == 1
+
+    def test_resample_candles(self):
+        candles = np.array(make_candles(6, drift=1.0), dtype=float)
+        out = resample_candles(candles, 3 * HOUR_MS)
+
+        assert out[:, 0].tolist() == [0, 3 * HOUR_MS]
+        assert out[:, 4].tolist() == [103.0, 106.0]
+        assert out[:, 5].tolist() == [30.0, 30.0]
+
+    def test_from_candle_store(self, tmp_path):
+        from candle_store import CandleStore
+        path = str(tmp_path / 'candles.db')
+        store = CandleStore(path, max_candles=0)
+        store.upsert(SYMBOL, '1h', make_candles(5))
+        store.upsert('ETH/USDT:USDT', '1h', make_candles(5))
+        store.close()
+
+        data = ReplayData.from_candle_store(path, symbols=[SYMBOL])
+        assert data.symbols == [SYMBOL]
+        assert data.start_ms == HOUR_MS
+        assert data.end_ms == 5 * HOUR_MS
+
+
+class TestReplayExchange:
+    """Test cases for simulated fills and margin accounting."""
+
+    def test_market_round_trip_realizes_pnl(self):
+        candles = make_candles(10, drift=1.0)
+        exchange, clock = make_exchange(candles, 2 * HOUR_MS, taker_fee=0.001)
+
+        exchange.set_leverage(10, SYMBOL)
+        order = exchange.create_order(SYMBOL, 'market', 'buy', 2)
+        assert order['status'] == 'closed' and order['average'] == 102.0
+        position = exchange.fetch_positions()[0]
+        assert position['side'] == 'long' and position['contracts'] == 2
+        assert position['leverage'] == 10 and position['initialMargin'] == pytest.approx(20.4)
+
+        clock.set(5 * HOUR_MS / 1000)
+        exchange.create_order(SYMBOL, 'market', 'sell', 2, params={'reduceOnly': True})
+        assert exchange.fetch_positions() == []
+        assert exchange.realized_pnl == pytest.approx(6.0)
+        fees = 2 * 102.0 * 0.001 + 2 * 105.0 * 0.001
+        assert exchange.fetch_balance()['free']['USDT'] == pytest.approx(1000 + 6.0 - fees)
+
+    def test_insufficient_margin_is_rejected(self):
+        exchange, _ = make_exchange(make_candles(5), 2 * HOUR_MS, balance=50.0)
+        exchange.set_leverage(1, SYMBOL)
+
+        with pytest.raises(ccxt.InsufficientFunds):
+            exchange.create_order(SYMBOL, 'market', 'buy', 1)
+        assert exchange.positions == {}
+
+    def test_reduce_only_never_opens(self):
+        exchange, _ = make_exchange(make_candles(5), 2 * HOUR_MS)
+
+        with pytest.raises(ccxt.InvalidOrder):
+            exchange.create_order(SYMBOL, 'market', 'sell', 1, params={'reduceOnly': True})
+
+        exchange.create_order(SYMBOL, 'market', 'buy', 1)
+        exchange.create_order(SYMBOL, 'market', 'sell', 3, params={'reduceOnly': True})
+        assert exchange.positions == {}
+
+    def test_orphaned_reduce_only_order_is_canceled(self):
+        exchange, clock = make_exchange(make_candles(10, drift=1.0), 2 * HOUR_MS)
+
+        exchange.create_order(SYMBOL, 'market', 'buy', 1)
+        take_profit = exchange.create_order(SYMBOL, 'limit', 'sell', 1, price=105.0, params={'reduceOnly': True})
+        exchange.create_order(SYMBOL, 'market', 'sell', 1, params={'reduceOnly': True})
+
+        clock.set(6 * HOUR_MS / 1000)
+        exchange.match_orders()
+        assert exchange.fetch_order(take_profit['id'])['status'] == 'canceled'
+        assert exchange.positions == {}
+        assert len(exchange.fills) == 2
+
+    def test_triggered_stop_pays_taker_fee(self):
+        candles = make_candles(10, drift=-1.0)
+        data = ReplayData({(SYMBOL, '1h'): candles}, spread=0.0)
+        clock = SimulatedClock(2 * HOUR_MS / 1000)
+        exchange = ReplayExchange(data, clock, taker_fee=0.001, maker_fee=0.0002)
+
+        exchange.create_order(SYMBOL, 'market', 'buy', 1)
+        stop = exchange.create_order(SYMBOL, 'limit', 'sell', 1, price=90.0,
+                                     params={'reduceOnly': True, 'stopPrice': 97.0})
+        assert exchange.fetch_order(stop['id'])['status'] == 'open'
+
+        clock.set(6 * HOUR_MS / 1000)
+        exchange.match_orders()
+        filled = exchange.fetch_order(stop['id'])
+        assert filled['status'] == 'closed' and filled['average'] == 90.0
+        assert filled['fee']['cost'] == pytest.approx(90.0 * 0.001)
+
+    def test_limit_order_rests_until_price_reaches_it(self):
+        exchange, clock = make_exchange(make_candles(10, drift=-1.0), 2 * HOUR_MS)
+
+        order = exchange.create_order(SYMBOL, 'limit', 'buy', 1, price=95.0)
+        assert exchange.fetch_order(order['id'])['status'] == 'open'
+        exchange.match_orders()
+        assert exchange.fetch_order(order['id'])['status'] == 'open'
+
+        clock.set(6 * HOUR_MS / 1000)
+        exchange.match_orders()
+        filled = exchange.fetch_order(order['id'])
+        assert filled['status'] == 'closed' and filled['average'] == 95.0
+
+        other = exchange.create_order(SYMBOL, 'limit', 'buy', 1, price=50.0)
+        exchange.cancel_order(other['id'])
+        assert exchange.fetch_order(other['id'])['status'] == 'canceled'
+
+
+class TestSimulatedClock:
+    """Test cases for the clock patched into the bot's modules."""
+
+    def test_sleep_advances_instead_of_blocking(self):
+        clock = SimulatedClock(1000.0)
+        started = time.perf_counter()
+        clock.sleep(3600)
+        assert clock.time() == 4600.0
+        assert time.perf_counter() - started < 1.0
+        clock.set(10.0)
+        assert clock.time() == 4600.0
+
+    def test_installed_patches_repo_modules(self):
+        clock = SimulatedClock(1_700_000_000.0)
+        with clock.installed():
+            assert market_scanner.time.time() == 1_700_000_000.0
+            assert market_scanner.datetime.now() == datetime.fromtimestamp(1_700_000_000.0)
+            market_scanner.time.sleep(5)
+            assert clock.time() == 1_700_000_005.0
+            with pytest.raises(RuntimeError):
+                with SimulatedClock().installed():
+                    pass
+        assert market_scanner.time is time
+        assert market_scanner.datetime is datetime
+        assert SimulatedDatetime._clock is None
+
+
+class TestReplayKuCoinClient:
+    """Test cases for the real client running on replayed data."""
+
+    def test_client_reads_replay_data(self):
+        data = ReplayData({(SYMBOL, '1h'): make_candles(120, drift=0.1)})
+        clock = SimulatedClock(100 * HOUR_MS / 1000)
+        exchange = ReplayExchange(data, clock)
+        with clock.installed():
+            client = ReplayKuCoinClient(exchange, ReplayWebSocket(data, clock))
+            try:
+                assert isinstance(client.websocket, ReplayWebSocket)
+                assert client.rate_limiter is None
+                assert client.get_ticker(SYMBOL)['last'] == pytest.approx(110.0)
+                assert len(client.get_ohlcv(SYMBOL, '1h', limit=100)) == 100
+                assert [f['symbol'] for f in client.get_active_futures()] == [SYMBOL]
+                assert client.get_balance()['free']['USDT'] == 10000.0
+            finally:
+                client.close()
+
+
+class FakeBot:
+    """Minimal TradingBot surface the runner drives"""
+
+    def __init__(self, client):
+        self.client = client
+        self._scan_lock = threading.Lock()
+        self._latest_opportunities = []
+        self._last_opportunity_update = None
+        self.cycles = []
+        self.scanner = self
+        self.position_manager = self
+
+    def get_best_pairs(self, n=5):
+        return [{'symbol': SYMBOL}]
+
+    def get_open_positions_count(self):
+        return len(self.client.get_open_positions())
+
+    def update_open_positions(self):
+        pass
+
+    def run_cycle(self):
+        self.cycles.append(time.time())
+        if not self.client.get_open_positions():
+            self.client.create_market_order(SYMBOL, 'buy', 1, leverage=5)
+
+    def shutdown(self):
+        pass
+
+
+class TestReplayRunner:
+    """Test cases for the simulated-clock driver."""
+
+    def test_runner_is_fast_and_deterministic(self):
+        data = ReplayData({(SYMBOL, '1h'): make_candles(200, drift=0.5)})
+
+        reports = []
+        for _ in range(2):
+            runner = ReplayRunner(data, step_seconds=600, scan_interval=3600, warmup_bars=100,
+                                  initial_balance=1000.0, bot_factory=FakeBot)
+            reports.append(runner.run())
+
+        report = reports[0]
+        # Starts after 100 warm-up candles, ends when the last candle closes
+        assert report['simulated_seconds'] == pytest.approx(99 * 3600)
+        assert report['steps'] == 594
+        assert report['fills'] == 1 and report['open_positions'] == 1
+        assert report['total_pnl'] > 0
+        assert report['latency']['scan']['count'] == 99
+        assert report['final_equity'] == reports[1]['final_equity']
+        assert SimulatedDatetime._clock is None
+
+    def test_runner_builds_real_bot_without_credentials(self, monkeypatch):
+        for name in ('KUCOIN_API_KEY', 'KUCOIN_API_SECRET', 'KUCOIN_API_PASSPHRASE'):
+            monkeypatch.delenv(name, raising=False)
+        data = ReplayData({(SYMBOL, '1h'): make_candles(110, drift=0.5)})
+
+        runner = ReplayRunner(data, step_seconds=3600, scan_interval=3600, warmup_bars=100, initial_balance=1000.0)
+        report = runner.run()
+
+        from bot import TradingBot
+        assert isinstance(runner.bot, TradingBot)
+        assert report['steps'] == 9 and report['latency']['cycle']['count'] == 9
+        assert 'KUCOIN_API_KEY' not in os.environ
@@ -0,0 +1,227 @@
+"""
+Unit tests for single-flight request coalescing and the ticker micro-cache
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config import Config
+from kucoin_client import APICallPriority
+from performance_monitor import PerformanceMonitor
+from request_coalescer import RequestCoalescer
+
+
+class TestRequestCoalescer:
+    """Test cases for coalescing, TTL caching and counters."""
+
+    def setup_method(self):
+        self.monitor = PerformanceMonitor()
+        self.patcher = patch('request_coalescer.get_monitor', return_value=self.monitor)
+        self.patcher.start()
+        self.coalescer = RequestCoalescer()
+        self.calls = 0
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def slow_fetch(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return {'last': 100.0}
+
+    def test_concurrent_callers_share_one_request(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                self.coalescer.get('ticker', ('BTC',), self.slow_fetch, max_age=0)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert self.calls == 1
+        assert results == [{'last': 100.0}] * 8
+        stats = self.coalescer.get_stats()
+        assert stats['misses'] == 1 and stats['coalesced'] == 7 and stats['in_flight'] == 0
+
+    def test_fresh_result_is_served_from_cache(self):
+        fetch = MagicMock(return_value={'last': 1.0})
+        self.coalescer.get('ticker', ('BTC',), fetch, max_age=1.0)
+        self.coalescer.get('ticker', ('BTC',), fetch, max_age=1.0)
+        self.coalescer.get('ticker', ('ETH',), fetch, max_age=1.0)
+        assert fetch.call_count == 2
+
+        time.sleep(0.06)
+        self.coalescer.get('ticker', ('BTC',), fetch, max_age=0.05)
+        assert fetch.call_count == 3
+
+        # A zero budget never serves cached data
+        self.coalescer.get('ticker', ('BTC',), fetch, max_age=0)
+        assert fetch.call_count == 4
+
+    def test_failures_are_not_cached(self):
+        fetch = MagicMock(side_effect=[None, RuntimeError('boom'), {'last': 2.0}])
+        assert self.coalescer.get('ticker', ('BTC',), fetch, max_age=10) is None
+        with pytest.raises(RuntimeError):
+            self.coalescer.get('ticker', ('BTC',), fetch, max_age=10)
+        assert self.coalescer.get('ticker', ('BTC',), fetch, max_age=10) == {'last': 2.0}
+        assert fetch.call_count == 3
+
+    def test_error_is_shared_with_followers(self):
+        def failing_fetch():
+            time.sleep(0.2)
+            raise RuntimeError('boom')
+
+        errors = []
+
+        def caller():
+            try:
+                self.coalescer.get('ticker', ('BTC',), failing_fetch, max_age=0)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 3
+
+    def test_each_caller_gets_its_own_copy(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                self.coalescer.get('ticker', ('BTC',), self.slow_fetch, max_age=10)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        results[0]['last'] = -1.0
+        assert [r['last'] for r in results[1:]] == [100.0, 100.0]
+        assert self.coalescer.get('ticker', ('BTC',), self.slow_fetch, max_age=10) == {'last': 100.0}
+        assert self.calls == 1
+
+    def test_counters_reported_to_performance_monitor(self):
+        fetch = MagicMock(return_value={'last': 1.0})
+        for _ in range(4):
+            self.coalescer.get('ticker', ('BTC',), fetch, max_age=10)
+
+        cache = self.monitor.get_stats()['request_cache']['ticker']
+        assert cache['misses'] == 1 and cache['hits'] == 3 and cache['coalesced'] == 0
+        assert cache['saved_rate'] == pytest.approx(0.75)
+
+
+class TestKuCoinClientTickerCoalescing:
+    """KuCoinClient.get_ticker deduplicates concurrent REST requests."""
+
+    def setup_method(self):
+        self.exchange = MagicMock()
+        self.fetches = 0
+
+        def fetch_ticker(symbol):
+            self.fetches += 1
+            time.sleep(0.2)
+            return {'symbol': symbol, 'last': 50000.0}
+
+        self.exchange.fetch_ticker.side_effect = fetch_ticker
+
+    def make_client(self):
+        from kucoin_client import KuCoinClient
+        with patch.object(Config, 'ENABLE_REQUEST_COALESCING', True), \
+                patch.object(Config, 'ENABLE_RATE_LIMITER', False), \
+                patch('kucoin_client.ccxt.kucoinfutures', return_value=self.exchange):
+            return KuCoinClient('key', 'secret', 'pass', enable_websocket=False)
+
+    def test_concurrent_get_ticker_makes_one_request(self):
+        client = self.make_client()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.get_ticker('BTC/USDT:USDT')))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert self.fetches == 1
+        assert all(r['last'] == 50000.0 for r in results) and len(results) == 5
+
+        # Within the freshness budget the cached ticker is reused
+        with patch.object(Config, 'TICKER_CACHE_TTL', 5.0):
+            client.get_ticker('BTC/USDT:USDT', priority=APICallPriority.NORMAL)
+        assert self.fetches == 1
+
+    def test_critical_calls_always_fetch(self):
+        client = self.make_client()
+        with patch.object(Config, 'TICKER_CACHE_TTL', 5.0):
+            client.get_ticker('BTC/USDT:USDT')
+            client.get_ticker('BTC/USDT:USDT', priority=APICallPriority.CRITICAL)
+            # Nested inside a critical operation the default priority is not enough to use the cache
+            client._execute_with_priority(lambda: client.get_ticker('BTC/USDT:USDT'),
+                                          APICallPriority.CRITICAL, 'close_position')
+        assert self.fetches == 3
+
+    def test_high_priority_call_does_not_join_normal_leader(self):
+        client = self.make_client()
+        scanner = threading.Thread(target=client.get_ticker, args=('BTC/USDT:USDT', APICallPriority.NORMAL))
+        scanner.start()
+        time.sleep(0.05)  # The NORMAL request is in flight
+
+        monitor = threading.Thread(target=client.get_ticker, args=('BTC/USDT:USDT', APICallPriority.HIGH))
+        followers = [threading.Thread(target=client.get_ticker, args=('BTC/USDT:USDT', APICallPriority.HIGH))
+                     for _ in range(3)]
+        monitor.start()
+        time.sleep(0.05)
+        for thread in followers:
+            thread.start()
+        for thread in [scanner, monitor] + followers:
+            thread.join(timeout=5)
+
+        assert self.fetches == 2  # One per priority level
+
+    def test_critical_call_does_not_join_waiting_normal_leader(self):
+        client = self.make_client()
+        in_critical = threading.Event()
+        leader_waiting = threading.Event()
+        wait_for_critical = client._wait_for_critical_calls
+
+        def wait_and_signal(priority):
+            if priority > APICallPriority.CRITICAL:
+                leader_waiting.set()
+            wait_for_critical(priority)
+
+        def close_position():
+            in_critical.set()
+            assert leader_waiting.wait(2)
+            return client.get_ticker('BTC/USDT:USDT')
+
+        with patch.object(client, '_wait_for_critical_calls', side_effect=wait_and_signal):
+            closer = []
+            thread = threading.Thread(target=lambda: closer.append(client._execute_with_priority(
+                close_position, APICallPriority.CRITICAL, 'close_position')))
+            thread.start()
+            assert in_critical.wait(2)
+
+            # A NORMAL leader enters the coalescer and blocks behind the critical operation
+            scanner = threading.Thread(target=client.get_ticker, args=('BTC/USDT:USDT', APICallPriority.NORMAL))
+            scanner.start()
+            start = time.monotonic()
+            thread.join(timeout=10)
+            scanner.join(timeout=10)
+
+        assert closer and closer[0]['last'] == 50000.0
+        assert time.monotonic() - start < 2.0
+        assert self.fetches == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
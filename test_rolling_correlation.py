@@ -0,0 +1,99 @@
+"""
+Unit tests for the streaming rolling correlation engine
+"""
+
+import numpy as np
+import pytest
+
+from correlation_matrix import CorrelationMatrix
+from position_correlation import PositionCorrelationManager
+from rolling_correlation import RollingCorrelationEngine
+
+
+def make_prices(n_symbols=5, ticks=200, seed=3):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, ticks)
+    returns = market[None, :] * rng.uniform(0, 1.5, (n_symbols, 1)) + rng.normal(0, 0.01, (n_symbols, ticks))
+    return 100 * np.cumprod(1 + returns, axis=1)
+
+
+def window_corrcoef(prices, window):
+    tail = prices[:, -(window + 1):]
+    return np.corrcoef(np.diff(tail, axis=1) / tail[:, :-1])
+
+
+class TestRollingCorrelationEngine:
+    """Test cases for the running-sum correlation matrix."""
+
+    def test_matrix_matches_corrcoef_after_many_evictions(self):
+        prices = make_prices(ticks=230)
+        symbols = [f'S{i}' for i in range(5)]
+        engine = RollingCorrelationEngine(window=40, min_periods=10, initial_capacity=2)
+        for t in range(prices.shape[1]):
+            for i, symbol in enumerate(symbols):
+                engine.update_price(symbol, prices[i, t])
+
+        np.testing.assert_allclose(engine.correlation_matrix(symbols), window_corrcoef(prices, 40), atol=1e-9)
+
+        lookback = prices[:2, -21:]
+        returns = np.diff(lookback, axis=1) / lookback[:, :-1]
+        assert engine.correlation('S0', 'S1', lookback=20) == pytest.approx(np.corrcoef(returns)[0, 1])
+
+    def test_late_symbol_uses_overlap_only(self):
+        prices = make_prices(n_symbols=2, ticks=60)
+        engine = RollingCorrelationEngine(window=50, min_periods=10)
+        for t in range(60):
+            ticks = {'A': prices[0, t]}
+            if t >= 45:
+                ticks['B'] = prices[1, t]
+            engine.update_prices(ticks)
+
+        assert engine.observations('B') == 14
+        overlap = prices[:, 45:]
+        returns = np.diff(overlap, axis=1) / overlap[:, :-1]
+        assert engine.correlation('A', 'B') == pytest.approx(np.corrcoef(returns)[0, 1])
+
+    def test_insufficient_or_flat_data_is_nan(self):
+        engine = RollingCorrelationEngine(window=20, min_periods=5)
+        for t in range(10):
+            engine.update_prices({'A': 100 + t, 'FLAT': 50.0, 'B': 10 + t % 3})
+        engine.update_price('NEW', 1.0)
+
+        matrix = engine.correlation_matrix(['A', 'FLAT', 'B', 'NEW', 'UNKNOWN'])
+        assert np.isnan(matrix[0, 1]) and np.isnan(matrix[0, 3]) and np.isnan(matrix[0, 4])
+        assert not np.isnan(matrix[0, 2])
+        assert np.all(np.diag(matrix) == 1.0)
+        assert engine.correlation('A', 'UNKNOWN') is None
+
+
+class TestEngineIntegration:
+    """Test cases for the engine behind CorrelationMatrix and PositionCorrelationManager."""
+
+    def test_correlation_matrix_uses_engine(self):
+        prices = make_prices(n_symbols=3, ticks=120)
+        symbols = ['BTC', 'ETH', 'SOL']
+        tracker = CorrelationMatrix(lookback_periods=100)
+        for t in range(prices.shape[1]):
+            for i, symbol in enumerate(symbols):
+                tracker.update_price(symbol, prices[i, t])
+
+        expected = window_corrcoef(prices, 99)
+        np.testing.assert_allclose(tracker.get_correlation_matrix(symbols).values, expected, atol=1e-9)
+        assert tracker.calculate_correlation('BTC', 'SOL') == pytest.approx(expected[0, 2])
+        assert tracker.get_portfolio_correlation({s: 1.0 for s in symbols}) == pytest.approx(
+            np.mean(np.abs(expected[np.triu_indices(3, k=1)])))
+
+    def test_portfolio_matrix_falls_back_to_category_estimates(self):
+        manager = PositionCorrelationManager()
+        prices = make_prices(n_symbols=2, ticks=30)
+        for t in range(30):
+            manager.update_price_history('BTCUSDT', prices[0, t])
+            manager.update_price_history('ETHUSDT', prices[1, t])
+
+        matrix = manager.calculate_portfolio_correlation_matrix(
+            [{'symbol': 'BTCUSDT'}, {'symbol': 'ETHUSDT'}, {'symbol': 'UNIUSDT'}, {'symbol': 'SUSHIUSDT'}]
+        )
+        assert matrix['BTCUSDT']['ETHUSDT'] == pytest.approx(window_corrcoef(prices, 29)[0, 1])
+        assert matrix['ETHUSDT']['BTCUSDT'] == matrix['BTCUSDT']['ETHUSDT']
+        assert matrix['UNIUSDT']['SUSHIUSDT'] == 0.5  # Related DeFi categories, no price data
+        assert matrix['UNIUSDT']['UNIUSDT'] == 1.0
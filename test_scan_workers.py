@@ -0,0 +1,67 @@
+"""
+Unit tests for process-pool scan evaluation
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from market_scanner import MarketScanner
+from scan_workers import ProcessScanEvaluator
+from test_batch_indicators import MockScanClient
+from test_incremental_indicators import make_ohlcv
+
+
+class TestProcessScanEvaluator:
+    """Test cases for the persistent worker pool."""
+
+    def setup_method(self):
+        self.evaluator = ProcessScanEvaluator(max_workers=2)
+
+    def teardown_method(self):
+        self.evaluator.shutdown()
+
+    def test_malformed_candles_reported_per_symbol(self):
+        results = self.evaluator.evaluate({
+            'BAD': {'1h': [[1, 2, 3]] * 60},
+            'GOOD': {'1h': make_ohlcv(100, seed=5)},
+        }, adaptive_threshold=0.72)
+
+        assert isinstance(results['BAD'], Exception)
+        score, signal, confidence, reasons, metrics = results['GOOD']
+        assert signal in ('BUY', 'SELL', 'HOLD')
+        assert metrics is not None
+
+    def test_pool_is_reused(self):
+        data = {'A': {'1h': make_ohlcv(100, seed=1)}}
+        self.evaluator.evaluate(data, adaptive_threshold=0.72)
+        executor = self.evaluator._executor
+        self.evaluator.evaluate(data, adaptive_threshold=0.72)
+        assert self.evaluator._executor is executor
+
+
+class TestProcessScannerMode:
+    """Process scanner mode returns the same results as per-pair scanning."""
+
+    def test_process_mode_matches_scan_pair(self):
+        with patch.object(Config, 'ENABLE_INCREMENTAL_INDICATORS', False), \
+                patch.object(Config, 'SCANNER_PROCESS_WORKERS', 2):
+            scanner = MarketScanner(MockScanClient())
+            symbols = list(scanner.client.data)
+            try:
+                expected = {symbol: scanner.scan_pair(symbol) for symbol in symbols}
+                scanner.clear_cache()
+                results, timeouts, errors = scanner.scan_pairs_multiprocess(symbols, max_workers=4)
+            finally:
+                scanner.shutdown()
+
+        assert timeouts == 0 and errors == 0
+        assert len(results) == len(symbols)
+        for result in results:
+            assert result[:4] == pytest.approx(expected[result[0]][:4])
+            assert result[4] == expected[result[0]][4]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
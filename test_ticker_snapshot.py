@@ -0,0 +1,122 @@
+"""
+Unit tests for the bulk ticker snapshot
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from config import Config
+from kucoin_client import APICallPriority
+from ticker_snapshot import TickerSnapshot
+
+
+def make_tickers():
+    return {
+        'BTC/USDT:USDT': {'symbol': 'BTC/USDT:USDT', 'last': 50000.0, 'bid': 49999.0, 'ask': 50001.0,
+                          'quoteVolume': 1e9, 'timestamp': 1700000000000, 'info': {'markPrice': '50002.5'}},
+        'ETH/USDT:USDT': {'symbol': 'ETH/USDT:USDT', 'last': 3000.0, 'bid': None, 'ask': None,
+                          'quoteVolume': 5e8, 'timestamp': None, 'info': {}},
+    }
+
+
+class TestTickerSnapshot:
+    """Test cases for the columnar ticker table."""
+
+    def setup_method(self):
+        self.snapshot = TickerSnapshot()
+
+    def test_empty_snapshot(self):
+        assert len(self.snapshot) == 0
+        assert self.snapshot.age() == float('inf')
+        assert self.snapshot.get('BTC/USDT:USDT') is None
+
+    def test_rows_in_ticker_shape(self):
+        self.snapshot.update(make_tickers())
+        btc = self.snapshot.get('BTC/USDT:USDT')
+        assert btc['last'] == 50000.0 and btc['bid'] == 49999.0
+        assert btc['info']['markPrice'] == 50002.5
+        assert btc['timestamp'] == 1700000000000
+
+        eth = self.snapshot.get('ETH/USDT:USDT')
+        assert eth['bid'] is None and eth['info'] == {}
+        assert self.snapshot.age() < 1.0
+
+    def test_column_access(self):
+        self.snapshot.update(make_tickers())
+        volumes = self.snapshot.column('quoteVolume', ['ETH/USDT:USDT', 'XRP/USDT:USDT', 'BTC/USDT:USDT'])
+        assert volumes[0] == 5e8 and np.isnan(volumes[1]) and volumes[2] == 1e9
+        assert len(self.snapshot.column('last')) == 2
+
+    def test_update_replaces_table(self):
+        self.snapshot.update(make_tickers())
+        self.snapshot.update({'SOL/USDT:USDT': {'last': 100.0}})
+        assert list(self.snapshot) == ['SOL/USDT:USDT']
+        assert 'BTC/USDT:USDT' not in self.snapshot
+        assert self.snapshot.refreshes == 2
+
+
+class TestKuCoinClientBulkTickers:
+    """KuCoinClient.get_all_tickers replaces per-symbol REST polling."""
+
+    def setup_method(self):
+        self.exchange = MagicMock()
+        self.exchange.fetch_tickers.side_effect = lambda: make_tickers()
+        self.exchange.fetch_ticker.return_value = {'symbol': 'BTC/USDT:USDT', 'last': 49000.0}
+
+    def make_client(self):
+        from kucoin_client import KuCoinClient
+        with patch.object(Config, 'ENABLE_RATE_LIMITER', False), \
+                patch('kucoin_client.ccxt.kucoinfutures', return_value=self.exchange):
+            return KuCoinClient('key', 'secret', 'pass', enable_websocket=False)
+
+    def test_one_bulk_request_serves_every_symbol(self):
+        client = self.make_client()
+        with patch.object(Config, 'TICKER_SNAPSHOT_TTL', 5.0):
+            tickers = client.get_all_tickers()
+            client.get_all_tickers()
+            prices = [client.get_ticker(s)['last'] for s in ('BTC/USDT:USDT', 'ETH/USDT:USDT')]
+
+        assert self.exchange.fetch_tickers.call_count == 1
+        assert self.exchange.fetch_ticker.call_count == 0
+        assert prices == [50000.0, 3000.0]
+        assert len(tickers) == 2
+
+    def test_critical_and_stale_reads_use_rest(self):
+        client = self.make_client()
+        with patch.object(Config, 'TICKER_SNAPSHOT_TTL', 5.0):
+            client.get_all_tickers()
+            assert client.get_ticker('BTC/USDT:USDT', priority=APICallPriority.CRITICAL)['last'] == 49000.0
+            # Symbols missing from the snapshot fall back to REST
+            client.get_ticker('XRP/USDT:USDT')
+        assert self.exchange.fetch_ticker.call_count == 2
+
+        with patch.object(Config, 'TICKER_SNAPSHOT_TTL', 0.05):
+            time.sleep(0.1)
+            assert client.get_ticker('ETH/USDT:USDT', priority=APICallPriority.NORMAL)['last'] == 49000.0
+
+    def test_active_futures_refresh_snapshot(self):
+        self.exchange.load_markets.return_value = {
+            'BTC/USDT:USDT': {'swap': True, 'active': True},
+            'ETH/USDT:USDT': {'swap': True, 'active': True},
+        }
+        client = self.make_client()
+        futures = client.get_active_futures()
+
+        assert {f['symbol']: f['quoteVolume'] for f in futures} == {'BTC/USDT:USDT': 1e9, 'ETH/USDT:USDT': 5e8}
+        assert client.get_all_tickers().refreshes == 1
+        assert self.exchange.fetch_tickers.call_count == 1
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        client = self.make_client()
+        client.get_all_tickers()
+        self.exchange.fetch_tickers.side_effect = Exception('exchange down')
+        with patch.object(Config, 'TICKER_SNAPSHOT_TTL', 0):
+            snapshot = client.get_all_tickers()
+        assert snapshot.get('BTC/USDT:USDT')['last'] == 50000.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
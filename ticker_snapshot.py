@@ -0,0 +1,130 @@
+"""
+Shared in-memory bulk ticker snapshot
+
+One bulk request (ccxt fetch_tickers) returns the ticker of every contract.
+The result is kept as a columnar table (symbol -> row index plus one numpy
+array per field) so position monitoring, the DCA loop, the dashboard and the
+scanner can all read prices from a single snapshot instead of sending one
+REST request per symbol.
+
+Features:
+- Columns: last, bid, ask, mark, quoteVolume, timestamp
+- Whole-table swaps on refresh (readers never see a half-updated table)
+- Per-symbol rows returned in ccxt ticker shape (mark price under info.markPrice)
+- Vectorized column access for screening many symbols at once
+"""
+
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+COLUMNS = ('last', 'bid', 'ask', 'mark', 'quoteVolume', 'timestamp')
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class TickerSnapshot:
+    """
+    Columnar table of the latest bulk ticker snapshot.
+    """
+
+    def __init__(self):
+        """Initialize an empty snapshot"""
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._columns: Dict[str, np.ndarray] = {name: np.empty(0) for name in COLUMNS}
+        self._updated = 0.0
+        self.refreshes = 0
+
+    def update(self, tickers: Dict[str, Dict]):
+        """
+        Replace the table with a new bulk ticker response
+
+        Args:
+            tickers: ccxt fetch_tickers() result (symbol -> ticker dict)
+        """
+        symbols = list(tickers)
+        columns = {name: np.full(len(symbols), np.nan) for name in COLUMNS}
+        for row, symbol in enumerate(symbols):
+            ticker = tickers[symbol] or {}
+            info = ticker.get('info') if isinstance(ticker.get('info'), dict) else {}
+            columns['last'][row] = _to_float(ticker.get('last'))
+            columns['bid'][row] = _to_float(ticker.get('bid'))
+            columns['ask'][row] = _to_float(ticker.get('ask'))
+            columns['mark'][row] = _to_float(ticker.get('markPrice') or info.get('markPrice'))
+            columns['quoteVolume'][row] = _to_float(ticker.get('quoteVolume'))
+            columns['timestamp'][row] = _to_float(ticker.get('timestamp'))
+
+        index = {symbol: row for row, symbol in enumerate(symbols)}
+        with self._lock:
+            self._index = index
+            self._columns = columns
+            self._updated = time.monotonic()
+            self.refreshes += 1
+
+    def age(self) -> float:
+        """Seconds since the last refresh (inf if never refreshed)"""
+        return time.monotonic() - self._updated if self._updated else float('inf')
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """
+        Get one symbol's row in ccxt ticker shape
+
+        Returns:
+            Ticker dict, or None if the symbol is not in the snapshot
+        """
+        with self._lock:
+            row = self._index.get(symbol)
+            if row is None:
+                return None
+            values = {name: self._columns[name][row] for name in COLUMNS}
+
+        ticker = {'symbol': symbol}
+        for name in ('last', 'bid', 'ask', 'quoteVolume'):
+            ticker[name] = None if np.isnan(values[name]) else float(values[name])
+        ticker['timestamp'] = None if np.isnan(values['timestamp']) else int(values['timestamp'])
+        ticker['info'] = {} if np.isnan(values['mark']) else {'markPrice': float(values['mark'])}
+        return ticker
+
+    def column(self, name: str, symbols: List[str] = None) -> np.ndarray:
+        """
+        Get a whole column, optionally for a list of symbols (NaN for unknown symbols)
+
+        Args:
+            name: One of COLUMNS
+            symbols: Symbols to select (default: every symbol in snapshot order)
+        """
+        with self._lock:
+            values = self._columns[name]
+            if symbols is None:
+                return values.copy()
+            rows = np.array([self._index.get(s, -1) for s in symbols], dtype=int)
+        result = np.full(len(rows), np.nan)
+        found = rows >= 0
+        result[found] = values[rows[found]]
+        return result
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Materialize every row as a ticker dict"""
+        return {symbol: self.get(symbol) for symbol in self.symbols()}
+
+    def symbols(self) -> List[str]:
+        """Symbols in the snapshot"""
+        with self._lock:
+            return list(self._index)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols())